@@ -10,9 +10,10 @@ from app.models.auth import BrokerCredential
 from app.models.trading import PaperTrade
 from app.core.token_manager import token_manager
 from app.core.logger import logger
-from app.engine.paper_trade_updater import update_open_paper_trades
+from app.engine.paper_trade_updater import track_paper_trade, update_open_paper_trades
 from datetime import datetime, time as dt_time
 from app.core.market_hours import ist_now, is_after_close
+from app.core.config import get_settings
 
 # Create a session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -134,6 +135,8 @@ def close_market_close_trades():
             
             if closed_count > 0:
                 db.commit()
+                for trade in open_trades:
+                    track_paper_trade(trade)
                 logger.log_error("Market close - Trades auto-exited", {
                     "closed_count": closed_count,
                     "time": current_time.isoformat(),
@@ -170,6 +173,62 @@ def update_open_paper_trades_task():
     finally:
         db.close()
 
+_tick_stream = None
+
+
+def _stream_quote_symbols():
+    """Instruments the tick stream should carry: open live and paper trades."""
+    from app.engine.paper_trade_updater import _quote_symbol
+    from app.routes.auto_trading_simple import live_quote_symbols
+
+    symbols = set(live_quote_symbols())
+    db = SessionLocal()
+    try:
+        for symbol, index_name in db.query(PaperTrade.symbol, PaperTrade.index_name).filter(PaperTrade.status == "OPEN"):
+            symbols.add(_quote_symbol(symbol, index_name))
+    finally:
+        db.close()
+    return symbols
+
+
+def _on_stream_paper_prices(prices):
+    # Runs on the stream's listener thread with prices coalesced per symbol.
+    # No poll rate limit; only trades whose band the prices cross are loaded,
+    # and a quiet batch never touches the database (the session opens lazily).
+    db = SessionLocal()
+    try:
+        update_open_paper_trades(db, prices=prices)
+    except Exception as e:
+        logger.log_error("Streamed paper trade update failed", {"error": str(e)})
+    finally:
+        db.close()
+
+
+def ensure_tick_stream():
+    """Start the websocket tick stream, restarting it when the broker session changes."""
+    global _tick_stream
+    try:
+        from app.engine.option_signal_generator import _get_kite
+        from app.engine.price_bus import account_key
+        from app.engine.tick_stream import MarketDataStream
+        from app.routes.auto_trading_simple import on_stream_prices
+
+        kite = _get_kite()
+        # _get_kite rebuilds its client every minute; only a new session restarts the stream.
+        if _tick_stream is not None and (account_key(_tick_stream.kite) != account_key(kite) or not _tick_stream.running):
+            _tick_stream.stop()
+            _tick_stream = None
+        if kite is None or _tick_stream is not None:
+            return
+        _tick_stream = MarketDataStream(kite, symbol_source=_stream_quote_symbols)
+        _tick_stream.add_listener(on_stream_prices)
+        _tick_stream.add_listener(_on_stream_paper_prices)
+        _tick_stream.start()
+        logger.log_info("Tick stream started", {"subscriptions": len(_tick_stream.ticker.subscriptions)})
+    except Exception as e:
+        logger.log_error("Tick stream start failed", {"error": str(e)})
+
+
 def start_background_tasks():
     """Initialize and start background scheduler"""
     try:
@@ -207,6 +266,17 @@ def start_background_tasks():
             replace_existing=True
         )
         
+        if get_settings().TICK_STREAM_ENABLED:
+            scheduler.add_job(
+                ensure_tick_stream,
+                'interval',
+                seconds=30,
+                id='tick_stream',
+                name='Keep the websocket tick stream connected',
+                replace_existing=True,
+                next_run_time=datetime.now()
+            )
+
         scheduler.start()
         logger.log_info("Background tasks started", {
             "jobs": len(scheduler.get_jobs()),
@@ -218,7 +288,11 @@ def start_background_tasks():
 
 def stop_background_tasks():
     """Stop background scheduler"""
+    global _tick_stream
     try:
+        if _tick_stream is not None:
+            _tick_stream.stop()
+            _tick_stream = None
         if scheduler.running:
             scheduler.shutdown(wait=True)
             logger.log_error("Background tasks stopped", {})
@@ -61,6 +61,9 @@ class Settings(BaseSettings):
     # Market hours
     MARKET_TIMEZONE: str = "Asia/Kolkata"
     MARKET_HOLIDAYS: str = ""
+
+    # Websocket tick streaming (exit rules run per tick instead of per poll)
+    TICK_STREAM_ENABLED: bool = False
     
     # Frontend URLs (for OAuth redirects)
     FRONTEND_URL: str = "https://algo-trade-frontend.up.railway.app"
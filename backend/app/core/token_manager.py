@@ -10,6 +10,7 @@ from app.core.logger import logger
 from app.core.config import get_settings
 from app.brokers.base import BrokerFactory, Account
 from kiteconnect import KiteConnect
+from app.engine.broker_executor import bind_kite
 import requests
 
 class TokenManager:
@@ -32,7 +33,7 @@ class TokenManager:
             if not api_key or not access_token:
                 return False
 
-            kite = KiteConnect(api_key=api_key)
+            kite = bind_kite(KiteConnect(api_key=api_key))
             kite.set_access_token(access_token)
             
             # Test token by making a simple API call
@@ -198,7 +199,7 @@ class TokenManager:
             if not decrypted_access_token:
                 raise Exception("Missing access token; re-auth required")
 
-            kite = KiteConnect(api_key=decrypted_api_key)
+            kite = bind_kite(KiteConnect(api_key=decrypted_api_key))
             kite.set_access_token(decrypted_access_token)
             
             margins = kite.margins()
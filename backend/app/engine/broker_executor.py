@@ -0,0 +1,159 @@
+"""
+Shared, bounded executor for synchronous broker I/O.
+
+Every blocking Kite call (``ltp``, ``quote``, ``ohlc``, ``historical_data``,
+``margins``) runs on one long-lived pool instead of a throw-away
+``ThreadPoolExecutor`` per call. Three things keep a slow broker from
+piling up threads:
+
+* each call carries a deadline; the worker exposes it to the HTTP session
+  (``request_timeout``), so the underlying ``requests`` call gives up at the
+  same moment the caller does instead of running on for the session default;
+* at most ``max_in_flight`` calls may be queued or running; beyond that
+  :class:`BrokerBusy` is raised immediately rather than queueing behind
+  stuck requests;
+* calls the caller stopped waiting for are counted in ``stats()`` as
+  ``abandoned`` (and ``abandoned_running`` until they actually finish).
+
+``bind_kite`` wraps those methods on a client instance so existing
+``kite.ltp(...)`` call sites route through the pool unchanged. Calls made
+from a pool worker (e.g. the price bus polling inside a deadline-bound
+call) run inline so the pool can never deadlock on itself.
+"""
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+BROKER_METHODS = ("ltp", "quote", "ohlc", "historical_data", "margins")
+
+
+class BrokerCallTimeout(TimeoutError):
+    """The caller's deadline passed before the broker answered."""
+
+
+class BrokerBusy(RuntimeError):
+    """Too many broker calls are already queued or running."""
+
+
+class BrokerExecutor:
+    """Long-lived worker pool with per-call deadlines and an in-flight cap."""
+
+    def __init__(self, max_workers: int = 12, max_in_flight: Optional[int] = None, default_timeout: float = 10.0):
+        self.max_workers = int(max_workers)
+        self.max_in_flight = int(max_in_flight or 2 * max_workers)
+        self.default_timeout = float(default_timeout)
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.calls = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self.abandoned = 0
+        self.abandoned_running = 0
+
+    def _executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="broker-io")
+            return self._pool
+
+    def request_timeout(self, default: Optional[float] = None) -> float:
+        """Seconds left on the current worker's deadline (``default`` outside the pool)."""
+        default = self.default_timeout if default is None else float(default)
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is None:
+            return default
+        return max(0.05, min(default, deadline - time.monotonic()))
+
+    def in_worker(self) -> bool:
+        return getattr(self._local, "deadline", None) is not None
+
+    def call(self, fn: Callable[..., Any], *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run ``fn`` on the pool and wait at most ``timeout`` seconds for it."""
+        timeout = self.default_timeout if timeout is None else float(timeout)
+        if self.in_worker():
+            return fn(*args, **kwargs)
+
+        with self._lock:
+            if self._in_flight >= self.max_in_flight:
+                self.rejected += 1
+                raise BrokerBusy(f"{self._in_flight} broker calls already in flight")
+            self._in_flight += 1
+            self.calls += 1
+        deadline = time.monotonic() + timeout
+        state = {"abandoned": False}
+
+        def run():
+            self._local.deadline = deadline
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._local.deadline = None
+
+        def done(_future):
+            with self._lock:
+                self._in_flight -= 1
+                if state["abandoned"]:
+                    self.abandoned_running -= 1
+
+        try:
+            future = self._executor().submit(run)
+        except BaseException:
+            with self._lock:
+                self._in_flight -= 1
+            raise
+        future.add_done_callback(done)
+        try:
+            return future.result(timeout=timeout)
+        except FuturesTimeoutError:
+            with self._lock:
+                self.timeouts += 1
+                # Still queued: cancel outright. Running: the HTTP deadline ends it shortly.
+                if not future.cancel() and not future.done():
+                    state["abandoned"] = True
+                    self.abandoned += 1
+                    self.abandoned_running += 1
+            raise BrokerCallTimeout(f"Broker call timed out after {timeout:.1f}s") from None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "in_flight": self._in_flight,
+                "calls": self.calls,
+                "timeouts": self.timeouts,
+                "rejected": self.rejected,
+                "abandoned": self.abandoned,
+                "abandoned_running": self.abandoned_running,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+
+broker_executor = BrokerExecutor()
+
+
+def bind_kite(kite, executor: BrokerExecutor = broker_executor, timeout: Optional[float] = None):
+    """Route ``kite``'s synchronous data calls through ``executor`` (idempotent)."""
+    if kite is None or getattr(kite, "_broker_executor", None) is executor:
+        return kite
+    for name in BROKER_METHODS:
+        method = getattr(kite, name, None)
+        if not callable(method):
+            continue
+
+        @functools.wraps(method)
+        def bound(*args, _method=method, **kwargs):
+            return executor.call(_method, *args, timeout=timeout, **kwargs)
+
+        setattr(kite, name, bound)
+    kite._broker_executor = executor
+    return kite
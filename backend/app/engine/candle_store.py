@@ -0,0 +1,192 @@
+"""
+Incremental historical-candle cache.
+
+``kite.historical_data`` is the most expensive call in deep technical
+validation. This store keeps the candle window for each
+``(instrument_token, interval)`` in NumPy arrays and only asks the broker for
+bars newer than the last cached one. Within the current candle period the
+cached window is returned without any network call.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from app.core.market_hours import ist_now
+from app.engine.pipeline_metrics import record_cache, stage
+
+INTERVAL_SECONDS: Dict[str, int] = {
+    "minute": 60,
+    "3minute": 180,
+    "5minute": 300,
+    "10minute": 600,
+    "15minute": 900,
+    "30minute": 1800,
+    "60minute": 3600,
+    "day": 86400,
+}
+
+# Candle periods are aligned to IST wall-clock boundaries (UTC+05:30).
+_IST_OFFSET_SECONDS = 19800
+
+
+def _epoch_seconds(value) -> int:
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+def _next_period_boundary(now: float, period: int) -> float:
+    shifted = now + _IST_OFFSET_SECONDS
+    return (shifted // period) * period + period - _IST_OFFSET_SECONDS
+
+
+class CandleSeries:
+    """Columnar candle window; ``ts`` holds epoch seconds."""
+
+    __slots__ = ("ts", "open", "high", "low", "close", "volume", "last_bar_time")
+
+    def __init__(self, ts, open_, high, low, close, volume, last_bar_time=None):
+        self.ts = ts
+        self.open = open_
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.last_bar_time = last_bar_time
+
+    @classmethod
+    def empty(cls) -> "CandleSeries":
+        prices = [np.empty(0, dtype=np.float64) for _ in range(5)]
+        return cls(np.empty(0, dtype=np.int64), *prices)
+
+    @classmethod
+    def from_candles(cls, candles: List[Dict]) -> "CandleSeries":
+        if not candles:
+            return cls.empty()
+        return cls(
+            np.fromiter((_epoch_seconds(c["date"]) for c in candles), dtype=np.int64, count=len(candles)),
+            np.fromiter((float(c.get("open", 0) or 0) for c in candles), dtype=np.float64, count=len(candles)),
+            np.fromiter((float(c.get("high", 0) or 0) for c in candles), dtype=np.float64, count=len(candles)),
+            np.fromiter((float(c.get("low", 0) or 0) for c in candles), dtype=np.float64, count=len(candles)),
+            np.fromiter((float(c.get("close", 0) or 0) for c in candles), dtype=np.float64, count=len(candles)),
+            np.fromiter((float(c.get("volume", 0) or 0) for c in candles), dtype=np.float64, count=len(candles)),
+            candles[-1]["date"],
+        )
+
+    def __len__(self) -> int:
+        return int(len(self.ts))
+
+    def merge(self, newer: "CandleSeries") -> "CandleSeries":
+        """Append ``newer``; bars it re-reports (the last, possibly partial one) are replaced."""
+        if not len(newer):
+            return self
+        keep = self.ts < newer.ts[0]
+        return CandleSeries(
+            np.concatenate([self.ts[keep], newer.ts]),
+            np.concatenate([self.open[keep], newer.open]),
+            np.concatenate([self.high[keep], newer.high]),
+            np.concatenate([self.low[keep], newer.low]),
+            np.concatenate([self.close[keep], newer.close]),
+            np.concatenate([self.volume[keep], newer.volume]),
+            newer.last_bar_time,
+        )
+
+    def since(self, cutoff_ts: float) -> "CandleSeries":
+        start = int(np.searchsorted(self.ts, cutoff_ts, side="left"))
+        if start <= 0:
+            return self
+        return CandleSeries(
+            self.ts[start:],
+            self.open[start:],
+            self.high[start:],
+            self.low[start:],
+            self.close[start:],
+            self.volume[start:],
+            self.last_bar_time,
+        )
+
+
+class _Entry:
+    __slots__ = ("series", "fresh_until", "lock")
+
+    def __init__(self):
+        self.series = CandleSeries.empty()
+        self.fresh_until = 0.0
+        self.lock = threading.Lock()
+
+
+class CandleStore:
+    """Per ``(instrument_token, interval)`` candle windows with incremental refresh."""
+
+    def __init__(self, lookback_days: int = 30, clock: Callable[[], float] = time.time):
+        self.lookback_days = int(lookback_days)
+        self._clock = clock
+        self._entries: Dict[tuple, _Entry] = {}
+        self._tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def instrument_token(self, kite, quote_symbol: str) -> int:
+        """Instrument token for ``quote_symbol``; resolved via ``kite.ltp`` once."""
+        with self._lock:
+            token = self._tokens.get(quote_symbol)
+        if token is not None:
+            return token
+        token = int(kite.ltp(quote_symbol)[quote_symbol]["instrument_token"])
+        with self._lock:
+            self._tokens[quote_symbol] = token
+        return token
+
+    def _entry(self, key: tuple) -> _Entry:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry()
+            return entry
+
+    def get(self, kite, instrument_token: int, interval: str = "5minute", lookback_days: Optional[int] = None) -> CandleSeries:
+        """Return the cached window, fetching only bars newer than the last cached one."""
+        period = INTERVAL_SECONDS.get(interval)
+        if period is None:
+            raise ValueError(f"Unsupported candle interval: {interval}")
+        lookback = int(lookback_days or self.lookback_days)
+        entry = self._entry((int(instrument_token), interval))
+        with entry.lock:
+            now = self._clock()
+            if len(entry.series) and now < entry.fresh_until:
+                record_cache("candles", "hit")
+                return entry.series
+            record_cache("candles", "incremental" if len(entry.series) else "miss")
+
+            to_date = ist_now().replace(tzinfo=None)
+            if len(entry.series) and entry.series.last_bar_time is not None:
+                # Re-request the last bar too: it may have been partial when cached.
+                from_date = entry.series.last_bar_time
+            else:
+                from_date = to_date - timedelta(days=lookback)
+            with stage("historical"):
+                candles = kite.historical_data(
+                    instrument_token=instrument_token,
+                    from_date=from_date,
+                    to_date=to_date,
+                    interval=interval,
+                )
+            series = entry.series.merge(CandleSeries.from_candles(candles or []))
+            entry.series = series.since(now - lookback * 86400)
+            entry.fresh_until = _next_period_boundary(now, period)
+            return entry.series
+
+    def candles_for_symbol(self, kite, quote_symbol: str, interval: str = "5minute", lookback_days: Optional[int] = None) -> CandleSeries:
+        return self.get(kite, self.instrument_token(kite, quote_symbol), interval, lookback_days)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tokens.clear()
+
+
+candle_store = CandleStore()
@@ -0,0 +1,339 @@
+"""
+Vectorized exit-rule engine shared by the paper and live trade paths.
+
+Every rule works on whole NumPy arrays of open trades (one row per trade).
+Prices are read in the trade's favourable direction with ``sign`` (+1 BUY,
+-1 SELL), so each rule is written once for both sides. Missing levels
+(no stop, no target, no trail anchors) are ``NaN``.
+
+Paper rules (``paper_exits``), in priority order:
+
+1. stop to breakeven once 35% of the target distance is covered;
+2. at 12 points of profit, lock the stop at entry + 12 and exit on the
+   first adverse tick;
+3. exit at the target;
+4. past the target, trail the stop 3 points behind price;
+5. exit at the stop (labelled PROFIT_TRAIL when the stop is in profit).
+
+Live rules (``live_exits``) chain ``trail_update`` (percentage breakeven,
+trail activation and stepping, one-way trail stop), ``currency_exit``
+(CE profit give-back, PE loss cap), ``target_hit`` and ``stop_hit``
+(effective stop with the emergency buffer).
+
+Single-trade callers use the ``*_one`` variants: the same rules on plain
+floats, without the per-call cost of building NumPy arrays. The tests hold
+them equal to the vectorized functions row by row.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+OPEN, SL_HIT, TARGET_HIT, PROFIT_TRAIL, LOSS_CAP = range(5)
+STATUS_NAMES = ("OPEN", "SL_HIT", "TARGET_HIT", "PROFIT_TRAIL", "LOSS_CAP")
+
+KIND_NONE, KIND_CE, KIND_PE = 0, 1, 2
+
+
+def _f(values) -> np.ndarray:
+    return np.asarray(values, dtype=float)
+
+
+def side_sign(sides) -> np.ndarray:
+    """+1 for BUY, -1 otherwise (missing sides count as BUY)."""
+    return np.fromiter((1.0 if str(s or "BUY").upper() == "BUY" else -1.0 for s in sides), dtype=float)
+
+
+def _pct_of_target(entry, target, fraction):
+    return entry + (target - entry) * fraction
+
+
+def _pnl_pct(pnl, entry, qty):
+    capital = entry * qty
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where((entry > 0) & (capital != 0), pnl / capital * 100, 0.0)
+
+
+# --- paper rules -------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class PaperRules:
+    breakeven_fraction: float = 0.35
+    lock_points: float = 12.0
+    trail_points: float = 3.0
+
+
+class PaperExits(NamedTuple):
+    stop: np.ndarray          # stop after this update
+    status: np.ndarray        # status code per row (OPEN if still open)
+    exit_price: np.ndarray    # NaN while open
+    mark: np.ndarray          # new current price (the fill price on exit)
+    pnl: np.ndarray
+    pnl_pct: np.ndarray
+    breakeven: np.ndarray     # stop moved to entry this update
+    locked: np.ndarray        # stop moved to the profit lock this update
+    trailed: np.ndarray       # stop trailed past the target this update
+
+
+def paper_exits(entry, stop, target, sign, price, prev_price, qty, rules: PaperRules = PaperRules()) -> PaperExits:
+    """Apply the paper exit rules to a batch of trades at ``price``."""
+    E, sl, T, s, p, prev, q = (_f(a) for a in (entry, stop, target, sign, price, prev_price, qty))
+    sl = sl.copy()
+    has_sl = ~np.isnan(sl)
+    has_t = has_sl & ~np.isnan(T)
+    profit = s * (p - E)
+
+    breakeven = has_t & (s * (p - _pct_of_target(E, T, rules.breakeven_fraction)) >= 0) & (s * (sl - E) < 0)
+    sl = np.where(breakeven, np.round(E, 2), sl)
+
+    lock_zone = has_sl & (profit >= rules.lock_points)
+    lock_stop = np.round(E + s * rules.lock_points, 2)
+    locked = lock_zone & (s * (sl - lock_stop) < 0)
+    sl = np.where(locked, lock_stop, sl)
+    reversal = lock_zone & ~np.isnan(prev) & (s * (p - prev) < 0)
+
+    at_target = has_t & ~reversal & (s * (p - T) >= 0)
+    live = has_sl & ~reversal & ~at_target
+    trail_stop = np.round(p - s * rules.trail_points, 2)
+    trailed = live & has_t & (profit > s * (T - E)) & (s * (trail_stop - sl) > 0)
+    sl = np.where(trailed, trail_stop, sl)
+
+    stopped = live & (s * (p - sl) <= 0)
+
+    status = np.full(len(E), OPEN, dtype=np.int8)
+    status[reversal] = PROFIT_TRAIL
+    status[at_target] = TARGET_HIT
+    status[stopped] = np.where((E[stopped] > 0) & (s[stopped] * (sl[stopped] - E[stopped]) > 0), PROFIT_TRAIL, SL_HIT)
+
+    mark = np.where(at_target, T, np.where(stopped, sl, p))
+    exit_price = np.where(status != OPEN, mark, np.nan)
+    pnl = s * (mark - E) * q
+    return PaperExits(sl, status, exit_price, mark, pnl, _pnl_pct(pnl, E, q), breakeven, locked, trailed)
+
+
+# --- live rules --------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class LiveRules:
+    trail_enabled: bool = True
+    trigger_pct: float = 0.2
+    step_pct: float = 0.1
+    buffer_pct: float = 0.08
+    breakeven_pct: float = 0.25
+    emergency_multiplier: float = 0.9
+    profit_exit_amount: float = 500.0
+    loss_cap_amount: float = 600.0
+
+
+def initial_trail(sign, entry, rules: LiveRules):
+    """Trail anchors for fresh trades: ``(trail_start, trail_stop, trail_step)``."""
+    s, E = _f(sign), _f(entry)
+    buffer = rules.buffer_pct * E / 100
+    start = E * (1 + s * rules.trigger_pct / 100)
+    return start, start - s * buffer, rules.step_pct * E / 100
+
+
+def initial_trail_one(sign: float, entry: float, rules: LiveRules) -> Tuple[float, float, float]:
+    buffer = rules.buffer_pct * entry / 100
+    start = entry * (1 + sign * rules.trigger_pct / 100)
+    return start, start - sign * buffer, rules.step_pct * entry / 100
+
+
+class TrailState(NamedTuple):
+    stop: np.ndarray
+    breakeven_applied: np.ndarray
+    trail_active: np.ndarray
+    trail_start: np.ndarray
+    trail_stop: np.ndarray
+    trail_step: np.ndarray
+    healed: np.ndarray        # legacy anchors re-initialised
+    breakeven: np.ndarray     # breakeven applied this update
+    activated: np.ndarray
+    stepped: np.ndarray
+
+
+def trail_update(sign, entry, price, stop, breakeven_applied, trail_active, trail_start, trail_stop, trail_step,
+                 support, resistance, rules: LiveRules) -> TrailState:
+    """Breakeven lift, trail activation and one-way trail stepping."""
+    s, E, p, sl = _f(sign), _f(entry), _f(price), _f(stop).copy()
+    ts, tstop, step = _f(trail_start).copy(), _f(trail_stop).copy(), _f(trail_step).copy()
+    be_applied = np.asarray(breakeven_applied, dtype=bool).copy()
+    was_active = np.asarray(trail_active, dtype=bool)
+    ok = np.full(len(E), bool(rules.trail_enabled)) & ~np.isnan(E) & ~np.isnan(ts) & ~np.isnan(tstop) & ~np.isnan(step)
+
+    # Anchors on the wrong side of entry come from older logic: re-initialise them.
+    healed = ok & (s * (ts - E) < 0)
+    start0, stop0, step0 = initial_trail(s, E, rules)
+    ts, tstop, step = np.where(healed, start0, ts), np.where(healed, stop0, tstop), np.where(healed, step0, step)
+    active = was_active & ~healed
+
+    buffer = rules.buffer_pct * E / 100
+    breakeven = ok & ~be_applied & (s * (p - E * (1 + s * rules.breakeven_pct / 100)) >= 0)
+    base = np.where(np.isnan(sl), E - s * buffer, sl)
+    sl = np.where(breakeven, E + s * np.maximum(s * (base - E), buffer), sl)
+    be_applied = be_applied | breakeven
+
+    # Activation compares against the pre-repair flag, as the per-trade code always has.
+    activated = ok & ~was_active & (s * (p - ts) >= 0)
+    active = active | activated
+    ahead = ok & active & (s * (p - ts) > 0) & (step > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        steps = np.where(ahead, np.floor(s * (p - ts) / np.where(step > 0, step, 1.0)), 0.0)
+    stepped = steps > 0
+    new_start = ts + s * steps * step
+    new_stop = new_start - s * buffer
+    floor_level = np.where(s > 0, _f(support), _f(resistance))
+    has_floor = ~np.isnan(floor_level) & (floor_level != 0)
+    new_stop = np.where(has_floor, np.where(s > 0, np.maximum(new_stop, floor_level), np.minimum(new_stop, floor_level)), new_stop)
+    new_stop = np.where(s > 0, np.maximum(new_stop, tstop), np.minimum(new_stop, tstop))
+    ts = np.where(stepped, new_start, ts)
+    tstop = np.where(stepped, new_stop, tstop)
+    return TrailState(sl, be_applied, active, ts, tstop, step, healed, breakeven, activated, stepped)
+
+
+def trail_row(trail: TrailState, i: int) -> TrailState:
+    """Row ``i`` of a batch ``TrailState``, in the scalar shape of ``trail_update_one``."""
+    return TrailState._make(field[i] for field in trail)
+
+
+def trail_update_one(sign: float, entry: float, price: float, stop: float, breakeven_applied: bool,
+                     trail_active: bool, trail_start: float, trail_stop: float, trail_step: float,
+                     support: float, resistance: float, rules: LiveRules) -> TrailState:
+    """``trail_update`` for one trade; the fields of the result are scalars."""
+    s, E, p, sl, ts, tstop, step = sign, entry, price, stop, trail_start, trail_stop, trail_step
+    be_applied, was_active = bool(breakeven_applied), bool(trail_active)
+    if not rules.trail_enabled or math.isnan(E) or math.isnan(ts) or math.isnan(tstop) or math.isnan(step):
+        return TrailState(sl, be_applied, was_active, ts, tstop, step, False, False, False, False)
+
+    healed = s * (ts - E) < 0
+    if healed:
+        ts, tstop, step = initial_trail_one(s, E, rules)
+    active = was_active and not healed
+
+    buffer = rules.buffer_pct * E / 100
+    breakeven = not be_applied and s * (p - E * (1 + s * rules.breakeven_pct / 100)) >= 0
+    if breakeven:
+        base = E - s * buffer if math.isnan(sl) else sl
+        sl = E + s * max(s * (base - E), buffer)
+        be_applied = True
+
+    activated = not was_active and s * (p - ts) >= 0
+    active = active or activated
+    stepped = False
+    if active and s * (p - ts) > 0 and step > 0:
+        steps = math.floor(s * (p - ts) / step)
+        if steps > 0:
+            stepped = True
+            new_start = ts + s * steps * step
+            new_stop = new_start - s * buffer
+            floor_level = support if s > 0 else resistance
+            if not math.isnan(floor_level) and floor_level != 0:
+                new_stop = max(new_stop, floor_level) if s > 0 else min(new_stop, floor_level)
+            ts, tstop = new_start, (max(new_stop, tstop) if s > 0 else min(new_stop, tstop))
+    return TrailState(sl, be_applied, active, ts, tstop, step, healed, breakeven, activated, stepped)
+
+
+def currency_exit(kind, sign, entry, qty, price, peak_pnl, rules: LiveRules):
+    """Option P&L rules: ``(status codes, updated peak P&L)``; non-options stay OPEN."""
+    k, s, E, q, p = np.asarray(kind), _f(sign), np.nan_to_num(_f(entry)), np.nan_to_num(_f(qty)), _f(price)
+    pnl = s * (p - E) * q
+    peak = _f(peak_pnl)
+    peak = np.maximum(np.where(np.isnan(peak) | (peak == 0), pnl, peak), pnl)
+    status = np.full(len(k), OPEN, dtype=np.int8)
+    give_back = (k == KIND_CE) & (peak >= rules.profit_exit_amount) & (pnl <= rules.profit_exit_amount) & (peak > pnl)
+    status[give_back] = PROFIT_TRAIL
+    status[(k == KIND_PE) & (pnl <= -rules.loss_cap_amount)] = LOSS_CAP
+    return status, peak
+
+
+def currency_exit_one(kind: int, sign: float, entry: float, qty: float, price: float, peak_pnl: float,
+                      rules: LiveRules) -> Tuple[int, float]:
+    """``currency_exit`` for one trade."""
+    entry = 0.0 if math.isnan(entry) else entry
+    qty = 0.0 if math.isnan(qty) else qty
+    pnl = sign * (price - entry) * qty
+    peak = pnl if math.isnan(peak_pnl) or peak_pnl == 0 else peak_pnl
+    peak = max(peak, pnl)
+    if kind == KIND_CE and peak >= rules.profit_exit_amount and pnl <= rules.profit_exit_amount and peak > pnl:
+        return PROFIT_TRAIL, peak
+    if kind == KIND_PE and pnl <= -rules.loss_cap_amount:
+        return LOSS_CAP, peak
+    return OPEN, peak
+
+
+def target_hit(sign, target, price) -> np.ndarray:
+    T = _f(target)
+    return ~np.isnan(T) & (_f(sign) * (_f(price) - T) >= 0)
+
+
+def target_hit_one(sign: float, target: float, price: float) -> bool:
+    return not math.isnan(target) and sign * (price - target) >= 0
+
+
+def stop_hit(sign, entry, stop, trail_active, trail_stop, price, rules: LiveRules) -> np.ndarray:
+    """Effective stop (active trail stop, else stop loss) or the tighter emergency stop."""
+    s, E, sl, p = _f(sign), np.nan_to_num(_f(entry)), _f(stop), _f(price)
+    tstop = _f(trail_stop)
+    effective = np.where(np.asarray(trail_active, dtype=bool) & ~np.isnan(tstop), tstop, sl)
+    emergency = np.where(E > 0, E - s * np.abs(E - effective) * rules.emergency_multiplier, effective)
+    return ~np.isnan(sl) & ((s * (p - emergency) <= 0) | (s * (p - effective) <= 0))
+
+
+def stop_hit_one(sign: float, entry: float, stop: float, trail_active: bool, trail_stop: float, price: float,
+                 rules: LiveRules) -> bool:
+    """``stop_hit`` for one trade."""
+    if math.isnan(stop):
+        return False
+    entry = 0.0 if math.isnan(entry) else entry
+    effective = trail_stop if trail_active and not math.isnan(trail_stop) else stop
+    emergency = entry - sign * abs(entry - effective) * rules.emergency_multiplier if entry > 0 else effective
+    return sign * (price - emergency) <= 0 or sign * (price - effective) <= 0
+
+
+class LiveExits(NamedTuple):
+    trail: TrailState
+    peak_pnl: np.ndarray
+    status: np.ndarray
+    pnl: np.ndarray
+
+
+def live_exits(kind, sign, entry, qty, price, stop, target, peak_pnl, breakeven_applied, trail_active,
+               trail_start, trail_stop, trail_step, support, resistance, rules: LiveRules) -> LiveExits:
+    """Trail update followed by the currency, target and stop checks."""
+    trail = trail_update(sign, entry, price, stop, breakeven_applied, trail_active, trail_start, trail_stop,
+                         trail_step, support, resistance, rules)
+    status, peak = currency_exit(kind, sign, entry, qty, price, peak_pnl, rules)
+    still_open = status == OPEN
+    at_target = still_open & target_hit(sign, target, price)
+    status[at_target] = TARGET_HIT
+    stopped = still_open & ~at_target & stop_hit(sign, entry, trail.stop, trail.trail_active, trail.trail_stop, price, rules)
+    status[stopped] = SL_HIT
+    pnl = _f(sign) * (_f(price) - np.nan_to_num(_f(entry))) * np.nan_to_num(_f(qty))
+    return LiveExits(trail, peak, status, pnl)
+
+
+def live_exits_row(exits: LiveExits, i: int) -> LiveExits:
+    """Row ``i`` of a batch ``LiveExits``, in the scalar shape of ``live_exit_one``."""
+    return LiveExits(trail_row(exits.trail, i), exits.peak_pnl[i], exits.status[i], exits.pnl[i])
+
+
+def live_exit_one(kind: int, sign: float, entry: float, qty: float, price: float, stop: float, target: float,
+                  peak_pnl: float, breakeven_applied: bool, trail_active: bool, trail_start: float,
+                  trail_stop: float, trail_step: float, support: float, resistance: float,
+                  rules: LiveRules) -> LiveExits:
+    """``live_exits`` for one trade."""
+    trail = trail_update_one(sign, entry, price, stop, breakeven_applied, trail_active, trail_start, trail_stop,
+                             trail_step, support, resistance, rules)
+    status, peak = currency_exit_one(kind, sign, entry, qty, price, peak_pnl, rules)
+    if status == OPEN:
+        if target_hit_one(sign, target, price):
+            status = TARGET_HIT
+        elif stop_hit_one(sign, entry, trail.stop, trail.trail_active, trail.trail_stop, price, rules):
+            status = SL_HIT
+    pnl = sign * (price - (0.0 if math.isnan(entry) else entry)) * (0.0 if math.isnan(qty) else qty)
+    return LiveExits(trail, peak, status, pnl)
@@ -0,0 +1,327 @@
+"""
+Local stand-in for the Kite ticker websocket.
+
+Speaks just enough RFC 6455 (stdlib sockets, no extra dependency) to accept
+``TickStream`` connections, honours ``subscribe``/``unsubscribe``/``mode``
+messages and pushes binary tick packets in the real wire format. Tests and
+load runs use it to exercise parsing, reconnects and per-tick exit logic
+without a broker session::
+
+    python -m app.engine.fake_tick_server --port 8765 --instruments 500 --rate 20
+
+``drop_clients()`` severs every connection to exercise the reconnect path.
+"""
+from __future__ import annotations
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.engine.tick_stream import MODE_FULL, MODE_LTP, MODE_QUOTE, price_divisor
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+def encode_packet(token: int, last_price: float, mode: str = MODE_QUOTE, ohlc: Optional[Tuple[float, float, float, float]] = None,
+                  volume: int = 0) -> bytes:
+    """Encode one tick packet (8 bytes ltp, 44 quote, 184 full)."""
+    divisor = price_divisor(token)
+
+    def p(value: float) -> int:
+        return int(round(value * divisor))
+
+    if mode == MODE_LTP:
+        return struct.pack(">ii", token, p(last_price))
+    o, h, l, c = ohlc or (last_price, last_price, last_price, last_price)
+    packet = struct.pack(">iiiiiiiiiii", token, p(last_price), 1, p(last_price), volume, 0, 0, p(o), p(h), p(l), p(c))
+    if mode == MODE_FULL:
+        now = int(time.time())
+        packet += struct.pack(">iiiii", now, 0, 0, 0, now)
+        packet += b"".join(struct.pack(">iiH2x", 0, p(last_price), 0) for _ in range(10))
+    return packet
+
+
+def encode_message(packets: Iterable[bytes]) -> bytes:
+    packets = list(packets)
+    return struct.pack(">H", len(packets)) + b"".join(struct.pack(">H", len(pk)) + pk for pk in packets)
+
+
+def _frame(opcode: int, payload: bytes) -> bytes:
+    header = bytes([0x80 | opcode])
+    size = len(payload)
+    if size < 126:
+        header += bytes([size])
+    elif size < 65536:
+        header += bytes([126]) + struct.pack(">H", size)
+    else:
+        header += bytes([127]) + struct.pack(">Q", size)
+    return header + payload
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("client closed")
+        data += chunk
+    return data
+
+
+def _read_frame(sock: socket.socket) -> Tuple[int, bytes]:
+    first, second = _recv_exact(sock, 2)
+    opcode = first & 0x0F
+    size = second & 0x7F
+    if size == 126:
+        size = struct.unpack(">H", _recv_exact(sock, 2))[0]
+    elif size == 127:
+        size = struct.unpack(">Q", _recv_exact(sock, 8))[0]
+    mask = _recv_exact(sock, 4) if second & 0x80 else None
+    payload = _recv_exact(sock, size)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class _Client:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self.modes: Dict[int, str] = {}
+        self.send_lock = threading.Lock()
+        self.alive = True
+
+    def send(self, opcode: int, payload: bytes) -> None:
+        with self.send_lock:
+            self.sock.sendall(_frame(opcode, payload))
+
+    def close(self) -> None:
+        self.alive = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+class FakeTickServer:
+    """In-process Kite ticker; ``url`` is ready once ``start()`` returns."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, heartbeat_interval: float = 1.0):
+        self.host = host
+        self.port = port
+        self.heartbeat_interval = heartbeat_interval
+        self.prices: Dict[int, float] = {}
+        self.clients: List[_Client] = []
+        self.connections = 0
+        self.messages_received: List[Dict] = []
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sock: Optional[socket.socket] = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> "FakeTickServer":
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+        threading.Thread(target=self._accept_loop, name="fake-tick-accept", daemon=True).start()
+        if self.heartbeat_interval:
+            threading.Thread(target=self._heartbeat_loop, name="fake-tick-heartbeat", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.drop_clients()
+        if self._sock is not None:
+            self._sock.close()
+
+    def __enter__(self) -> "FakeTickServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def drop_clients(self) -> None:
+        with self._lock:
+            clients, self.clients = self.clients, []
+        for client in clients:
+            client.close()
+
+    def subscribed(self) -> Dict[int, str]:
+        with self._lock:
+            merged: Dict[int, str] = {}
+            for client in self.clients:
+                merged.update(client.modes)
+            return merged
+
+    def set_price(self, token: int, price: float, push: bool = True) -> None:
+        self.prices[int(token)] = float(price)
+        if push:
+            self.push([int(token)])
+
+    def push(self, tokens: Optional[Iterable[int]] = None) -> int:
+        """Send the current price of ``tokens`` (default all) to subscribed clients."""
+        tokens = list(self.prices) if tokens is None else list(tokens)
+        with self._lock:
+            clients = list(self.clients)
+        sent = 0
+        for client in clients:
+            packets = [
+                encode_packet(t, self.prices[t], client.modes[t])
+                for t in tokens
+                if t in client.modes and t in self.prices
+            ]
+            if packets:
+                self._send(client, OP_BINARY, encode_message(packets))
+                sent += len(packets)
+        return sent
+
+    def _send(self, client: _Client, opcode: int, payload: bytes) -> None:
+        try:
+            client.send(opcode, payload)
+        except OSError:
+            self._forget(client)
+
+    def _forget(self, client: _Client) -> None:
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+        client.alive = False
+
+    def _accept_loop(self) -> None:
+        while not self._stopped.is_set():
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._serve, args=(sock,), name="fake-tick-client", daemon=True).start()
+
+    def _handshake(self, sock: socket.socket) -> bool:
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = sock.recv(4096)
+            if not chunk:
+                return False
+            request += chunk
+        headers = {}
+        for line in request.decode("latin-1").split("\r\n")[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            return False
+        accept = base64.b64encode(hashlib.sha1((key + _GUID).encode()).digest()).decode()
+        sock.sendall(
+            (
+                "HTTP/1.1 101 Switching Protocols\r\n"
+                "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+                f"Sec-WebSocket-Accept: {accept}\r\n\r\n"
+            ).encode()
+        )
+        return True
+
+    def _serve(self, sock: socket.socket) -> None:
+        try:
+            if not self._handshake(sock):
+                sock.close()
+                return
+        except OSError:
+            sock.close()
+            return
+        client = _Client(sock)
+        with self._lock:
+            self.clients.append(client)
+            self.connections += 1
+        try:
+            while client.alive and not self._stopped.is_set():
+                opcode, payload = _read_frame(sock)
+                if opcode == OP_TEXT:
+                    self._on_text(client, payload)
+                elif opcode == OP_PING:
+                    self._send(client, OP_PONG, payload)
+                elif opcode == OP_CLOSE:
+                    self._send(client, OP_CLOSE, payload[:2])
+                    break
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._forget(client)
+            client.close()
+
+    def _on_text(self, client: _Client, payload: bytes) -> None:
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            return
+        with self._lock:
+            self.messages_received.append(message)
+        action, value = message.get("a"), message.get("v")
+        if action == "subscribe":
+            for token in value:
+                client.modes.setdefault(int(token), MODE_QUOTE)
+        elif action == "unsubscribe":
+            for token in value:
+                client.modes.pop(int(token), None)
+        elif action == "mode":
+            mode, tokens = value
+            for token in tokens:
+                client.modes[int(token)] = mode
+            self.push(int(t) for t in tokens)
+
+    def _heartbeat_loop(self) -> None:
+        while not self._stopped.wait(self.heartbeat_interval):
+            with self._lock:
+                clients = list(self.clients)
+            for client in clients:
+                self._send(client, OP_BINARY, b"\x00")
+
+    def random_walk(self, tokens: Iterable[int], rate: float, duration: float, start_price: float = 100.0) -> int:
+        """Load generator: move and push every token ``rate`` times a second."""
+        tokens = list(tokens)
+        for token in tokens:
+            self.prices.setdefault(token, start_price)
+        sent, interval = 0, 1.0 / rate
+        deadline = time.time() + duration
+        while time.time() < deadline and not self._stopped.is_set():
+            for token in tokens:
+                self.prices[token] = max(0.05, round(self.prices[token] + random.uniform(-0.5, 0.5), 2))
+            sent += self.push(tokens)
+            time.sleep(interval)
+        return sent
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Fake Kite tick websocket server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--instruments", type=int, default=100, help="number of NFO tokens to random-walk")
+    parser.add_argument("--rate", type=float, default=10.0, help="pushes per second")
+    parser.add_argument("--duration", type=float, default=3600.0)
+    args = parser.parse_args(argv)
+
+    server = FakeTickServer(args.host, args.port).start()
+    print(f"fake tick server on {server.url}")
+    try:
+        sent = server.random_walk([(i << 8) | 2 for i in range(1, args.instruments + 1)], args.rate, args.duration)
+        print(f"sent {sent} ticks")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Daily liquidity-ranked F&O stock universe.
+
+Scans used to re-derive the stock universe from the full NFO dump on every
+call, ordered only by how many option contracts each name lists. The universe
+is now built once per trading day, ranked by the turnover and open interest of
+each stock's near-month future (one batched quote call covers every F&O
+name), cached in memory and persisted next to the day's instrument dump. A
+universe built before the dump's publish cutoff is rebuilt once after it.
+"""
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date
+from typing import Dict, List, Optional
+
+from app.core.market_hours import ist_now
+from app.engine.instrument_store import InstrumentStore, instrument_store, predates_publish
+
+INDEX_ROOTS = {"NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "SENSEX"}
+_SYMBOL_RE = re.compile(r"^[A-Z0-9-]+$")
+_QUOTE_CHUNK = 500
+# A fallback (option-count) ranking is retried after this many seconds.
+FALLBACK_RETRY_SECONDS = 300
+UNIVERSE_FILE = "fno_universe.json"
+
+
+def _stock_name(row: Dict) -> Optional[str]:
+    name = str(row.get("name") or "").upper().strip()
+    if not name or name in INDEX_ROOTS or not _SYMBOL_RE.match(name):
+        return None
+    return name
+
+
+def rank_by_option_count(instruments_nfo: List[Dict]) -> List[str]:
+    """Stock names ordered by listed option contracts, then by name."""
+    counts: Dict[str, int] = {}
+    for ins in instruments_nfo or []:
+        if ins.get("segment") != "NFO-OPT":
+            continue
+        name = _stock_name(ins)
+        if name:
+            counts[name] = counts.get(name, 0) + 1
+    return [sym for sym, _ in sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))]
+
+
+def near_month_futures(instruments_nfo: List[Dict], today: date) -> Dict[str, str]:
+    """Stock name -> tradingsymbol of its nearest unexpired future."""
+    best: Dict[str, tuple] = {}
+    for ins in instruments_nfo or []:
+        if ins.get("segment") != "NFO-FUT":
+            continue
+        expiry = ins.get("expiry")
+        if not isinstance(expiry, date) or expiry < today:
+            continue
+        name = _stock_name(ins)
+        if not name:
+            continue
+        current = best.get(name)
+        if current is None or expiry < current[0]:
+            best[name] = (expiry, ins["tradingsymbol"])
+    return {name: symbol for name, (_expiry, symbol) in best.items()}
+
+
+@dataclass
+class RankedUniverse:
+    trading_day: str
+    built_at: float
+    source: str  # "futures_liquidity" or "option_count"
+    symbols: List[str] = field(default_factory=list)
+    metrics: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def top(self, n: int) -> List[str]:
+        return self.symbols[: max(0, int(n))]
+
+
+class FnoUniverseCache:
+    """Builds the ranked F&O stock universe once per trading day."""
+
+    def __init__(self, store: InstrumentStore = instrument_store):
+        self._store = store
+        self._current: Optional[RankedUniverse] = None
+        self._lock = threading.Lock()
+
+    def _path(self, trading_day: date):
+        return self._store.day_dir(trading_day) / UNIVERSE_FILE
+
+    def _usable(self, universe: Optional[RankedUniverse], trading_day: date) -> bool:
+        if universe is None or universe.trading_day != trading_day.isoformat():
+            return False
+        if predates_publish(universe.built_at, trading_day):
+            return False
+        if universe.source != "futures_liquidity":
+            return (time.time() - universe.built_at) < FALLBACK_RETRY_SECONDS
+        return True
+
+    def _load(self, trading_day: date) -> Optional[RankedUniverse]:
+        try:
+            data = json.loads(self._path(trading_day).read_text(encoding="utf-8"))
+            return RankedUniverse(**data)
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _save(self, universe: RankedUniverse, trading_day: date) -> None:
+        path = self._path(trading_day)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            staging = path.with_suffix(f".{os.getpid()}.tmp")
+            staging.write_text(json.dumps(asdict(universe)), encoding="utf-8")
+            os.replace(staging, path)
+        except OSError:
+            pass
+
+    def get(self, kite, instruments_nfo: List[Dict]) -> RankedUniverse:
+        """Today's ranked universe; built (and persisted) on first use of the day."""
+        trading_day = ist_now().date()
+        with self._lock:
+            if self._usable(self._current, trading_day):
+                return self._current
+            persisted = self._load(trading_day)
+            if self._usable(persisted, trading_day):
+                self._current = persisted
+                return persisted
+            universe = self.build(kite, instruments_nfo, trading_day)
+            self._current = universe
+            if universe.source == "futures_liquidity":
+                self._save(universe, trading_day)
+            return universe
+
+    def build(self, kite, instruments_nfo: List[Dict], trading_day: date) -> RankedUniverse:
+        by_options = rank_by_option_count(instruments_nfo)
+        futures = near_month_futures(instruments_nfo, trading_day)
+        metrics: Dict[str, Dict[str, float]] = {}
+        if kite is not None and futures:
+            keys = [f"NFO:{symbol}" for symbol in futures.values()]
+            quotes: Dict[str, dict] = {}
+            for start in range(0, len(keys), _QUOTE_CHUNK):
+                try:
+                    quotes.update(kite.quote(keys[start:start + _QUOTE_CHUNK]) or {})
+                except Exception:
+                    continue
+            for name, symbol in futures.items():
+                q = quotes.get(f"NFO:{symbol}")
+                if not q:
+                    continue
+                price = float(q.get("average_price") or q.get("last_price") or 0)
+                metrics[name] = {
+                    "turnover": float(q.get("volume") or 0) * price,
+                    "oi_value": float(q.get("oi") or 0) * price,
+                }
+
+        if not metrics:
+            return RankedUniverse(trading_day.isoformat(), time.time(), "option_count", by_options)
+
+        option_rank = {name: i for i, name in enumerate(by_options)}
+        optionable = set(by_options)
+        quoted = sorted(
+            (name for name in metrics if name in optionable),
+            key=lambda name: (-metrics[name]["turnover"], -metrics[name]["oi_value"], name),
+        )
+        unquoted = sorted((n for n in optionable if n not in metrics), key=lambda n: option_rank[n])
+        return RankedUniverse(
+            trading_day.isoformat(),
+            time.time(),
+            "futures_liquidity",
+            quoted + unquoted,
+            {name: metrics[name] for name in quoted},
+        )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._current = None
+
+
+fno_universe = FnoUniverseCache()
@@ -0,0 +1,299 @@
+"""
+Daily on-disk instrument master store.
+
+Kite's instrument dumps are tens of thousands of CSV rows per exchange and only
+change once per trading day. This store downloads each dump at most once per
+trading day, persists it as one ``.npy`` file per column and memory-maps the
+columns on load, so repeat scans and process restarts read the local copy.
+
+Kite publishes the day's dump around 08:30 IST. A copy fetched earlier that
+morning still carries the previous session's contracts, so it is replaced by
+one re-download once the publish cutoff has passed.
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import date, datetime, time as dt_time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.core.market_hours import ist_now
+from app.engine.pipeline_metrics import record_cache, stage
+
+_BACKEND_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_STORE_DIR = _BACKEND_ROOT / "data" / "instruments"
+
+# Column name -> (kind, default used when a row omits the field).
+INSTRUMENT_COLUMNS: Dict[str, tuple] = {
+    "instrument_token": ("int", 0),
+    "exchange_token": ("str", ""),
+    "tradingsymbol": ("str", ""),
+    "name": ("str", ""),
+    "last_price": ("float", 0.0),
+    "expiry": ("date", ""),
+    "strike": ("float", 0.0),
+    "tick_size": ("float", 0.0),
+    "lot_size": ("int", 1),
+    "instrument_type": ("str", ""),
+    "segment": ("str", ""),
+    "exchange": ("str", ""),
+}
+
+ALL_EXCHANGES_KEY = "ALL"
+
+# Kite regenerates the instrument dumps at about 08:30 IST each trading day.
+PUBLISH_CUTOFF = dt_time(8, 30)
+
+
+def _exchange_key(exchange: Optional[str]) -> str:
+    return str(exchange).strip().upper() if exchange else ALL_EXCHANGES_KEY
+
+
+def _trading_day() -> date:
+    return ist_now().date()
+
+
+def predates_publish(fetched_at: Optional[float], trading_day: date) -> bool:
+    """True when data fetched at ``fetched_at`` missed ``trading_day``'s dump, which is now out.
+
+    Anything derived from the dumps before the publish cutoff should be
+    fetched (or rebuilt) again once the cutoff has passed.
+    """
+    if fetched_at is None:
+        return False
+    now = ist_now()
+    cutoff = datetime.combine(trading_day, PUBLISH_CUTOFF, tzinfo=now.tzinfo).timestamp()
+    return fetched_at < cutoff <= now.timestamp()
+
+
+def _encode_column(kind: str, values: list) -> np.ndarray:
+    if kind == "int":
+        return np.asarray([int(v or 0) for v in values], dtype=np.int64)
+    if kind == "float":
+        return np.asarray([float(v or 0.0) for v in values], dtype=np.float64)
+    if kind == "date":
+        out = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[D]")
+        for i, v in enumerate(values):
+            if isinstance(v, datetime):
+                out[i] = np.datetime64(v.date(), "D")
+            elif isinstance(v, date):
+                out[i] = np.datetime64(v, "D")
+            elif isinstance(v, str) and len(v) == 10:
+                try:
+                    out[i] = np.datetime64(v, "D")
+                except ValueError:
+                    pass
+        return out
+    # Strings are stored as fixed-width UTF-8 bytes, 4x smaller than numpy unicode.
+    encoded = [str(v if v is not None else "").encode("utf-8") for v in values]
+    width = max((len(v) for v in encoded), default=1) or 1
+    return np.asarray(encoded, dtype=f"S{width}")
+
+
+def _decode_column(kind: str, column: np.ndarray) -> list:
+    if kind == "str":
+        return np.char.decode(column, "utf-8").tolist() if len(column) else []
+    if kind == "date":
+        # NaT -> "" mirrors how Kite reports instruments without an expiry.
+        return [d if d is not None else "" for d in column.astype(object).tolist()]
+    return column.tolist()
+
+
+class InstrumentTable:
+    """Columnar view of one exchange dump (or the full dump) for a trading day."""
+
+    def __init__(
+        self,
+        exchange: str,
+        trading_day: date,
+        columns: Dict[str, np.ndarray],
+        downloaded_at: Optional[float] = None,
+    ):
+        self.exchange = exchange
+        self.trading_day = trading_day
+        self.columns = columns
+        self.downloaded_at = downloaded_at
+        self._records: Optional[List[Dict]] = None
+        self._records_lock = threading.Lock()
+
+    @classmethod
+    def from_records(
+        cls, exchange: str, trading_day: date, rows: List[Dict], downloaded_at: Optional[float] = None
+    ) -> "InstrumentTable":
+        rows = rows or []
+        columns = {
+            name: _encode_column(kind, [row.get(name, default) for row in rows])
+            for name, (kind, default) in INSTRUMENT_COLUMNS.items()
+        }
+        return cls(exchange, trading_day, columns, downloaded_at)
+
+    def __len__(self) -> int:
+        first = self.columns.get("instrument_token")
+        return int(len(first)) if first is not None else 0
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def str_column(self, name: str) -> np.ndarray:
+        """Decoded unicode copy of a string column (for vectorized filtering)."""
+        return np.char.decode(self.columns[name], "utf-8")
+
+    def records(self) -> List[Dict]:
+        """Materialize rows as Kite-style dicts once, then reuse them."""
+        if self._records is not None:
+            return self._records
+        with self._records_lock:
+            if self._records is None:
+                decoded = {
+                    name: _decode_column(kind, self.columns[name])
+                    for name, (kind, _default) in INSTRUMENT_COLUMNS.items()
+                }
+                names = list(decoded.keys())
+                self._records = [dict(zip(names, row)) for row in zip(*decoded.values())]
+        return self._records
+
+
+class InstrumentStore:
+    """Downloads instrument dumps once per trading day and serves them from disk."""
+
+    def __init__(self, root: Optional[str | Path] = None, retain_days: int = 2):
+        self._root_override = Path(root) if root else None
+        self.retain_days = max(1, int(retain_days))
+        self._tables: Dict[tuple, InstrumentTable] = {}
+        self._lock = threading.Lock()
+        self._download_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def root(self) -> Path:
+        if self._root_override is not None:
+            return self._root_override
+        return Path(os.getenv("INSTRUMENT_STORE_DIR") or DEFAULT_STORE_DIR)
+
+    def day_dir(self, trading_day: Optional[date] = None) -> Path:
+        """Directory holding everything derived from ``trading_day``'s dumps."""
+        return self.root / (trading_day or _trading_day()).isoformat()
+
+    def _table_dir(self, trading_day: date, exchange_key: str) -> Path:
+        return self.day_dir(trading_day) / exchange_key
+
+    def _download_lock(self, exchange_key: str) -> threading.Lock:
+        with self._lock:
+            return self._download_locks.setdefault(exchange_key, threading.Lock())
+
+    def cached(self, exchange: Optional[str] = None) -> Optional[InstrumentTable]:
+        """Return today's table from memory or disk without touching the broker.
+
+        A copy downloaded before today's publish cutoff counts as missing once
+        the cutoff has passed, so ``load`` fetches the published dump once.
+        """
+        exchange_key = _exchange_key(exchange)
+        day = _trading_day()
+        with self._lock:
+            table = self._tables.get((day, exchange_key))
+        if table is None:
+            table = self._read(day, exchange_key)
+            if table is not None:
+                with self._lock:
+                    self._tables[(day, exchange_key)] = table
+        if table is not None and predates_publish(table.downloaded_at, day):
+            return None
+        return table
+
+    def load(self, kite, exchange: Optional[str] = None) -> InstrumentTable:
+        """Return today's table, downloading it only when no local copy exists.
+
+        Broker errors propagate so callers keep their existing error handling.
+        """
+        table = self.cached(exchange)
+        if table is not None:
+            record_cache("instruments", "hit")
+            return table
+        exchange_key = _exchange_key(exchange)
+        with self._download_lock(exchange_key):
+            # Another thread may have finished the download while we waited.
+            table = self.cached(exchange)
+            if table is not None:
+                record_cache("instruments", "hit")
+                return table
+            record_cache("instruments", "miss")
+            with stage("instruments_download"):
+                return self.refresh(kite, exchange)
+
+    def records(self, kite, exchange: Optional[str] = None) -> List[Dict]:
+        return self.load(kite, exchange).records()
+
+    def refresh(self, kite, exchange: Optional[str] = None) -> InstrumentTable:
+        """Force a fresh download for today and persist it."""
+        exchange_key = _exchange_key(exchange)
+        day = _trading_day()
+        downloaded_at = ist_now().timestamp()
+        rows = kite.instruments(exchange) if exchange else kite.instruments()
+        table = InstrumentTable.from_records(exchange_key, day, list(rows or []), downloaded_at)
+        try:
+            self._write(table)
+            persisted = self._read(day, exchange_key)
+            if persisted is not None:
+                table = persisted
+        except OSError:
+            # Read-only or full disk: keep serving the in-memory copy.
+            pass
+        with self._lock:
+            self._tables[(day, exchange_key)] = table
+        self._prune(day)
+        return table
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+    def _write(self, table: InstrumentTable) -> None:
+        target = self._table_dir(table.trading_day, table.exchange)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging = target.parent / f".{table.exchange}.{os.getpid()}.{threading.get_ident()}.tmp"
+        if staging.exists():
+            shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        for name, column in table.columns.items():
+            np.save(staging / f"{name}.npy", column, allow_pickle=False)
+        meta = {
+            "exchange": table.exchange,
+            "trading_day": table.trading_day.isoformat(),
+            "rows": len(table),
+            "downloaded_at": table.downloaded_at if table.downloaded_at is not None else time.time(),
+        }
+        (staging / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+        if target.exists():
+            shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+
+    def _read(self, trading_day: date, exchange_key: str) -> Optional[InstrumentTable]:
+        directory = self._table_dir(trading_day, exchange_key)
+        if not (directory / "meta.json").exists():
+            return None
+        try:
+            meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+            columns = {
+                name: np.load(directory / f"{name}.npy", mmap_mode="r", allow_pickle=False)
+                for name in INSTRUMENT_COLUMNS
+            }
+        except (OSError, ValueError):
+            return None
+        return InstrumentTable(exchange_key, trading_day, columns, meta.get("downloaded_at"))
+
+    def _prune(self, today: date) -> None:
+        root = self.root
+        if not root.exists():
+            return
+        days = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+        for name in days[:-self.retain_days]:
+            if name != today.isoformat():
+                shutil.rmtree(root / name, ignore_errors=True)
+
+
+instrument_store = InstrumentStore()
@@ -0,0 +1,160 @@
+"""
+Option-chain index keyed by underlying -> expiry -> strike -> CE/PE.
+
+Built once per instrument refresh so per-symbol chain lookups stop scanning
+the whole NFO/BFO dump. Underlyings are keyed by the exact instrument ``name``
+(no ``tradingsymbol`` prefix matching), and ATM strikes are found by bisect.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+
+class ExpiryChain:
+    """Sorted strike ladder for one underlying/expiry with aligned CE/PE records."""
+
+    __slots__ = ("expiry", "strikes", "ce", "pe")
+
+    def __init__(self, expiry: date, strikes: np.ndarray, ce: List[Optional[Dict]], pe: List[Optional[Dict]]):
+        self.expiry = expiry
+        self.strikes = strikes
+        self.ce = ce
+        self.pe = pe
+
+    def __len__(self) -> int:
+        return int(len(self.strikes))
+
+    def atm_position(self, spot: float) -> int:
+        """Index of the strike closest to ``spot``; ties resolve to the lower strike."""
+        pos = int(np.searchsorted(self.strikes, spot, side="left"))
+        if pos <= 0:
+            return 0
+        if pos >= len(self.strikes):
+            return len(self.strikes) - 1
+        below = self.strikes[pos - 1]
+        above = self.strikes[pos]
+        return pos - 1 if (spot - below) <= (above - spot) else pos
+
+    def atm_strike(self, spot: float) -> float:
+        return self.strikes[self.atm_position(spot)].item()
+
+    def window(self, spot: float, width: int) -> range:
+        """Positions of ``width`` strikes either side of ATM (clamped to the ladder)."""
+        center = self.atm_position(spot)
+        width = max(0, int(width))
+        return range(max(0, center - width), min(len(self.strikes), center + width + 1))
+
+
+def _as_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return None
+
+
+class OptionChainIndex:
+    """underlying -> sorted expiries -> :class:`ExpiryChain`."""
+
+    def __init__(self, segment: str):
+        self.segment = segment
+        self._expiries: Dict[str, List[date]] = {}
+        self._chains: Dict[str, Dict[date, ExpiryChain]] = {}
+
+    @classmethod
+    def from_records(
+        cls,
+        records: Iterable[Dict],
+        segment: str,
+        key: Optional[str] = None,
+    ) -> "OptionChainIndex":
+        """Index option rows of ``segment``.
+
+        ``key`` forces every row under a single underlying name; used for
+        fallbacks where the broker dump does not carry a clean ``name``.
+        """
+        grouped: Dict[str, Dict[date, Dict[float, List[Optional[Dict]]]]] = {}
+        for row in records or []:
+            if row.get("segment") != segment:
+                continue
+            expiry = _as_date(row.get("expiry"))
+            if expiry is None:
+                continue
+            kind = row.get("instrument_type")
+            if kind not in ("CE", "PE"):
+                continue
+            name = key or str(row.get("name") or "").strip().upper()
+            if not name:
+                continue
+            strike = float(row.get("strike") or 0.0)
+            legs = grouped.setdefault(name, {}).setdefault(expiry, {}).setdefault(strike, [None, None])
+            slot = 0 if kind == "CE" else 1
+            # Keep the first record per leg, matching the old ``next(...)`` scan.
+            if legs[slot] is None:
+                legs[slot] = row
+
+        index = cls(segment)
+        for name, by_expiry in grouped.items():
+            chains: Dict[date, ExpiryChain] = {}
+            for expiry, by_strike in by_expiry.items():
+                strikes = sorted(by_strike)
+                chains[expiry] = ExpiryChain(
+                    expiry,
+                    np.asarray(strikes, dtype=np.float64),
+                    [by_strike[s][0] for s in strikes],
+                    [by_strike[s][1] for s in strikes],
+                )
+            index._chains[name] = chains
+            index._expiries[name] = sorted(chains)
+        return index
+
+    def __contains__(self, underlying: str) -> bool:
+        return str(underlying).upper() in self._chains
+
+    def __len__(self) -> int:
+        return len(self._chains)
+
+    def underlyings(self) -> List[str]:
+        return list(self._chains)
+
+    def expiries(self, underlying: str) -> List[date]:
+        return self._expiries.get(str(underlying).upper(), [])
+
+    def nearest_expiry(self, underlying: str, today: Optional[date] = None) -> Optional[date]:
+        """First expiry on or after ``today``."""
+        expiries = self.expiries(underlying)
+        pos = bisect.bisect_left(expiries, today or date.today())
+        return expiries[pos] if pos < len(expiries) else None
+
+    def chain(self, underlying: str, expiry: date) -> Optional[ExpiryChain]:
+        return self._chains.get(str(underlying).upper(), {}).get(expiry)
+
+
+_index_cache: Dict[tuple, tuple] = {}
+_index_cache_lock = threading.Lock()
+_INDEX_CACHE_MAX = 8
+
+
+def get_option_chain_index(records: List[Dict], segment: str) -> OptionChainIndex:
+    """Return the index for an instrument list, building it once per list object.
+
+    The instrument store hands out the same list for a whole trading day, so
+    keying on identity rebuilds exactly once per refresh.
+    """
+    cache_key = (id(records), segment)
+    with _index_cache_lock:
+        hit = _index_cache.get(cache_key)
+        if hit is not None and hit[0] is records:
+            return hit[1]
+    index = OptionChainIndex.from_records(records, segment)
+    with _index_cache_lock:
+        # Holding the list keeps its id from being reused while cached.
+        _index_cache[cache_key] = (records, index)
+        while len(_index_cache) > _INDEX_CACHE_MAX:
+            _index_cache.pop(next(iter(_index_cache)))
+    return index
@@ -3,8 +3,9 @@ from typing import List, Dict
 import functools
 import threading
 import time
-import re
 import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date
 from kiteconnect import KiteConnect
 import os
 from app.core.database import SessionLocal
@@ -12,6 +13,15 @@ from app.models.auth import BrokerCredential
 from app.core.security import encryption_manager
 from app.strategies.market_intelligence import news_analyzer, trend_analyzer
 from app.engine.technical_indicators import calculate_comprehensive_signals
+from app.engine.instrument_store import instrument_store
+from app.engine.candle_store import candle_store
+from app.engine.rate_limiter import rate_limited
+from app.engine.pipeline_metrics import bind_run, current_run, record_cache, stage, symbol_timer, track_run
+from app.engine.fno_universe import fno_universe, rank_by_option_count
+from app.engine.option_analytics import DEFAULT_STRIKE_WINDOW, analyze_chain, iv_baseline
+from app.engine.option_chain_index import OptionChainIndex, get_option_chain_index
+from app.engine.price_bus import price_bus
+from app.engine.broker_executor import bind_kite, broker_executor
 
 # Example: You would replace this with actual NSE/BSE/3rd party API endpoints
 OPTION_CHAIN_URLS = {
@@ -35,6 +45,71 @@ NIFTY_50_SYMBOLS = [
     "TITAN", "ULTRACEMCO", "WIPRO"
 ]
 
+# Map index/stock name to correct Zerodha symbol for quote
+# Includes both indices and NIFTY 50 stocks
+UNDERLYING_QUOTE_SYMBOLS = {
+    # Indices
+    "BANKNIFTY": "NSE:NIFTY BANK",
+    "NIFTY": "NSE:NIFTY 50",
+    "SENSEX": "BSE:SENSEX",
+    "FINNIFTY": "NSE:NIFTY FIN SERVICE",
+    # NIFTY 50 Stocks (for option chain support)
+    "ADANIENT": "NSE:ADANIENT",
+    "ADANIPORTS": "NSE:ADANIPORTS",
+    "APOLLOHOSP": "NSE:APOLLOHOSP",
+    "ASIANPAINT": "NSE:ASIANPAINT",
+    "AXISBANK": "NSE:AXISBANK",
+    "BAJAJ-AUTO": "NSE:BAJAJAUTOLD",
+    "BAJFINANCE": "NSE:BAJFINANCE",
+    "BAJAJFINSV": "NSE:BAJAJFINSV",
+    "BEL": "NSE:BEL",
+    "BPCL": "NSE:BPCL",
+    "BHARTIARTL": "NSE:BHARTIARTL",
+    "BRITANNIA": "NSE:BRITANNIA",
+    "CIPLA": "NSE:CIPLA",
+    "COALINDIA": "NSE:COALINDIA",
+    "DRREDDY": "NSE:DRREDDY",
+    "EICHERMOT": "NSE:EICHERMOT",
+    "GRASIM": "NSE:GRASIM",
+    "HCLTECH": "NSE:HCLTECH",
+    "HDFCBANK": "NSE:HDFCBANK",
+    "HDFCLIFE": "NSE:HDFCLIFE",
+    "HEROMOTOCO": "NSE:HEROMOTOCO",
+    "HINDALCO": "NSE:HINDALCO",
+    "HINDUNILVR": "NSE:HINDUNILVR",
+    "ICICIBANK": "NSE:ICICIBANK",
+    "INDUSINDBK": "NSE:INDUSINDBK",
+    "INFY": "NSE:INFY",
+    "ITC": "NSE:ITC",
+    "JSWSTEEL": "NSE:JSWSTEEL",
+    "KOTAKBANK": "NSE:KOTAKBANK",
+    "LT": "NSE:LT",
+    "M&M": "NSE:MM",
+    "MARUTI": "NSE:MARUTI",
+    "NESTLEIND": "NSE:NESTLEIND",
+    "NTPC": "NSE:NTPC",
+    "ONGC": "NSE:ONGC",
+    "POWERGRID": "NSE:POWERGRID",
+    "RELIANCE": "NSE:RELIANCE",
+    "SBIN": "NSE:SBIN",
+    "SBILIFE": "NSE:SBILIFE",
+    "SHRIRAMFIN": "NSE:SHRIRAMFIN",
+    "SUNPHARMA": "NSE:SUNPHARMA",
+    "TATAMOTORS": "NSE:TATAMOTORS",
+    "TATASTEEL": "NSE:TATASTEEL",
+    "TCS": "NSE:TCS",
+    "TECHM": "NSE:TECHM",
+    "TITAN": "NSE:TITAN",
+    "ULTRACEMCO": "NSE:ULTRACEMCO",
+    "WIPRO": "NSE:WIPRO",
+}
+
+# Kite accepts at most 500 instruments per quote call.
+QUOTE_BATCH_LIMIT = 500
+
+# Strikes either side of ATM quoted for IV/Greeks/PCR/max-pain analytics.
+OPTION_ANALYTICS_WINDOW = int(os.getenv("OPTION_ANALYTICS_WINDOW", str(DEFAULT_STRIKE_WINDOW)))
+
 # Zerodha Kite Connect (lazy initialized)
 _kite_cache = None
 _kite_cache_time = 0
@@ -87,14 +162,61 @@ def _build_kite(api_key: str, access_token: str) -> KiteConnect:
     adapter = HTTPAdapter(max_retries=retries)
     session.mount('https://', adapter)
     session.mount('http://', adapter)
+    # Calls inside a broker_executor deadline get a single attempt: each retry
+    # would otherwise start over with the timeout computed for the first one.
+    bounded = requests.Session()
+    bounded.mount('https://', HTTPAdapter(max_retries=0))
+    bounded.mount('http://', HTTPAdapter(max_retries=0))
 
     def custom_request(*args, **kwargs):
         kwargs.pop('timeout', None)
-        return requests.Session.request(session, *args, timeout=10, **kwargs)
+        # Inside a broker_executor call the HTTP timeout shrinks to the caller's deadline.
+        target = bounded if broker_executor.in_worker() else session
+        return requests.Session.request(target, *args, timeout=broker_executor.request_timeout(10), **kwargs)
 
     session.request = custom_request
     kite.reqsession = session
-    return kite
+    # Every consumer of this client shares the per-endpoint token buckets.
+    return rate_limited(bind_kite(kite))
+
+
+_technicals_cache: Dict[tuple, tuple] = {}
+_technicals_cache_lock = threading.Lock()
+_technicals_cache_max = 64
+
+
+def _underlying_technicals(kite: KiteConnect, underlying_symbol: str, interval: str = "5minute") -> Dict | None:
+    """Indicator bundle for an underlying, memoized per (underlying, interval, last candle).
+
+    Returns None when fewer than 21 candles are available.
+    """
+    # 30 days of candles from the incremental candle store; only bars newer
+    # than the cached window hit the broker.
+    historical = candle_store.candles_for_symbol(kite, underlying_symbol, interval, lookback_days=30)
+    if len(historical) <= 20:
+        return None
+    key = (underlying_symbol, interval, int(historical.ts[-1]))
+    last_close = float(historical.close[-1])
+    with _technicals_cache_lock:
+        hit = _technicals_cache.get(key)
+    # The newest bar may still be forming; its close is part of the identity.
+    if hit is not None and hit[0] == last_close:
+        record_cache("technicals", "hit")
+        return hit[1]
+
+    record_cache("technicals", "miss")
+    with stage("technicals"):
+        tech_analysis = calculate_comprehensive_signals(
+            historical.close.tolist(),
+            historical.high.tolist(),
+            historical.low.tolist(),
+            historical.volume.tolist(),
+        )
+    with _technicals_cache_lock:
+        _technicals_cache[key] = (last_close, tech_analysis)
+        while len(_technicals_cache) > _technicals_cache_max:
+            _technicals_cache.pop(next(iter(_technicals_cache)))
+    return tech_analysis
 
 
 def _validate_signal_quality(
@@ -130,84 +252,13 @@ def _validate_signal_quality(
             try:
                 # Get underlying index symbol
                 index_symbol = signal.get("index", "NIFTY")
-                symbol_map = {
-                    "BANKNIFTY": "NSE:NIFTY BANK",
-                    "NIFTY": "NSE:NIFTY 50",
-                    "SENSEX": "BSE:SENSEX",
-                    "FINNIFTY": "NSE:NIFTY FIN SERVICE",
-                    # NIFTY 50 Stocks - map to their NSE symbols
-                    "ADANIENT": "NSE:ADANIENT",
-                    "ADANIPORTS": "NSE:ADANIPORTS",
-                    "APOLLOHOSP": "NSE:APOLLOHOSP",
-                    "ASIANPAINT": "NSE:ASIANPAINT",
-                    "AXISBANK": "NSE:AXISBANK",
-                    "BAJAJ-AUTO": "NSE:BAJAJAUTOLD",
-                    "BAJFINANCE": "NSE:BAJFINANCE",
-                    "BAJAJFINSV": "NSE:BAJAJFINSV",
-                    "BEL": "NSE:BEL",
-                    "BPCL": "NSE:BPCL",
-                    "BHARTIARTL": "NSE:BHARTIARTL",
-                    "BRITANNIA": "NSE:BRITANNIA",
-                    "CIPLA": "NSE:CIPLA",
-                    "COALINDIA": "NSE:COALINDIA",
-                    "DRREDDY": "NSE:DRREDDY",
-                    "EICHERMOT": "NSE:EICHERMOT",
-                    "GRASIM": "NSE:GRASIM",
-                    "HCLTECH": "NSE:HCLTECH",
-                    "HDFCBANK": "NSE:HDFCBANK",
-                    "HDFCLIFE": "NSE:HDFCLIFE",
-                    "HEROMOTOCO": "NSE:HEROMOTOCO",
-                    "HINDALCO": "NSE:HINDALCO",
-                    "HINDUNILVR": "NSE:HINDUNILVR",
-                    "ICICIBANK": "NSE:ICICIBANK",
-                    "INDUSINDBK": "NSE:INDUSINDBK",
-                    "INFY": "NSE:INFY",
-                    "ITC": "NSE:ITC",
-                    "JSWSTEEL": "NSE:JSWSTEEL",
-                    "KOTAKBANK": "NSE:KOTAKBANK",
-                    "LT": "NSE:LT",
-                    "M&M": "NSE:MM",
-                    "MARUTI": "NSE:MARUTI",
-                    "NESTLEIND": "NSE:NESTLEIND",
-                    "NTPC": "NSE:NTPC",
-                    "ONGC": "NSE:ONGC",
-                    "POWERGRID": "NSE:POWERGRID",
-                    "RELIANCE": "NSE:RELIANCE",
-                    "SBIN": "NSE:SBIN",
-                    "SBILIFE": "NSE:SBILIFE",
-                    "SHRIRAMFIN": "NSE:SHRIRAMFIN",
-                    "SUNPHARMA": "NSE:SUNPHARMA",
-                    "TATAMOTORS": "NSE:TATAMOTORS",
-                    "TATASTEEL": "NSE:TATASTEEL",
-                    "TCS": "NSE:TCS",
-                    "TECHM": "NSE:TECHM",
-                    "TITAN": "NSE:TITAN",
-                    "ULTRACEMCO": "NSE:ULTRACEMCO",
-                    "WIPRO": "NSE:WIPRO",
-                }
-                underlying_symbol = symbol_map.get(index_symbol, "NSE:NIFTY 50")
-
-                # Get historical data (last 100 candles for indicators)
-                from datetime import datetime, timedelta
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=30)
-
-                historical = kite.historical_data(
-                    instrument_token=kite.ltp(underlying_symbol)[underlying_symbol]["instrument_token"],
-                    from_date=start_date,
-                    to_date=end_date,
-                    interval="5minute"
-                )
-
-                if historical and len(historical) > 20:
-                    prices = [candle["close"] for candle in historical]
-                    highs = [candle["high"] for candle in historical]
-                    lows = [candle["low"] for candle in historical]
-                    volumes = [candle["volume"] for candle in historical]
+                underlying_symbol = UNDERLYING_QUOTE_SYMBOLS.get(index_symbol, "NSE:NIFTY 50")
 
-                    # Calculate comprehensive technical indicators
-                    tech_analysis = calculate_comprehensive_signals(prices, highs, lows, volumes)
+                # Indicator bundle is shared by the CE/PE legs and across scans
+                # until a new candle prints; only per-leg scoring runs here.
+                tech_analysis = _underlying_technicals(kite, underlying_symbol, "5minute")
 
+                if tech_analysis is not None:
                     # Store technical indicators in signal
                     signal["technical_indicators"] = {
                         "rsi": tech_analysis.get("rsi", 50),
@@ -421,112 +472,69 @@ def fetch_banknifty_option_chain(kite: KiteConnect, instruments: list[dict]):
         "risk": 20 * 15
     }
 
-def fetch_index_option_chain(
-    index_name,
-    kite: KiteConnect,
+def _underlying_quote_symbol(index_name: str) -> str:
+    return UNDERLYING_QUOTE_SYMBOLS.get(index_name, f"NSE:{index_name}")
+
+
+def _quote_batch(kite: KiteConnect, keys, chunk_size: int = QUOTE_BATCH_LIMIT) -> Dict[str, dict]:
+    """Quote many instruments in as few broker calls as possible.
+
+    A failed chunk is skipped; its keys stay missing so the per-symbol path
+    re-quotes them and reports the error against the right symbol.
+    """
+    unique_keys = list(dict.fromkeys(k for k in keys if k))
+    quotes: Dict[str, dict] = {}
+    for start in range(0, len(unique_keys), max(1, int(chunk_size))):
+        chunk = unique_keys[start:start + chunk_size]
+        try:
+            quotes.update(kite.quote(chunk) or {})
+        except Exception:
+            continue
+    return quotes
+
+
+def _quote_for(kite: KiteConnect, key: str, quotes: Dict[str, dict] | None) -> dict:
+    """Prefetched quote for ``key`` if available, otherwise a single quote call."""
+    if quotes and key in quotes:
+        return quotes[key]
+    return kite.quote([key])[key]
+
+
+def _resolve_chain_index(
+    index_name: str,
     instruments_nfo: list[dict],
     instruments_bfo: list[dict] | None = None,
     instruments_all: list[dict] | None = None,
-    bfo_error_reason: str | None = None,
-    enable_technical: bool = True,
 ):
-    # Map index/stock name to correct Zerodha symbol for quote
-    # Includes both indices and NIFTY 50 stocks
-    symbol_map = {
-        # Indices
-        "BANKNIFTY": "NSE:NIFTY BANK",
-        "NIFTY": "NSE:NIFTY 50",
-        "SENSEX": "BSE:SENSEX",
-        "FINNIFTY": "NSE:NIFTY FIN SERVICE",
-        # NIFTY 50 Stocks (for option chain support)
-        "ADANIENT": "NSE:ADANIENT",
-        "ADANIPORTS": "NSE:ADANIPORTS",
-        "APOLLOHOSP": "NSE:APOLLOHOSP",
-        "ASIANPAINT": "NSE:ASIANPAINT",
-        "AXISBANK": "NSE:AXISBANK",
-        "BAJAJ-AUTO": "NSE:BAJAJAUTOLD",
-        "BAJFINANCE": "NSE:BAJFINANCE",
-        "BAJAJFINSV": "NSE:BAJAJFINSV",
-        "BEL": "NSE:BEL",
-        "BPCL": "NSE:BPCL",
-        "BHARTIARTL": "NSE:BHARTIARTL",
-        "BRITANNIA": "NSE:BRITANNIA",
-        "CIPLA": "NSE:CIPLA",
-        "COALINDIA": "NSE:COALINDIA",
-        "DRREDDY": "NSE:DRREDDY",
-        "EICHERMOT": "NSE:EICHERMOT",
-        "GRASIM": "NSE:GRASIM",
-        "HCLTECH": "NSE:HCLTECH",
-        "HDFCBANK": "NSE:HDFCBANK",
-        "HDFCLIFE": "NSE:HDFCLIFE",
-        "HEROMOTOCO": "NSE:HEROMOTOCO",
-        "HINDALCO": "NSE:HINDALCO",
-        "HINDUNILVR": "NSE:HINDUNILVR",
-        "ICICIBANK": "NSE:ICICIBANK",
-        "INDUSINDBK": "NSE:INDUSINDBK",
-        "INFY": "NSE:INFY",
-        "ITC": "NSE:ITC",
-        "JSWSTEEL": "NSE:JSWSTEEL",
-        "KOTAKBANK": "NSE:KOTAKBANK",
-        "LT": "NSE:LT",
-        "M&M": "NSE:MM",
-        "MARUTI": "NSE:MARUTI",
-        "NESTLEIND": "NSE:NESTLEIND",
-        "NTPC": "NSE:NTPC",
-        "ONGC": "NSE:ONGC",
-        "POWERGRID": "NSE:POWERGRID",
-        "RELIANCE": "NSE:RELIANCE",
-        "SBIN": "NSE:SBIN",
-        "SBILIFE": "NSE:SBILIFE",
-        "SHRIRAMFIN": "NSE:SHRIRAMFIN",
-        "SUNPHARMA": "NSE:SUNPHARMA",
-        "TATAMOTORS": "NSE:TATAMOTORS",
-        "TATASTEEL": "NSE:TATASTEEL",
-        "TCS": "NSE:TCS",
-        "TECHM": "NSE:TECHM",
-        "TITAN": "NSE:TITAN",
-        "ULTRACEMCO": "NSE:ULTRACEMCO",
-        "WIPRO": "NSE:WIPRO",
-    }
-    try:
-        if index_name == "SENSEX":
-            instruments = instruments_bfo or []
-            segment = "BFO-OPT"
-            name = "SENSEX"
-            is_stock = False
-            if not instruments:
-                return {"index": index_name, "error": "BFO instruments unavailable for SENSEX."}
-        else:
-            instruments = instruments_nfo
-            segment = "NFO-OPT"
-            name = index_name
-            # Check if this is a stock symbol (in NIFTY 50) vs an index
-            is_stock = index_name in NIFTY_50_SYMBOLS
-
-        # For indices: match by name. For stocks: match by tradingsymbol prefix
-        if is_stock:
-            # Stock symbols: look for tradingsymbols that start with the stock symbol
-            options = [
-                i for i in instruments 
-                if i.get("tradingsymbol", "").startswith(index_name) 
-                and i["segment"] == segment
-            ]
-        else:
-            # Index symbols: match by name
-            options = [i for i in instruments if i["name"] == name and i["segment"] == segment]
-        if index_name == "SENSEX" and not options:
-            # Fallback: some BFO instruments may not use name="SENSEX"
-            options = [
-                i for i in instruments
-                if i.get("segment") == segment
-                and (
-                    "SENSEX" in str(i.get("tradingsymbol", ""))
-                    or "SENSEX" in str(i.get("name", ""))
-                )
-            ]
-        if index_name == "SENSEX" and not options and instruments_all:
+    """Return ``(chain_index, name, segment, is_stock)`` for an underlying."""
+    if index_name == "SENSEX":
+        instruments = instruments_bfo or []
+        segment = "BFO-OPT"
+        name = "SENSEX"
+        is_stock = False
+    else:
+        instruments = instruments_nfo
+        segment = "NFO-OPT"
+        name = index_name
+        # Check if this is a stock symbol (in NIFTY 50) vs an index
+        is_stock = index_name in NIFTY_50_SYMBOLS
+
+    # Indices and stocks are both keyed by the exact instrument ``name`` in the
+    # pre-built chain index (built once per instrument refresh).
+    chain_index = get_option_chain_index(instruments, segment)
+    if index_name == "SENSEX" and name not in chain_index:
+        # Fallback: some BFO instruments may not use name="SENSEX"
+        fallback = [
+            i for i in instruments
+            if i.get("segment") == segment
+            and (
+                "SENSEX" in str(i.get("tradingsymbol", ""))
+                or "SENSEX" in str(i.get("name", ""))
+            )
+        ]
+        if not fallback and instruments_all:
             # Final fallback: scan full instruments list for BFO-OPT SENSEX
-            options = [
+            fallback = [
                 i for i in instruments_all
                 if i.get("segment") == "BFO-OPT"
                 and (
@@ -534,7 +542,129 @@ def fetch_index_option_chain(
                     or "SENSEX" in str(i.get("name", ""))
                 )
             ]
-        if not options:
+        chain_index = OptionChainIndex.from_records(fallback, segment, key=name)
+    return chain_index, name, segment, is_stock
+
+
+def _locate_atm(chain_index: OptionChainIndex, name: str, spot_price: float):
+    """Return ``(error, nearest_expiry, chain, atm_pos)`` for the nearest expiry."""
+    if not chain_index.expiries(name):
+        return "No expiries found for this index.", None, None, -1
+    # Nearest expiry that is today or in the future
+    nearest_expiry = chain_index.nearest_expiry(name, date.today())
+    if nearest_expiry is None:
+        return "No valid (future) expiries found for this index.", None, None, -1
+    chain = chain_index.chain(name, nearest_expiry)
+    if chain is None or not len(chain):
+        return "No strikes found for this expiry.", nearest_expiry, None, -1
+    atm_pos = chain.atm_position(spot_price)
+    if chain.ce[atm_pos] is None or chain.pe[atm_pos] is None:
+        return "No CE/PE symbol found for ATM strike.", nearest_expiry, chain, atm_pos
+    return None, nearest_expiry, chain, atm_pos
+
+
+def _prefetch_scan_quotes(
+    kite: KiteConnect,
+    symbols: List[str],
+    instruments_nfo: list[dict],
+    instruments_bfo: list[dict] | None = None,
+    instruments_all: list[dict] | None = None,
+) -> Dict[str, dict]:
+    """Two-phase batched quoting for a multi-symbol scan.
+
+    Phase 1 quotes every underlying at once; ATM contracts are then resolved
+    locally from the chain index and phase 2 quotes all CE/PE legs at once.
+    """
+    quotes = _quote_batch(kite, [_underlying_quote_symbol(sym) for sym in symbols])
+    option_keys: List[str] = []
+    for sym in symbols:
+        spot = (quotes.get(_underlying_quote_symbol(sym)) or {}).get("last_price")
+        if spot is None:
+            continue
+        chain_index, name, segment, _is_stock = _resolve_chain_index(
+            sym, instruments_nfo, instruments_bfo, instruments_all
+        )
+        if name not in chain_index:
+            continue
+        error, _expiry, chain, atm_pos = _locate_atm(chain_index, name, spot)
+        if error:
+            continue
+        quote_prefix = "BFO" if segment == "BFO-OPT" else "NFO"
+        option_keys.extend(_window_quote_keys(chain, spot, quote_prefix))
+    quotes.update(_quote_batch(kite, option_keys))
+    # Share the scan's prices with the other LTP consumers.
+    price_bus.publish(kite, quotes)
+    return quotes
+
+
+def _window_quote_keys(chain, spot_price: float, quote_prefix: str, width: int = OPTION_ANALYTICS_WINDOW) -> List[str]:
+    """Quote keys for the CE/PE legs of ``width`` strikes either side of ATM (ATM first)."""
+    center = chain.atm_position(spot_price)
+    positions = [center] + [p for p in chain.window(spot_price, width) if p != center]
+    keys = []
+    for pos in positions:
+        for row in (chain.ce[pos], chain.pe[pos]):
+            if row is not None:
+                keys.append(f"{quote_prefix}:{row['tradingsymbol']}")
+    return keys
+
+
+def _chain_analytics(chain, spot_price: float, expiry, quotes: Dict[str, dict], quote_prefix: str, width: int = OPTION_ANALYTICS_WINDOW):
+    """IV/Greeks/PCR/max pain for the quoted strike window, or None if unavailable."""
+    try:
+        positions = list(chain.window(spot_price, width))
+
+        def _leg_quote(row):
+            return quotes.get(f"{quote_prefix}:{row['tradingsymbol']}") if row is not None else None
+
+        return analyze_chain(
+            chain.strikes[positions],
+            [_leg_quote(chain.ce[p]) for p in positions],
+            [_leg_quote(chain.pe[p]) for p in positions],
+            spot_price,
+            expiry,
+        )
+    except Exception:
+        return None
+
+
+def _attach_option_analytics(signal: Dict, analytics) -> Dict:
+    """Copy chain and per-leg analytics onto a signal."""
+    if analytics is None:
+        return signal
+    leg = analytics.leg(signal.get("strike"), signal.get("option_type"))
+    signal["option_analytics"] = {
+        **analytics.summary(),
+        **{k: leg.get(k) for k in ("iv", "delta", "gamma", "theta", "vega", "oi", "spread_pct")},
+    }
+    signal["implied_volatility"] = leg.get("iv")
+    signal["pcr"] = signal["option_analytics"]["pcr"]
+    signal["max_pain"] = analytics.max_pain
+    if leg.get("spread_pct") is not None:
+        signal["bid_ask_spread_pct"] = round(leg["spread_pct"], 3)
+    iv_spike = iv_baseline.spike_pct(str(signal.get("symbol")), leg.get("iv"))
+    if iv_spike is not None:
+        signal["iv_spike_pct"] = iv_spike
+    return signal
+
+
+def fetch_index_option_chain(
+    index_name,
+    kite: KiteConnect,
+    instruments_nfo: list[dict],
+    instruments_bfo: list[dict] | None = None,
+    instruments_all: list[dict] | None = None,
+    bfo_error_reason: str | None = None,
+    enable_technical: bool = True,
+    quotes: Dict[str, dict] | None = None,
+):
+    try:
+        if index_name == "SENSEX" and not instruments_bfo:
+            return {"index": index_name, "error": "BFO instruments unavailable for SENSEX."}
+        chain_index, name, segment, is_stock = _resolve_chain_index(
+            index_name, instruments_nfo, instruments_bfo, instruments_all
+        )
+        if name not in chain_index:
             if index_name == "SENSEX" and bfo_error_reason:
                 return {
                     "index": index_name,
@@ -554,38 +684,31 @@ def fetch_index_option_chain(
                     "is_stock": is_stock,
                 } if index_name == "SENSEX" else {"is_stock": is_stock},
             }
-        quote_symbol = symbol_map.get(index_name, f"NSE:{index_name}")
+        quote_symbol = _underlying_quote_symbol(index_name)
         try:
-            quote = kite.quote([quote_symbol])
-            spot_price = quote[quote_symbol]["last_price"]
-            quote_data = quote[quote_symbol]  # Store full quote data for validation
+            quote_data = _quote_for(kite, quote_symbol, quotes)  # Full quote data for validation
+            spot_price = quote_data["last_price"]
         except Exception as e:
             return {"index": index_name, "error": f"Quote error: {str(e)}"}
-        from datetime import datetime, date
-        expiries = sorted(set(i["expiry"] for i in options))
-        if not expiries:
-            return {"index": index_name, "error": "No expiries found for this index."}
-        # Filter for expiry dates that are today or in the future
-        today = date.today()
-        valid_expiries = [e for e in expiries if isinstance(e, date) and e >= today]
-        if not valid_expiries:
-            return {"index": index_name, "error": "No valid (future) expiries found for this index."}
-        nearest_expiry = valid_expiries[0]
-        strikes = sorted(set(i["strike"] for i in options if i["expiry"] == nearest_expiry))
-        if not strikes:
-            return {"index": index_name, "error": "No strikes found for this expiry."}
-        atm_strike = min(strikes, key=lambda x: abs(x - spot_price))
+        error, nearest_expiry, chain, atm_pos = _locate_atm(chain_index, name, spot_price)
+        if error:
+            return {"index": index_name, "error": error}
+        ce_instrument = chain.ce[atm_pos]
+        pe_instrument = chain.pe[atm_pos]
+        atm_strike = ce_instrument["strike"]
+        ce_symbol = ce_instrument["tradingsymbol"]
+        pe_symbol = pe_instrument["tradingsymbol"]
+        quote_prefix = "BFO" if segment == "BFO-OPT" else "NFO"
+        # One batched call for the analytics window (ATM legs included) unless
+        # the scan already prefetched it.
+        missing = [k for k in _window_quote_keys(chain, spot_price, quote_prefix) if not quotes or k not in quotes]
+        if missing:
+            quotes = {**(quotes or {}), **_quote_batch(kite, missing)}
         try:
-            ce_symbol = next(i["tradingsymbol"] for i in options if i["strike"] == atm_strike and i["expiry"] == nearest_expiry and i["instrument_type"] == "CE")
-            pe_symbol = next(i["tradingsymbol"] for i in options if i["strike"] == atm_strike and i["expiry"] == nearest_expiry and i["instrument_type"] == "PE")
-        except StopIteration:
-            return {"index": index_name, "error": "No CE/PE symbol found for ATM strike."}
-        try:
-            quote_prefix = "BFO" if segment == "BFO-OPT" else "NFO"
             ce_key = f"{quote_prefix}:{ce_symbol}"
             pe_key = f"{quote_prefix}:{pe_symbol}"
-            ce_quote = kite.quote([ce_key])[ce_key]["last_price"]
-            pe_quote = kite.quote([pe_key])[pe_key]["last_price"]
+            ce_quote = _quote_for(kite, ce_key, quotes)["last_price"]
+            pe_quote = _quote_for(kite, pe_key, quotes)["last_price"]
         except Exception as e:
             err_text = str(e)
             if index_name == "SENSEX" and "Invalid `api_key` or `access_token`" in err_text:
@@ -597,8 +720,7 @@ def fetch_index_option_chain(
             return {"index": index_name, "error": f"Option quote error: {err_text}"}
         
         # Get lot size from instrument data
-        ce_instrument = next((i for i in options if i["tradingsymbol"] == ce_symbol), None)
-        lot_size = ce_instrument.get("lot_size", 1) if ce_instrument else 1
+        lot_size = ce_instrument.get("lot_size", 1) or 1
         
         # Index-specific and stock-specific lot sizes (fallback if not in instrument data)
         lot_size_map = {
@@ -711,6 +833,10 @@ def fetch_index_option_chain(
             "trend_aligned": not trend_bullish,
         }
         
+        analytics = _chain_analytics(chain, spot_price, nearest_expiry, quotes, quote_prefix)
+        ce_signal = _attach_option_analytics(ce_signal, analytics)
+        pe_signal = _attach_option_analytics(pe_signal, analytics)
+
         # Validate signal quality for both CE and PE
         ce_signal = _validate_signal_quality(
             ce_signal,
@@ -774,10 +900,18 @@ def analyze_option_chain(chain: Dict) -> Dict:
 
 # --- Simple in-memory cache and rate limiter ---
 _signals_cache = {}
-_signals_cache_lock = threading.Lock()
+_signals_cache_lock = threading.Lock()  # guards the dicts only, never broker I/O
 _signals_cache_ttl = 60  # seconds - increased from 30 to reduce API calls
-_signals_rate_limit = 5  # seconds between calls - reduced from 10
-_signals_last_call = 0
+_signals_stale_ttl = 600  # seconds a stale scan may be served while it refreshes
+_signals_cache_max_keys = 20
+_signals_inflight: Dict[str, Future] = {}
+# Cross-key cap on concurrent scans: single-flight only dedupes one key, and
+# each scan already fans out over ``_scan_executor``.
+_signals_max_concurrent_scans = 2
+_signals_scan_slots = threading.BoundedSemaphore(_signals_max_concurrent_scans)
+_signals_refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="signals-refresh")
+_signals_scan_workers = 8
+_scan_executor = ThreadPoolExecutor(max_workers=_signals_scan_workers, thread_name_prefix="signals-scan")
 
 
 def _signals_cache_key(
@@ -796,24 +930,13 @@ def _signals_cache_key(
 
 
 def _build_fno_stock_universe(instruments_nfo: List[Dict], max_symbols: int = 120) -> List[str]:
-    """Build a broad yet bounded stock option universe from NFO instruments."""
-    max_symbols = max(20, min(int(max_symbols or 120), 300))
-    index_roots = {"NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY", "SENSEX"}
-    counts: Dict[str, int] = {}
-
-    for ins in instruments_nfo or []:
-        if ins.get("segment") != "NFO-OPT":
-            continue
-        name = str(ins.get("name") or "").upper().strip()
-        if not name or name in index_roots:
-            continue
-        if not re.match(r"^[A-Z0-9-]+$", name):
-            continue
-        counts[name] = counts.get(name, 0) + 1
+    """Build a broad yet bounded stock option universe from NFO instruments.
 
+    Option-depth ranking; used when the daily liquidity ranking is unavailable.
+    """
+    max_symbols = max(20, min(int(max_symbols or 120), 300))
     # Deterministic ranking: option-depth first, then symbol name as tie-breaker.
-    ranked = sorted(counts.items(), key=lambda kv: (-kv[1], kv[0]))
-    return [sym for sym, _ in ranked[:max_symbols]]
+    return rank_by_option_count(instruments_nfo)[:max_symbols]
 
 
 def _build_scan_symbol_universe(
@@ -821,8 +944,13 @@ def _build_scan_symbol_universe(
     include_fno_universe: bool,
     max_symbols: int,
     instruments_nfo: List[Dict],
+    ranked_fno_stocks: List[str] | None = None,
 ) -> List[str]:
-    """Return indices + bounded stock universe for breadth scans."""
+    """Return indices + bounded stock universe for breadth scans.
+
+    ``ranked_fno_stocks`` is the cached daily liquidity ranking; without it the
+    F&O names are ranked by option depth from ``instruments_nfo``.
+    """
     indices = ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
     stock_budget = max(0, min(int(max_symbols or 120), 300))
 
@@ -830,7 +958,10 @@ def _build_scan_symbol_universe(
     if include_nifty50:
         stock_candidates.extend(NIFTY_50_SYMBOLS)
     if include_fno_universe:
-        stock_candidates.extend(_build_fno_stock_universe(instruments_nfo, max_symbols=stock_budget))
+        if ranked_fno_stocks is not None:
+            stock_candidates.extend(ranked_fno_stocks[:stock_budget])
+        else:
+            stock_candidates.extend(_build_fno_stock_universe(instruments_nfo, max_symbols=stock_budget))
 
     # De-duplicate stock candidates, then enforce overall stock budget.
     seen = set()
@@ -846,68 +977,51 @@ def _build_scan_symbol_universe(
 
     return indices + bounded_stocks
 
-def generate_signals(
-    user_id: int | None = None,
-    symbols: List[str] | None = None,
-    include_nifty50: bool = False,
-    include_fno_universe: bool = False,
-    max_symbols: int = 120,
-) -> List[Dict]:
-    global _signals_cache, _signals_last_call
-    now = time.time()
-    cache_key = _signals_cache_key(
-        user_id=user_id,
-        symbols=symbols,
-        include_nifty50=include_nifty50,
-        include_fno_universe=include_fno_universe,
-        max_symbols=max_symbols,
-    )
-    with _signals_cache_lock:
-        # Serve from cache if not expired (cache key includes request parameters).
-        cached = _signals_cache.get(cache_key)
-        if cached and (now - cached["ts"]) < _signals_cache_ttl:
-            return cached["signals"]
-        # Rate limit: if last call was too recent, return error signals
-        if (now - _signals_last_call) < _signals_rate_limit:
-            return [
-                {"index": idx, "error": "Too many requests (rate limited)"}
-                for idx in ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
-            ]
-        _signals_last_call = now
-        # Actual signal generation
+def _compute_signals(
+    user_id: int | None,
+    symbols: List[str] | None,
+    include_nifty50: bool,
+    include_fno_universe: bool,
+    max_symbols: int,
+) -> tuple[List[Dict], bool]:
+    """Run one full scan. Returns ``(signals, cacheable)``."""
+    with stage("kite_client"):
         kite = _get_kite(user_id=user_id)
-        if not kite:
-            # If credentials are missing, still build the requested symbol universe
-            # so frontend can classify indices vs stocks and display informative
-            # error rows per-symbol (previous behavior only returned 4 index errors).
-            selected = _build_scan_symbol_universe(
-                include_nifty50=include_nifty50,
-                include_fno_universe=include_fno_universe,
-                max_symbols=max_symbols,
-                instruments_nfo=[],
-            )
-            indices = ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
-            msg = "Zerodha credentials missing or invalid"
-            results = []
-            for sym in selected:
-                results.append({
-                    "index": sym,
-                    "signal_type": "index" if sym in indices else "stock",
-                    "error": msg,
-                })
-            return results
-
+    if not kite:
+        # If credentials are missing, still build the requested symbol universe
+        # so frontend can classify indices vs stocks and display informative
+        # error rows per-symbol (previous behavior only returned 4 index errors).
+        selected = _build_scan_symbol_universe(
+            include_nifty50=include_nifty50,
+            include_fno_universe=include_fno_universe,
+            max_symbols=max_symbols,
+            instruments_nfo=[],
+        )
+        indices = ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
+        msg = "Zerodha credentials missing or invalid"
+        results = []
+        for sym in selected:
+            results.append({
+                "index": sym,
+                "signal_type": "index" if sym in indices else "stock",
+                "error": msg,
+            })
+        return results, False
+
+    with stage("instruments"):
+        # Instrument dumps come from the daily on-disk store; the broker is only
+        # hit for the first scan of a trading day (or after the store is wiped).
         try:
-            instruments_nfo = kite.instruments("NFO")
+            instruments_nfo = instrument_store.records(kite, "NFO")
         except Exception as e:
             return [
                 {"index": idx, "error": f"Failed to load instruments: {str(e)}"}
                 for idx in ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
-            ]
+            ], False
 
         bfo_error_reason = None
         try:
-            instruments_bfo = kite.instruments("BFO")
+            instruments_bfo = instrument_store.records(kite, "BFO")
         except Exception as e:
             bfo_error_reason = str(e)
             instruments_bfo = []
@@ -915,53 +1029,156 @@ def generate_signals(
         instruments_all = None
         if not instruments_bfo:
             try:
-                instruments_all = kite.instruments()
+                instruments_all = instrument_store.records(kite)
             except Exception:
                 instruments_all = None
 
-        indices = ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
-        selected = []
-        if symbols:
-            selected = [s.strip().upper() for s in symbols if isinstance(s, str) and s.strip()]
+    indices = ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY"]
+    selected = []
+    if symbols:
+        selected = [s.strip().upper() for s in symbols if isinstance(s, str) and s.strip()]
+    else:
+        ranked_fno_stocks = None
+        if include_fno_universe:
+            try:
+                with stage("universe"):
+                    ranked_fno_stocks = fno_universe.get(kite, instruments_nfo).symbols
+            except Exception:
+                ranked_fno_stocks = None
+        selected = _build_scan_symbol_universe(
+            include_nifty50=include_nifty50,
+            include_fno_universe=include_fno_universe,
+            max_symbols=max_symbols,
+            instruments_nfo=instruments_nfo,
+            ranked_fno_stocks=ranked_fno_stocks,
+        )
+    # de-duplicate while preserving order
+    seen = set()
+    selected_symbols = []
+    for sym in selected:
+        if sym not in seen:
+            selected_symbols.append(sym)
+            seen.add(sym)
+    # Two batched quote calls for the whole scan instead of three per symbol.
+    with stage("quotes"):
+        quotes = _prefetch_scan_quotes(
+            kite,
+            selected_symbols,
+            instruments_nfo,
+            instruments_bfo,
+            instruments_all,
+        )
+    deep_technical_allowed = len(selected_symbols) <= 20
+    run = current_run()
+
+    def _evaluate(idx: str):
+        with bind_run(run), symbol_timer(idx):
+            try:
+                return fetch_index_option_chain(
+                    idx,
+                    kite,
+                    instruments_nfo,
+                    instruments_bfo,
+                    instruments_all,
+                    bfo_error_reason,
+                    enable_technical=idx in indices and deep_technical_allowed,
+                    quotes=quotes,
+                )
+            except Exception as e:
+                return {"index": idx, "error": str(e)}
+
+    # Symbols are evaluated concurrently; broker calls are paced by the shared
+    # token buckets and ``map`` keeps results in the selected order.
+    with stage("evaluate"):
+        if len(selected_symbols) > 1:
+            results = list(_scan_executor.map(_evaluate, selected_symbols))
         else:
-            selected = _build_scan_symbol_universe(
-                include_nifty50=include_nifty50,
-                include_fno_universe=include_fno_universe,
-                max_symbols=max_symbols,
-                instruments_nfo=instruments_nfo,
-            )
-        # de-duplicate while preserving order
-        seen = set()
-        selected_symbols = []
-        for sym in selected:
-            if sym not in seen:
-                selected_symbols.append(sym)
-                seen.add(sym)
-        signals = []
-        for idx in selected_symbols:
-            use_deep_technical = idx in indices and len(selected_symbols) <= 20
-            result = fetch_index_option_chain(
-                idx,
-                kite,
-                instruments_nfo,
-                instruments_bfo,
-                instruments_all,
-                bfo_error_reason,
-                enable_technical=use_deep_technical,
-            )
-            # flatten list of signals
-            if isinstance(result, list):
-                signals.extend(result)
-            else:
-                signals.append(result)
-        _signals_cache[cache_key] = {"signals": signals, "ts": now}
+            results = [_evaluate(idx) for idx in selected_symbols]
 
-        # Prevent unbounded growth if many unique keys are requested.
-        if len(_signals_cache) > 20:
-            oldest_key = min(_signals_cache.items(), key=lambda item: item[1]["ts"])[0]
-            _signals_cache.pop(oldest_key, None)
+    signals = []
+    for result in results:
+        # flatten list of signals
+        if isinstance(result, list):
+            signals.extend(result)
+        else:
+            signals.append(result)
+    return signals, True
+
+
+def _run_signal_generation(cache_key: str, future: Future, params: Dict) -> None:
+    """Compute signals for ``cache_key`` and resolve the in-flight future."""
+    try:
+        with _signals_scan_slots:
+            signals, cacheable = _compute_signals(**params)
+        if cacheable:
+            with _signals_cache_lock:
+                _signals_cache[cache_key] = {"signals": signals, "ts": time.time()}
+                # Prevent unbounded growth if many unique keys are requested.
+                while len(_signals_cache) > _signals_cache_max_keys:
+                    oldest_key = min(_signals_cache.items(), key=lambda item: item[1]["ts"])[0]
+                    _signals_cache.pop(oldest_key, None)
+        future.set_result(signals)
+    except BaseException as exc:
+        future.set_exception(exc)
+    finally:
+        with _signals_cache_lock:
+            if _signals_inflight.get(cache_key) is future:
+                _signals_inflight.pop(cache_key, None)
 
-        return signals
+
+def generate_signals(
+    user_id: int | None = None,
+    symbols: List[str] | None = None,
+    include_nifty50: bool = False,
+    include_fno_universe: bool = False,
+    max_symbols: int = 120,
+) -> List[Dict]:
+    """Cached scan with single-flight generation and stale-while-revalidate.
+
+    Fresh entries are returned directly. Stale entries (younger than
+    ``_signals_stale_ttl``) are returned immediately while one background
+    refresh runs. Otherwise the first caller computes and concurrent callers
+    for the same key wait on its result. The lock only guards dict access.
+    """
+    params = {
+        "user_id": user_id,
+        "symbols": symbols,
+        "include_nifty50": include_nifty50,
+        "include_fno_universe": include_fno_universe,
+        "max_symbols": max_symbols,
+    }
+    cache_key = _signals_cache_key(**params)
+    with track_run("generate_signals", cache_key=cache_key):
+        now = time.time()
+        with _signals_cache_lock:
+            cached = _signals_cache.get(cache_key)
+            age = (now - cached["ts"]) if cached else None
+            if cached and age < _signals_cache_ttl:
+                record_cache("signals", "hit")
+                return cached["signals"]
+            stale = cached["signals"] if cached and age < _signals_stale_ttl else None
+            future = _signals_inflight.get(cache_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                _signals_inflight[cache_key] = future
+
+        if stale is not None:
+            record_cache("signals", "stale")
+            if owner:
+                _signals_refresh_executor.submit(_refresh_signals_in_background, cache_key, future, params)
+            return stale
+        if owner:
+            record_cache("signals", "miss")
+            _run_signal_generation(cache_key, future, params)
+        else:
+            record_cache("signals", "join")
+        return future.result()
+
+
+def _refresh_signals_in_background(cache_key: str, future: Future, params: Dict) -> None:
+    with track_run("signals_refresh", cache_key=cache_key):
+        _run_signal_generation(cache_key, future, params)
 
 def select_best_signal(signals: List[Dict]) -> Dict | None:
     """
@@ -1203,33 +1420,39 @@ async def generate_signals_advanced(
     include_fno_universe: bool = False,
     max_symbols: int = 120,
 ) -> List[Dict]:
-    # Run heavy sync signal generation off the event loop to keep API responsive.
-    signals = await asyncio.to_thread(
-        generate_signals,
-        user_id,
-        symbols,
-        include_nifty50,
-        include_fno_universe,
-        max_symbols,
-    )
-    try:
-        sentiment = news_analyzer.get_market_sentiment_summary()
-    except Exception:
-        sentiment = {"overall_sentiment": "Unknown", "sentiment_score": 0.5}
+    with track_run("generate_signals_advanced", mode=mode):
+        # Run heavy sync signal generation off the event loop to keep API responsive.
+        # ``to_thread`` copies the context, so the scan records into this run.
+        with stage("generate"):
+            signals = await asyncio.to_thread(
+                generate_signals,
+                user_id,
+                symbols,
+                include_nifty50,
+                include_fno_universe,
+                max_symbols,
+            )
+        try:
+            with stage("news_sentiment"):
+                sentiment = news_analyzer.get_market_sentiment_summary()
+        except Exception:
+            sentiment = {"overall_sentiment": "Unknown", "sentiment_score": 0.5}
 
-    trend_data = {}
-    try:
-        trends = await trend_analyzer.get_market_trends()
-        trend_data = trends.get("indices", {}) if isinstance(trends, dict) else {}
-    except Exception:
         trend_data = {}
-
-    enhanced = []
-    for s in signals:
-        idx = s.get("index")
-        trend_row = trend_data.get(idx) if idx else None
-        enhanced.append(_apply_confirmation(s, sentiment, trend_row, mode=mode))
-    return enhanced
+        try:
+            with stage("trend_fetch"):
+                trends = await trend_analyzer.get_market_trends()
+            trend_data = trends.get("indices", {}) if isinstance(trends, dict) else {}
+        except Exception:
+            trend_data = {}
+
+        enhanced = []
+        with stage("confirmation"):
+            for s in signals:
+                idx = s.get("index")
+                trend_row = trend_data.get(idx) if idx else None
+                enhanced.append(_apply_confirmation(s, sentiment, trend_row, mode=mode))
+        return enhanced
 
 if __name__ == "__main__":
     from pprint import pprint
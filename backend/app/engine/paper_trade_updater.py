@@ -4,13 +4,18 @@ Runs batched price updates and enforces SL/target logic.
 """
 from __future__ import annotations
 
+import contextlib
+import threading
 import time
-from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Callable, Optional, Dict, List, Mapping
 
 from app.models.trading import PaperTrade
 from app.engine.option_signal_generator import _get_kite
+from app.engine.price_bus import price_bus
+from app.engine.broker_executor import BrokerCallTimeout, broker_executor
+from app.engine.trigger_index import TriggerIndex
+from app.engine import exit_rules
 
 # Shared rate limit across all callers (routes + background jobs)
 _price_update_cache = {
@@ -19,38 +24,98 @@ _price_update_cache = {
 }
 
 
-def _paper_profit_protect_status(trade) -> str:
-    try:
-        entry = float(trade.entry_price or 0)
-        stop = float(trade.stop_loss) if trade.stop_loss is not None else None
-        side = str(trade.side or "BUY").upper()
-        if stop is None or entry <= 0:
-            return "SL_HIT"
-        if side == "BUY" and stop > entry:
-            return "PROFIT_TRAIL"
-        if side == "SELL" and stop < entry:
-            return "PROFIT_TRAIL"
-    except Exception:
-        return "SL_HIT"
-    return "SL_HIT"
-
-
 def _fetch_ltp_with_timeout(kite, symbols: List[str], timeout_s: float = 2.5):
     """Fetch LTP with a hard timeout so API route does not hang indefinitely."""
     if not symbols:
         return {}, None
 
-    executor = ThreadPoolExecutor(max_workers=1)
-    future = executor.submit(kite.ltp, symbols)
     try:
-        return future.result(timeout=timeout_s), None
-    except FuturesTimeoutError:
-        future.cancel()
+        return broker_executor.call(kite.ltp, symbols, timeout=timeout_s), None
+    except BrokerCallTimeout:
         return None, f"Price fetch timed out after {timeout_s:.1f}s"
     except Exception as e:
         return None, str(e)
-    finally:
-        executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Serialises exit checks between the scheduler, the routes and the tick stream.
+_paper_price_lock = threading.RLock()
+# Quiet bands of open paper trades in the app database, keyed by trade id
+# (see _paper_trigger_band). Other databases (the tick replay) bring their own.
+_paper_triggers = TriggerIndex()
+
+
+def _paper_trigger_band(trade) -> tuple:
+    """Price band inside which the paper exit rules leave ``trade`` untouched.
+
+    Edges are the stop, the target, the 12-point lock level and (while the
+    stop is still below entry) the 35%-of-target breakeven level.
+    """
+    if trade.stop_loss is None:
+        return None, None
+    entry = trade.entry_price
+    if trade.side == "BUY":
+        levels = [entry + 12]
+        if trade.target is not None:
+            levels.append(trade.target)
+            if trade.stop_loss < entry:
+                levels.append(entry + (trade.target - entry) * 0.35)
+        return trade.stop_loss, min(levels)
+    levels = [entry - 12]
+    if trade.target is not None:
+        levels.append(trade.target)
+        if trade.stop_loss > entry:
+            levels.append(entry - (entry - trade.target) * 0.35)
+    return max(levels), trade.stop_loss
+
+
+def _sync_paper_triggers(trade_symbol_map: Dict[str, List[PaperTrade]], triggers: TriggerIndex) -> None:
+    """Refresh bands of new or externally edited trades; drop trades no longer open."""
+    open_ids = []
+    for quote_symbol, trades in trade_symbol_map.items():
+        for trade in trades:
+            open_ids.append(trade.id)
+            _index_paper_trade(quote_symbol, trade, triggers)
+    triggers.retain(open_ids)
+
+
+def _index_paper_trade(quote_symbol: str, trade, triggers: TriggerIndex) -> None:
+    tag = (quote_symbol, trade.side, trade.entry_price, trade.stop_loss, trade.target)
+    if triggers.tag(trade.id) != tag:
+        triggers.upsert(trade.id, quote_symbol, *_paper_trigger_band(trade), tag=tag)
+
+
+def track_paper_trade(trade, triggers: Optional[TriggerIndex] = None) -> None:
+    """Index a committed trade after it is opened, edited or closed.
+
+    Streamed prices only reach trades in the index; the scheduled poll
+    re-indexes every open trade, so a write that skips this is picked up
+    on the next poll.
+    """
+    with _paper_price_lock if triggers is None else contextlib.nullcontext():
+        triggers = _paper_triggers if triggers is None else triggers
+        if trade.status == "OPEN":
+            _index_paper_trade(_quote_symbol(trade.symbol, trade.index_name), trade, triggers)
+        else:
+            triggers.remove(trade.id)
+
+
+def forget_paper_trade(trade_id: int) -> None:
+    """Drop a deleted trade from the app database's index."""
+    with _paper_price_lock:
+        _paper_triggers.remove(trade_id)
+
+
+def _nan_if_none(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+def _mark_paper_trade(trade, price: float) -> None:
+    trade.current_price = price
+    if trade.side == "BUY":
+        trade.pnl = (price - trade.entry_price) * trade.quantity
+    else:
+        trade.pnl = (trade.entry_price - price) * trade.quantity
+    trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100 if trade.entry_price > 0 else 0
 
 
 def _quote_symbol(trade_symbol: str, index_name: Optional[str] = None) -> str:
@@ -74,11 +139,36 @@ def _quote_symbol(trade_symbol: str, index_name: Optional[str] = None) -> str:
     return f"NSE:{upper}"
 
 
-def update_open_paper_trades(db, *, force: bool = False) -> Dict:
+def update_open_paper_trades(
+    db,
+    *,
+    force: bool = False,
+    kite=None,
+    clock: Optional[Callable[[], datetime]] = None,
+    ltp_timeout_s: Optional[float] = 2.5,
+    prices: Optional[Mapping[str, float]] = None,
+    triggers: Optional[TriggerIndex] = None,
+) -> Dict:
     """Update prices for OPEN trades and enforce SL logic.
 
+    Prices come from the shared ``price_bus``. ``kite``, ``clock`` (exit
+    timestamps) and ``ltp_timeout_s`` (``None`` calls ``kite.ltp`` inline,
+    bypassing the bus) let the tick replay drive this offline.
+
+    ``prices`` (``{quote_symbol: last_price}`` from the tick stream) applies
+    the rules on every call, with no poll rate limit or broker fetch, to the
+    indexed trades whose band those prices cross (see ``track_paper_trade``).
+    Quiet trades keep their mark until the next poll.
+
+    ``triggers`` is the band index for ``db``'s trade ids; callers with a
+    database other than the app's (the tick replay) must pass their own.
+
     Returns a summary dict for logging or API response.
     """
+    clock = clock or datetime.utcnow
+    if prices is not None:
+        return _apply_paper_prices(db, {s: {"last_price": p} for s, p in prices.items()}, clock, triggers)
+
     now = time.time()
     if not force and now - _price_update_cache["last_update"] < _price_update_cache["min_interval"]:
         remaining = _price_update_cache["min_interval"] - (now - _price_update_cache["last_update"])
@@ -93,7 +183,7 @@ def update_open_paper_trades(db, *, force: bool = False) -> Dict:
 
     _price_update_cache["last_update"] = now
 
-    kite = _get_kite()
+    kite = kite or _get_kite()
     if not kite:
         return {
             "success": False,
@@ -105,6 +195,8 @@ def update_open_paper_trades(db, *, force: bool = False) -> Dict:
 
     open_trades: List[PaperTrade] = db.query(PaperTrade).filter(PaperTrade.status == "OPEN").all()
     if not open_trades:
+        with _paper_price_lock if triggers is None else contextlib.nullcontext():
+            (_paper_triggers if triggers is None else triggers).clear()
         return {
             "success": True,
             "message": "No open trades to update",
@@ -113,22 +205,19 @@ def update_open_paper_trades(db, *, force: bool = False) -> Dict:
             "total_open": 0,
         }
 
-    # Batch all quote symbols
-    quote_symbols: List[str] = []
-    trade_symbol_map: Dict[str, List[PaperTrade]] = {}
+    # Batch all quote symbols, one entry per instrument.
+    trade_symbol_map = _group_paper_trades(open_trades)
+    quote_symbols = list(trade_symbol_map)
 
-    for trade in open_trades:
+    if ltp_timeout_s is None:
         try:
-            quote_symbol = _quote_symbol(trade.symbol, trade.index_name)
-            quote_symbols.append(quote_symbol)
-            trade_symbol_map.setdefault(quote_symbol, []).append(trade)
-        except Exception:
-            continue
-
-    # Avoid duplicate instruments in one broker call.
-    quote_symbols = list(dict.fromkeys(quote_symbols))
-
-    quotes, fetch_error = _fetch_ltp_with_timeout(kite, quote_symbols, timeout_s=2.5)
+            quotes, fetch_error = kite.ltp(quote_symbols), None
+        except Exception as e:
+            quotes, fetch_error = None, str(e)
+    else:
+        # Forced updates always read a fresh poll; scheduled ones may share the last one.
+        bus_client = price_bus.client(kite, max_age=0 if force else None)
+        quotes, fetch_error = _fetch_ltp_with_timeout(bus_client, quote_symbols, timeout_s=ltp_timeout_s)
     if fetch_error:
         return {
             "success": False,
@@ -139,9 +228,72 @@ def update_open_paper_trades(db, *, force: bool = False) -> Dict:
             "timeout": "timed out" in fetch_error.lower(),
         }
 
+    return _evaluate_paper_trades(db, open_trades, trade_symbol_map, quotes, clock, triggers)
+
+
+def _group_paper_trades(open_trades: List[PaperTrade]) -> Dict[str, List[PaperTrade]]:
+    trade_symbol_map: Dict[str, List[PaperTrade]] = {}
+    for trade in open_trades:
+        try:
+            trade_symbol_map.setdefault(_quote_symbol(trade.symbol, trade.index_name), []).append(trade)
+        except Exception:
+            continue
+    return trade_symbol_map
+
+
+def _apply_paper_prices(db, quotes: Dict[str, Dict], clock: Callable[[], datetime], triggers=None) -> Dict:
+    """Run the exit rules on the crossed trades only; quiet ticks touch no rows."""
+    shared = triggers is None
+    with _paper_price_lock if shared else contextlib.nullcontext():
+        triggers = _paper_triggers if shared else triggers
+        hits = {}
+        for quote_symbol, data in quotes.items():
+            live_price = data.get("last_price")
+            if live_price is None:
+                continue
+            for trade_id in triggers.crossed(quote_symbol, live_price):
+                hits[trade_id] = (quote_symbol, float(live_price))
+
+        crossed_rows = []
+        if hits:
+            rows = db.query(PaperTrade).filter(PaperTrade.id.in_(list(hits)), PaperTrade.status == "OPEN").all()
+            for trade in rows:
+                quote_symbol, new_price = hits.pop(trade.id)
+                if _quote_symbol(trade.symbol, trade.index_name) != quote_symbol:
+                    track_paper_trade(trade, triggers)  # edited since it was indexed
+                    continue
+                crossed_rows.append((quote_symbol, trade, new_price))
+            for trade_id in hits:  # closed or deleted elsewhere
+                triggers.remove(trade_id)
+
+        updated_count, closed_count = _exit_paper_rows(crossed_rows, clock, triggers)
+        if crossed_rows:
+            db.commit()
+
+        return {
+            "success": True,
+            "updated_count": updated_count,
+            "closed_count": closed_count,
+            "total_open": len(triggers),
+            "message": f"Updated {updated_count} trades, closed {closed_count}",
+        }
+
+
+def _evaluate_paper_trades(db, open_trades, trade_symbol_map, quotes, clock, triggers=None) -> Dict:
+    """Poll pass: re-index and mark every trade priced in ``quotes``, then run
+    the exit rules on the crossed ones."""
+    shared = triggers is None
+    with _paper_price_lock if shared else contextlib.nullcontext():
+        return _evaluate_locked(db, open_trades, trade_symbol_map, quotes, clock, _paper_triggers if shared else triggers)
+
+
+def _evaluate_locked(db, open_trades, trade_symbol_map, quotes, clock, triggers: TriggerIndex) -> Dict:
     updated_count = 0
-    closed_count = 0
+    _sync_paper_triggers(trade_symbol_map, triggers)
 
+    # Only trades whose quiet band the new price leaves go through the exit
+    # rules, and those are evaluated together in one vectorized batch.
+    crossed_rows = []
     for quote_symbol, trades in trade_symbol_map.items():
         data = quotes.get(quote_symbol) or {}
         live_price = data.get("last_price")
@@ -149,149 +301,19 @@ def update_open_paper_trades(db, *, force: bool = False) -> Dict:
             continue
 
         new_price = float(live_price)
-
+        crossed = set(triggers.crossed(quote_symbol, new_price))
         for trade in trades:
+            if trade.id in crossed:
+                crossed_rows.append((quote_symbol, trade, new_price))
+                continue
             try:
-                # Smart Profit Booking + Trailing Stop Logic
-                # 1) Move SL to breakeven after 35% of target is reached.
-                # 2) Close at target (profit booking).
-                # 3) If target is exceeded, keep a tighter trailing SL (3pts).
-                if trade.side == "BUY":
-                    if trade.stop_loss is not None:
-                        profit_points = new_price - trade.entry_price
-                        target_reached = trade.target is not None and new_price >= trade.target
-                        half_target = trade.target is not None and new_price >= (trade.entry_price + (trade.target - trade.entry_price) * 0.35)
-                        if half_target and trade.stop_loss < trade.entry_price:
-                            trade.stop_loss = round(trade.entry_price, 2)
-                            print(
-                                f"✅ BREAKEVEN set at {trade.stop_loss} after 35% target reached (Profit: +{profit_points:.1f}pts)"
-                            )
-                        # Lock-in 12 points profit: once profit >= 12, move SL to entry+12
-                        if profit_points >= 12:
-                            locked_sl = round(trade.entry_price + 12, 2)
-                            if trade.stop_loss < locked_sl:
-                                trade.stop_loss = locked_sl
-                                print(f"🔒 LOCKED PROFIT: SL moved to {trade.stop_loss} (Profit: +{profit_points:.1f}pts)")
-                            # If price starts dropping from last seen price, exit immediately to lock profit
-                            if (trade.current_price is not None) and (new_price < trade.current_price):
-                                trade.status = "PROFIT_TRAIL"
-                                trade.exit_price = new_price
-                                trade.exit_time = datetime.utcnow()
-                                trade.pnl = (trade.exit_price - trade.entry_price) * trade.quantity
-                                trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                                closed_count += 1
-                                print(f"❌ PROFIT-LOCK EXIT: Trade {trade.id} closed at {trade.exit_price} (Profit: ₹{trade.pnl:.2f})")
-                                trade.current_price = new_price
-                                updated_count += 1
-                                continue
-                        if target_reached:
-                            trade.status = "TARGET_HIT"
-                            trade.exit_price = trade.target
-                            trade.exit_time = datetime.utcnow()
-                            trade.pnl = (trade.target - trade.entry_price) * trade.quantity
-                            trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                            closed_count += 1
-                            print(
-                                f"✅ TARGET HIT: Trade {trade.id} closed at target {trade.target} (Profit: ₹{trade.pnl:.2f})"
-                            )
-                            trade.current_price = trade.target
-                            updated_count += 1
-                            continue
-                        if trade.target is not None and profit_points > (trade.target - trade.entry_price):
-                            new_trailing_sl = round(new_price - 3, 2)
-                            if new_trailing_sl > trade.stop_loss:
-                                trade.stop_loss = new_trailing_sl
-                                print(
-                                    f"💎 TARGET EXCEEDED! Trailing SL: {trade.stop_loss} (Profit: +{profit_points:.1f}pts)"
-                                )
-                else:  # SELL
-                    if trade.stop_loss is not None:
-                        profit_points = trade.entry_price - new_price
-                        target_reached = trade.target is not None and new_price <= trade.target
-                        half_target = trade.target is not None and new_price <= (trade.entry_price - (trade.entry_price - trade.target) * 0.35)
-                        if half_target and trade.stop_loss > trade.entry_price:
-                            trade.stop_loss = round(trade.entry_price, 2)
-                            print(
-                                f"✅ BREAKEVEN set at {trade.stop_loss} after 35% target reached (Profit: +{profit_points:.1f}pts)"
-                            )
-                        # Lock-in 12 points profit for shorts: once profit >= 12, move SL to entry-12
-                        if profit_points >= 12:
-                            locked_sl = round(trade.entry_price - 12, 2)
-                            if trade.stop_loss > locked_sl:
-                                trade.stop_loss = locked_sl
-                                print(f"🔒 LOCKED PROFIT: SL moved to {trade.stop_loss} (Profit: +{profit_points:.1f}pts)")
-                            # If price starts rising from last seen price, exit immediately to lock profit
-                            if (trade.current_price is not None) and (new_price > trade.current_price):
-                                trade.status = "PROFIT_TRAIL"
-                                trade.exit_price = new_price
-                                trade.exit_time = datetime.utcnow()
-                                trade.pnl = (trade.entry_price - trade.exit_price) * trade.quantity
-                                trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                                closed_count += 1
-                                print(f"❌ PROFIT-LOCK EXIT: Trade {trade.id} closed at {trade.exit_price} (Profit: ₹{trade.pnl:.2f})")
-                                trade.current_price = new_price
-                                updated_count += 1
-                                continue
-                        if target_reached:
-                            trade.status = "TARGET_HIT"
-                            trade.exit_price = trade.target
-                            trade.exit_time = datetime.utcnow()
-                            trade.pnl = (trade.entry_price - trade.target) * trade.quantity
-                            trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                            closed_count += 1
-                            print(
-                                f"✅ TARGET HIT: Trade {trade.id} closed at target {trade.target} (Profit: ₹{trade.pnl:.2f})"
-                            )
-                            trade.current_price = trade.target
-                            updated_count += 1
-                            continue
-                        if trade.target is not None and profit_points > (trade.entry_price - trade.target):
-                            new_trailing_sl = round(new_price + 3, 2)
-                            if new_trailing_sl < trade.stop_loss:
-                                trade.stop_loss = new_trailing_sl
-                                print(
-                                    f"💎 TARGET EXCEEDED! Trailing SL: {trade.stop_loss} (Profit: +{profit_points:.1f}pts)"
-                                )
-
-                # Check SL using live price (target handled above)
-                if trade.side == "BUY":
-                    if trade.stop_loss is not None and new_price <= trade.stop_loss:
-                        new_price = trade.stop_loss
-                        trade.status = _paper_profit_protect_status(trade)
-                        trade.exit_price = trade.stop_loss
-                        trade.exit_time = datetime.utcnow()
-                        trade.pnl = (trade.stop_loss - trade.entry_price) * trade.quantity
-                        trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                        closed_count += 1
-                        print(f"❌ Trade {trade.id} closed at SL: {trade.stop_loss} (Profit: ₹{trade.pnl:.2f})")
-                else:  # SELL
-                    if trade.stop_loss is not None and new_price >= trade.stop_loss:
-                        new_price = trade.stop_loss
-                        trade.status = _paper_profit_protect_status(trade)
-                        trade.exit_price = trade.stop_loss
-                        trade.exit_time = datetime.utcnow()
-                        trade.pnl = (trade.entry_price - trade.stop_loss) * trade.quantity
-                        trade.pnl_percentage = (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                        closed_count += 1
-                        print(f"❌ Trade {trade.id} closed at SL: {trade.stop_loss} (Profit: ₹{trade.pnl:.2f})")
-
-                trade.current_price = new_price
-
-                # Calculate P&L while still open or at exit
-                if trade.side == "BUY":
-                    trade.pnl = (trade.current_price - trade.entry_price) * trade.quantity
-                else:
-                    trade.pnl = (trade.entry_price - trade.current_price) * trade.quantity
-
-                trade.pnl_percentage = (
-                    (trade.pnl / (trade.entry_price * trade.quantity)) * 100
-                    if trade.entry_price > 0
-                    else 0
-                )
+                _mark_paper_trade(trade, new_price)
                 updated_count += 1
             except Exception:
                 continue
 
+    crossed_count, closed_count = _exit_paper_rows(crossed_rows, clock, triggers)
+    updated_count += crossed_count
     db.commit()
 
     return {
@@ -301,3 +323,47 @@ def update_open_paper_trades(db, *, force: bool = False) -> Dict:
         "total_open": len([t for t in open_trades if t.status == "OPEN"]),
         "message": f"Updated {updated_count} trades, closed {closed_count}",
     }
+
+
+def _exit_paper_rows(crossed_rows, clock, triggers: TriggerIndex):
+    """Apply the exit rules to ``(quote_symbol, trade, price)`` rows in one vectorized batch.
+
+    Returns ``(updated_count, closed_count)``; open trades get their new band.
+    """
+    if not crossed_rows:
+        return 0, 0
+    closed_count = 0
+    batch = [trade for _, trade, _ in crossed_rows]
+    result = exit_rules.paper_exits(
+        entry=[t.entry_price for t in batch],
+        stop=[_nan_if_none(t.stop_loss) for t in batch],
+        target=[_nan_if_none(t.target) for t in batch],
+        sign=exit_rules.side_sign(t.side for t in batch),
+        price=[price for _, _, price in crossed_rows],
+        prev_price=[_nan_if_none(t.current_price) for t in batch],
+        qty=[t.quantity for t in batch],
+    )
+    exit_time = clock()
+    for i, (quote_symbol, trade, new_price) in enumerate(crossed_rows):
+        if trade.stop_loss is not None and result.stop[i] != trade.stop_loss:
+            trade.stop_loss = float(result.stop[i])
+            if result.breakeven[i]:
+                print(f"✅ BREAKEVEN set at {trade.stop_loss} after 35% target reached")
+            if result.locked[i]:
+                print(f"🔒 LOCKED PROFIT: SL moved to {trade.stop_loss}")
+            if result.trailed[i]:
+                print(f"💎 TARGET EXCEEDED! Trailing SL: {trade.stop_loss}")
+        trade.current_price = float(result.mark[i])
+        trade.pnl = float(result.pnl[i])
+        trade.pnl_percentage = float(result.pnl_pct[i])
+
+        if result.status[i] != exit_rules.OPEN:
+            trade.status = exit_rules.STATUS_NAMES[result.status[i]]
+            trade.exit_price = float(result.exit_price[i])
+            trade.exit_time = exit_time
+            closed_count += 1
+            print(f"❌ {trade.status}: Trade {trade.id} closed at {trade.exit_price} (Profit: ₹{trade.pnl:.2f})")
+            triggers.remove(trade.id)
+        else:
+            _index_paper_trade(quote_symbol, trade, triggers)
+    return len(crossed_rows), closed_count
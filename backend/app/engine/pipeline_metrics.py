@@ -0,0 +1,171 @@
+"""
+Stage-level timing for the option-signal pipeline.
+
+A :class:`PipelineRun` collects per-stage durations, per-symbol latency,
+broker call counts and cache hit/miss counts for one scan. The active run is
+carried in a context variable (``asyncio.to_thread`` copies it; pool workers
+bind it explicitly via :func:`bind_run`). Finished runs go into a bounded ring
+buffer exposed through the admin API.
+
+Stage durations recorded from concurrent workers are summed, so a stage can
+exceed the run's wall time; ``wall_ms`` is the elapsed time of the run itself.
+"""
+from __future__ import annotations
+
+import contextvars
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+_run_ids = itertools.count(1)
+
+
+class PipelineRun:
+    """Timing and counters for one signal-pipeline invocation."""
+
+    def __init__(self, kind: str, **meta):
+        self.run_id = next(_run_ids)
+        self.kind = kind
+        self.meta = dict(meta)
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self.wall_ms: Optional[float] = None
+        self.stages: Dict[str, float] = {}
+        self.symbols: Dict[str, float] = {}
+        self.broker_calls: Dict[str, int] = {}
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000.0
+
+    def add_symbol(self, symbol: str, seconds: float) -> None:
+        with self._lock:
+            self.symbols[symbol] = self.symbols.get(symbol, 0.0) + seconds * 1000.0
+
+    def count_call(self, endpoint: str) -> None:
+        with self._lock:
+            self.broker_calls[endpoint] = self.broker_calls.get(endpoint, 0) + 1
+
+    def cache_event(self, cache: str, outcome: str) -> None:
+        with self._lock:
+            counts = self.cache.setdefault(cache, {})
+            counts[outcome] = counts.get(outcome, 0) + 1
+
+    def finish(self) -> None:
+        if self.wall_ms is None:
+            self.wall_ms = (time.perf_counter() - self._t0) * 1000.0
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            slowest = sorted(self.symbols.items(), key=lambda kv: -kv[1])
+            return {
+                "run_id": self.run_id,
+                "kind": self.kind,
+                "meta": dict(self.meta),
+                "started_at": self.started_at,
+                "wall_ms": round(self.wall_ms, 3) if self.wall_ms is not None else None,
+                "stages_ms": {k: round(v, 3) for k, v in self.stages.items()},
+                "symbols_ms": {k: round(v, 3) for k, v in slowest},
+                "broker_calls": dict(self.broker_calls),
+                "cache": {k: dict(v) for k, v in self.cache.items()},
+            }
+
+
+class PipelineMetrics:
+    """Ring buffer of the most recent finished runs."""
+
+    def __init__(self, capacity: int = 50):
+        self._runs: deque = deque(maxlen=max(1, int(capacity)))
+        self._lock = threading.Lock()
+
+    def record(self, run: PipelineRun) -> None:
+        run.finish()
+        with self._lock:
+            self._runs.append(run)
+
+    def recent(self, limit: int = 20) -> List[Dict]:
+        with self._lock:
+            runs = list(self._runs)[-max(0, int(limit)):] if limit else []
+        return [run.to_dict() for run in reversed(runs)]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._runs.clear()
+
+
+pipeline_metrics = PipelineMetrics()
+_current_run: contextvars.ContextVar[Optional[PipelineRun]] = contextvars.ContextVar("pipeline_run", default=None)
+
+
+def current_run() -> Optional[PipelineRun]:
+    return _current_run.get()
+
+
+@contextmanager
+def track_run(kind: str, **meta) -> Iterator[PipelineRun]:
+    """Start a run, or join the run already active in this context."""
+    existing = _current_run.get()
+    if existing is not None:
+        yield existing
+        return
+    run = PipelineRun(kind, **meta)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+        pipeline_metrics.record(run)
+
+
+@contextmanager
+def bind_run(run: Optional[PipelineRun]) -> Iterator[None]:
+    """Make ``run`` current in a worker thread that did not inherit the context."""
+    token = _current_run.set(run)
+    try:
+        yield
+    finally:
+        _current_run.reset(token)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_stage(name, time.perf_counter() - started)
+
+
+@contextmanager
+def symbol_timer(symbol: str) -> Iterator[None]:
+    run = _current_run.get()
+    if run is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        run.add_symbol(symbol, time.perf_counter() - started)
+
+
+def count_broker_call(endpoint: str) -> None:
+    run = _current_run.get()
+    if run is not None:
+        run.count_call(endpoint)
+
+
+def record_cache(cache: str, outcome: str) -> None:
+    """Count a cache lookup outcome (``"hit"``, ``"miss"``, ``"stale"``, ...)."""
+    run = _current_run.get()
+    if run is not None:
+        run.cache_event(cache, outcome)
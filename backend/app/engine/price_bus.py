@@ -0,0 +1,244 @@
+"""
+Shared in-process LTP snapshot bus.
+
+The paper-trade updater, the live trade price refresh, the market-indices
+analyzer and the signal scan all want last prices for overlapping
+instruments. Instead of each calling ``kite.ltp``/``kite.ohlc`` itself, they
+ask this bus. The bus keeps the union of recently requested symbols as its
+subscription set. When a request finds any of its symbols older than
+``max_age``, one batched broker call refreshes the whole set, and concurrent
+callers wait for that poll rather than issuing their own. Broker calls
+therefore scale with the poll interval, not with the number of consumers.
+
+Readers get an immutable :class:`PriceSnapshot` with a timestamp per symbol.
+A snapshot is reused across client objects on the same Kite account (same
+``api_key``/``access_token``); a changed access token always polls.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from types import MappingProxyType
+from typing import Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+from app.engine.rate_limiter import RateLimitedKite
+
+# Kite Connect accepts up to 1000 instruments per ltp/ohlc call.
+_MAX_INSTRUMENTS_PER_CALL = 1000
+
+
+class Tick(NamedTuple):
+    last_price: float
+    ohlc: Optional[Mapping[str, float]]
+    timestamp: float
+
+
+class PriceSnapshot:
+    """Immutable symbol -> :class:`Tick` view."""
+
+    __slots__ = ("ticks", "taken_at")
+
+    def __init__(self, ticks: Mapping[str, Tick], taken_at: float):
+        self.ticks = MappingProxyType(dict(ticks))
+        self.taken_at = taken_at
+
+    def get(self, symbol: str) -> Optional[Tick]:
+        return self.ticks.get(symbol)
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.ticks
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def as_quotes(self, symbols: Iterable[str]) -> Dict[str, Dict]:
+        """Kite-style ``{symbol: {"last_price", "ohlc"?, "timestamp"}}`` for the known symbols."""
+        quotes = {}
+        for symbol in symbols:
+            tick = self.ticks.get(symbol)
+            if tick is None:
+                continue
+            quote = {"last_price": tick.last_price, "timestamp": tick.timestamp}
+            if tick.ohlc is not None:
+                quote["ohlc"] = dict(tick.ohlc)
+            quotes[symbol] = quote
+        return quotes
+
+
+def account_key(kite):
+    """Identity of the broker session behind ``kite`` (proxies and rebuilt clients share it)."""
+    inner = kite
+    while isinstance(inner, RateLimitedKite):
+        inner = inner.wrapped
+    token = getattr(inner, "access_token", None)
+    if isinstance(token, str) and token:
+        return getattr(inner, "api_key", None), token
+    return id(inner)
+
+
+class _Subscription:
+    __slots__ = ("wants_ohlc", "last_requested", "polled_at", "polled_ohlc", "source")
+
+    def __init__(self):
+        self.wants_ohlc = False
+        self.last_requested = 0.0
+        self.polled_at = float("-inf")
+        self.polled_ohlc = False
+        self.source = None
+
+
+class PriceBus:
+    """Coalesces LTP/OHLC requests into one batched poll per interval."""
+
+    def __init__(self, interval: float = 1.0, idle_ttl: float = 120.0, clock: Callable[[], float] = time.time):
+        self.interval = float(interval)
+        self.idle_ttl = float(idle_ttl)
+        self._clock = clock
+        self._subscriptions: Dict[str, _Subscription] = {}
+        self._snapshot = PriceSnapshot({}, 0.0)
+        self._lock = threading.Lock()
+        self._poll_lock = threading.Lock()
+        self.broker_calls = 0
+        self.requests = 0
+        self.served_from_snapshot = 0
+
+    def snapshot(self) -> PriceSnapshot:
+        return self._snapshot
+
+    def subscribe(self, symbols: Iterable[str], ohlc: bool = False) -> None:
+        now = self._clock()
+        with self._lock:
+            for symbol in symbols:
+                sub = self._subscriptions.get(symbol)
+                if sub is None:
+                    sub = self._subscriptions[symbol] = _Subscription()
+                sub.last_requested = now
+                sub.wants_ohlc = sub.wants_ohlc or ohlc
+
+    def ltp(self, kite, symbols: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict]:
+        """Last prices for ``symbols`` in ``kite.ltp`` shape, polling at most once."""
+        return self._request(kite, list(dict.fromkeys(symbols)), ohlc=False, max_age=max_age)
+
+    def ohlc(self, kite, symbols: Iterable[str], max_age: Optional[float] = None) -> Dict[str, Dict]:
+        """Last prices plus day OHLC for ``symbols`` in ``kite.ohlc`` shape."""
+        return self._request(kite, list(dict.fromkeys(symbols)), ohlc=True, max_age=max_age)
+
+    def client(self, kite, max_age: Optional[float] = None) -> "BusClient":
+        """``kite``-like object whose ``ltp``/``ohlc`` read through this bus."""
+        return BusClient(self, kite, max_age)
+
+    def _fresh(self, kite, symbols: List[str], ohlc: bool, max_age: float) -> bool:
+        if max_age <= 0:
+            return False
+        account = account_key(kite)
+        cutoff = self._clock() - max_age
+        with self._lock:
+            for symbol in symbols:
+                sub = self._subscriptions.get(symbol)
+                if sub is None or sub.source != account or sub.polled_at < cutoff or (ohlc and not sub.polled_ohlc):
+                    return False
+        return True
+
+    def _request(self, kite, symbols: List[str], ohlc: bool, max_age: Optional[float]) -> Dict[str, Dict]:
+        if not symbols:
+            return {}
+        max_age = self.interval if max_age is None else float(max_age)
+        self.subscribe(symbols, ohlc=ohlc)
+        with self._lock:
+            self.requests += 1
+        if not self._fresh(kite, symbols, ohlc, max_age):
+            with self._poll_lock:
+                # Another caller may have polled while we waited.
+                if not self._fresh(kite, symbols, ohlc, max_age):
+                    self.poll(kite)
+                    return self._snapshot.as_quotes(symbols)
+        with self._lock:
+            self.served_from_snapshot += 1
+        return self._snapshot.as_quotes(symbols)
+
+    def _due_symbols(self) -> tuple:
+        now = self._clock()
+        with self._lock:
+            idle = [s for s, sub in self._subscriptions.items() if now - sub.last_requested > self.idle_ttl]
+            for symbol in idle:
+                del self._subscriptions[symbol]
+            symbols = list(self._subscriptions)
+            with_ohlc = any(sub.wants_ohlc for sub in self._subscriptions.values())
+        return symbols, with_ohlc
+
+    def poll(self, kite) -> PriceSnapshot:
+        """Refresh every subscribed symbol with one batched call (per 1000 instruments)."""
+        symbols, with_ohlc = self._due_symbols()
+        with_ohlc = with_ohlc and callable(getattr(kite, "ohlc", None))
+        fetch = kite.ohlc if with_ohlc else kite.ltp
+        quotes: Dict[str, Dict] = {}
+        for start in range(0, len(symbols), _MAX_INSTRUMENTS_PER_CALL):
+            quotes.update(fetch(symbols[start:start + _MAX_INSTRUMENTS_PER_CALL]) or {})
+            with self._lock:
+                self.broker_calls += 1
+        self._merge(kite, symbols, quotes, with_ohlc)
+        return self._snapshot
+
+    def publish(self, kite, quotes: Mapping[str, Mapping]) -> None:
+        """Merge quotes another consumer already fetched (e.g. the signal scan)."""
+        symbols = [s for s, q in quotes.items() if isinstance(q, Mapping) and q.get("last_price") is not None]
+        if symbols:
+            self._merge(kite, symbols, quotes, with_ohlc=all(quotes[s].get("ohlc") for s in symbols), only_subscribed=False)
+
+    def _merge(self, kite, symbols: List[str], quotes: Mapping[str, Mapping], with_ohlc: bool, only_subscribed: bool = True) -> None:
+        now = self._clock()
+        expired = now - self.idle_ttl
+        account = account_key(kite)
+        with self._lock:
+            ticks = {s: t for s, t in self._snapshot.ticks.items() if t.timestamp >= expired}
+            for symbol in symbols:
+                data = quotes.get(symbol) or {}
+                price = data.get("last_price")
+                sub = self._subscriptions.get(symbol)
+                if sub is None and only_subscribed:
+                    continue
+                if sub is not None:
+                    # Symbols the broker did not return still count as polled, so
+                    # an unknown instrument cannot force a poll on every request.
+                    sub.polled_at, sub.polled_ohlc, sub.source = now, with_ohlc, account
+                try:
+                    price = float(price)
+                except (TypeError, ValueError):
+                    continue
+                ohlc = data.get("ohlc")
+                ticks[symbol] = Tick(price, MappingProxyType(dict(ohlc)) if isinstance(ohlc, Mapping) else None, now)
+            self._snapshot = PriceSnapshot(ticks, now)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "subscriptions": len(self._subscriptions),
+                "symbols": len(self._snapshot),
+                "broker_calls": self.broker_calls,
+                "requests": self.requests,
+                "served_from_snapshot": self.served_from_snapshot,
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscriptions.clear()
+            self._snapshot = PriceSnapshot({}, 0.0)
+            self.broker_calls = self.requests = self.served_from_snapshot = 0
+
+
+class BusClient:
+    """Drop-in for ``kite.ltp``/``kite.ohlc`` callers that should share the bus."""
+
+    def __init__(self, bus: PriceBus, kite, max_age: Optional[float] = None):
+        self.bus = bus
+        self.kite = kite
+        self.max_age = max_age
+
+    def ltp(self, symbols) -> Dict[str, Dict]:
+        return self.bus.ltp(self.kite, [symbols] if isinstance(symbols, str) else symbols, self.max_age)
+
+    def ohlc(self, symbols) -> Dict[str, Dict]:
+        return self.bus.ohlc(self.kite, [symbols] if isinstance(symbols, str) else symbols, self.max_age)
+
+
+price_bus = PriceBus()
@@ -0,0 +1,112 @@
+"""
+Token-bucket rate limiting for broker API calls.
+
+Kite enforces per-endpoint request rates (quote: 1 req/s, historical: 3 req/s).
+Concurrent scan workers share the buckets below so fan-out is bounded by the
+broker's limits instead of tripping 429s.
+"""
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+from app.engine.pipeline_metrics import count_broker_call
+
+
+class TokenBucket:
+    """Thread-safe token bucket; waiting callers are served in arrival order."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float, timeout: Optional[float]) -> Optional[float]:
+        """Reserve ``tokens`` and return the wait needed, or None if over ``timeout``."""
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (tokens - self._tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                return None
+            # Tokens may go negative: later callers queue behind this reservation.
+            self._tokens -= tokens
+            return wait
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        wait = self._reserve(float(tokens), timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            self._sleep(wait)
+        return True
+
+
+# Shared per-endpoint limits for the Kite Connect REST API.
+KITE_RATE_LIMITS: Dict[str, TokenBucket] = {
+    "quote": TokenBucket(rate=1.0, capacity=1.0),
+    "historical": TokenBucket(rate=3.0, capacity=3.0),
+}
+
+# Client method -> rate-limit bucket (ltp/ohlc count against the quote limit).
+_KITE_METHOD_BUCKETS = {
+    "quote": "quote",
+    "ltp": "quote",
+    "ohlc": "quote",
+    "historical_data": "historical",
+}
+# Broker methods counted in pipeline metrics (rate-limited or not).
+_COUNTED_METHODS = set(_KITE_METHOD_BUCKETS) | {"instruments"}
+
+
+class RateLimitedKite:
+    """Proxy that throttles quote/historical calls of a KiteConnect client.
+
+    Broker calls made through the proxy are also counted in the active
+    pipeline-metrics run.
+    """
+
+    def __init__(self, kite, limits: Optional[Dict[str, TokenBucket]] = None):
+        self._kite = kite
+        self._limits = KITE_RATE_LIMITS if limits is None else limits
+
+    @property
+    def wrapped(self):
+        return self._kite
+
+    def __getattr__(self, name):
+        attr = getattr(self._kite, name)
+        if name not in _COUNTED_METHODS or not callable(attr):
+            return attr
+        bucket = self._limits.get(_KITE_METHOD_BUCKETS.get(name, ""))
+
+        @functools.wraps(attr)
+        def limited(*args, **kwargs):
+            if bucket is not None:
+                bucket.acquire()
+            count_broker_call(name)
+            return attr(*args, **kwargs)
+
+        return limited
+
+
+def rate_limited(kite, limits: Optional[Dict[str, TokenBucket]] = None):
+    """Wrap ``kite`` once; already-wrapped clients are returned unchanged."""
+    if kite is None or isinstance(kite, RateLimitedKite):
+        return kite
+    return RateLimitedKite(kite, limits)
@@ -0,0 +1,330 @@
+"""
+Incremental (O(1) per bar) indicator state.
+
+The functions in ``technical_indicators`` and ``strategies.intraday_professional``
+recompute from the full candle history on every call. The classes here keep
+just enough running state to fold in one new bar at a time, so a live scanner
+can keep per-symbol indicators warm instead of re-downloading and recomputing
+the whole window.
+
+``update`` commits one *closed* bar; calling it per tick would count every
+tick as a bar and skew EMA/RSI/ATR. Ticks of the still-forming bar go to
+``preview``, which returns what ``update`` would for that bar without
+changing any state; commit the bar with ``update`` once it closes.
+
+Every indicator can be serialised with ``snapshot()`` (plain JSON-friendly
+dict) and rebuilt with :func:`restore`. Values match the batch definitions:
+
+* ``EMA``/``MACD`` - pandas ``ewm(span, adjust=False)``
+* ``BollingerBands`` - rolling mean and population std (``np.std``)
+* ``VWAP`` - cumulative price*volume over cumulative volume
+* ``Supertrend`` - ``intraday_professional.supertrend``
+* ``WilderRSI``/``ATR`` - Wilder smoothing seeded with a simple average
+"""
+from __future__ import annotations
+
+import copy
+import math
+from collections import deque
+from typing import Dict, Optional, Type
+
+_REGISTRY: Dict[str, Type["StreamingIndicator"]] = {}
+
+
+class StreamingIndicator:
+    """Base class: ``update`` folds in one closed bar, ``snapshot``/``restore`` persist state."""
+
+    _fields: tuple = ()
+    _deques: tuple = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        _REGISTRY[cls.__name__] = cls
+
+    def preview(self, *args, **kwargs):
+        """``update``'s result for a still-forming bar; this indicator is left unchanged."""
+        return copy.deepcopy(self).update(*args, **kwargs)
+
+    def snapshot(self) -> Dict:
+        state = {"type": type(self).__name__}
+        for name in self._fields:
+            value = getattr(self, name)
+            if isinstance(value, StreamingIndicator):
+                value = value.snapshot()
+            elif name in self._deques:
+                value = list(value)
+            state[name] = value
+        return state
+
+    @classmethod
+    def _from_state(cls, state: Dict) -> "StreamingIndicator":
+        obj = cls.__new__(cls)
+        for name in cls._fields:
+            value = state[name]
+            if isinstance(value, dict) and "type" in value:
+                value = restore(value)
+            elif name in cls._deques:
+                value = deque(value)
+            setattr(obj, name, value)
+        return obj
+
+
+def restore(state: Dict) -> StreamingIndicator:
+    """Rebuild an indicator from :meth:`StreamingIndicator.snapshot` output."""
+    try:
+        cls = _REGISTRY[state["type"]]
+    except KeyError:
+        raise ValueError(f"Unknown indicator snapshot type: {state.get('type')!r}")
+    return cls._from_state(state)
+
+
+class EMA(StreamingIndicator):
+    _fields = ("period", "alpha", "value")
+
+    def __init__(self, period: int):
+        self.period = int(period)
+        self.alpha = 2.0 / (self.period + 1)
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+
+class RollingWindow(StreamingIndicator):
+    """Fixed-size window with running sum and sum of squares."""
+
+    _fields = ("period", "window", "total", "total_sq")
+    _deques = ("window",)
+
+    def __init__(self, period: int):
+        self.period = int(period)
+        self.window: deque = deque()
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return len(self.window) >= self.period
+
+    def update(self, x: float) -> None:
+        x = float(x)
+        self.window.append(x)
+        self.total += x
+        self.total_sq += x * x
+        if len(self.window) > self.period:
+            old = self.window.popleft()
+            self.total -= old
+            self.total_sq -= old * old
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / len(self.window) if self.window else None
+
+    @property
+    def std(self) -> Optional[float]:
+        if not self.window:
+            return None
+        mean = self.total / len(self.window)
+        return math.sqrt(max(0.0, self.total_sq / len(self.window) - mean * mean))
+
+
+class WilderRSI(StreamingIndicator):
+    _fields = ("period", "prev", "count", "avg_gain", "avg_loss", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self.prev: Optional[float] = None
+        self.count = 0
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, x: float) -> Optional[float]:
+        x = float(x)
+        if self.prev is None:
+            self.prev = x
+            return None
+        delta = x - self.prev
+        self.prev = x
+        gain, loss = max(delta, 0.0), max(-delta, 0.0)
+        self.count += 1
+        if self.count <= self.period:
+            # Seed with the simple average of the first ``period`` changes.
+            self.avg_gain += gain / self.period
+            self.avg_loss += loss / self.period
+            if self.count < self.period:
+                return None
+        else:
+            self.avg_gain = (self.avg_gain * (self.period - 1) + gain) / self.period
+            self.avg_loss = (self.avg_loss * (self.period - 1) + loss) / self.period
+        if self.avg_loss == 0:
+            self.value = 100.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+        return self.value
+
+
+class MACD(StreamingIndicator):
+    _fields = ("fast", "slow", "signal", "macd", "histogram", "prev_histogram")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast = EMA(fast)
+        self.slow = EMA(slow)
+        self.signal = EMA(signal)
+        self.macd: Optional[float] = None
+        self.histogram: Optional[float] = None
+        self.prev_histogram: Optional[float] = None
+
+    def update(self, x: float) -> Dict[str, float]:
+        self.macd = self.fast.update(x) - self.slow.update(x)
+        signal = self.signal.update(self.macd)
+        self.prev_histogram = self.histogram
+        self.histogram = self.macd - signal
+        return {"macd": self.macd, "signal": signal, "histogram": self.histogram}
+
+
+class BollingerBands(StreamingIndicator):
+    _fields = ("std_dev", "window")
+
+    def __init__(self, period: int = 20, std_dev: float = 2.0):
+        self.std_dev = float(std_dev)
+        self.window = RollingWindow(period)
+
+    def update(self, x: float) -> Optional[Dict[str, float]]:
+        self.window.update(x)
+        if not self.window.ready:
+            return None
+        middle, std = self.window.mean, self.window.std
+        upper = middle + self.std_dev * std
+        lower = middle - self.std_dev * std
+        position = (float(x) - lower) / (upper - lower) if upper != lower else 0.5
+        return {"upper": upper, "middle": middle, "lower": lower, "position": position}
+
+
+class ATR(StreamingIndicator):
+    """Wilder average true range."""
+
+    _fields = ("period", "prev_close", "count", "value")
+
+    def __init__(self, period: int = 14):
+        self.period = int(period)
+        self.prev_close: Optional[float] = None
+        self.count = 0
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        high, low, close = float(high), float(low), float(close)
+        if self.prev_close is None:
+            tr = high - low
+        else:
+            tr = max(high - low, abs(high - self.prev_close), abs(low - self.prev_close))
+        self.prev_close = close
+        self.count += 1
+        if self.count <= self.period:
+            self.value = (self.value or 0.0) + tr / self.period
+            return self.value if self.count == self.period else None
+        self.value = (self.value * (self.period - 1) + tr) / self.period
+        return self.value
+
+
+class VWAP(StreamingIndicator):
+    _fields = ("pv", "volume")
+
+    def __init__(self):
+        self.pv = 0.0
+        self.volume = 0.0
+
+    def update(self, price: float, volume: float) -> Optional[float]:
+        self.pv += float(price) * float(volume)
+        self.volume += float(volume)
+        return self.value
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.pv / self.volume if self.volume else None
+
+    def reset(self) -> None:
+        """Start a new session."""
+        self.pv = 0.0
+        self.volume = 0.0
+
+
+class Supertrend(StreamingIndicator):
+    """Streaming form of ``intraday_professional.supertrend``.
+
+    Uses the same band definition (hl2 +/- multiplier x rolling mean of the
+    bar range) and flips trend against the previous bar's bands.
+    """
+
+    _fields = ("multiplier", "ranges", "in_uptrend", "prev_upper", "prev_lower", "bars", "value")
+
+    def __init__(self, period: int = 10, multiplier: float = 3.0):
+        self.multiplier = float(multiplier)
+        self.ranges = RollingWindow(period)
+        self.in_uptrend = True
+        self.prev_upper: Optional[float] = None
+        self.prev_lower: Optional[float] = None
+        self.bars = 0
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float) -> Optional[float]:
+        high, low, close = float(high), float(low), float(close)
+        self.ranges.update(high - low)
+        if self.ranges.ready:
+            hl2 = (high + low) / 2
+            band = self.multiplier * self.ranges.mean
+            upper, lower = hl2 + band, hl2 - band
+        else:
+            upper = lower = None
+        if self.bars == 0:
+            self.value = 0.0
+        else:
+            if self.prev_upper is not None and close > self.prev_upper:
+                self.in_uptrend = True
+            elif self.prev_lower is not None and close < self.prev_lower:
+                self.in_uptrend = False
+            self.value = upper if self.in_uptrend else lower
+        self.prev_upper, self.prev_lower = upper, lower
+        self.bars += 1
+        return self.value
+
+
+class IndicatorSet(StreamingIndicator):
+    """Per-symbol bundle matching the ``intraday_professional`` indicator set."""
+
+    _fields = ("vwap", "ema9", "ema21", "rsi", "macd", "bollinger", "atr", "supertrend", "last")
+
+    def __init__(self):
+        self.vwap = VWAP()
+        self.ema9 = EMA(9)
+        self.ema21 = EMA(21)
+        self.rsi = WilderRSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bollinger = BollingerBands(20, 2)
+        self.atr = ATR(14)
+        self.supertrend = Supertrend(10, 3)
+        self.last: Dict = {}
+
+    def update(self, high: float, low: float, close: float, volume: float = 0.0) -> Dict:
+        macd = self.macd.update(close)
+        self.last = {
+            "close": float(close),
+            "vwap": self.vwap.update(close, volume),
+            "ema9": self.ema9.update(close),
+            "ema21": self.ema21.update(close),
+            "rsi": self.rsi.update(close),
+            "macd": macd["macd"],
+            "macd_signal": macd["signal"],
+            "macd_hist": macd["histogram"],
+            "bollinger": self.bollinger.update(close),
+            "atr": self.atr.update(high, low, close),
+            "supertrend": self.supertrend.update(high, low, close),
+        }
+        return self.last
+
+    def update_many(self, highs, lows, closes, volumes) -> Dict:
+        for bar in zip(highs, lows, closes, volumes):
+            self.update(*bar)
+        return self.last
@@ -279,3 +279,141 @@ def calculate_comprehensive_signals(
         "recommendation": recommendation,
         "timestamp": pd.Timestamp.now().isoformat()
     }
+
+
+def _as_matrix(values, dtype=np.float64) -> np.ndarray:
+    matrix = np.asarray(values, dtype=dtype)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    if matrix.ndim != 2:
+        raise ValueError("expected a 2-D array of shape (symbols, bars)")
+    return matrix
+
+
+def _ema(frame: pd.DataFrame, span: int) -> pd.DataFrame:
+    return frame.ewm(span=span, adjust=False).mean()
+
+
+def calculate_indicators_batch(
+    closes,
+    highs=None,
+    lows=None,
+    volumes=None,
+    symbols: list = None,
+) -> pd.DataFrame:
+    """
+    Calculate every indicator for many symbols in one vectorized pass
+    Inputs are 2-D arrays of shape (symbols, bars) with equal-length rows.
+    Values match the single-symbol functions above row for row; keys those
+    functions omit on short history are filled with "none"/"normal".
+    Returns: DataFrame with one row per symbol
+    """
+    closes = _as_matrix(closes)
+    n_symbols, n_bars = closes.shape
+    highs = closes if highs is None else _as_matrix(highs)
+    lows = closes if lows is None else _as_matrix(lows)
+    volumes = np.full_like(closes, 1000000.0) if volumes is None else _as_matrix(volumes)
+    for name, matrix in (("highs", highs), ("lows", lows), ("volumes", volumes)):
+        if matrix.shape != closes.shape:
+            raise ValueError(f"{name} shape {matrix.shape} does not match closes {closes.shape}")
+    if symbols is not None and len(symbols) != n_symbols:
+        raise ValueError("symbols must have one entry per row")
+
+    index = list(symbols) if symbols is not None else list(range(n_symbols))
+    current = closes[:, -1] if n_bars else np.zeros(n_symbols)
+    out: Dict[str, np.ndarray] = {}
+
+    # One frame (bars x symbols) feeds every EMA: MACD and moving averages.
+    frame = pd.DataFrame(closes.T) if n_bars else None
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # RSI (simple average of the last 14 gains/losses)
+        period = 14
+        if n_bars >= period + 1:
+            deltas = np.diff(closes[:, -(period + 1):], axis=1)
+            avg_gain = np.where(deltas > 0, deltas, 0).mean(axis=1)
+            avg_loss = np.where(deltas < 0, -deltas, 0).mean(axis=1)
+            out["rsi"] = np.where(avg_loss == 0, 100.0, 100 - (100 / (1 + avg_gain / avg_loss)))
+        else:
+            out["rsi"] = np.full(n_symbols, 50.0)
+
+        # MACD (12, 26, 9)
+        if n_bars >= 26:
+            macd_line = _ema(frame, 12) - _ema(frame, 26)
+            signal_line = _ema(macd_line, 9)
+            histogram = (macd_line - signal_line).to_numpy()
+            hist_now, hist_prev = histogram[-1], histogram[-2]
+            out["macd"] = macd_line.to_numpy()[-1]
+            out["macd_signal"] = signal_line.to_numpy()[-1]
+            out["macd_histogram"] = hist_now
+            out["macd_crossover"] = np.where(
+                (hist_now > 0) & (hist_prev <= 0),
+                "bullish",
+                np.where((hist_now < 0) & (hist_prev >= 0), "bearish", "none"),
+            )
+        else:
+            out["macd"] = out["macd_signal"] = out["macd_histogram"] = np.zeros(n_symbols)
+            out["macd_crossover"] = np.full(n_symbols, "none", dtype=object)
+
+        # Bollinger Bands (20, 2)
+        period = 20
+        if n_bars >= period:
+            window = closes[:, -period:]
+            middle = window.mean(axis=1)
+            std = window.std(axis=1)
+            upper = middle + 2 * std
+            lower = middle - 2 * std
+            out["bb_upper"], out["bb_middle"], out["bb_lower"] = upper, middle, lower
+            out["bb_position"] = np.where(upper != lower, (current - lower) / (upper - lower), 0.5)
+            out["bb_squeeze"] = np.where((upper - lower) / middle < 0.02, "tight", "normal")
+        else:
+            out["bb_upper"], out["bb_middle"], out["bb_lower"] = current * 1.02, current, current * 0.98
+            out["bb_position"] = np.full(n_symbols, 0.5)
+            out["bb_squeeze"] = np.full(n_symbols, "normal", dtype=object)
+
+        # Historical volatility (annualized, last 20 returns)
+        if n_bars >= 2:
+            returns = np.diff(closes, axis=1) / closes[:, :-1]
+            out["volatility"] = returns[:, -period:].std(axis=1) * np.sqrt(252) * 100
+        else:
+            out["volatility"] = np.zeros(n_symbols)
+
+        # Moving averages
+        for window_size in (5, 10, 20, 50):
+            if n_bars >= max(5, window_size):
+                out[f"sma_{window_size}"] = closes[:, -window_size:].mean(axis=1)
+            else:
+                out[f"sma_{window_size}"] = current
+        for span in (9, 21):
+            out[f"ema_{span}"] = _ema(frame, span).to_numpy()[-1] if n_bars >= 5 else current
+
+        # Support / resistance from the last 20 highs and lows
+        if n_bars >= 20:
+            resistance = -np.sort(-highs[:, -20:], axis=1)[:, :3].mean(axis=1)
+            support = np.sort(lows[:, -20:], axis=1)[:, :3].mean(axis=1)
+            out["support"], out["resistance"] = support, resistance
+            out["at_support"] = np.abs(current - support) / support < 0.005
+            out["at_resistance"] = np.abs(current - resistance) / resistance < 0.005
+        else:
+            out["support"], out["resistance"] = current * 0.98, current * 1.02
+            out["at_support"] = out["at_resistance"] = np.zeros(n_symbols, dtype=bool)
+
+        # Volume confirmation used by the comprehensive signal
+        if n_bars >= 2:
+            out["volume_spike"] = volumes[:, -1] > volumes[:, -20:].mean(axis=1) * 1.2
+        else:
+            out["volume_spike"] = np.zeros(n_symbols, dtype=bool)
+
+        # Signal strength and recommendation, scored as in calculate_comprehensive_signals
+        rsi, hist, position = out["rsi"], out["macd_histogram"], out["bb_position"]
+        crossover = out["macd_crossover"]
+        strength = np.where((rsi <= 70) & ((rsi > 50) | (rsi < 30)), 25, 0)
+        strength = strength + np.where(crossover == "bullish", 25, np.where((crossover == "none") & (hist > 0), 15, 0))
+        strength = strength + np.where(position < 0.2, 25, np.where((position >= 0.4) & (position <= 0.6), 10, 0))
+        strength = strength + np.where(out["at_support"], 25, 0) + np.where(out["volume_spike"], 10, 0)
+        out["signal_strength"] = strength
+        out["recommendation"] = np.select(
+            [strength >= 75, strength >= 60, strength >= 40], ["STRONG BUY", "BUY", "HOLD"], default="AVOID"
+        )
+
+    return pd.DataFrame(out, index=index)
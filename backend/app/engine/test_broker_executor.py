@@ -0,0 +1,109 @@
+import threading
+import time
+
+import pytest
+
+from app.engine.broker_executor import BrokerBusy, BrokerCallTimeout, BrokerExecutor, bind_kite
+
+
+class _Kite:
+    def __init__(self):
+        self.release = threading.Event()
+        self.threads = set()
+        self.timeouts_seen = []
+
+    def ltp(self, symbols):
+        self.threads.add(threading.current_thread().name)
+        return {s: {"last_price": 100.0} for s in symbols}
+
+    def quote(self, symbols):
+        self.release.wait(5)
+        return {s: {"last_price": 101.0} for s in symbols}
+
+    def margins(self, executor):
+        self.timeouts_seen.append(executor.request_timeout(10))
+        return {"equity": {}}
+
+
+def test_calls_reuse_one_long_lived_pool():
+    executor = BrokerExecutor(max_workers=2)
+    kite = bind_kite(_Kite(), executor)
+    try:
+        for _ in range(20):
+            assert kite.ltp(["NFO:A"]) == {"NFO:A": {"last_price": 100.0}}
+        assert len(kite.threads) <= 2 and all(name.startswith("broker-io") for name in kite.threads)
+        assert executor.stats()["calls"] == 20
+        assert bind_kite(kite, executor) is kite  # idempotent
+    finally:
+        executor.shutdown()
+
+
+def test_timeouts_are_counted_as_abandoned_and_capped():
+    executor = BrokerExecutor(max_workers=2, max_in_flight=2)
+    kite = _Kite()
+    try:
+        for _ in range(2):
+            with pytest.raises(BrokerCallTimeout):
+                executor.call(kite.quote, ["NFO:A"], timeout=0.05)
+        stats = executor.stats()
+        assert stats["timeouts"] == 2 and stats["abandoned"] == 2 and stats["abandoned_running"] == 2
+
+        # Stuck calls hold their slots: new calls fail fast instead of queueing threads.
+        with pytest.raises(BrokerBusy):
+            executor.call(kite.ltp, ["NFO:A"])
+
+        kite.release.set()
+        deadline = time.time() + 2
+        while executor.stats()["in_flight"] and time.time() < deadline:
+            time.sleep(0.01)
+        stats = executor.stats()
+        assert stats["in_flight"] == 0 and stats["abandoned_running"] == 0 and stats["rejected"] == 1
+        assert executor.call(kite.ltp, ["NFO:A"])["NFO:A"]["last_price"] == 100.0
+    finally:
+        executor.shutdown()
+
+
+def test_deadline_reaches_http_timeout_and_nested_calls_run_inline():
+    executor = BrokerExecutor(max_workers=1, max_in_flight=1)
+    kite = _Kite()
+    try:
+        executor.call(kite.margins, executor, timeout=1.5)
+        assert 0 < kite.timeouts_seen[0] <= 1.5
+        assert executor.request_timeout(10) == 10  # outside the pool
+
+        # A bound call made from a pool worker must not need a second slot.
+        bound = bind_kite(_Kite(), executor)
+        assert executor.call(lambda: bound.ltp(["NFO:B"]), timeout=1.0) == {"NFO:B": {"last_price": 100.0}}
+    finally:
+        executor.shutdown()
+
+
+def test_kite_session_does_not_retry_inside_a_deadline():
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from app.engine import option_signal_generator as osg
+    from app.engine.broker_executor import broker_executor
+
+    hits = []
+
+    class _Unavailable(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/quote"
+    try:
+        session = osg._build_kite("key", "token").reqsession
+        # One attempt only: a retry would restart with the first attempt's timeout.
+        assert broker_executor.call(session.request, "GET", url, timeout=2.0).status_code == 503
+        assert len(hits) == 1
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+from app.engine.candle_store import CandleStore
+
+IST = timezone(timedelta(hours=5, minutes=30))
+START = datetime(2026, 10, 16, 9, 15, tzinfo=IST)
+
+
+def _bar(i, close):
+    return {"date": START + timedelta(minutes=5 * i), "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 100 + i}
+
+
+class _Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class _FakeKite:
+    def __init__(self, bars):
+        self.bars = bars
+        self.history_calls = []
+        self.ltp_calls = 0
+
+    def ltp(self, symbol):
+        self.ltp_calls += 1
+        return {symbol: {"instrument_token": 256265, "last_price": 25000.0}}
+
+    def historical_data(self, instrument_token, from_date, to_date, interval):
+        self.history_calls.append(from_date)
+        if from_date.tzinfo is None:
+            return list(self.bars)
+        return [b for b in self.bars if b["date"] >= from_date]
+
+
+def test_repeat_reads_inside_candle_period_skip_network():
+    bars = [_bar(i, 100 + i) for i in range(30)]
+    clock = _Clock((START + timedelta(minutes=5 * 29, seconds=30)).timestamp())
+    store = CandleStore(clock=clock)
+    kite = _FakeKite(bars)
+
+    first = store.candles_for_symbol(kite, "NSE:NIFTY 50")
+    clock.now += 120
+    second = store.candles_for_symbol(kite, "NSE:NIFTY 50")
+
+    assert len(kite.history_calls) == 1
+    assert kite.ltp_calls == 1
+    assert second is first
+    assert len(first) == 30
+    assert first.close[-1] == 129.0
+
+
+def test_next_period_fetches_only_newer_bars_and_replaces_partial():
+    bars = [_bar(i, 100 + i) for i in range(30)]
+    clock = _Clock((START + timedelta(minutes=5 * 29, seconds=30)).timestamp())
+    store = CandleStore(clock=clock)
+    kite = _FakeKite(bars)
+    store.candles_for_symbol(kite, "NSE:NIFTY 50")
+
+    # The last bar closes differently than its partial snapshot, and one new bar prints.
+    kite.bars = bars[:-1] + [_bar(29, 500), _bar(30, 501)]
+    clock.now += 300
+    series = store.candles_for_symbol(kite, "NSE:NIFTY 50")
+
+    assert kite.history_calls[-1] == bars[-1]["date"]
+    assert len(series) == 31
+    assert series.close[-2:].tolist() == [500.0, 501.0]
+    assert (series.ts[1:] > series.ts[:-1]).all()
@@ -0,0 +1,126 @@
+import numpy as np
+
+from app.engine import exit_rules
+from app.engine.exit_rules import LiveRules, PaperRules
+
+NAN = float("nan")
+
+
+def _statuses(codes):
+    return [exit_rules.STATUS_NAMES[c] for c in codes]
+
+
+def test_paper_rules_for_a_mixed_batch():
+    # BUY rows: breakeven, lock + reversal, target, stop in loss, no stop; SELL row: stop exit in profit.
+    result = exit_rules.paper_exits(
+        entry=[100, 100, 100, 100, 100, 100],
+        stop=[95, 95, 95, 95, NAN, 96],
+        target=[120, 130, 110, 120, 120, 80],
+        sign=[1, 1, 1, 1, 1, -1],
+        price=[107.5, 113, 110.5, 94, 50, 96.5],
+        prev_price=[NAN, 114, 109, 96, NAN, 97],
+        qty=[50, 50, 50, 50, 50, 10],
+        rules=PaperRules(),
+    )
+    assert _statuses(result.status) == ["OPEN", "PROFIT_TRAIL", "TARGET_HIT", "SL_HIT", "OPEN", "PROFIT_TRAIL"]
+    assert list(result.stop[:4]) == [100.0, 112.0, 100.0, 95.0]
+    assert bool(result.breakeven[0]) and bool(result.locked[1])
+    np.testing.assert_allclose(result.exit_price, [NAN, 113, 110, 95, NAN, 96])
+    np.testing.assert_allclose(result.mark, [107.5, 113, 110, 95, 50, 96])
+    np.testing.assert_allclose(result.pnl, [375, 650, 500, -250, -2500, 40])
+
+
+def test_live_trail_steps_one_way_and_breakeven_lifts_stop():
+    rules = LiveRules()
+    start, trail_stop, step = exit_rules.initial_trail([1, -1], [100, 100], rules)
+    np.testing.assert_allclose(start, [100.2, 99.8])
+    np.testing.assert_allclose(trail_stop, [100.12, 99.88])
+
+    state = exit_rules.trail_update(
+        sign=[1, -1], entry=[100, 100], price=[100.55, 99.45], stop=[99, 101],
+        breakeven_applied=[False, False], trail_active=[False, False],
+        trail_start=start, trail_stop=trail_stop, trail_step=step,
+        support=[NAN, NAN], resistance=[NAN, NAN], rules=rules,
+    )
+    assert state.activated.all() and state.stepped.all() and state.breakeven.all()
+    np.testing.assert_allclose(state.trail_start, [100.5, 99.5])
+    np.testing.assert_allclose(state.trail_stop, [100.42, 99.58])
+    np.testing.assert_allclose(state.stop, [100.08, 99.92])
+
+    # Price falling back never loosens the trail stop.
+    back = exit_rules.trail_update(
+        sign=[1], entry=[100], price=[100.3], stop=state.stop[:1], breakeven_applied=[True], trail_active=[True],
+        trail_start=state.trail_start[:1], trail_stop=state.trail_stop[:1], trail_step=step[:1],
+        support=[NAN], resistance=[NAN], rules=rules,
+    )
+    assert not back.stepped.any() and back.trail_stop[0] == state.trail_stop[0]
+
+
+def test_live_exit_priority_currency_then_target_then_stop():
+    rules = LiveRules()
+    result = exit_rules.live_exits(
+        kind=[exit_rules.KIND_CE, exit_rules.KIND_PE, exit_rules.KIND_NONE, exit_rules.KIND_NONE, exit_rules.KIND_NONE],
+        sign=[1, 1, 1, -1, 1],
+        entry=[100, 100, 100, 100, 100],
+        qty=[50, 50, 50, 50, 50],
+        price=[109.5, 87, 103, 101.5, 99.5],
+        stop=[95, 80, 95, 102, 98],
+        target=[130, 130, 103, 90, 110],
+        peak_pnl=[600, NAN, NAN, NAN, NAN],
+        breakeven_applied=[True] * 5,
+        trail_active=[False] * 5,
+        trail_start=[NAN] * 5, trail_stop=[NAN] * 5, trail_step=[NAN] * 5,
+        support=[NAN] * 5, resistance=[NAN] * 5,
+        rules=rules,
+    )
+    # CE gave back below 500 after a 600 peak; PE hit the 600 loss cap before its stop;
+    # target on row 3; the SELL emergency stop (100 + 2 * 0.9 = 101.8) is not hit yet; BUY emergency stop 98.2 is.
+    assert _statuses(result.status) == ["PROFIT_TRAIL", "LOSS_CAP", "TARGET_HIT", "OPEN", "OPEN"]
+    np.testing.assert_allclose(result.peak_pnl[:2], [600, -650])
+    assert exit_rules.stop_hit([1], [100], [98], [False], [NAN], [98.2], rules)[0]
+
+
+def test_scalar_variants_match_the_vectorized_rules_row_by_row():
+    rng = np.random.default_rng(11)
+    n = 4000
+    rules = LiveRules()
+
+    def maybe_nan(values, p=0.15):
+        return np.where(rng.random(n) < p, np.nan, values)
+
+    sign = rng.choice([1.0, -1.0], n)
+    entry = maybe_nan(rng.uniform(50, 150, n), 0.02)
+    price = entry * (1 + rng.normal(0, 0.01, n))
+    price = np.where(np.isnan(price), 100.0, price)
+    stop = maybe_nan(entry * (1 - sign * rng.uniform(0, 0.03, n)))
+    start, trail_stop, step = exit_rules.initial_trail(sign, entry, rules)
+    # Some anchors sit on the wrong side of entry (legacy trades that must be healed).
+    start = np.where(rng.random(n) < 0.1, entry * (1 - sign * 0.002), start + sign * rng.uniform(-0.3, 0.3, n))
+    cols = dict(
+        sign=sign, entry=entry, price=price, stop=stop,
+        breakeven_applied=rng.random(n) < 0.3, trail_active=rng.random(n) < 0.4,
+        trail_start=maybe_nan(start, 0.05), trail_stop=trail_stop, trail_step=step,
+        support=maybe_nan(price * 0.995, 0.5), resistance=maybe_nan(price * 1.005, 0.5),
+    )
+    kind = rng.choice([exit_rules.KIND_NONE, exit_rules.KIND_CE, exit_rules.KIND_PE], n)
+    qty = rng.choice([25.0, 50.0, 75.0], n)
+    peak = maybe_nan(rng.uniform(0, 900, n), 0.3)
+    target = maybe_nan(entry * (1 + sign * rng.uniform(-0.01, 0.03, n)))
+
+    trail = exit_rules.trail_update(**cols, rules=rules)
+    status, peaks = exit_rules.currency_exit(kind, sign, entry, qty, price, peak, rules)
+    targets = exit_rules.target_hit(sign, target, price)
+    stops = exit_rules.stop_hit(sign, entry, trail.stop, trail.trail_active, trail.trail_stop, price, rules)
+    batch = exit_rules.live_exits(kind=kind, qty=qty, target=target, peak_pnl=peak, **cols, rules=rules)
+    for i in range(n):
+        row = {k: v[i] for k, v in cols.items()}
+        one = exit_rules.trail_update_one(**row, rules=rules)
+        np.testing.assert_equal(tuple(one), tuple(exit_rules.trail_row(trail, i)))
+        assert exit_rules.currency_exit_one(kind[i], sign[i], entry[i], qty[i], price[i], peak[i], rules) == (status[i], peaks[i])
+        assert exit_rules.target_hit_one(sign[i], target[i], price[i]) == targets[i]
+        assert exit_rules.stop_hit_one(
+            sign[i], entry[i], trail.stop[i], trail.trail_active[i], trail.trail_stop[i], price[i], rules
+        ) == stops[i]
+        one = exit_rules.live_exit_one(kind=kind[i], qty=qty[i], target=target[i], peak_pnl=peak[i], **row, rules=rules)
+        np.testing.assert_equal(tuple(one.trail), tuple(exit_rules.trail_row(batch.trail, i)))
+        np.testing.assert_equal(tuple(one)[1:], tuple(exit_rules.live_exits_row(batch, i))[1:])
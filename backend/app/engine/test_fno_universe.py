@@ -0,0 +1,89 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+from app.engine.fno_universe import FnoUniverseCache
+from app.engine.instrument_store import InstrumentStore
+from app.engine.option_signal_generator import _build_scan_symbol_universe
+
+
+def _rows():
+    near = date.today() + timedelta(days=10)
+    far = near + timedelta(days=28)
+    rows = []
+    for name, option_count in (("RELIANCE", 6), ("SBIN", 4), ("TCS", 2), ("IDEA", 1)):
+        rows += [{"segment": "NFO-OPT", "name": name, "tradingsymbol": f"{name}OPT{i}"} for i in range(option_count)]
+        for expiry, tag in ((near, "NEAR"), (far, "FAR")):
+            rows.append({"segment": "NFO-FUT", "name": name, "tradingsymbol": f"{name}{tag}FUT", "expiry": expiry})
+    rows.append({"segment": "NFO-FUT", "name": "NIFTY", "tradingsymbol": "NIFTYNEARFUT", "expiry": near})
+    return rows
+
+
+class _QuoteKite:
+    def __init__(self, quotes=None, fail=False):
+        self.quotes = quotes or {}
+        self.fail = fail
+        self.calls = []
+
+    def quote(self, keys):
+        self.calls.append(list(keys))
+        if self.fail:
+            raise RuntimeError("quote down")
+        return {k: self.quotes[k] for k in keys if k in self.quotes}
+
+
+def test_universe_ranks_by_near_month_futures_turnover_and_is_cached(tmp_path):
+    cache = FnoUniverseCache(InstrumentStore(root=tmp_path))
+    kite = _QuoteKite({
+        "NFO:TCSNEARFUT": {"last_price": 4000.0, "volume": 500000, "oi": 100},
+        "NFO:SBINNEARFUT": {"last_price": 800.0, "volume": 100000, "oi": 100},
+        "NFO:RELIANCENEARFUT": {"last_price": 3000.0, "volume": 10000, "oi": 100},
+    })
+
+    universe = cache.get(kite, _rows())
+
+    assert universe.source == "futures_liquidity"
+    # IDEA has no quote and falls back to option-depth order after the quoted names.
+    assert universe.symbols == ["TCS", "SBIN", "RELIANCE", "IDEA"]
+    assert sorted(kite.calls[0]) == ["NFO:IDEANEARFUT", "NFO:RELIANCENEARFUT", "NFO:SBINNEARFUT", "NFO:TCSNEARFUT"]
+
+    assert cache.get(kite, _rows()) is universe
+    restarted = FnoUniverseCache(InstrumentStore(root=tmp_path))
+    assert restarted.get(_QuoteKite(fail=True), _rows()).symbols == universe.symbols
+    assert len(kite.calls) == 1
+
+
+def test_universe_falls_back_to_option_depth_when_quotes_fail(tmp_path):
+    cache = FnoUniverseCache(InstrumentStore(root=tmp_path))
+    universe = cache.get(_QuoteKite(fail=True), _rows())
+
+    assert universe.source == "option_count"
+    assert universe.symbols == ["RELIANCE", "SBIN", "TCS", "IDEA"]
+
+
+def test_scan_universe_takes_top_n_from_ranking():
+    selected = _build_scan_symbol_universe(
+        include_nifty50=False,
+        include_fno_universe=True,
+        max_symbols=2,
+        instruments_nfo=[],
+        ranked_fno_stocks=["TCS", "SBIN", "RELIANCE"],
+    )
+    assert selected == ["BANKNIFTY", "NIFTY", "SENSEX", "FINNIFTY", "TCS", "SBIN"]
+
+
+def test_universe_built_before_publish_cutoff_is_rebuilt_once(tmp_path, monkeypatch):
+    now = {"value": datetime(2026, 3, 2, 8, 10, tzinfo=ZoneInfo("Asia/Kolkata"))}
+    monkeypatch.setattr("app.engine.fno_universe.ist_now", lambda: now["value"])
+    monkeypatch.setattr("app.engine.instrument_store.ist_now", lambda: now["value"])
+    monkeypatch.setattr("app.engine.fno_universe.time", SimpleNamespace(time=lambda: now["value"].timestamp()))
+    cache = FnoUniverseCache(InstrumentStore(root=tmp_path))
+    kite = _QuoteKite({"NFO:TCSNEARFUT": {"last_price": 4000.0, "volume": 500000, "oi": 100}})
+
+    early = cache.get(kite, _rows())
+    now["value"] = now["value"].replace(hour=9, minute=20)
+    rebuilt = cache.get(kite, _rows())
+
+    assert rebuilt is not early
+    assert cache.get(kite, _rows()) is rebuilt
+    assert len(kite.calls) == 2
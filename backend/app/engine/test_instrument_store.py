@@ -0,0 +1,107 @@
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app.engine.instrument_store import InstrumentStore
+
+
+class _FakeKite:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = []
+
+    def instruments(self, exchange=None):
+        self.calls.append(exchange)
+        return list(self.rows)
+
+
+def _rows():
+    expiry = date.today() + timedelta(days=7)
+    return [
+        {
+            "instrument_token": 101,
+            "exchange_token": "7",
+            "tradingsymbol": "NIFTY26OCT25000CE",
+            "name": "NIFTY",
+            "last_price": 0.0,
+            "expiry": expiry,
+            "strike": 25000.0,
+            "tick_size": 0.05,
+            "lot_size": 75,
+            "instrument_type": "CE",
+            "segment": "NFO-OPT",
+            "exchange": "NFO",
+        },
+        {
+            "instrument_token": 102,
+            "tradingsymbol": "M&M",
+            "name": "M&M",
+            "expiry": "",
+            "instrument_type": "EQ",
+            "segment": "NSE",
+            "exchange": "NSE",
+        },
+    ]
+
+
+def test_store_downloads_once_and_round_trips_records(tmp_path):
+    store = InstrumentStore(root=tmp_path)
+    kite = _FakeKite(_rows())
+
+    first = store.records(kite, "NFO")
+    second = store.records(kite, "NFO")
+
+    assert kite.calls == ["NFO"]
+    assert first is second
+    assert first[0]["tradingsymbol"] == "NIFTY26OCT25000CE"
+    assert first[0]["expiry"] == date.today() + timedelta(days=7)
+    assert first[0]["lot_size"] == 75
+    # Missing fields fall back to Kite-style defaults.
+    assert first[1]["expiry"] == ""
+    assert first[1]["lot_size"] == 1
+    assert first[1]["name"] == "M&M"
+
+
+def test_store_serves_restart_from_disk_without_broker(tmp_path):
+    InstrumentStore(root=tmp_path).load(_FakeKite(_rows()), "NFO")
+
+    restarted = InstrumentStore(root=tmp_path)
+    kite = _FakeKite([])
+    table = restarted.load(kite, "NFO")
+
+    assert kite.calls == []
+    assert len(table) == 2
+    assert table.column("strike")[0] == 25000.0
+
+
+def test_store_propagates_broker_errors(tmp_path):
+    class _Broken:
+        def instruments(self, exchange=None):
+            raise RuntimeError("permission denied")
+
+    store = InstrumentStore(root=tmp_path)
+    try:
+        store.load(_Broken(), "BFO")
+    except RuntimeError as exc:
+        assert "permission denied" in str(exc)
+    else:
+        raise AssertionError("expected broker error to propagate")
+    assert store.cached("BFO") is None
+
+
+def test_store_redownloads_once_after_publish_cutoff(tmp_path, monkeypatch):
+    now = {"value": datetime(2026, 3, 2, 7, 50, tzinfo=ZoneInfo("Asia/Kolkata"))}
+    monkeypatch.setattr("app.engine.instrument_store.ist_now", lambda: now["value"])
+    kite = _FakeKite(_rows())
+
+    InstrumentStore(root=tmp_path).load(kite, "NFO")
+    now["value"] = now["value"].replace(hour=8, minute=20)
+    store = InstrumentStore(root=tmp_path)
+    store.load(kite, "NFO")
+    assert kite.calls == ["NFO"]
+
+    # Past the cutoff the pre-publish copy is replaced once, then reused.
+    now["value"] = now["value"].replace(hour=9, minute=5)
+    store.load(kite, "NFO")
+    store.load(kite, "NFO")
+    InstrumentStore(root=tmp_path).load(kite, "NFO")
+    assert kite.calls == ["NFO", "NFO"]
@@ -0,0 +1,93 @@
+import math
+import time
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+
+from app.engine.option_analytics import (
+    IVBaseline,
+    analyze_chain,
+    bs_price,
+    greeks,
+    implied_volatility,
+    max_pain,
+    put_call_ratio,
+)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def test_implied_volatility_round_trips_black_scholes_for_whole_ladder():
+    strikes = np.arange(24000.0, 26050.0, 50.0)
+    spot, t, rate = 25000.0, 7 / 365, 0.065
+    true_iv = 0.12 + 0.00002 * np.abs(strikes - spot)
+    calls = bs_price(spot, strikes, t, rate, true_iv, True)
+    puts = bs_price(spot, strikes, t, rate, true_iv, False)
+
+    started = time.perf_counter()
+    ce_iv = implied_volatility(calls, spot, strikes, t, rate, True)
+    pe_iv = implied_volatility(puts, spot, strikes, t, rate, False)
+    elapsed = time.perf_counter() - started
+
+    solvable = calls > 0.01
+    assert np.allclose(ce_iv[solvable], true_iv[solvable], atol=1e-4)
+    assert np.allclose(pe_iv[puts > 0.01], true_iv[puts > 0.01], atol=1e-4)
+    assert elapsed < 0.05
+
+
+def test_implied_volatility_is_nan_outside_arbitrage_bounds():
+    iv = implied_volatility([0.0, 1.0, 30000.0], 25000.0, [25000.0, 20000.0, 25000.0], 0.02, 0.065, True)
+    assert all(math.isnan(v) for v in iv)
+
+
+def test_greeks_signs_and_parity():
+    g_call = greeks(25000.0, 25000.0, 7 / 365, 0.15, True)
+    g_put = greeks(25000.0, 25000.0, 7 / 365, 0.15, False)
+    assert 0.5 < float(g_call["delta"]) < 0.6
+    assert math.isclose(float(g_call["delta"]) - float(g_put["delta"]), 1.0, rel_tol=1e-9)
+    assert float(g_call["gamma"]) > 0 and math.isclose(float(g_call["gamma"]), float(g_put["gamma"]))
+    assert float(g_call["theta"]) < 0 and float(g_call["vega"]) > 0
+
+
+def test_pcr_and_max_pain():
+    strikes = np.array([100.0, 110.0, 120.0])
+    ce_oi = np.array([10.0, 50.0, 500.0])
+    pe_oi = np.array([500.0, 50.0, 10.0])
+    assert put_call_ratio(ce_oi, pe_oi) == 1.0
+    assert max_pain(strikes, ce_oi, pe_oi) == 110.0
+    assert put_call_ratio(np.zeros(3), pe_oi) is None
+
+
+def test_analyze_chain_exposes_leg_metrics_and_spread():
+    expiry = date(2026, 10, 22)
+    now = datetime(2026, 10, 16, 11, 0, tzinfo=IST)
+    strikes = [24900.0, 25000.0, 25100.0]
+
+    def q(price, oi, bid=None, ask=None):
+        quote = {"last_price": price, "oi": oi}
+        if bid:
+            quote["depth"] = {"buy": [{"price": bid}], "sell": [{"price": ask}]}
+        return quote
+
+    analytics = analyze_chain(
+        strikes,
+        [q(240.0, 1000), q(180.0, 3000, 179.0, 181.0), q(130.0, 5000)],
+        [q(130.0, 4000), q(170.0, 2500), None],
+        25010.0,
+        expiry,
+        now=now,
+    )
+    ce = analytics.leg(25000.0, "CE")
+    assert 0.05 < ce["iv"] < 0.5
+    assert math.isclose(ce["spread_pct"], 2 / 180 * 100, rel_tol=1e-6)
+    assert analytics.leg(25100.0, "PE")["iv"] is None
+    assert analytics.summary()["pcr"] == round(6500 / 9000, 6)
+    assert analytics.summary()["strikes_analyzed"] == 3
+
+
+def test_iv_baseline_tracks_intraday_spike():
+    baseline = IVBaseline()
+    day = date(2026, 10, 16)
+    assert baseline.spike_pct("NIFTY25000CE", 0.10, today=day) == 0.0
+    assert baseline.spike_pct("NIFTY25000CE", 0.13, today=day) == 30.0
+    assert baseline.spike_pct("NIFTY25000CE", 0.13, today=day + timedelta(days=1)) == 0.0
@@ -0,0 +1,63 @@
+from datetime import date, timedelta
+
+from app.engine.option_chain_index import OptionChainIndex, get_option_chain_index
+
+
+def _opt(name, strike, kind, expiry, symbol=None):
+    return {
+        "tradingsymbol": symbol or f"{name}{int(strike)}{kind}",
+        "name": name,
+        "strike": float(strike),
+        "expiry": expiry,
+        "instrument_type": kind,
+        "segment": "NFO-OPT",
+        "lot_size": 75,
+    }
+
+
+def test_index_keys_by_exact_name_not_symbol_prefix():
+    expiry = date.today() + timedelta(days=3)
+    rows = [
+        _opt("M&M", 3000, "CE", expiry),
+        _opt("M&M", 3000, "PE", expiry),
+        _opt("M&MFIN", 300, "CE", expiry, symbol="M&MFIN300CE"),
+        _opt("M&MFIN", 300, "PE", expiry, symbol="M&MFIN300PE"),
+    ]
+    index = OptionChainIndex.from_records(rows, "NFO-OPT")
+
+    chain = index.chain("M&M", expiry)
+    assert list(chain.strikes) == [3000.0]
+    assert chain.ce[0]["tradingsymbol"] == "M&M3000CE"
+    assert "M&MFIN" in index
+
+
+def test_nearest_expiry_skips_past_and_atm_ties_go_low():
+    today = date.today()
+    past, near, far = today - timedelta(days=1), today, today + timedelta(days=7)
+    rows = []
+    for expiry in (past, near, far):
+        for strike in (24900, 25000, 25100):
+            rows.append(_opt("NIFTY", strike, "CE", expiry))
+            rows.append(_opt("NIFTY", strike, "PE", expiry))
+    index = OptionChainIndex.from_records(rows, "NFO-OPT")
+
+    assert index.expiries("NIFTY") == [past, near, far]
+    assert index.nearest_expiry("NIFTY", today) == near
+    chain = index.chain("NIFTY", near)
+    assert chain.atm_strike(25049) == 25000.0
+    assert chain.atm_strike(25050) == 25000.0
+    assert chain.atm_strike(25051) == 25100.0
+    assert chain.atm_strike(1) == 24900.0
+    assert chain.atm_strike(99999) == 25100.0
+    assert list(chain.window(25000, 1)) == [0, 1, 2]
+
+
+def test_missing_leg_is_none_and_index_is_memoized_per_list():
+    expiry = date.today() + timedelta(days=1)
+    rows = [_opt("BANKNIFTY", 52000, "CE", expiry), {"segment": "NSE", "name": "SBIN"}]
+
+    first = get_option_chain_index(rows, "NFO-OPT")
+    assert get_option_chain_index(rows, "NFO-OPT") is first
+    chain = first.chain("BANKNIFTY", expiry)
+    assert chain.pe[0] is None
+    assert "SBIN" not in first
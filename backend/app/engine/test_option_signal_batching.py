@@ -0,0 +1,97 @@
+from datetime import date, timedelta
+
+from app.engine import option_signal_generator as osg
+
+
+def _opt(name, strike, kind, expiry):
+    return {
+        "tradingsymbol": f"{name}{int(strike)}{kind}",
+        "name": name,
+        "strike": float(strike),
+        "expiry": expiry,
+        "instrument_type": kind,
+        "segment": "NFO-OPT",
+        "lot_size": 50,
+    }
+
+
+class _BatchKite:
+    def __init__(self, prices):
+        self.prices = prices
+        self.calls = []
+
+    def quote(self, keys):
+        self.calls.append(list(keys))
+        return {
+            k: {"last_price": self.prices[k], "ohlc": {"open": self.prices[k]}}
+            for k in keys
+            if k in self.prices
+        }
+
+
+def _scan_fixture():
+    expiry = date.today() + timedelta(days=5)
+    instruments = []
+    for name, strikes in (("NIFTY", (24900, 25000)), ("TCS", (4000, 4050))):
+        for strike in strikes:
+            instruments.append(_opt(name, strike, "CE", expiry))
+            instruments.append(_opt(name, strike, "PE", expiry))
+    prices = {
+        "NSE:NIFTY 50": 25010.0,
+        "NSE:TCS": 4048.0,
+        "NFO:NIFTY25000CE": 120.0,
+        "NFO:NIFTY25000PE": 110.0,
+        "NFO:TCS4050CE": 40.0,
+        "NFO:TCS4050PE": 38.0,
+        "NFO:NIFTY24900CE": 180.0,
+        "NFO:NIFTY24900PE": 70.0,
+        "NFO:TCS4000CE": 75.0,
+        "NFO:TCS4000PE": 22.0,
+    }
+    return instruments, prices
+
+
+def test_prefetch_quotes_scan_in_two_batched_calls():
+    instruments, prices = _scan_fixture()
+    kite = _BatchKite(prices)
+
+    quotes = osg._prefetch_scan_quotes(kite, ["NIFTY", "TCS"], instruments)
+
+    assert kite.calls == [
+        ["NSE:NIFTY 50", "NSE:TCS"],
+        [
+            "NFO:NIFTY25000CE", "NFO:NIFTY25000PE", "NFO:NIFTY24900CE", "NFO:NIFTY24900PE",
+            "NFO:TCS4050CE", "NFO:TCS4050PE", "NFO:TCS4000CE", "NFO:TCS4000PE",
+        ],
+    ]
+    assert set(quotes) == set(prices)
+
+
+def test_fetch_with_prefetched_quotes_makes_no_broker_calls():
+    instruments, prices = _scan_fixture()
+    kite = _BatchKite(prices)
+    quotes = osg._prefetch_scan_quotes(kite, ["TCS"], instruments)
+    kite.calls.clear()
+
+    result = osg.fetch_index_option_chain("TCS", kite, instruments, enable_technical=False, quotes=quotes)
+
+    assert kite.calls == []
+    assert {s["symbol"] for s in result} <= {"TCS4050CE", "TCS4050PE"}
+    assert result[0]["strike"] == 4050.0
+    assert result[0]["option_analytics"]["strikes_analyzed"] == 2
+    assert result[0]["implied_volatility"] > 0
+
+
+def test_quote_batch_chunks_and_skips_failed_chunk():
+    class _Flaky(_BatchKite):
+        def quote(self, keys):
+            if "B" in keys:
+                self.calls.append(list(keys))
+                raise RuntimeError("Too many requests")
+            return super().quote(keys)
+
+    kite = _Flaky({"A": 1.0, "C": 3.0})
+    quotes = osg._quote_batch(kite, ["A", "B", "C", "A"], chunk_size=2)
+
+    assert kite.calls == [["A", "B"], ["C"]]
+    assert set(quotes) == {"C"}
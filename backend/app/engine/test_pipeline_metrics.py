@@ -0,0 +1,101 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app.engine import option_signal_generator as osg
+from app.engine.candle_store import CandleStore
+from app.engine.pipeline_metrics import (
+    PipelineMetrics,
+    PipelineRun,
+    bind_run,
+    current_run,
+    pipeline_metrics,
+    record_cache,
+    stage,
+    symbol_timer,
+    track_run,
+)
+from app.engine.rate_limiter import RateLimitedKite
+
+
+class _Kite:
+    def __init__(self):
+        self.history_calls = 0
+
+    def quote(self, keys):
+        return {}
+
+    def ltp(self, keys):
+        return {}
+
+    def historical_data(self, **kwargs):
+        self.history_calls += 1
+        return [{"date": 1_700_000_000, "open": 1, "high": 2, "low": 0.5, "close": 1.5, "volume": 10}]
+
+
+def test_ring_buffer_keeps_most_recent_runs_first():
+    metrics = PipelineMetrics(capacity=3)
+    for i in range(5):
+        metrics.record(PipelineRun("scan", n=i))
+
+    runs = metrics.recent(10)
+    assert [r["meta"]["n"] for r in runs] == [4, 3, 2]
+    assert all(r["wall_ms"] is not None for r in runs)
+    assert [r["meta"]["n"] for r in metrics.recent(1)] == [4]
+
+
+def test_nested_runs_join_and_worker_threads_bind_the_run():
+    pipeline_metrics.clear()
+    with track_run("outer") as outer:
+        with track_run("inner") as inner:
+            assert inner is outer
+            with stage("quotes"):
+                pass
+            record_cache("signals", "miss")
+
+        run = current_run()
+
+        def work(symbol):
+            with bind_run(run), symbol_timer(symbol):
+                record_cache("technicals", "hit")
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(work, ["NIFTY", "BANKNIFTY"]))
+
+    assert current_run() is None
+    [recorded] = pipeline_metrics.recent(5)
+    assert recorded["kind"] == "outer"
+    assert "quotes" in recorded["stages_ms"]
+    assert set(recorded["symbols_ms"]) == {"NIFTY", "BANKNIFTY"}
+    assert recorded["cache"] == {"signals": {"miss": 1}, "technicals": {"hit": 2}}
+
+
+def test_broker_calls_and_candle_cache_outcomes_are_counted():
+    clock = [1_700_000_100.0]
+    store = CandleStore(clock=lambda: clock[0])
+    raw = _Kite()
+    kite = RateLimitedKite(raw, limits={})
+
+    with track_run("scan") as run:
+        kite.quote(["NSE:SBIN"])
+        store.get(kite, 256265, "5minute")
+        store.get(kite, 256265, "5minute")
+        clock[0] += 600
+        store.get(kite, 256265, "5minute")
+
+    summary = run.to_dict()
+    assert summary["broker_calls"] == {"quote": 1, "historical_data": 2}
+    assert summary["cache"]["candles"] == {"miss": 1, "hit": 1, "incremental": 1}
+    assert "historical" in summary["stages_ms"]
+    assert raw.history_calls == 2
+
+
+def test_generate_signals_records_signal_cache_outcomes(monkeypatch):
+    pipeline_metrics.clear()
+    osg._signals_cache.clear()
+    monkeypatch.setattr(osg, "_compute_signals", lambda **params: ([{"index": "NIFTY"}], True))
+
+    osg.generate_signals(symbols=["NIFTY"])
+    osg.generate_signals(symbols=["NIFTY"])
+
+    runs = pipeline_metrics.recent(2)
+    assert [r["cache"]["signals"] for r in runs] == [{"hit": 1}, {"miss": 1}]
+    osg._signals_cache.clear()
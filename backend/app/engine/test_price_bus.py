@@ -0,0 +1,137 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+
+from app.engine.price_bus import PriceBus
+
+
+class _Kite:
+    def __init__(self, delay=0.0, access_token=None):
+        self.api_key = "key"
+        self.access_token = access_token
+        self.calls = []
+        self.delay = delay
+        self.price = 100.0
+
+    def ltp(self, symbols):
+        self.calls.append(("ltp", list(symbols)))
+        time.sleep(self.delay)
+        return {s: {"last_price": self.price} for s in symbols if s != "NSE:UNKNOWN"}
+
+    def ohlc(self, symbols):
+        self.calls.append(("ohlc", list(symbols)))
+        return {s: {"last_price": self.price, "ohlc": {"close": 90.0}} for s in symbols}
+
+
+def test_consumers_share_one_batched_poll_per_interval():
+    clock = [1000.0]
+    bus = PriceBus(interval=1.0, clock=lambda: clock[0])
+    kite = _Kite()
+
+    bus.ltp(kite, ["NFO:A", "NFO:B"])
+    bus.ltp(kite, ["NFO:B"])
+    assert kite.calls == [("ltp", ["NFO:A", "NFO:B"])]
+
+    # A new symbol forces one poll of the whole subscription set.
+    kite.price = 101.0
+    quotes = bus.ltp(kite, ["NFO:C"])
+    assert kite.calls[-1] == ("ltp", ["NFO:A", "NFO:B", "NFO:C"])
+    assert quotes == {"NFO:C": {"last_price": 101.0, "timestamp": 1000.0}}
+
+    clock[0] += 0.5
+    assert bus.ltp(kite, ["NFO:A", "NFO:C"])["NFO:A"]["last_price"] == 101.0
+    clock[0] += 1.0
+    bus.ltp(kite, ["NFO:A"])
+    assert len(kite.calls) == 3
+    assert bus.stats()["served_from_snapshot"] == 2
+
+
+def test_concurrent_callers_wait_for_a_single_poll():
+    bus = PriceBus(interval=5.0)
+    kite = _Kite(delay=0.05)
+    start = threading.Barrier(8)
+
+    def read(i):
+        start.wait()
+        return bus.ltp(kite, ["NFO:A", "NFO:B"])
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(read, range(8)))
+
+    assert len(kite.calls) == 1
+    assert all(r["NFO:A"]["last_price"] == 100.0 for r in results)
+
+
+def test_snapshot_is_immutable_and_tracks_ohlc_and_client():
+    clock = [0.0]
+    bus = PriceBus(interval=10.0, idle_ttl=30.0, clock=lambda: clock[0])
+    kite = _Kite()
+    bus.ltp(kite, ["NSE:NIFTY 50"])
+    snapshot = bus.snapshot()
+
+    # OHLC readers need an ohlc poll even when the ltp is fresh.
+    quotes = bus.ohlc(kite, ["NSE:NIFTY 50"])
+    assert quotes["NSE:NIFTY 50"]["ohlc"] == {"close": 90.0}
+    assert [c[0] for c in kite.calls] == ["ltp", "ohlc"]
+    assert snapshot.get("NSE:NIFTY 50").ohlc is None
+    try:
+        snapshot.ticks["X"] = None
+        raise AssertionError("snapshot should be read-only")
+    except TypeError:
+        pass
+
+    # A client for another session (no shared access token) never reads this snapshot.
+    other = _Kite()
+    bus.ltp(other, ["NSE:NIFTY 50"])
+    assert len(other.calls) == 1
+
+    # Unknown symbols count as polled; idle subscriptions expire.
+    bus.ltp(other, ["NSE:UNKNOWN"])
+    bus.ltp(other, ["NSE:UNKNOWN"])
+    assert len(other.calls) == 2
+    clock[0] += 31
+    bus.ltp(other, ["NSE:BANK"])
+    assert other.calls[-1][1] == ["NSE:BANK"]
+
+
+def test_published_quotes_serve_later_readers():
+    bus = PriceBus(interval=5.0)
+    kite = _Kite()
+    bus.subscribe(["NFO:A"])
+    bus.publish(kite, {"NFO:A": {"last_price": 55.0, "ohlc": {"close": 50.0}}, "NFO:B": {"last_price": None}})
+
+    assert bus.ltp(kite, ["NFO:A"])["NFO:A"]["last_price"] == 55.0
+    assert kite.calls == []
+    assert "NFO:B" not in bus.snapshot()
+
+
+def test_rebuilt_and_wrapped_clients_on_one_account_share_the_snapshot():
+    from app.engine.rate_limiter import rate_limited
+
+    clock = [0.0]
+    bus = PriceBus(interval=1.0, clock=lambda: clock[0])
+    analyzer, updater = _Kite(access_token="tok"), _Kite(access_token="tok")
+    scan = rate_limited(_Kite(access_token="tok"), limits={})
+
+    for i in range(20):
+        clock[0] += 0.04
+        if i % 2:
+            bus.ohlc(analyzer, ["NSE:NIFTY 50", "NFO:A"])
+        else:
+            bus.ltp(updater, ["NFO:A"])
+    bus.ltp(scan, ["NFO:A"])
+    assert len(analyzer.calls) + len(updater.calls) + len(scan.wrapped.calls) == 2
+    assert bus.stats()["served_from_snapshot"] == 19
+
+    # A refreshed access token is a new session and polls again.
+    bus.ltp(_Kite(access_token="new"), ["NFO:A"])
+    assert bus.stats()["broker_calls"] == 3
+
+
+def test_account_key_does_not_unwrap_arbitrary_attributes():
+    from unittest.mock import MagicMock
+
+    from app.engine.price_bus import account_key
+
+    kite = MagicMock()
+    assert account_key(kite) == id(kite)
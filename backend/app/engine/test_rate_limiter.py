@@ -0,0 +1,96 @@
+import threading
+import time
+
+from app.engine import option_signal_generator as osg
+from app.engine.rate_limiter import RateLimitedKite, TokenBucket
+
+
+class _FakeTime:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+def test_token_bucket_paces_bursts_and_honours_timeout():
+    t = _FakeTime()
+    bucket = TokenBucket(rate=2.0, capacity=2.0, clock=t.clock, sleep=t.sleep)
+
+    for _ in range(4):
+        assert bucket.acquire()
+
+    # Two tokens of burst, then one every 0.5s.
+    assert t.sleeps == [0.5, 0.5]
+    assert bucket.acquire(timeout=0.1) is False
+    assert t.sleeps == [0.5, 0.5]
+
+
+def test_rate_limited_kite_only_throttles_limited_endpoints():
+    t = _FakeTime()
+    bucket = TokenBucket(rate=1.0, capacity=1.0, clock=t.clock, sleep=t.sleep)
+
+    class _Kite:
+        def quote(self, keys):
+            return {k: {"last_price": 1.0} for k in keys}
+
+        def instruments(self, exchange=None):
+            return []
+
+    kite = RateLimitedKite(_Kite(), {"quote": bucket})
+    kite.quote(["NSE:SBIN"])
+    kite.quote(["NSE:TCS"])
+    kite.instruments("NFO")
+    kite.instruments("NFO")
+
+    assert t.sleeps == [1.0]
+
+
+def test_concurrent_scan_keeps_symbol_order_and_error_rows(monkeypatch):
+    class _Kite:
+        def quote(self, keys):
+            return {}
+
+    monkeypatch.setattr(osg, "_get_kite", lambda user_id=None: _Kite())
+    monkeypatch.setattr(osg.instrument_store, "records", lambda kite, exchange=None: [])
+    monkeypatch.setattr(osg, "_prefetch_scan_quotes", lambda *a, **k: {})
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def _fetch(idx, *args, **kwargs):
+        with lock:
+            active.append(idx)
+            peak.append(len(active))
+        time.sleep(0.05 if idx == "A" else 0.01)
+        with lock:
+            active.remove(idx)
+        if idx == "B":
+            raise RuntimeError("boom")
+        return [{"index": idx, "symbol": f"{idx}CE"}]
+
+    monkeypatch.setattr(osg, "fetch_index_option_chain", _fetch)
+    signals, cacheable = osg._compute_signals(None, ["A", "B", "C", "D"], False, False, 120)
+
+    assert cacheable
+    assert [s["index"] for s in signals] == ["A", "B", "C", "D"]
+    assert signals[1] == {"index": "B", "error": "boom"}
+    assert max(peak) > 1
+
+
+def test_clients_are_rate_limited_where_they_are_built():
+    from app.strategies.market_intelligence import MarketTrendAnalyzer
+
+    kite = osg._build_kite("key", "token")
+    assert isinstance(kite, RateLimitedKite)
+    assert kite.wrapped.reqsession is kite.reqsession
+
+    service = MarketTrendAnalyzer.__new__(MarketTrendAnalyzer)
+    service.kite_api_key, service.kite_access_token = "key", "token"
+    service._kite, service._kite_credentials = None, None
+    assert isinstance(service._kite_client(), RateLimitedKite)
@@ -0,0 +1,139 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.engine import option_signal_generator as osg
+
+
+@pytest.fixture(autouse=True)
+def _clean_signal_cache():
+    osg._signals_cache.clear()
+    osg._signals_inflight.clear()
+    osg._technicals_cache.clear()
+    osg.candle_store.clear()
+    yield
+    osg._signals_cache.clear()
+    osg._signals_inflight.clear()
+    osg._technicals_cache.clear()
+    osg.candle_store.clear()
+
+
+def test_concurrent_callers_share_one_generation(monkeypatch):
+    calls = []
+    release = threading.Event()
+
+    def _slow_compute(**params):
+        calls.append(params)
+        release.wait(2)
+        return [{"index": "NIFTY", "symbol": "NIFTY25000CE"}], True
+
+    monkeypatch.setattr(osg, "_compute_signals", _slow_compute)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(osg.generate_signals(user_id=1))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    time.sleep(0.1)
+    release.set()
+    for t in threads:
+        t.join(2)
+
+    assert len(calls) == 1
+    assert len(results) == 4
+    assert all(r == results[0] for r in results)
+    assert not osg._signals_inflight
+
+
+def test_stale_entry_served_while_background_refresh_runs(monkeypatch):
+    refreshed = threading.Event()
+
+    def _compute(**params):
+        refreshed.set()
+        return [{"index": "NIFTY", "symbol": "fresh"}], True
+
+    monkeypatch.setattr(osg, "_compute_signals", _compute)
+    key = osg._signals_cache_key(None, None, False, False, 120)
+    osg._signals_cache[key] = {"signals": [{"symbol": "stale"}], "ts": time.time() - osg._signals_cache_ttl - 1}
+
+    assert osg.generate_signals() == [{"symbol": "stale"}]
+    assert refreshed.wait(2)
+    for _ in range(50):
+        if not osg._signals_inflight:
+            break
+        time.sleep(0.02)
+    assert osg.generate_signals() == [{"index": "NIFTY", "symbol": "fresh"}]
+
+
+def test_uncacheable_result_and_errors_are_not_stored(monkeypatch):
+    monkeypatch.setattr(osg, "_compute_signals", lambda **p: ([{"error": "Zerodha credentials missing or invalid"}], False))
+    assert osg.generate_signals()[0]["error"]
+    assert osg._signals_cache == {}
+
+    def _boom(**params):
+        raise RuntimeError("broker down")
+
+    monkeypatch.setattr(osg, "_compute_signals", _boom)
+    with pytest.raises(RuntimeError):
+        osg.generate_signals()
+    assert not osg._signals_inflight
+
+
+def test_ce_and_pe_legs_share_one_indicator_bundle(monkeypatch):
+    start = datetime.now() - timedelta(hours=3)
+
+    class _Kite:
+        history_calls = 0
+
+        def ltp(self, symbol):
+            return {symbol: {"instrument_token": 260105}}
+
+        def historical_data(self, instrument_token, from_date, to_date, interval):
+            self.history_calls += 1
+            return [
+                {"date": start + timedelta(minutes=5 * i), "open": 100 + i, "high": 101 + i, "low": 99 + i, "close": 100 + i, "volume": 1000}
+                for i in range(30)
+            ]
+
+    computed = []
+    real = osg.calculate_comprehensive_signals
+
+    def _counting(*args, **kwargs):
+        computed.append(1)
+        return real(*args, **kwargs)
+
+    monkeypatch.setattr(osg, "calculate_comprehensive_signals", _counting)
+    kite = _Kite()
+    quote = {"ohlc": {"high": 110, "low": 90, "close": 100, "open": 95}, "volume": 10}
+
+    ce = osg._validate_signal_quality({"index": "BANKNIFTY", "option_type": "CE", "entry_price": 100}, kite, quote)
+    pe = osg._validate_signal_quality({"index": "BANKNIFTY", "option_type": "PE", "entry_price": 90}, kite, quote)
+
+    assert len(computed) == 1
+    assert kite.history_calls == 1
+    assert ce["technical_indicators"] == pe["technical_indicators"]
+
+
+def test_scans_for_different_keys_share_a_global_concurrency_cap(monkeypatch):
+    active, peak = [], []
+    lock = threading.Lock()
+
+    def _compute(**params):
+        with lock:
+            active.append(params["user_id"])
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.remove(params["user_id"])
+        return [], True
+
+    monkeypatch.setattr(osg, "_compute_signals", _compute)
+    threads = [threading.Thread(target=osg.generate_signals, kwargs={"user_id": i}) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert len(peak) == 6
+    assert max(peak) == osg._signals_max_concurrent_scans
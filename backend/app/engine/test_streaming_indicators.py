@@ -0,0 +1,129 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engine.streaming_indicators import (
+    ATR,
+    MACD,
+    VWAP,
+    BollingerBands,
+    IndicatorSet,
+    Supertrend,
+    WilderRSI,
+    restore,
+)
+from app.engine.technical_indicators import calculate_bollinger_bands
+from app.strategies import intraday_professional as ip
+
+
+def _bars(n=120, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.004, n))
+    high = close * (1 + rng.uniform(0, 0.003, n))
+    low = close * (1 - rng.uniform(0, 0.003, n))
+    volume = rng.integers(100, 1000, n).astype(float)
+    return pd.DataFrame({"high": high, "low": low, "close": close, "volume": volume})
+
+
+def _wilder(values, period):
+    avg = float(np.mean(values[:period]))
+    out = [avg]
+    for v in values[period:]:
+        avg = (avg * (period - 1) + v) / period
+        out.append(avg)
+    return out
+
+
+def test_ema_macd_vwap_and_supertrend_match_batch_definitions():
+    df = _bars()
+    macd_ref, signal_ref, hist_ref = ip.macd(df)
+    vwap_ref = ip.vwap(df)
+    st_ref = ip.supertrend(df, 10, 3)
+
+    macd, vwap, st = MACD(), VWAP(), Supertrend(10, 3)
+    for i, row in df.iterrows():
+        m = macd.update(row.close)
+        assert m["macd"] == pytest.approx(macd_ref[i])
+        assert m["signal"] == pytest.approx(signal_ref[i])
+        assert m["histogram"] == pytest.approx(hist_ref[i])
+        assert vwap.update(row.close, row.volume) == pytest.approx(vwap_ref[i])
+        value = st.update(row.high, row.low, row.close)
+        if math.isnan(st_ref[i]):
+            assert value is None
+        else:
+            assert value == pytest.approx(st_ref[i])
+
+
+def test_bollinger_rsi_and_atr_match_reference():
+    df = _bars()
+    closes = df.close.tolist()
+    bb, rsi, atr = BollingerBands(20, 2), WilderRSI(14), ATR(14)
+    rsi_values, atr_values = [], []
+    for i, row in df.iterrows():
+        band = bb.update(row.close)
+        if i >= 19:
+            ref = calculate_bollinger_bands(closes[: i + 1])
+            for key in ("upper", "middle", "lower", "position"):
+                assert band[key] == pytest.approx(ref[key])
+        else:
+            assert band is None
+        rsi_values.append(rsi.update(row.close))
+        atr_values.append(atr.update(row.high, row.low, row.close))
+
+    deltas = np.diff(df.close.to_numpy())
+    avg_gain = _wilder(np.maximum(deltas, 0), 14)
+    avg_loss = _wilder(np.maximum(-deltas, 0), 14)
+    expected_rsi = [100 - 100 / (1 + g / l) for g, l in zip(avg_gain, avg_loss)]
+    assert rsi_values[:14] == [None] * 14
+    assert rsi_values[14:] == pytest.approx(expected_rsi)
+
+    prev_close = df.close.shift(1)
+    tr = np.maximum(df.high - df.low, np.maximum((df.high - prev_close).abs(), (df.low - prev_close).abs()))
+    tr.iloc[0] = df.high.iloc[0] - df.low.iloc[0]
+    assert atr_values[13:] == pytest.approx(_wilder(tr.to_numpy(), 14))
+
+
+def test_snapshot_restore_continues_identically():
+    df = _bars()
+    head, tail = df.iloc[:60], df.iloc[60:]
+    continuous = IndicatorSet()
+    continuous.update_many(df.high, df.low, df.close, df.volume)
+
+    warm = IndicatorSet()
+    warm.update_many(head.high, head.low, head.close, head.volume)
+    revived = restore(json.loads(json.dumps(warm.snapshot())))
+    revived.update_many(tail.high, tail.low, tail.close, tail.volume)
+
+    assert revived.last.keys() == continuous.last.keys()
+    for key, value in continuous.last.items():
+        assert revived.last[key] == pytest.approx(value)
+
+
+def test_restore_rejects_unknown_snapshot():
+    with pytest.raises(ValueError):
+        restore({"type": "Nope"})
+
+
+def test_preview_folds_in_a_forming_bar_without_committing_it():
+    df = _bars()
+    live, closed_only = IndicatorSet(), IndicatorSet()
+    for _, row in df.iterrows():
+        # Three ticks of the forming bar, then the bar closes.
+        for frac in (0.25, 0.5, 0.75):
+            tick = row.low + frac * (row.high - row.low)
+            forming = live.preview(row.high, row.low, tick, row.volume * frac)
+            assert forming["close"] == tick
+        assert live.update(row.high, row.low, row.close, row.volume) == closed_only.update(
+            row.high, row.low, row.close, row.volume
+        )
+    assert live.snapshot() == closed_only.snapshot()
+
+    rsi = WilderRSI(14)
+    for value in df.close[:30]:
+        rsi.update(value)
+    before = rsi.snapshot()
+    assert rsi.preview(df.close[30]) is not None
+    assert rsi.snapshot() == before
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from app.engine.technical_indicators import (
+    calculate_bollinger_bands,
+    calculate_comprehensive_signals,
+    calculate_indicators_batch,
+    calculate_macd,
+    calculate_moving_averages,
+    calculate_rsi,
+    calculate_volatility,
+    detect_support_resistance,
+)
+
+
+def _market(n_symbols, n_bars, seed=7):
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.cumprod(1 + rng.normal(0, 0.01, size=(n_symbols, n_bars)), axis=1)
+    highs = closes * (1 + rng.uniform(0, 0.01, size=closes.shape))
+    lows = closes * (1 - rng.uniform(0, 0.01, size=closes.shape))
+    volumes = rng.integers(1000, 5000, size=closes.shape).astype(float)
+    return closes, highs, lows, volumes
+
+
+@pytest.mark.parametrize("n_bars", [3, 8, 15, 24, 60])
+def test_batch_matches_single_symbol_indicators(n_bars):
+    closes, highs, lows, volumes = _market(5, n_bars)
+    symbols = [f"SYM{i}" for i in range(5)]
+
+    table = calculate_indicators_batch(closes, highs, lows, volumes, symbols=symbols)
+
+    assert list(table.index) == symbols
+    for i, sym in enumerate(symbols):
+        prices, row = closes[i].tolist(), table.loc[sym]
+        assert row["rsi"] == pytest.approx(calculate_rsi(prices))
+        macd = calculate_macd(prices)
+        assert row["macd"] == pytest.approx(macd["macd"], abs=1e-9)
+        assert row["macd_histogram"] == pytest.approx(macd["histogram"], abs=1e-9)
+        assert row["macd_crossover"] == macd.get("crossover", "none")
+        bb = calculate_bollinger_bands(prices)
+        for key in ("upper", "middle", "lower", "position"):
+            assert row[f"bb_{key}"] == pytest.approx(bb[key])
+        assert row["bb_squeeze"] == bb.get("squeeze", "normal")
+        assert row["volatility"] == pytest.approx(calculate_volatility(prices))
+        for key, value in calculate_moving_averages(prices).items():
+            assert row[key] == pytest.approx(value)
+        sr = detect_support_resistance(prices, highs[i].tolist(), lows[i].tolist())
+        assert row["support"] == pytest.approx(sr["support"])
+        assert row["resistance"] == pytest.approx(sr["resistance"])
+        assert bool(row["at_support"]) == sr["at_support"]
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_batch_scores_match_comprehensive_signals(seed):
+    closes, highs, lows, volumes = _market(40, 60, seed=seed)
+    table = calculate_indicators_batch(closes, highs, lows, volumes)
+
+    for i in range(len(closes)):
+        single = calculate_comprehensive_signals(
+            closes[i].tolist(), highs[i].tolist(), lows[i].tolist(), volumes[i].tolist()
+        )
+        assert table.loc[i, "signal_strength"] == single["signal_strength"]
+        assert table.loc[i, "recommendation"] == single["recommendation"]
+
+
+def test_batch_accepts_single_row_and_validates_shapes():
+    closes, highs, _, _ = _market(1, 30)
+    assert len(calculate_indicators_batch(closes[0])) == 1
+    with pytest.raises(ValueError):
+        calculate_indicators_batch(closes, highs[:, :-1])
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.engine.tick_replay import ReplayTrade, candles_to_ticks, replay_live, replay_paper
+
+T0 = datetime(2026, 3, 2, 9, 20)
+
+
+def _ticks(symbol, prices, start=T0, seconds=1):
+    return pd.DataFrame(
+        {"time": [start + timedelta(seconds=seconds * i) for i in range(len(prices))], "symbol": symbol, "price": prices}
+    )
+
+
+def test_paper_replay_applies_breakeven_lock_and_down_tick_exit():
+    ticks = pd.concat([
+        _ticks("NIFTY26MAR22500CE", [100, 105, 111, 113, 112.5, 120]),
+        _ticks("BANKNIFTY26MAR48000PE", [200, 195, 189, 250]),
+    ])
+    result = replay_paper(ticks, [
+        ReplayTrade("NIFTY26MAR22500CE", "BUY", 100, 10, stop_loss=95, target=130),
+        ReplayTrade("BANKNIFTY26MAR48000PE", "BUY", 200, 5, stop_loss=190, target=230),
+    ])
+
+    lock, stop = result["trades"]
+    # 35% of target moves SL to entry, +12 locks entry+12, first down-tick exits.
+    assert (lock["status"], lock["exit_price"], lock["stop_loss"]) == ("PROFIT_TRAIL", 112.5, 112.0)
+    assert lock["exit_time"] == T0 + timedelta(seconds=4)
+    assert (stop["status"], stop["exit_price"], stop["pnl"]) == ("SL_HIT", 190, -50)
+    assert stop["exit_time"] == T0 + timedelta(seconds=2)
+    assert result["by_status"] == {"PROFIT_TRAIL": 1, "SL_HIT": 1}
+    assert result["total_pnl"] == 75.0
+
+
+def test_paper_replay_opens_trades_at_their_entry_time():
+    ticks = _ticks("NIFTY26MAR22500CE", [100, 80, 100, 131])
+    result = replay_paper(ticks, [
+        ReplayTrade("NIFTY26MAR22500CE", "BUY", 100, 1, stop_loss=95, target=130, entry_time=T0 + timedelta(seconds=2)),
+    ])
+    [trade] = result["trades"]
+    assert (trade["status"], trade["exit_price"], trade["entry_time"]) == ("TARGET_HIT", 130, T0 + timedelta(seconds=2))
+
+
+def test_live_replay_runs_trail_target_and_stop_rules():
+    ticks = pd.concat([
+        _ticks("SBIN", [100.0, 100.5, 100.3]),
+        _ticks("INFY", [100.0, 105.0, 110.0]),
+        _ticks("TCS", [100.0, 99.5, 98.1]),
+    ])
+    result = replay_live(ticks, [
+        ReplayTrade("SBIN", "BUY", 100, 10, stop_loss=98, target=110),
+        ReplayTrade("INFY", "BUY", 100, 10, stop_loss=98, target=110),
+        ReplayTrade("TCS", "BUY", 100, 10, stop_loss=98, target=110),
+    ])
+    statuses = {t["symbol"]: (t["status"], t["exit_price"]) for t in result["trades"]}
+    assert statuses == {"SBIN": ("PROFIT_TRAIL", 100.3), "INFY": ("TARGET_HIT", 110.0), "TCS": ("SL_HIT", 98.1)}
+    assert result["open"] == 0
+
+
+def test_candles_expand_to_intrabar_path():
+    candles = pd.DataFrame(
+        {"open": [100, 105], "high": [106, 107], "low": [99, 101], "close": [105, 102]},
+        index=pd.date_range(T0, periods=2, freq="5min"),
+    )
+    ticks = candles_to_ticks(candles, "NIFTY")
+    assert ticks["price"].tolist() == [100, 99, 106, 105, 105, 107, 101, 102]
+    assert ticks["time"].is_monotonic_increasing
+
+
+def test_paper_replay_handles_a_day_of_candles_for_many_trades():
+    index = pd.date_range(T0, periods=75, freq="5min")
+    closes = pd.Series(range(75), index=index, dtype=float) % 7 + 100
+    candles = pd.DataFrame({"open": closes, "high": closes + 2, "low": closes - 2, "close": closes})
+    symbols = [f"STOCK{i}" for i in range(20)]
+    ticks = pd.concat([candles_to_ticks(candles, s) for s in symbols])
+    trades = [ReplayTrade(s, "BUY", 100, 1, stop_loss=98.5, target=200, entry_time=index[k]) for k in range(0, 50, 5) for s in symbols]
+
+    result = replay_paper(ticks, trades)
+    assert len(result["trades"]) == 200
+    assert result["closed"] + result["open"] == 200
+    assert result["by_status"].get("SL_HIT", 0) > 0
@@ -0,0 +1,249 @@
+import time
+
+import pytest
+
+pytest.importorskip("websocket")
+
+from app.engine.fake_tick_server import FakeTickServer, encode_message, encode_packet
+from app.engine.price_bus import PriceBus
+from app.engine.tick_stream import (
+    MODE_FULL,
+    MODE_LTP,
+    MODE_QUOTE,
+    InstrumentState,
+    MarketDataStream,
+    TickStream,
+    parse_binary,
+    split_packets,
+)
+
+NFO_TOKEN = (12345 << 8) | 2
+CDS_TOKEN = (77 << 8) | 3
+INDEX_TOKEN = (256265 & ~0xFF) | 9
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_packets_round_trip_in_every_mode():
+    message = encode_message([
+        encode_packet(NFO_TOKEN, 101.25, MODE_LTP),
+        encode_packet(NFO_TOKEN, 101.5, MODE_QUOTE, ohlc=(100.0, 102.0, 99.0, 98.5), volume=1200),
+        encode_packet(NFO_TOKEN, 101.75, MODE_FULL),
+        encode_packet(CDS_TOKEN, 83.1234, MODE_QUOTE),
+    ])
+    ltp, quote, full, cds = parse_binary(message)
+
+    assert ltp == {"instrument_token": NFO_TOKEN, "tradable": True, "last_price": 101.25, "mode": MODE_LTP}
+    assert quote["mode"] == MODE_QUOTE and quote["volume"] == 1200
+    assert (quote["open"], quote["high"], quote["low"], quote["close"]) == (100.0, 102.0, 99.0, 98.5)
+    assert full["mode"] == MODE_FULL and len(full["depth"]["buy"]) == 5 and full["depth"]["sell"][0][0] == 101.75
+    assert cds["last_price"] == pytest.approx(83.1234)
+
+    # Heartbeats carry no packets; index tokens are flagged non-tradable.
+    assert split_packets(b"\x00") == []
+    assert parse_binary(encode_message([encode_packet(INDEX_TOKEN, 22000.0, MODE_LTP)]))[0]["tradable"] is False
+
+    # ltp-mode ticks keep the richer fields from earlier quote ticks.
+    state = InstrumentState(NFO_TOKEN)
+    state.apply(quote, 1.0)
+    state.apply(ltp, 2.0)
+    assert state.quote()["last_price"] == 101.25 and state.quote()["ohlc"]["close"] == 98.5
+
+
+def test_stream_reconnects_and_resubscribes_after_drop():
+    with FakeTickServer(heartbeat_interval=0.2) as server:
+        received = []
+        stream = TickStream("key", "token", url=server.url, reconnect_delay=0.05,
+                            on_ticks=lambda states: received.extend((s.token, s.last_price) for s in states))
+        server.prices[NFO_TOKEN] = 100.0
+        stream.subscribe([NFO_TOKEN], MODE_FULL)
+        stream.start()
+        try:
+            assert _wait_for(lambda: (NFO_TOKEN, 100.0) in received)
+            assert server.subscribed() == {NFO_TOKEN: MODE_FULL}
+
+            server.drop_clients()
+            assert _wait_for(lambda: server.connections == 2 and server.subscribed() == {NFO_TOKEN: MODE_FULL})
+            server.set_price(NFO_TOKEN, 95.5)
+            assert _wait_for(lambda: (NFO_TOKEN, 95.5) in received)
+            assert stream.state(NFO_TOKEN).last_price == 95.5
+
+            stream.unsubscribe([NFO_TOKEN])
+            assert _wait_for(lambda: server.subscribed() == {})
+        finally:
+            stream.stop()
+
+
+class _Kite:
+    api_key = "key"
+    access_token = "token"
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.ltp_calls = []
+
+    def ltp(self, symbols):
+        self.ltp_calls.append(list(symbols))
+        return {s: {"instrument_token": self.tokens[s], "last_price": 0.0} for s in symbols if s in self.tokens}
+
+
+def test_market_data_stream_follows_symbol_source_and_publishes_to_bus():
+    other = (999 << 8) | 2
+    kite = _Kite({"NFO:NIFTY24JUN22000CE": NFO_TOKEN, "NFO:NIFTY24JUN22000PE": other})
+    wanted = {"NFO:NIFTY24JUN22000CE"}
+    bus = PriceBus()
+    prices = []
+
+    with FakeTickServer(heartbeat_interval=0) as server:
+        stream = MarketDataStream(kite, symbol_source=lambda: set(wanted), bus=bus, sync_interval=60,
+                                  url=server.url, reconnect_delay=0.05)
+        stream.add_listener(prices.append)
+        stream.start()
+        try:
+            assert stream.ticker.wait_connected()
+            assert _wait_for(lambda: server.subscribed() == {NFO_TOKEN: MODE_QUOTE})
+            server.set_price(NFO_TOKEN, 120.0)
+            assert _wait_for(lambda: {"NFO:NIFTY24JUN22000CE": 120.0} in prices)
+            assert bus.snapshot().get("NFO:NIFTY24JUN22000CE").last_price == 120.0
+
+            wanted.clear()
+            wanted.add("NFO:NIFTY24JUN22000PE")
+            stream.sync()
+            assert _wait_for(lambda: server.subscribed() == {other: MODE_QUOTE})
+            # Tokens are resolved once per symbol.
+            assert kite.ltp_calls == [["NFO:NIFTY24JUN22000CE"], ["NFO:NIFTY24JUN22000PE"]]
+        finally:
+            stream.stop()
+
+
+def test_listeners_run_off_the_socket_thread_with_coalesced_prices():
+    class _Ticker:
+        subscriptions = {}
+
+        def subscribe(self, tokens, mode):
+            self.subscriptions = {t: mode for t in tokens}
+
+        def unsubscribe(self, tokens):
+            pass
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+    pe_token = (999 << 8) | 2
+    kite = _Kite({"NFO:NIFTY24JUN22000CE": NFO_TOKEN, "NFO:NIFTY24JUN22000PE": pe_token})
+    calls = []
+
+    def slow_listener(prices):
+        calls.append(prices)
+        time.sleep(0.3)
+
+    def tick(token, price):
+        state = InstrumentState(token)
+        state.apply({"last_price": price}, time.time())
+        stream._on_ticks([state])
+
+    stream = MarketDataStream(kite, ticker=_Ticker(), symbol_source=lambda: set(kite.tokens), bus=PriceBus(),
+                              sync_interval=60)
+    stream.add_listener(slow_listener)
+    stream.start()
+    try:
+        tick(NFO_TOKEN, 100.0)
+        assert _wait_for(lambda: len(calls) == 1)
+        started = time.perf_counter()
+        tick(NFO_TOKEN, 101.0)
+        tick(NFO_TOKEN, 102.0)
+        tick(pe_token, 50.0)
+        assert time.perf_counter() - started < 0.1
+        assert _wait_for(lambda: len(calls) == 2)
+        assert calls == [{"NFO:NIFTY24JUN22000CE": 100.0}, {"NFO:NIFTY24JUN22000CE": 102.0, "NFO:NIFTY24JUN22000PE": 50.0}]
+    finally:
+        stream.stop()
+
+
+def test_streamed_tick_triggers_live_stop_loss_exit(monkeypatch):
+    from app.routes import auto_trading_simple as live
+
+    closed = []
+    trade = {
+        "id": 1,
+        "symbol": "NIFTY24JUN22000CE",
+        "index": "NIFTY",
+        "side": "BUY",
+        "price": 100.0,
+        "quantity": 50,
+        "stop_loss": 95.0,
+        "target": 120.0,
+        "status": "OPEN",
+    }
+    trade.update(live._init_trailing_fields(100.0, "BUY"))
+    monkeypatch.setattr(live, "active_trades", [trade])
+    monkeypatch.setattr(live, "live_price_cache", {})
+    monkeypatch.setattr(live, "_maybe_place_exit_order", lambda t, p: None)
+    monkeypatch.setattr(live, "_close_trade", lambda t, p: closed.append((t["status"], p)))
+    live._live_trades_changed()
+
+    symbol = live._quote_symbol(trade["symbol"], trade["index"])
+    kite = _Kite({symbol: NFO_TOKEN})
+    with FakeTickServer(heartbeat_interval=0) as server:
+        stream = MarketDataStream(kite, symbol_source=live.live_quote_symbols, bus=PriceBus(), sync_interval=60,
+                                  url=server.url, reconnect_delay=0.05)
+        stream.add_listener(live.on_stream_prices)
+        stream.start()
+        try:
+            assert _wait_for(lambda: server.subscribed() == {NFO_TOKEN: MODE_QUOTE})
+            server.set_price(NFO_TOKEN, 99.0)
+            assert _wait_for(lambda: trade.get("current_price") == 99.0)
+            assert closed == []
+
+            server.set_price(NFO_TOKEN, 94.5)
+            assert _wait_for(lambda: closed == [("SL_HIT", 94.5)])
+            assert live.active_trades == []
+        finally:
+            stream.stop()
+
+
+def test_stream_restarts_only_when_the_access_token_changes(monkeypatch):
+    from app.core import background_tasks
+    from app.engine import option_signal_generator, tick_stream
+
+    class _Client:
+        api_key = "key"
+
+        def __init__(self, token):
+            self.access_token = token
+
+    class _Stream:
+        started = []
+
+        def __init__(self, kite, **_):
+            self.kite, self.running, self.ticker = kite, True, type("T", (), {"subscriptions": {}})()
+            _Stream.started.append(self)
+
+        def add_listener(self, _):
+            pass
+
+        def start(self):
+            pass
+
+        def stop(self):
+            self.running = False
+
+    tokens = iter(["tok", "tok", "tok", "new"])
+    monkeypatch.setattr(option_signal_generator, "_get_kite", lambda: _Client(next(tokens)))
+    monkeypatch.setattr(tick_stream, "MarketDataStream", _Stream)
+    monkeypatch.setattr(background_tasks, "_tick_stream", None)
+    for _ in range(4):
+        background_tasks.ensure_tick_stream()
+
+    assert [s.kite.access_token for s in _Stream.started] == ["tok", "new"]
+    assert not _Stream.started[0].running
@@ -0,0 +1,120 @@
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from app.engine import exit_rules, paper_trade_updater
+from app.engine.tick_replay import ReplayTrade, replay_paper
+from app.engine.trigger_index import ALWAYS, TriggerIndex
+
+
+def test_crossed_returns_only_trades_whose_band_the_price_leaves():
+    index = TriggerIndex()
+    index.upsert("a", "NFO:X", low=95.0, high=110.0)
+    index.upsert("b", "NFO:X", low=98.0, high=104.0)
+    index.upsert("c", "NFO:X", low=None, high=None)
+    index.upsert("d", "NFO:Y", low=95.0, high=110.0)
+
+    assert index.crossed("NFO:X", 100.0) == []
+    assert index.crossed("NFO:X", 98.0) == ["b"]  # edges count as crossed
+    assert sorted(index.crossed("NFO:X", 120.0)) == ["a", "b"]
+    assert index.crossed("NFO:Z", 100.0) == []
+
+    index.upsert("b", "NFO:X", low=90.0, high=130.0, tag="moved")
+    assert index.crossed("NFO:X", 98.0) == [] and index.tag("b") == "moved"
+    index.upsert("c", "NFO:X", *ALWAYS)
+    assert index.crossed("NFO:X", 100.0) == ["c"]
+
+    index.retain(["b", "c"])
+    assert len(index) == 2 and "a" not in index and index.crossed("NFO:Y", 50.0) == []
+
+
+def _walk(symbol, start, steps, seed, step=1.5):
+    rng = random.Random(seed)
+    t0 = datetime(2024, 6, 3, 9, 15)
+    price, rows = start, []
+    for i in range(steps):
+        price = max(1.0, round(price + rng.uniform(-step, step), 2))
+        rows.append({"time": t0 + timedelta(seconds=i), "symbol": symbol, "price": price})
+    return pd.DataFrame(rows)
+
+
+def test_paper_exits_match_full_evaluation(monkeypatch):
+    ticks = pd.concat([_walk("NIFTY24JUN22000CE", 100.0, 600, 1), _walk("BANKNIFTY24JUN48000PE", 200.0, 600, 2)])
+    rng = random.Random(3)
+    trades = []
+    for symbol, base in (("NIFTY24JUN22000CE", 100.0), ("BANKNIFTY24JUN48000PE", 200.0)):
+        for _ in range(20):
+            side = rng.choice(["BUY", "SELL"])
+            sign = 1 if side == "BUY" else -1
+            trades.append(ReplayTrade(symbol, side, base, 50, stop_loss=base - sign * rng.uniform(2, 8),
+                                      target=base + sign * rng.uniform(5, 25)))
+
+    # The replay keeps its bands apart from the app database's index.
+    production = paper_trade_updater._paper_triggers
+    production.upsert(1, "NFO:OTHER", 90.0, 110.0, tag="app")
+    indexed = replay_paper(ticks, trades)
+    monkeypatch.setattr(paper_trade_updater, "_paper_trigger_band", lambda trade: ALWAYS)
+    full = replay_paper(ticks, trades)
+    assert len(production) == 1 and production.tag(1) == "app"
+    production.clear()
+
+    assert indexed["closed"] > 0
+    assert indexed["trades"] == full["trades"]
+
+
+def test_live_exits_match_full_evaluation_and_skip_quiet_trades(monkeypatch):
+    from app.routes import auto_trading_simple as live
+
+    def make_trades():
+        rng = random.Random(4)
+        trades = []
+        for i in range(60):
+            side = rng.choice(["BUY", "SELL"])
+            sign = 1 if side == "BUY" else -1
+            symbol = rng.choice(["NIFTY24JUN22000CE", "NIFTY24JUN22000PE", "RELIANCE"])
+            trade = {
+                "id": i, "symbol": symbol, "index": "NIFTY", "side": side, "price": 100.0, "quantity": rng.choice([25, 50, 75]),
+                "stop_loss": 100.0 - sign * rng.uniform(1, 6), "target": 100.0 + sign * rng.uniform(2, 12), "status": "OPEN",
+            }
+            trade.update(live._init_trailing_fields(100.0, side))
+            trades.append(trade)
+        return trades
+
+    def run(trades):
+        evaluations = []
+        closed = []
+        original_exits, original_exit_one = exit_rules.live_exits, exit_rules.live_exit_one
+
+        def counting_exits(**columns):
+            evaluations.append(len(columns["price"]))
+            return original_exits(**columns)
+
+        def counting_exit_one(**row):
+            evaluations.append(1)
+            return original_exit_one(**row)
+
+        monkeypatch.setattr(live, "active_trades", list(trades))
+        monkeypatch.setattr(exit_rules, "live_exits", counting_exits)
+        monkeypatch.setattr(exit_rules, "live_exit_one", counting_exit_one)
+        monkeypatch.setattr(live, "_maybe_place_exit_order", lambda t, p: None)
+        monkeypatch.setattr(live, "_close_trade", lambda t, p: closed.append((t["id"], t["status"], p)))
+        monkeypatch.setattr(live, "live_price_cache", {})
+        monkeypatch.setattr(live, "_LIVE_RESYNC_S", float("inf"))
+        live._live_triggers.clear()
+        live._live_trades_changed()
+        symbols = list(live._open_trades_by_quote_symbol(live.active_trades))
+        prices = _walk("x", 100.0, 400, 5, step=0.1)["price"]
+        for price in prices:
+            live.on_stream_prices({s: price for s in symbols})
+        live._live_triggers.clear()
+        live._live_indexed.clear()
+        return closed, [{k: v for k, v in t.items() if k != "current_price"} for t in trades], sum(evaluations)
+
+    indexed_closed, indexed_state, indexed_evals = run(make_trades())
+    monkeypatch.setattr(live, "_live_trigger_band", lambda trade: ALWAYS)
+    full_closed, full_state, full_evals = run(make_trades())
+
+    assert indexed_closed and indexed_closed == full_closed
+    assert indexed_state == full_state
+    assert indexed_evals < full_evals / 2
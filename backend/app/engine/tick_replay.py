@@ -0,0 +1,281 @@
+"""
+Accelerated tick replay for the paper and live exit rules.
+
+Recorded ticks (or candles expanded into ticks) are fed through the exact
+production exit code paths, driven by a fake clock instead of wall time:
+
+* ``replay_paper`` inserts the trades into an in-memory database and calls
+  ``paper_trade_updater.update_open_paper_trades`` once per tick timestamp
+  (breakeven at 35% of target, 12-point lock, first down-tick exit, 3-point
+  trail past target).
+* ``replay_live`` feeds each tick batch to ``auto_trading_simple``'s
+  ``_apply_live_ticks`` (trigger index, then the exit rules on the crossed
+  trades) with order placement and ``_close_trade`` replaced by a
+  side-effect-free settle.
+
+Both return the same result shape, so an exit-rule change can be measured on
+a full day of ticks before it is deployed.
+"""
+from __future__ import annotations
+
+import contextlib
+import io
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.engine import paper_trade_updater
+from app.engine.trigger_index import TriggerIndex
+from app.models.trading import PaperTrade
+
+
+@dataclass
+class ReplayTrade:
+    """Trade to open once the replay clock reaches ``entry_time`` (``None`` = at start)."""
+    symbol: str
+    side: str
+    entry_price: float
+    quantity: float
+    stop_loss: Optional[float] = None
+    target: Optional[float] = None
+    entry_time: Optional[datetime] = None
+    index_name: Optional[str] = None
+
+
+class ReplayClock:
+    """Fake clock; callable like ``datetime.utcnow``."""
+
+    def __init__(self, start: Optional[datetime] = None):
+        self.now = start or datetime(1970, 1, 1)
+
+    def __call__(self) -> datetime:
+        return self.now
+
+    def advance_to(self, when: datetime) -> None:
+        if when > self.now:
+            self.now = when
+
+
+class _ReplayKite:
+    """Answers ``ltp`` from the replay's current prices."""
+
+    def __init__(self):
+        self.quote_to_symbol: Dict[str, str] = {}
+        self.prices: Dict[str, float] = {}
+
+    def ltp(self, quote_symbols) -> Dict[str, Dict[str, float]]:
+        quotes = {}
+        for quote_symbol in quote_symbols:
+            price = self.prices.get(self.quote_to_symbol.get(quote_symbol, quote_symbol))
+            if price is not None:
+                quotes[quote_symbol] = {"last_price": price}
+        return quotes
+
+
+def candles_to_ticks(candles: pd.DataFrame, symbol: str, bar_seconds: int = 300) -> pd.DataFrame:
+    """Expand OHLC bars into four ticks each.
+
+    Up bars go open -> low -> high -> close, down bars open -> high -> low ->
+    close, spread evenly across the bar.
+    """
+    times = pd.DatetimeIndex(candles.index)
+    up = (candles["close"] >= candles["open"]).to_numpy()
+    path = [
+        candles["open"].to_numpy(dtype=float),
+        candles["low"].where(up, candles["high"]).to_numpy(dtype=float),
+        candles["high"].where(up, candles["low"]).to_numpy(dtype=float),
+        candles["close"].to_numpy(dtype=float),
+    ]
+    step = timedelta(seconds=bar_seconds / 4)
+    frames = [
+        pd.DataFrame({"time": times + k * step, "symbol": symbol, "price": prices})
+        for k, prices in enumerate(path)
+    ]
+    return pd.concat(frames, ignore_index=True).sort_values("time", kind="stable", ignore_index=True)
+
+
+def _tick_batches(ticks: pd.DataFrame) -> Iterator[Tuple[datetime, Dict[str, float]]]:
+    """Yield ``(time, {symbol: last price})`` per distinct timestamp, in time order."""
+    ordered = ticks.sort_values("time", kind="stable")
+    times = pd.DatetimeIndex(ordered["time"]).to_pydatetime()
+    symbols = ordered["symbol"].to_numpy()
+    prices = ordered["price"].to_numpy(dtype=float)
+    start = 0
+    for i in range(1, len(times) + 1):
+        if i == len(times) or times[i] != times[start]:
+            yield times[start], dict(zip(symbols[start:i], prices[start:i]))
+            start = i
+
+
+def _pending(trades: Iterable[ReplayTrade]) -> List[ReplayTrade]:
+    return sorted(trades, key=lambda t: t.entry_time or datetime.min)
+
+
+def _summary(results: List[Dict[str, Any]], batches: int) -> Dict[str, Any]:
+    closed = [r for r in results if r["status"] != "OPEN"]
+    return {
+        "trades": results,
+        "ticks_replayed": batches,
+        "closed": len(closed),
+        "open": len(results) - len(closed),
+        "by_status": dict(Counter(r["status"] for r in results)),
+        "total_pnl": round(sum(r["pnl"] or 0.0 for r in results), 2),
+    }
+
+
+def replay_paper(ticks: pd.DataFrame, trades: Iterable[ReplayTrade], quiet: bool = True) -> Dict[str, Any]:
+    """Replay ``ticks`` (columns time/symbol/price) through the paper-trade updater."""
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(bind=engine, tables=[PaperTrade.__table__])
+    db = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)()
+    # The in-memory ids overlap the app database's, so the bands live apart.
+    triggers = TriggerIndex()
+    clock = ReplayClock()
+    kite = _ReplayKite()
+    pending = _pending(trades)
+    open_symbols: Counter = Counter()
+    batches = 0
+    out = io.StringIO() if quiet else None
+
+    try:
+        for when, prices in _tick_batches(ticks):
+            clock.advance_to(when)
+            while pending and (pending[0].entry_time is None or pending[0].entry_time <= when):
+                spec = pending.pop(0)
+                kite.quote_to_symbol[paper_trade_updater._quote_symbol(spec.symbol, spec.index_name)] = spec.symbol
+                db.add(PaperTrade(
+                    symbol=spec.symbol,
+                    index_name=spec.index_name,
+                    side=spec.side.upper(),
+                    quantity=spec.quantity,
+                    entry_price=spec.entry_price,
+                    current_price=spec.entry_price,
+                    stop_loss=spec.stop_loss,
+                    target=spec.target,
+                    strategy="replay",
+                    status="OPEN",
+                    entry_time=when,
+                    trading_date=when.date(),
+                ))
+                open_symbols[spec.symbol] += 1
+                db.commit()
+            kite.prices.update(prices)
+            if not any(open_symbols[s] for s in prices):
+                continue
+
+            batches += 1
+            with contextlib.redirect_stdout(out) if out else contextlib.nullcontext():
+                result = paper_trade_updater.update_open_paper_trades(
+                    db, force=True, kite=kite, clock=clock, ltp_timeout_s=None, triggers=triggers
+                )
+            if result.get("closed_count"):
+                open_symbols = Counter(
+                    symbol for (symbol,) in db.query(PaperTrade.symbol).filter(PaperTrade.status == "OPEN")
+                )
+
+        results = [
+            {
+                "symbol": t.symbol,
+                "side": t.side,
+                "entry_price": t.entry_price,
+                "entry_time": t.entry_time,
+                "exit_price": t.exit_price,
+                "exit_time": t.exit_time,
+                "status": t.status,
+                "stop_loss": t.stop_loss,
+                "pnl": t.pnl,
+            }
+            for t in db.query(PaperTrade).order_by(PaperTrade.id).all()
+        ]
+    finally:
+        db.close()
+        engine.dispose()
+    return _summary(results, batches)
+
+
+def replay_live(ticks: pd.DataFrame, trades: Iterable[ReplayTrade]) -> Dict[str, Any]:
+    """Replay ``ticks`` through the live auto-trading exit sequence.
+
+    Every tick batch goes through ``_apply_live_ticks``, the loop the tick
+    stream runs, with a private trigger index that trades join as they open.
+    Closing is reduced to ``_settle_trade`` (the P&L and status relabel of
+    ``_close_trade``), so no orders, reports or global state are touched.
+    Trades still open at the end are marked at their symbol's last price.
+    """
+    from app.routes import auto_trading_simple as live
+
+    clock = ReplayClock()
+    triggers = TriggerIndex()
+    indexed: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+    pending = _pending(trades)
+    open_symbols: Counter = Counter()
+    last_price: Dict[str, float] = {}
+    results: List[Dict[str, Any]] = []
+    batches = 0
+
+    def close(trade: Dict[str, Any], price: float) -> None:
+        live._settle_trade(trade, price, clock())
+
+    for when, prices in _tick_batches(ticks):
+        clock.advance_to(when)
+        while pending and (pending[0].entry_time is None or pending[0].entry_time <= when):
+            spec = pending.pop(0)
+            side = spec.side.upper()
+            trade = {
+                "symbol": spec.symbol,
+                "index": spec.index_name,
+                "side": side,
+                "price": float(spec.entry_price),
+                "quantity": spec.quantity,
+                "stop_loss": spec.stop_loss,
+                "target": spec.target,
+                "status": "OPEN",
+                "entry_time": when,
+                "exit_price": None,
+                "exit_time": None,
+                "pnl": None,
+            }
+            trade.update(live._init_trailing_fields(float(spec.entry_price), side))
+            results.append(trade)
+            # Ticks are keyed by trade symbol, so the symbol doubles as the quote key.
+            live._index_live_trade(spec.symbol, trade, triggers)
+            indexed[id(trade)] = (spec.symbol, trade)
+            open_symbols[spec.symbol] += 1
+
+        streamed = {symbol: price for symbol, price in prices.items() if open_symbols[symbol]}
+        if not streamed:
+            continue
+        last_price.update(streamed)
+        batches += 1
+        _, closed = live._apply_live_ticks(streamed, triggers=triggers, indexed=indexed, close=close)
+        if closed:
+            open_symbols = Counter(t["symbol"] for t in results if t["status"] == "OPEN")
+
+    for trade in results:
+        if trade["status"] == "OPEN" and trade["symbol"] in last_price:
+            trade["current_price"] = last_price[trade["symbol"]]
+            trade["pnl"] = live._pnl_for_trade(trade, trade["current_price"])
+
+    return _summary(
+        [
+            {
+                "symbol": t["symbol"],
+                "side": t["side"],
+                "entry_price": t["price"],
+                "entry_time": t["entry_time"],
+                "exit_price": t["exit_price"],
+                "exit_time": t["exit_time"],
+                "status": t["status"],
+                "stop_loss": t.get("stop_loss"),
+                "pnl": t["pnl"],
+            }
+            for t in results
+        ],
+        batches,
+    )
@@ -0,0 +1,509 @@
+"""
+Streaming market data over Kite's websocket tick protocol.
+
+Polling ``ltp`` leaves the exit logic blind for the length of the poll
+interval. ``TickStream`` keeps one websocket to the ticker endpoint open. It
+subscribes instrument tokens in ``ltp``/``quote``/``full`` mode, reconnects
+with exponential backoff (replaying every subscription), and folds the
+binary tick packets into a compact per-instrument :class:`InstrumentState`.
+
+``MarketDataStream`` sits on top. It maps quote symbols (``NFO:...``) to
+tokens, keeps the subscription set in sync with a symbol source (open trades
+plus watched underlyings), publishes every tick batch into the shared
+``price_bus`` and calls listeners with ``{quote_symbol: last_price}``, so
+exit rules run per tick instead of per poll. Listeners run on their own
+thread, never the socket's: ticks that arrive while they are busy are
+coalesced to the latest price per symbol.
+
+Binary format (all integers big-endian)::
+
+    message := count:uint16 (length:uint16 packet){count}
+    packet  := token:int32 fields...   # 8 (ltp), 28/32 (index), 44 (quote), 184 (full)
+
+Single-byte messages are heartbeats; text messages are JSON (errors, order
+updates). Prices are in paise except for currency segments.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from app.engine.price_bus import PriceBus, price_bus
+
+logger = logging.getLogger(__name__)
+
+KITE_TICKER_URL = "wss://ws.kite.trade"
+
+MODE_LTP = "ltp"
+MODE_QUOTE = "quote"
+MODE_FULL = "full"
+
+# Exchange segment is the low byte of the instrument token.
+SEGMENT_CDS = 3
+SEGMENT_BCD = 6
+SEGMENT_INDICES = 9
+
+_INT = struct.Struct(">i")
+_SHORT = struct.Struct(">H")
+_DEPTH_ENTRY = struct.Struct(">iiH2x")
+
+
+def price_divisor(token: int) -> float:
+    segment = token & 0xFF
+    if segment == SEGMENT_CDS:
+        return 10_000_000.0
+    if segment == SEGMENT_BCD:
+        return 10_000.0
+    return 100.0
+
+
+def split_packets(payload: bytes) -> List[bytes]:
+    """Split a binary message into its packets; heartbeats yield none."""
+    if len(payload) < 2:
+        return []
+    count = _SHORT.unpack_from(payload, 0)[0]
+    packets, offset = [], 2
+    for _ in range(count):
+        if offset + 2 > len(payload):
+            break
+        length = _SHORT.unpack_from(payload, offset)[0]
+        packets.append(payload[offset + 2:offset + 2 + length])
+        offset += 2 + length
+    return packets
+
+
+def parse_packet(packet: bytes) -> Optional[Dict]:
+    """Decode one tick packet into a flat dict (``None`` for unknown lengths)."""
+    size = len(packet)
+    if size < 8:
+        return None
+    token = _INT.unpack_from(packet, 0)[0]
+    divisor = price_divisor(token)
+
+    def price(offset: int) -> float:
+        return _INT.unpack_from(packet, offset)[0] / divisor
+
+    def integer(offset: int) -> int:
+        return _INT.unpack_from(packet, offset)[0]
+
+    tick: Dict = {"instrument_token": token, "tradable": (token & 0xFF) != SEGMENT_INDICES, "last_price": price(4)}
+    if size == 8:
+        tick["mode"] = MODE_LTP
+    elif size in (28, 32):
+        tick.update(
+            mode=MODE_QUOTE if size == 28 else MODE_FULL,
+            high=price(8), low=price(12), open=price(16), close=price(20),
+        )
+        if size == 32:
+            tick["exchange_timestamp"] = integer(28)
+    elif size in (44, 184):
+        tick.update(
+            mode=MODE_QUOTE if size == 44 else MODE_FULL,
+            last_quantity=integer(8),
+            average_price=price(12),
+            volume=integer(16),
+            buy_quantity=integer(20),
+            sell_quantity=integer(24),
+            open=price(28), high=price(32), low=price(36), close=price(40),
+        )
+        if size == 184:
+            tick.update(
+                last_trade_time=integer(44),
+                oi=integer(48),
+                oi_day_high=integer(52),
+                oi_day_low=integer(56),
+                exchange_timestamp=integer(60),
+            )
+            levels = []
+            for i in range(10):
+                quantity, level_price, orders = _DEPTH_ENTRY.unpack_from(packet, 64 + 12 * i)
+                levels.append((level_price / divisor, quantity, orders))
+            tick["depth"] = {"buy": levels[:5], "sell": levels[5:]}
+    else:
+        return None
+    return tick
+
+
+def parse_binary(payload: bytes) -> List[Dict]:
+    ticks = []
+    for packet in split_packets(payload):
+        tick = parse_packet(packet)
+        if tick is not None:
+            ticks.append(tick)
+    return ticks
+
+
+class InstrumentState:
+    """Latest known values for one instrument token."""
+
+    __slots__ = (
+        "token", "last_price", "open", "high", "low", "close", "volume",
+        "buy_quantity", "sell_quantity", "oi", "exchange_timestamp", "depth", "received_at", "ticks",
+    )
+
+    def __init__(self, token: int):
+        self.token = token
+        self.last_price: Optional[float] = None
+        self.open = self.high = self.low = self.close = None
+        self.volume = self.buy_quantity = self.sell_quantity = self.oi = None
+        self.exchange_timestamp: Optional[int] = None
+        self.depth = None
+        self.received_at = 0.0
+        self.ticks = 0
+
+    def apply(self, tick: Dict, received_at: float) -> None:
+        # ltp-mode packets only carry the price; keep the richer fields from earlier ticks.
+        for name in ("last_price", "open", "high", "low", "close", "volume",
+                     "buy_quantity", "sell_quantity", "oi", "exchange_timestamp", "depth"):
+            value = tick.get(name)
+            if value is not None:
+                setattr(self, name, value)
+        self.received_at = received_at
+        self.ticks += 1
+
+    def quote(self) -> Dict:
+        """``kite.quote``-shaped view (the fields the rest of the app reads)."""
+        quote = {"instrument_token": self.token, "last_price": self.last_price, "timestamp": self.received_at}
+        if self.close is not None:
+            quote["ohlc"] = {"open": self.open, "high": self.high, "low": self.low, "close": self.close}
+        if self.volume is not None:
+            quote["volume"] = self.volume
+        if self.oi is not None:
+            quote["oi"] = self.oi
+        return quote
+
+
+def _default_ws_factory(url: str, **callbacks):
+    import websocket
+
+    return websocket.WebSocketApp(url, **callbacks)
+
+
+class TickStream:
+    """Reconnecting websocket client for the Kite tick protocol."""
+
+    def __init__(
+        self,
+        api_key: str,
+        access_token: str,
+        url: str = KITE_TICKER_URL,
+        on_ticks: Optional[Callable[[List[InstrumentState]], None]] = None,
+        reconnect_delay: float = 1.0,
+        max_reconnect_delay: float = 30.0,
+        stale_after: float = 10.0,
+        ws_factory: Callable = _default_ws_factory,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.url = f"{url}?api_key={api_key}&access_token={access_token}"
+        self.on_ticks = on_ticks
+        self.reconnect_delay = float(reconnect_delay)
+        self.max_reconnect_delay = float(max_reconnect_delay)
+        self.stale_after = float(stale_after)
+        self._ws_factory = ws_factory
+        self._clock = clock
+        self._modes: Dict[int, str] = {}
+        self._states: Dict[int, InstrumentState] = {}
+        self._lock = threading.Lock()
+        self._ws = None
+        self._connected = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_message_at = 0.0
+        self.connects = 0
+        self.messages = 0
+
+    # --- subscriptions -------------------------------------------------
+
+    @property
+    def subscriptions(self) -> Dict[int, str]:
+        with self._lock:
+            return dict(self._modes)
+
+    def subscribe(self, tokens: Iterable[int], mode: str = MODE_QUOTE) -> None:
+        tokens = [int(t) for t in tokens]
+        if not tokens:
+            return
+        with self._lock:
+            for token in tokens:
+                self._modes[token] = mode
+        self._send({"a": "subscribe", "v": tokens})
+        self._send({"a": "mode", "v": [mode, tokens]})
+
+    def unsubscribe(self, tokens: Iterable[int]) -> None:
+        tokens = [int(t) for t in tokens]
+        with self._lock:
+            tokens = [t for t in tokens if self._modes.pop(t, None) is not None]
+            for token in tokens:
+                self._states.pop(token, None)
+        if tokens:
+            self._send({"a": "unsubscribe", "v": tokens})
+
+    def _resubscribe(self) -> None:
+        by_mode: Dict[str, List[int]] = {}
+        with self._lock:
+            for token, mode in self._modes.items():
+                by_mode.setdefault(mode, []).append(token)
+        for mode, tokens in by_mode.items():
+            self._send({"a": "subscribe", "v": tokens})
+            self._send({"a": "mode", "v": [mode, tokens]})
+
+    def _send(self, message: Dict) -> None:
+        ws = self._ws
+        if ws is None or not self._connected.is_set():
+            return  # replayed by _resubscribe on (re)connect
+        try:
+            ws.send(json.dumps(message))
+        except Exception as exc:
+            logger.warning("tick stream send failed: %s", exc)
+
+    # --- state ---------------------------------------------------------
+
+    def state(self, token: int) -> Optional[InstrumentState]:
+        with self._lock:
+            return self._states.get(int(token))
+
+    def states(self) -> Dict[int, InstrumentState]:
+        with self._lock:
+            return dict(self._states)
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def wait_connected(self, timeout: float = 5.0) -> bool:
+        return self._connected.wait(timeout)
+
+    # --- websocket callbacks ---------------------------------------------
+
+    def _on_open(self, ws) -> None:
+        self.connects += 1
+        self.last_message_at = self._clock()
+        self._connected.set()
+        self._resubscribe()
+
+    def _on_message(self, ws, message) -> None:
+        now = self._clock()
+        self.last_message_at = now
+        self.messages += 1
+        if isinstance(message, str):
+            self._on_text(message)
+            return
+        ticks = parse_binary(message)
+        if not ticks:
+            return  # heartbeat
+        updated = []
+        with self._lock:
+            for tick in ticks:
+                token = tick["instrument_token"]
+                if token not in self._modes:
+                    continue
+                state = self._states.get(token)
+                if state is None:
+                    state = self._states[token] = InstrumentState(token)
+                state.apply(tick, now)
+                updated.append(state)
+        if updated and self.on_ticks is not None:
+            try:
+                self.on_ticks(updated)
+            except Exception:
+                logger.exception("tick listener failed")
+
+    def _on_text(self, message: str) -> None:
+        try:
+            payload = json.loads(message)
+        except ValueError:
+            return
+        if payload.get("type") == "error":
+            logger.warning("tick stream error: %s", payload.get("data"))
+
+    def _on_error(self, ws, error) -> None:
+        logger.warning("tick stream error: %s", error)
+
+    def _on_close(self, ws, *args) -> None:
+        self._connected.clear()
+
+    # --- lifecycle -------------------------------------------------------
+
+    def start(self) -> "TickStream":
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="tick-stream", daemon=True)
+        self._thread.start()
+        threading.Thread(target=self._watchdog, name="tick-stream-watchdog", daemon=True).start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopped.set()
+        ws = self._ws
+        if ws is not None:
+            try:
+                ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        attempt = 0
+        while not self._stopped.is_set():
+            connects_before = self.connects
+            self._ws = self._ws_factory(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close,
+            )
+            try:
+                self._ws.run_forever(skip_utf8_validation=True)
+            except Exception as exc:
+                logger.warning("tick stream connection failed: %s", exc)
+            self._connected.clear()
+            if self._stopped.is_set():
+                break
+            attempt = 0 if self.connects > connects_before else attempt + 1
+            self._stopped.wait(min(self.max_reconnect_delay, self.reconnect_delay * (2 ** attempt)))
+
+    def _watchdog(self) -> None:
+        # Kite sends a heartbeat every second; silence means a half-open socket.
+        interval = max(0.05, min(1.0, self.stale_after / 4))
+        while not self._stopped.wait(interval):
+            ws = self._ws
+            if ws is not None and self._connected.is_set() and self._clock() - self.last_message_at > self.stale_after:
+                logger.warning("tick stream stale for %.1fs, reconnecting", self.stale_after)
+                try:
+                    ws.close()
+                except Exception:
+                    pass
+
+
+class MarketDataStream:
+    """Symbol-level subscriptions on a :class:`TickStream`, fanned out to listeners."""
+
+    def __init__(
+        self,
+        kite,
+        ticker: Optional[TickStream] = None,
+        symbol_source: Optional[Callable[[], Iterable[str]]] = None,
+        bus: PriceBus = price_bus,
+        mode: str = MODE_QUOTE,
+        sync_interval: float = 5.0,
+        **ticker_kwargs,
+    ):
+        self.kite = kite
+        self.bus = bus
+        self.mode = mode
+        self.sync_interval = float(sync_interval)
+        self.symbol_source = symbol_source
+        self.ticker = ticker or TickStream(kite.api_key, kite.access_token, **ticker_kwargs)
+        self.ticker.on_ticks = self._on_ticks
+        self._listeners: List[Callable[[Dict[str, float]], None]] = []
+        self._watched: set = set()
+        self._tokens: Dict[str, int] = {}
+        self._symbols: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._sync_thread: Optional[threading.Thread] = None
+        # Prices not yet handed to the listeners, latest per symbol.
+        self._pending: Dict[str, float] = {}
+        self._pending_ready = threading.Condition()
+        self._dispatch_thread: Optional[threading.Thread] = None
+
+    def add_listener(self, listener: Callable[[Dict[str, float]], None]) -> None:
+        self._listeners.append(listener)
+
+    def watch(self, symbols: Iterable[str]) -> None:
+        """Keep ``symbols`` subscribed regardless of the symbol source."""
+        with self._lock:
+            self._watched.update(symbols)
+        self.sync()
+
+    def _resolve(self, symbols: Sequence[str]) -> Dict[str, int]:
+        with self._lock:
+            missing = [s for s in symbols if s not in self._tokens]
+        if missing:
+            # One batched ltp call returns the token of every instrument.
+            for symbol, data in (self.kite.ltp(missing) or {}).items():
+                token = (data or {}).get("instrument_token")
+                if token is not None:
+                    with self._lock:
+                        self._tokens[symbol] = int(token)
+        with self._lock:
+            return {s: self._tokens[s] for s in symbols if s in self._tokens}
+
+    def sync(self) -> None:
+        """Diff the wanted symbol set against the live subscriptions."""
+        wanted = set(self._watched)
+        if self.symbol_source is not None:
+            try:
+                wanted.update(self.symbol_source())
+            except Exception:
+                logger.exception("tick stream symbol source failed")
+        tokens = self._resolve(sorted(wanted))
+        with self._lock:
+            self._symbols = {token: symbol for symbol, token in tokens.items()}
+        subscribed = self.ticker.subscriptions
+        added = [t for t in tokens.values() if t not in subscribed]
+        removed = [t for t in subscribed if t not in self._symbols]
+        if added:
+            self.ticker.subscribe(added, self.mode)
+        if removed:
+            self.ticker.unsubscribe(removed)
+
+    def _on_ticks(self, states: List[InstrumentState]) -> None:
+        with self._lock:
+            symbols = self._symbols
+        quotes = {symbols[s.token]: s.quote() for s in states if s.token in symbols and s.last_price is not None}
+        if not quotes:
+            return
+        self.bus.publish(self.kite, quotes)
+        with self._pending_ready:
+            self._pending.update((symbol, quote["last_price"]) for symbol, quote in quotes.items())
+            self._pending_ready.notify()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._pending_ready:
+                while not self._pending and not self._stopped.is_set():
+                    self._pending_ready.wait()
+                if self._stopped.is_set():
+                    return
+                prices, self._pending = self._pending, {}
+            for listener in list(self._listeners):
+                try:
+                    listener(prices)
+                except Exception:
+                    logger.exception("tick stream listener failed")
+
+    def start(self) -> "MarketDataStream":
+        self._stopped.clear()
+        self._dispatch_thread = threading.Thread(target=self._dispatch_loop, name="tick-stream-listeners", daemon=True)
+        self._dispatch_thread.start()
+        self.sync()
+        self.ticker.start()
+        self._sync_thread = threading.Thread(target=self._sync_loop, name="tick-stream-sync", daemon=True)
+        self._sync_thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        with self._pending_ready:
+            self._pending.clear()
+            self._pending_ready.notify()
+        self.ticker.stop()
+
+    @property
+    def running(self) -> bool:
+        return self._sync_thread is not None and self._sync_thread.is_alive() and not self._stopped.is_set()
+
+    def _sync_loop(self) -> None:
+        while not self._stopped.wait(self.sync_interval):
+            try:
+                self.sync()
+            except Exception:
+                logger.exception("tick stream subscription sync failed")
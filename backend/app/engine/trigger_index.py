@@ -0,0 +1,133 @@
+"""
+Price-trigger index for exit-rule evaluation.
+
+Each open trade is reduced to a *quiet band* ``(low, high)`` on its
+instrument: while ``low < price < high`` a full pass of its exit rules
+would change nothing except the mark (no stop/target hit, no breakeven,
+lock or trail step). The index keeps every band edge in per-instrument
+sorted lists, so a price update finds the trades that need the full rule
+pass with two bisects::
+
+    index.upsert(trade_id, "NFO:NIFTY24JUN22000CE", low=95.0, high=103.5)
+    index.crossed("NFO:NIFTY24JUN22000CE", 96.0)   # -> []
+    index.crossed("NFO:NIFTY24JUN22000CE", 94.9)   # -> [trade_id]
+
+That is O(log n + k) per tick for k crossed trades. After evaluating a
+crossed trade, the caller recomputes its band (or removes it once
+closed). Bands are conservative: a trade may be evaluated when nothing
+happens, never skipped when something would. ``low >= high`` means
+"evaluate on every update" for states that cannot be bounded.
+
+Entries carry a ``tag`` (any comparable snapshot of the inputs the band
+was computed from) so callers can cheaply detect trades whose levels
+were edited elsewhere and refresh only those.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+INF = float("inf")
+ALWAYS = (INF, -INF)
+
+# Band edges are widened by this much so float rounding in the rule code
+# can never fire just inside a band.
+_EPSILON = 1e-9
+
+
+class _Book:
+    __slots__ = ("lows", "highs")
+
+    def __init__(self):
+        # (level, seq, key) tuples; ``seq`` keeps ordering total without comparing keys.
+        self.lows: List[Tuple[float, int, Hashable]] = []
+        self.highs: List[Tuple[float, int, Hashable]] = []
+
+
+class _Entry:
+    __slots__ = ("symbol", "low", "high", "seq", "tag")
+
+    def __init__(self, symbol: str, low: float, high: float, seq: int, tag: Any):
+        self.symbol = symbol
+        self.low = low
+        self.high = high
+        self.seq = seq
+        self.tag = tag
+
+
+def _remove(levels: List[Tuple[float, int, Hashable]], item: Tuple[float, int, Hashable]) -> None:
+    i = bisect_left(levels, item[:2])
+    while i < len(levels) and levels[i][:2] == item[:2]:
+        if levels[i][2] == item[2]:
+            del levels[i]
+            return
+        i += 1
+
+
+class TriggerIndex:
+    """Sorted stop/target band edges per instrument."""
+
+    def __init__(self):
+        self._books: Dict[str, _Book] = {}
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._seq = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def tag(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        return None if entry is None else entry.tag
+
+    def band(self, key: Hashable) -> Optional[Tuple[float, float]]:
+        entry = self._entries.get(key)
+        return None if entry is None else (entry.low, entry.high)
+
+    def upsert(self, key: Hashable, symbol: str, low: Optional[float], high: Optional[float], tag: Any = None) -> None:
+        """(Re)place ``key``'s band; ``None`` edges are unbounded."""
+        low = -INF if low is None else float(low) + _EPSILON
+        high = INF if high is None else float(high) - _EPSILON
+        if low != low or high != high:  # NaN levels: cannot bound, always evaluate
+            low, high = ALWAYS
+        self.remove(key)
+        self._seq += 1
+        entry = self._entries[key] = _Entry(symbol, low, high, self._seq, tag)
+        book = self._books.get(symbol)
+        if book is None:
+            book = self._books[symbol] = _Book()
+        insort(book.lows, (low, entry.seq, key))
+        insort(book.highs, (high, entry.seq, key))
+
+    def remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        book = self._books[entry.symbol]
+        _remove(book.lows, (entry.low, entry.seq, key))
+        _remove(book.highs, (entry.high, entry.seq, key))
+        if not book.lows:
+            del self._books[entry.symbol]
+
+    def retain(self, keys: Iterable[Hashable]) -> None:
+        """Drop every entry whose key is not in ``keys``."""
+        keep = set(keys)
+        for key in [k for k in self._entries if k not in keep]:
+            self.remove(key)
+
+    def crossed(self, symbol: str, price: float) -> List[Hashable]:
+        """Keys on ``symbol`` whose band does not strictly contain ``price``."""
+        book = self._books.get(symbol)
+        if book is None:
+            return []
+        price = float(price)
+        lows, highs = book.lows, book.highs
+        hit = [key for _, _, key in lows[bisect_left(lows, (price, -1)):]]
+        hit.extend(key for _, _, key in highs[:bisect_right(highs, (price, INF))])
+        return list(dict.fromkeys(hit))
+
+    def clear(self) -> None:
+        self._books.clear()
+        self._entries.clear()
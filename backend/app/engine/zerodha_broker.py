@@ -11,11 +11,12 @@ class ZerodhaBroker(BrokerInterface):
     def connect(self, credentials: Dict[str, Any]) -> bool:
         try:
             from kiteconnect import KiteConnect
+            from app.engine.broker_executor import bind_kite
             api_key = credentials.get('api_key')
             access_token = credentials.get('access_token')
             if not api_key or not access_token:
                 return False
-            self.api = KiteConnect(api_key=api_key)
+            self.api = bind_kite(KiteConnect(api_key=api_key))
             self.api.set_access_token(access_token)
             self.connected = True
             return True
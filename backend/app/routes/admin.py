@@ -8,6 +8,7 @@ from sqlalchemy.orm import Session
 from app.auth.service import AuthService
 from app.core.database import get_db
 from app.core.security import encryption_manager
+from app.engine.pipeline_metrics import pipeline_metrics
 from app.models.auth import User, BrokerCredential, RefreshToken
 from app.models.trading import (
     Order,
@@ -192,3 +193,13 @@ async def delete_broker(
     db.commit()
 
     return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.get("/pipeline-metrics")
+async def get_pipeline_metrics(
+    limit: int = 20,
+    current_user: User = Depends(AuthService.get_current_user),
+):
+    """Stage timings, broker call counts and cache outcomes of recent signal scans."""
+    _require_admin(current_user)
+    return {"runs": pipeline_metrics.recent(max(1, min(limit, 50)))}
@@ -22,6 +22,7 @@ async def auto_close_trades_task():
                 _close_trade(trade, price)
         # Remove closed trades from active_trades
         active_trades[:] = [t for t in active_trades if t.get("status") == "OPEN"]
+        _live_trades_changed()
 
 # Start background task on startup
 @router.on_event("startup")
@@ -31,7 +32,9 @@ async def start_auto_close_trades():
     asyncio.create_task(auto_close_trades_task())
 """Auto Trading Engine wired to live market data (no mocks)."""
 
+import contextlib
 import math
+import threading
 import time
 import asyncio
 import os
@@ -40,7 +43,7 @@ import uuid
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, time as dt_time, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 
 
@@ -119,6 +122,9 @@ except ImportError:
     def evaluate_advanced_ai_signal(signal):
         return {}
 from app.engine.zerodha_order_util import place_zerodha_order
+from app.engine.price_bus import price_bus
+from app.engine.trigger_index import ALWAYS, TriggerIndex
+from app.engine import exit_rules
 
 
 def _ensure_json_serializable(value):
@@ -303,6 +309,15 @@ state = {
     "recent_exit_contexts": {},  # Track same-move exit context to prevent churn re-entries
 }
 active_trades: List[Dict] = []
+# Serialises exit checks between the polling endpoint and the tick stream.
+_live_price_lock = threading.RLock()
+# Quiet bands of open live trades, keyed by id(trade) (see _live_trigger_band).
+_live_triggers = TriggerIndex()
+# {id(trade): (quote_symbol, trade)} behind _live_triggers. Rebuilt after
+# active_trades changes (_live_trades_changed) and every _LIVE_RESYNC_S.
+_live_indexed: Dict[int, Tuple[str, Dict[str, Any]]] = {}
+_live_index_state = {"stale": True, "synced_at": 0.0}
+_LIVE_RESYNC_S = 5.0
 history: List[Dict] = []
 broker_logs: List[Dict] = []
 live_price_cache: Dict[str, float] = {}
@@ -365,6 +380,7 @@ async def reset_state(authorization: Optional[str] = Header(None)):
     state["daily_loss"] = 0.0
     state["daily_date"] = datetime.now().date()
     active_trades.clear()
+    _live_trades_changed()
     history.clear()
     db = SessionLocal()
     try:
@@ -492,6 +508,7 @@ def _cleanup_synthetic_trade_rows() -> Dict[str, Any]:
         db.close()
 
     active_trades[:] = [t for t in active_trades if not _is_synthetic_trade_symbol(t.get("symbol"))]
+    _live_trades_changed()
     history[:] = [t for t in history if not _is_synthetic_trade_symbol(t.get("symbol"))]
 
     return {
@@ -528,6 +545,7 @@ def _sync_active_trades_from_db() -> None:
                 continue
             loaded.append(payload)
         active_trades[:] = loaded
+        _live_trades_changed()
     except Exception as e:
         print(f"[ACTIVE_TRADES_SYNC] Failed to load active trades from DB: {e}")
     finally:
@@ -1285,16 +1303,12 @@ def _should_exit_by_currency(trade: Dict[str, Any], price: float) -> str | None:
     kind = _option_kind(trade.get("symbol"))
     if not kind:
         return None
-    pnl = _pnl_for_trade(trade, price)
-    peak_pnl = float(trade.get("peak_pnl") or pnl)
-    trade["peak_pnl"] = max(peak_pnl, pnl)
-    if kind == "CE":
-        # Exit if we hit profit >= threshold and then fall back below it.
-        if trade.get("peak_pnl", 0) >= PROFIT_EXIT_AMOUNT and pnl <= PROFIT_EXIT_AMOUNT and trade.get("peak_pnl", 0) > pnl:
-            return "PROFIT_TRAIL"
-    if kind == "PE" and pnl <= -LOSS_CAP_AMOUNT:
-        return "LOSS_CAP"
-    return None
+    status, peak = exit_rules.currency_exit_one(
+        _OPTION_KIND_CODES[kind], _trade_sign(trade), _nan_float(trade.get("price")),
+        _nan_float(trade.get("quantity") or 0), float(price), _nan_float(trade.get("peak_pnl")), _live_rules(),
+    )
+    trade["peak_pnl"] = float(peak)
+    return None if status == exit_rules.OPEN else exit_rules.STATUS_NAMES[status]
 
 
 def _reset_daily_if_needed():
@@ -1999,100 +2013,138 @@ async def toggle(enabled: bool = True, authorization: Optional[str] = Header(Non
     return {"enabled": True, "is_demo_mode": state["is_demo_mode"], "message": "Auto-trading is always enabled."}
 
 
+def _live_rules() -> exit_rules.LiveRules:
+    """Current live exit settings (read at call time so config changes apply immediately)."""
+    return exit_rules.LiveRules(
+        trail_enabled=bool(trail_config.get("enabled", False)),
+        trigger_pct=trail_config["trigger_pct"],
+        step_pct=trail_config["step_pct"],
+        buffer_pct=trail_config["buffer_pct"],
+        breakeven_pct=BREAKEVEN_TRIGGER_PCT,
+        emergency_multiplier=EMERGENCY_STOP_MULTIPLIER,
+        profit_exit_amount=PROFIT_EXIT_AMOUNT,
+        loss_cap_amount=LOSS_CAP_AMOUNT,
+    )
+
+
+_OPTION_KIND_CODES = {"CE": exit_rules.KIND_CE, "PE": exit_rules.KIND_PE}
+
+
+def _nan_float(value) -> float:
+    try:
+        return float("nan") if value is None else float(value)
+    except (TypeError, ValueError):
+        return float("nan")
+
+
+def _trade_sign(trade: Dict[str, Any]) -> float:
+    return 1.0 if str(trade.get("side") or "BUY").upper() == "BUY" else -1.0
+
+
+def _live_columns(trades: List[Dict[str, Any]], prices: List[float]) -> Dict[str, np.ndarray]:
+    """Column arrays of live trade dicts for the exit_rules engine."""
+    return {
+        "kind": np.array([_OPTION_KIND_CODES.get(_option_kind(t.get("symbol")), exit_rules.KIND_NONE) for t in trades]),
+        "sign": exit_rules.side_sign(t.get("side") for t in trades),
+        "entry": np.array([_nan_float(t.get("price")) for t in trades]),
+        "qty": np.array([_nan_float(t.get("quantity") or 0) for t in trades]),
+        "price": np.array(prices, dtype=float),
+        "stop": np.array([_nan_float(t.get("stop_loss")) for t in trades]),
+        "target": np.array([_nan_float(t.get("target")) for t in trades]),
+        "peak_pnl": np.array([_nan_float(t.get("peak_pnl")) for t in trades]),
+        "breakeven_applied": np.array([bool(t.get("breakeven_applied")) for t in trades]),
+        "trail_active": np.array([bool(t.get("trail_active")) for t in trades]),
+        "trail_start": np.array([_nan_float(t.get("trail_start")) for t in trades]),
+        "trail_stop": np.array([_nan_float(t.get("trail_stop")) for t in trades]),
+        "trail_step": np.array([_nan_float(t.get("trail_step")) for t in trades]),
+        "support": np.array([_nan_float(t.get("support")) for t in trades]),
+        "resistance": np.array([_nan_float(t.get("resistance")) for t in trades]),
+    }
+
+
+def _live_row(trade: Dict[str, Any], price: float) -> Dict[str, Any]:
+    """Scalar inputs of one live trade for the ``exit_rules.*_one`` functions."""
+    return {
+        "kind": _OPTION_KIND_CODES.get(_option_kind(trade.get("symbol")), exit_rules.KIND_NONE),
+        "sign": _trade_sign(trade),
+        "entry": _nan_float(trade.get("price")),
+        "qty": _nan_float(trade.get("quantity") or 0),
+        "price": float(price),
+        "stop": _nan_float(trade.get("stop_loss")),
+        "target": _nan_float(trade.get("target")),
+        "peak_pnl": _nan_float(trade.get("peak_pnl")),
+        "breakeven_applied": bool(trade.get("breakeven_applied")),
+        "trail_active": bool(trade.get("trail_active")),
+        "trail_start": _nan_float(trade.get("trail_start")),
+        "trail_stop": _nan_float(trade.get("trail_stop")),
+        "trail_step": _nan_float(trade.get("trail_step")),
+        "support": _nan_float(trade.get("support")),
+        "resistance": _nan_float(trade.get("resistance")),
+    }
+
+
+# Below this many crossed trades the scalar rules beat NumPy's per-call overhead.
+_SCALAR_EXIT_ROWS = 32
+
+
+def _write_trail(trade: Dict[str, Any], trail: exit_rules.TrailState) -> None:
+    """Copy a one-trade trail update back onto ``trade`` (only the fields that moved)."""
+    if trail.healed:
+        trade["trail_step"] = float(trail.trail_step)
+        trade["trail_active"] = bool(trail.trail_active)
+    if trail.breakeven:
+        trade["stop_loss"] = float(trail.stop)
+        trade["breakeven_applied"] = True
+    if trail.activated:
+        trade["trail_active"] = True
+    if trail.healed or trail.stepped:
+        trade["trail_start"] = float(trail.trail_start)
+        trade["trail_stop"] = float(trail.trail_stop)
+
+
 def _init_trailing_fields(entry_price: float, side: str) -> Dict[str, float | bool]:
     # Precompute trailing stop anchor to avoid repeated math and simplify updates.
-    buffer = trail_config["buffer_pct"] * entry_price / 100
-    if side == "BUY":
-        # Activate trail only after favorable move above entry.
-        start = entry_price * (1 + trail_config["trigger_pct"] / 100)
-        return {
-            "trail_active": False,
-            "trail_start": start,
-            "trail_stop": start - buffer,
-            "trail_step": trail_config["step_pct"] * entry_price / 100,
-        }
-    # For SELL, favorable move is below entry.
-    start = entry_price * (1 - trail_config["trigger_pct"] / 100)
+    # Trail activates only after a favourable move (above entry for BUY, below for SELL).
+    start, stop, step = exit_rules.initial_trail_one(1.0 if side == "BUY" else -1.0, float(entry_price), _live_rules())
     return {
         "trail_active": False,
-        "trail_start": start,
-        "trail_stop": start + buffer,
-        "trail_step": trail_config["step_pct"] * entry_price / 100,
+        "trail_start": float(start),
+        "trail_stop": float(stop),
+        "trail_step": float(step),
     }
 
 
 def _maybe_update_trail(trade: Dict[str, Any], new_price: float) -> None:
     if not trail_config.get("enabled", False):
         return
-    side = trade.get("side")
-    entry_price = trade.get("price")
-    support = trade.get("support")
-    resistance = trade.get("resistance")
-    trail_active = trade.get("trail_active")
-    trail_start = trade.get("trail_start")
-    trail_stop = trade.get("trail_stop")
-    trail_step = trade.get("trail_step")
-    if None in (side, trail_start, trail_stop, trail_step, entry_price):
-        return
-
-    # Self-heal legacy anchors from older logic so existing open trades trail correctly.
-    if side == "BUY" and trail_start < entry_price:
-        repaired = _init_trailing_fields(float(entry_price), side)
-        trade.update(repaired)
-        trail_start = trade.get("trail_start")
-        trail_stop = trade.get("trail_stop")
-        trail_step = trade.get("trail_step")
-    elif side != "BUY" and trail_start > entry_price:
-        repaired = _init_trailing_fields(float(entry_price), side)
-        trade.update(repaired)
-        trail_start = trade.get("trail_start")
-        trail_stop = trade.get("trail_stop")
-        trail_step = trade.get("trail_step")
-
-    # Breakeven: once price moves in favor by BREAKEVEN_TRIGGER_PCT, lift stop to entry +/- tiny buffer
-    buffer = trail_config["buffer_pct"] * entry_price / 100
-    if side == "BUY" and not trade.get("breakeven_applied"):
-        if new_price >= entry_price * (1 + BREAKEVEN_TRIGGER_PCT / 100):
-            trade["stop_loss"] = max(trade.get("stop_loss", entry_price - buffer), entry_price + buffer)
-            trade["breakeven_applied"] = True
-    if side != "BUY" and not trade.get("breakeven_applied"):
-        if new_price <= entry_price * (1 - BREAKEVEN_TRIGGER_PCT / 100):
-            trade["stop_loss"] = min(trade.get("stop_loss", entry_price + buffer), entry_price - buffer)
-            trade["breakeven_applied"] = True
-
-    # Strong one-way trailing: BUY stop can only move up; SELL stop can only move down.
-    prev_trail_stop = float(trade.get("trail_stop") or trail_stop)
-
-    if side == "BUY":
-        if not trail_active and new_price >= trail_start:
-            trade["trail_active"] = True
-        if trade.get("trail_active") and new_price > trail_start:
-            steps = math.floor((new_price - trail_start) / trail_step)
-            if steps > 0:
-                trail_start = trail_start + steps * trail_step
-                trail_stop = trail_start - trail_config["buffer_pct"] * entry_price / 100
-                # Do not set trail below known support
-                if support:
-                    trail_stop = max(trail_stop, support)
-                # One-way lock: never loosen BUY trail.
-                trail_stop = max(float(trail_stop), prev_trail_stop)
-                trade["trail_start"] = trail_start
-                trade["trail_stop"] = trail_stop
-    else:
-        if not trail_active and new_price <= trail_start:
-            trade["trail_active"] = True
-        if trade.get("trail_active") and new_price < trail_start:
-            steps = math.floor((trail_start - new_price) / trail_step)
-            if steps > 0:
-                trail_start = trail_start - steps * trail_step
-                trail_stop = trail_start + trail_config["buffer_pct"] * entry_price / 100
-                # Do not set trail above known resistance
-                if resistance:
-                    trail_stop = min(trail_stop, resistance)
-                # One-way lock: never loosen SELL trail.
-                trail_stop = min(float(trail_stop), prev_trail_stop)
-                trade["trail_start"] = trail_start
-                trade["trail_stop"] = trail_stop
+    trail = exit_rules.trail_update_one(
+        _trade_sign(trade), _nan_float(trade.get("price")), float(new_price), _nan_float(trade.get("stop_loss")),
+        bool(trade.get("breakeven_applied")), bool(trade.get("trail_active")), _nan_float(trade.get("trail_start")),
+        _nan_float(trade.get("trail_stop")), _nan_float(trade.get("trail_step")), _nan_float(trade.get("support")),
+        _nan_float(trade.get("resistance")), _live_rules(),
+    )
+    _write_trail(trade, trail)
+
+
+def _settle_trade(trade: Dict[str, Any], exit_price: float, exit_time: Any) -> float:
+    """Record exit price, time, P&L and final status on ``trade`` (no other side effects)."""
+    qty = int(trade.get("quantity") or 0)
+    entry = float(trade.get("price") or trade.get("entry_price") or 0.0)
+    pnl = _pnl_for_trade(trade, exit_price)
+    capital = float(trade.get("capital_used") or (entry * qty) or 0.0)
+    pnl_percentage = (pnl / capital * 100) if capital else 0.0
+
+    trade["exit_price"] = exit_price
+    trade["exit_time"] = exit_time
+    trade["status"] = trade.get("status") or "CLOSED"
+    trade["pnl"] = round(pnl, 2)
+    trade["pnl_percentage"] = round(pnl_percentage, 2)
+
+    # A trailing/breakeven stop can close with positive P&L; do not treat it as a true SL loss.
+    if str(trade.get("status") or "").upper() == "SL_HIT" and pnl > 0:
+        trade["status"] = "PROFIT_TRAIL"
+        trade["exit_reason"] = trade.get("exit_reason") or "PROFIT_TRAIL"
+    return pnl
 
 
 def _close_trade(trade: Dict[str, Any], exit_price: float) -> None:
@@ -2102,21 +2154,7 @@ def _close_trade(trade: Dict[str, Any], exit_price: float) -> None:
         qty = int(trade.get("quantity") or 0)
         entry = float(trade.get("price") or trade.get("entry_price") or 0.0)
         exit_price = float(exit_price or trade.get("current_price") or entry)
-
-        pnl = _pnl_for_trade(trade, exit_price)
-        capital = float(trade.get("capital_used") or (entry * qty) or 0.0)
-        pnl_percentage = (pnl / capital * 100) if capital else 0.0
-
-        trade["exit_price"] = exit_price
-        trade["exit_time"] = _now()
-        trade["status"] = trade.get("status") or "CLOSED"
-        trade["pnl"] = round(pnl, 2)
-        trade["pnl_percentage"] = round(pnl_percentage, 2)
-
-        # A trailing/breakeven stop can close with positive P&L; do not treat it as a true SL loss.
-        if str(trade.get("status") or "").upper() == "SL_HIT" and pnl > 0:
-            trade["status"] = "PROFIT_TRAIL"
-            trade["exit_reason"] = trade.get("exit_reason") or "PROFIT_TRAIL"
+        pnl = _settle_trade(trade, exit_price, _now())
 
         trade_mode = _normalize_trade_mode(
             trade.get("trade_mode"),
@@ -2185,7 +2223,7 @@ def _close_trade(trade: Dict[str, Any], exit_price: float) -> None:
                 entry_price=entry,
                 exit_price=exit_price,
                 pnl=round(pnl, 2),
-                pnl_percentage=round(pnl_percentage, 2),
+                pnl_percentage=trade["pnl_percentage"],
                 strategy=trade.get("strategy") or trade.get("strategy_name"),
                 status=trade.get("status") or "CLOSED",
                 entry_time=entry_dt,
@@ -2277,36 +2315,17 @@ def close_all_active_trades(reason: str = "Market close") -> int:
 
     if closed_count > 0:
         active_trades[:] = [t for t in active_trades if t.get("status") == "OPEN"]
+        _live_trades_changed()
 
     return closed_count
 
 
 def _stop_hit(trade: Dict[str, any], price: float) -> bool:
     """Check if stop loss is hit, with emergency stop buffer to prevent slippage losses"""
-    side = trade.get("side", "BUY").upper()
-    stop_loss = trade.get("stop_loss")
-    trail_stop = trade.get("trail_stop") if trade.get("trail_active") else None
-    if stop_loss is None:
-        return False
-    
-    effective_stop = trail_stop if trail_stop is not None else stop_loss
-    entry_price = trade.get("price", 0)
-    
-    # Calculate emergency stop (slightly before actual stop to prevent slippage)
-    if entry_price > 0:
-        stop_distance = abs(entry_price - effective_stop)
-        emergency_distance = stop_distance * EMERGENCY_STOP_MULTIPLIER
-        if side == "BUY":
-            emergency_stop = entry_price - emergency_distance
-        else:
-            emergency_stop = entry_price + emergency_distance
-    else:
-        emergency_stop = effective_stop
-    
-    # Check emergency stop first (tighter), then regular stop
-    if side == "BUY":
-        return price <= emergency_stop or price <= effective_stop
-    return price >= emergency_stop or price >= effective_stop
+    return exit_rules.stop_hit_one(
+        _trade_sign(trade), _nan_float(trade.get("price")), _nan_float(trade.get("stop_loss")),
+        bool(trade.get("trail_active")), _nan_float(trade.get("trail_stop")), float(price), _live_rules(),
+    )
 
 
 def _profit_lock_exit_reason(trade: Dict[str, Any]) -> str:
@@ -4131,6 +4150,7 @@ async def execute(
             demo_trades.append(trade_obj)
             active_trades.append(trade_obj)
             _trim_list_in_place(active_trades, MAX_ACTIVE_TRADES_IN_MEMORY)
+            _live_trades_changed()
             _upsert_active_trade_record(trade_obj)
             broker_response = {"simulated": True}
             print(f"[API /execute] ℹ Demo trade started for {trade_obj.get('symbol')} qty={trade_obj.get('quantity')}")
@@ -4170,6 +4190,7 @@ async def execute(
                 trade_obj["broker_response"] = real_order
                 active_trades.append(trade_obj)
                 _trim_list_in_place(active_trades, MAX_ACTIVE_TRADES_IN_MEMORY)
+                _live_trades_changed()
                 _upsert_active_trade_record(trade_obj)
             else:
                 print(f"[API /execute] ✗ Zerodha order REJECTED - Error: {real_order.get('error', 'Unknown')}")
@@ -4222,9 +4243,276 @@ async def get_active_trades(authorization: Optional[str] = Header(None)):
     print(f"[API /trades/active] Returning {len(active_trades)} active trades from Zerodha")
     trades = [normalize_active_trade_metrics(trade) for trade in active_trades if _include_trade_in_runtime(trade)]
     active_trades[:] = trades
+    _live_trades_changed()
     return {"trades": trades, "is_demo_mode": bool(state.get("is_demo_mode", False)), "count": len(trades)}
 
 
+def _live_trigger_band(trade: Dict[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    """Price band inside which ``exit_rules.live_exits`` leaves ``trade`` unchanged
+    (currency peak, breakeven, trail step, target, stop)."""
+    side = trade.get("side")
+    if side not in ("BUY", "SELL"):
+        return ALWAYS
+    buy = side == "BUY"
+    entry = float(trade.get("price") or 0.0)
+    lows: List[float] = []
+    highs: List[float] = []
+
+    kind = _option_kind(trade.get("symbol"))
+    if kind:
+        qty = float(trade.get("quantity") or 0)
+        peak = trade.get("peak_pnl")
+        if not peak or qty <= 0:
+            return ALWAYS  # peak is reset from the current P&L on every update
+        peak = float(peak)
+        (highs if buy else lows).append(entry + peak / qty if buy else entry - peak / qty)
+        if kind == "CE" and peak >= PROFIT_EXIT_AMOUNT:
+            (lows if buy else highs).append(entry + PROFIT_EXIT_AMOUNT / qty if buy else entry - PROFIT_EXIT_AMOUNT / qty)
+        if kind == "PE":
+            (lows if buy else highs).append(entry - LOSS_CAP_AMOUNT / qty if buy else entry + LOSS_CAP_AMOUNT / qty)
+
+    trail_start, trail_step = trade.get("trail_start"), trade.get("trail_step")
+    if trail_config.get("enabled", False) and None not in (trade.get("price"), trail_start, trade.get("trail_stop"), trail_step):
+        if (buy and trail_start < entry) or (not buy and trail_start > entry) or trail_step <= 0:
+            return ALWAYS  # legacy anchors are repaired on the next update
+        if not trade.get("breakeven_applied"):
+            (highs if buy else lows).append(entry * (1 + BREAKEVEN_TRIGGER_PCT / 100) if buy else entry * (1 - BREAKEVEN_TRIGGER_PCT / 100))
+        if not trade.get("trail_active"):
+            (highs if buy else lows).append(trail_start)
+        else:
+            (highs if buy else lows).append(trail_start + trail_step if buy else trail_start - trail_step)
+
+    target = trade.get("target")
+    if target is not None:
+        try:
+            (highs if buy else lows).append(float(target))
+        except Exception:
+            pass
+
+    stop_loss = trade.get("stop_loss")
+    if stop_loss is not None:
+        trail_stop = trade.get("trail_stop") if trade.get("trail_active") else None
+        effective_stop = float(trail_stop if trail_stop is not None else stop_loss)
+        emergency_stop = effective_stop
+        if entry > 0:
+            emergency_distance = abs(entry - effective_stop) * EMERGENCY_STOP_MULTIPLIER
+            emergency_stop = entry - emergency_distance if buy else entry + emergency_distance
+        if buy:
+            lows.append(max(emergency_stop, effective_stop))
+        else:
+            highs.append(min(emergency_stop, effective_stop))
+
+    return (max(lows) if lows else None), (min(highs) if highs else None)
+
+
+def _index_live_trade(quote_symbol: str, trade: Dict[str, Any], triggers: Optional[TriggerIndex] = None) -> None:
+    triggers = _live_triggers if triggers is None else triggers
+    tag = (
+        quote_symbol, trade.get("symbol"), trade.get("side"), trade.get("price"), trade.get("quantity"),
+        trade.get("stop_loss"), trade.get("target"), trade.get("peak_pnl"), trade.get("breakeven_applied"),
+        trade.get("trail_active"), trade.get("trail_start"), trade.get("trail_stop"), trade.get("trail_step"),
+        trail_config.get("enabled", False),
+    )
+    if triggers.tag(id(trade)) != tag:
+        triggers.upsert(id(trade), quote_symbol, *_live_trigger_band(trade), tag=tag)
+
+
+def _open_trades_by_quote_symbol(trades: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    trade_symbol_map: Dict[str, List[Dict[str, Any]]] = {}
+    for trade in trades:
+        if trade.get("status") != "OPEN":
+            continue
+        quote_symbol = _quote_symbol(trade.get("symbol") or "", trade.get("index"))
+        if quote_symbol:
+            trade_symbol_map.setdefault(quote_symbol, []).append(trade)
+    return trade_symbol_map
+
+
+def _apply_live_prices(
+    trade_symbol_map: Dict[str, List[Dict[str, Any]]],
+    ltp_data: Dict[str, Any],
+    persist: bool = True,
+    *,
+    triggers: Optional[TriggerIndex] = None,
+) -> Tuple[int, int]:
+    """Trail, mark and exit-check trades against ``{quote_symbol: {"last_price"}}``.
+
+    This is the full pass of the polling endpoint: every trade in
+    ``trade_symbol_map`` is (re)indexed and marked, and the crossed ones go
+    through the exit rules. Streamed ticks take ``_apply_live_ticks`` instead.
+    ``persist=False`` skips the per-update DB write; closed trades are still
+    persisted by ``_close_trade``.
+    """
+    updated = 0
+    shared = triggers is None
+    triggers = _live_triggers if shared else triggers
+    with _live_price_lock if shared else contextlib.nullcontext():
+        for quote_symbol, trades in trade_symbol_map.items():
+            for trade in trades:
+                _index_live_trade(quote_symbol, trade, triggers)
+        triggers.retain(id(t) for trades in trade_symbol_map.values() for t in trades)
+
+        crossed_rows = []
+        for quote_symbol, trades in trade_symbol_map.items():
+            tick = ltp_data.get(quote_symbol) or {}
+            live_price = tick.get("last_price")
+            if live_price is None:
+                continue
+
+            try:
+                price = float(live_price)
+            except Exception:
+                continue
+
+            # Only trades whose quiet band this price leaves go through the exit rules.
+            crossed = set(triggers.crossed(quote_symbol, price))
+            for trade in trades:
+                if trade.get("status") != "OPEN":
+                    continue
+                if id(trade) in crossed:
+                    crossed_rows.append((quote_symbol, trade, price))
+                    continue
+                trade["current_price"] = price
+                if persist:
+                    _upsert_active_trade_record(trade)
+                updated += 1
+
+        crossed_updated, closed = _exit_live_rows(crossed_rows, persist, triggers)
+        if shared:
+            _live_trades_changed()
+    return updated + crossed_updated, closed
+
+
+def _exit_live_rows(
+    crossed_rows: List[Tuple[str, Dict[str, Any], float]],
+    persist: bool,
+    triggers: TriggerIndex,
+    close: Optional[Callable[[Dict[str, Any], float], None]] = None,
+) -> Tuple[int, int]:
+    """Run the exit rules on ``(quote_symbol, trade, price)`` rows whose band was crossed.
+
+    Open trades are re-indexed with their new band, closed ones removed.
+    ``close(trade, price)`` replaces the exit order, ``_close_trade`` and the
+    ``active_trades`` prune (the tick replay).
+    """
+    if not crossed_rows:
+        return 0, 0
+    closed = 0
+    # Trail update, then currency, target and stop checks: one vectorized
+    # pass for large batches, the equivalent scalar rules for a few trades.
+    rules = _live_rules()
+    if len(crossed_rows) < _SCALAR_EXIT_ROWS:
+        results = [exit_rules.live_exit_one(**_live_row(trade, price), rules=rules) for _, trade, price in crossed_rows]
+    else:
+        cols = _live_columns([trade for _, trade, _ in crossed_rows], [price for _, _, price in crossed_rows])
+        batch = exit_rules.live_exits(**cols, rules=rules)
+        results = [exit_rules.live_exits_row(batch, i) for i in range(len(crossed_rows))]
+    for (quote_symbol, trade, price), result in zip(crossed_rows, results):
+        _write_trail(trade, result.trail)
+        if _option_kind(trade.get("symbol")):
+            trade["peak_pnl"] = float(result.peak_pnl)
+        trade["current_price"] = price
+        if persist:
+            _upsert_active_trade_record(trade)
+
+        if result.status == exit_rules.OPEN:
+            _index_live_trade(quote_symbol, trade, triggers)
+            continue
+        exit_reason = exit_rules.STATUS_NAMES[result.status]
+        trade["status"] = exit_reason
+        trade["exit_reason"] = exit_reason
+        if close is None:
+            _maybe_place_exit_order(trade, price)
+            _close_trade(trade, price)
+        else:
+            close(trade, price)
+        triggers.remove(id(trade))
+        closed += 1
+
+    if closed and close is None:
+        active_trades[:] = [t for t in active_trades if t.get("status") == "OPEN"]
+    return len(crossed_rows), closed
+
+
+def _live_trades_changed() -> None:
+    """Re-index the open live trades before the next streamed tick.
+
+    Call after trades are opened, closed, replaced or edited outside the
+    exit rules; the tick path also re-indexes every ``_LIVE_RESYNC_S``.
+    """
+    _live_index_state["stale"] = True
+
+
+def _reindex_live_trades() -> None:
+    """Rebuild ``_live_indexed`` from ``active_trades`` (``_live_price_lock`` held).
+
+    Also marks every open trade at its last streamed price, so quiet trades
+    are marked to market here rather than on each tick.
+    """
+    _live_indexed.clear()
+    for quote_symbol, trades in _open_trades_by_quote_symbol(active_trades).items():
+        price = live_price_cache.get(quote_symbol)
+        for trade in trades:
+            _index_live_trade(quote_symbol, trade)
+            _live_indexed[id(trade)] = (quote_symbol, trade)
+            if price is not None:
+                trade["current_price"] = price
+    _live_triggers.retain(_live_indexed)
+    _live_index_state.update(stale=False, synced_at=time.monotonic())
+
+
+def _apply_live_ticks(
+    prices: Dict[str, float],
+    *,
+    triggers: Optional[TriggerIndex] = None,
+    indexed: Optional[Dict[int, Tuple[str, Dict[str, Any]]]] = None,
+    close: Optional[Callable[[Dict[str, Any], float], None]] = None,
+) -> Tuple[int, int]:
+    """Run the live exit rules on the trades whose quiet band ``prices`` leaves.
+
+    Only ``triggers.crossed`` rows are touched, so a tick costs O(log n + k)
+    for k crossed trades. Nothing is written to the DB except closes.
+
+    The tick replay passes its own ``triggers`` and ``indexed``
+    (``{id(trade): (quote_symbol, trade)}``), indexing trades as it opens them,
+    and a ``close`` callback (see ``_exit_live_rows``).
+    """
+    shared = triggers is None
+    with _live_price_lock if shared else contextlib.nullcontext():
+        if shared:
+            live_price_cache.update(prices)
+            if _live_index_state["stale"] or time.monotonic() - _live_index_state["synced_at"] >= _LIVE_RESYNC_S:
+                _reindex_live_trades()
+            triggers, indexed = _live_triggers, _live_indexed
+
+        crossed_rows = []
+        for quote_symbol, price in prices.items():
+            for key in triggers.crossed(quote_symbol, price):
+                trade = indexed.get(key, (None, {}))[1]
+                if trade.get("status") == "OPEN":
+                    crossed_rows.append((quote_symbol, trade, float(price)))
+                else:  # closed outside the exit rules since the last re-index
+                    triggers.remove(key)
+                    indexed.pop(key, None)
+
+        updated, closed = _exit_live_rows(crossed_rows, False, triggers, close)
+        if closed:
+            for _, trade, _ in crossed_rows:
+                if trade.get("status") != "OPEN":
+                    indexed.pop(id(trade), None)
+    return updated, closed
+
+
+def on_stream_prices(prices: Dict[str, float]) -> None:
+    """Tick-stream listener: run the live exit rules on every streamed price."""
+    _apply_live_ticks(prices)
+
+
+def live_quote_symbols() -> List[str]:
+    """Quote symbols of the open live trades (tick-stream subscription source)."""
+    return list(_open_trades_by_quote_symbol(active_trades))
+
+
 @router.post("/trades/update-prices")
 async def update_live_trade_prices(authorization: Optional[str] = Header(None)):
     try:
@@ -4251,16 +4539,8 @@ async def update_live_trade_prices(authorization: Optional[str] = Header(None)):
                 "timestamp": _now(),
             }
 
-        quote_symbols: List[str] = []
-        trade_symbol_map: Dict[str, List[Dict[str, Any]]] = {}
-        for trade in open_trades:
-            quote_symbol = _quote_symbol(trade.get("symbol") or "", trade.get("index"))
-            if not quote_symbol:
-                continue
-            quote_symbols.append(quote_symbol)
-            trade_symbol_map.setdefault(quote_symbol, []).append(trade)
-
-        quote_symbols = list(dict.fromkeys(quote_symbols))
+        trade_symbol_map = _open_trades_by_quote_symbol(open_trades)
+        quote_symbols = list(trade_symbol_map)
         if not quote_symbols:
             return {
                 "success": True,
@@ -4271,56 +4551,8 @@ async def update_live_trade_prices(authorization: Optional[str] = Header(None)):
                 "timestamp": _now(),
             }
 
-        ltp_data = kite.ltp(quote_symbols) or {}
-        updated = 0
-        closed = 0
-        to_close: List[Dict[str, Any]] = []
-
-        for quote_symbol, trades in trade_symbol_map.items():
-            tick = ltp_data.get(quote_symbol) or {}
-            live_price = tick.get("last_price")
-            if live_price is None:
-                continue
-
-            try:
-                price = float(live_price)
-            except Exception:
-                continue
-
-            for trade in trades:
-                if trade.get("status") != "OPEN":
-                    continue
-
-                _maybe_update_trail(trade, price)
-                trade["current_price"] = price
-                _upsert_active_trade_record(trade)
-                updated += 1
-
-                exit_reason = _should_exit_by_currency(trade, price)
-                if not exit_reason:
-                    target = trade.get("target")
-                    side = (trade.get("side") or "BUY").upper()
-                    if target is not None:
-                        try:
-                            target_value = float(target)
-                            if (side == "BUY" and price >= target_value) or (side != "BUY" and price <= target_value):
-                                exit_reason = "TARGET_HIT"
-                        except Exception:
-                            pass
-
-                if not exit_reason and _stop_hit(trade, price):
-                    exit_reason = "SL_HIT"
-
-                if exit_reason:
-                    trade["status"] = exit_reason
-                    trade["exit_reason"] = exit_reason
-                    _maybe_place_exit_order(trade, price)
-                    _close_trade(trade, price)
-                    to_close.append(trade)
-                    closed += 1
-
-        if to_close:
-            active_trades[:] = [t for t in active_trades if t.get("status") == "OPEN"]
+        ltp_data = price_bus.ltp(kite, quote_symbols) or {}
+        updated, closed = _apply_live_prices(trade_symbol_map, ltp_data)
 
         return {
             "success": True,
@@ -4366,6 +4598,7 @@ async def close_live_trade(payload: CloseTradeRequest, authorization: Optional[s
     _close_trade(target_trade, exit_price)
 
     active_trades[:] = [t for t in active_trades if t.get("status") == "OPEN"]
+    _live_trades_changed()
 
     return {
         "success": True,
@@ -4450,6 +4683,8 @@ async def update_trade_price(symbol: str, price: float, authorization: Optional[
 
     if to_close:
         active_trades[:] = [t for t in active_trades if t.get("status") == "OPEN"]
+    if updated:
+        _live_trades_changed()
 
     return {
         "updated": updated,
@@ -1,6 +1,7 @@
 from kiteconnect import KiteConnect
+from app.engine.broker_executor import bind_kite
+from app.engine.rate_limiter import rate_limited
 import os
-import json
 import datetime
 import sqlite3
 import sys
@@ -25,11 +26,12 @@ async def get_active_symbols():
         ACCESS_TOKEN = encryption_manager.decrypt_credentials(row[0])
     except Exception:
         ACCESS_TOKEN = row[0]
-    kite = KiteConnect(api_key=API_KEY)
+    kite = bind_kite(KiteConnect(api_key=API_KEY))
     kite.set_access_token(ACCESS_TOKEN)
-    # Load cached instruments
-    with open("instruments_cache.json", "r", encoding="utf-8") as f:
-        instruments = json.load(f)
+    kite = rate_limited(kite)
+    # Load instruments from the shared daily store (downloads once per trading day)
+    from app.engine.instrument_store import instrument_store
+    instruments = instrument_store.records(kite, "NSE")
     from_date = datetime.datetime.now() - datetime.timedelta(days=5)
     to_date = datetime.datetime.now()
     results = []
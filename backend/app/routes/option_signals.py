@@ -1,5 +1,6 @@
 from fastapi import APIRouter
 from app.engine.option_signal_generator import generate_signals, generate_signals_advanced
+from app.engine.pipeline_metrics import track_run
 
 router = APIRouter(prefix="/option-signals", tags=["Option Signals"])
 
@@ -16,29 +17,28 @@ async def get_intraday_option_signals_advanced(
     include_nifty50: bool = False,
     include_fno_universe: bool = False,
     max_symbols: int = 60,
+    debug: bool = False,
 ):
-    """Get intraday signals with trend/news confirmation and adaptive targets."""
-    import asyncio
-    try:
-        symbol_list = [s.strip().upper() for s in symbols.split(",")] if symbols else None
-        # Timeout guard; returns cached signals on slow upstream.
-        signals = await asyncio.wait_for(
-            generate_signals_advanced(
+    """Get intraday signals with trend/news confirmation and adaptive targets.
+
+    Generation is single-flight per scan and stale scans are served while a
+    background refresh runs, so no timeout fallback is needed here. With
+    ``debug=true`` the response carries the stage timings of this request.
+    """
+    with track_run("intraday_advanced", mode=mode) as run:
+        try:
+            symbol_list = [s.strip().upper() for s in symbols.split(",")] if symbols else None
+            signals = await generate_signals_advanced(
                 mode=mode,
                 symbols=symbol_list,
                 include_nifty50=include_nifty50,
                 include_fno_universe=include_fno_universe,
                 max_symbols=max_symbols,
-            ),
-            timeout=40.0
-        )
-        return {"signals": signals}
-    except asyncio.TimeoutError:
-        # Return cached signals if generation times out
-        from app.engine.option_signal_generator import _signals_cache
-        latest = []
-        if isinstance(_signals_cache, dict) and _signals_cache:
-            latest = max(_signals_cache.values(), key=lambda rec: rec.get("ts", 0)).get("signals", [])
-        return {"signals": latest, "status": "timeout_using_cache"}
-    except Exception as e:
-        return {"signals": [], "error": str(e)}
+            )
+            response = {"signals": signals}
+        except Exception as e:
+            response = {"signals": [], "error": str(e)}
+        if debug:
+            run.finish()
+            response["debug"] = run.to_dict()
+        return response
@@ -14,6 +14,7 @@ import re
 from app.core.database import get_db
 from app.core.market_hours import market_status
 from app.models.trading import PaperTrade
+from app.engine.paper_trade_updater import forget_paper_trade, track_paper_trade
 from app.routes.auto_trading_simple import _ai_entry_validation
 
 router = APIRouter()
@@ -635,6 +636,7 @@ def create_paper_trade(trade: PaperTradeCreate, db: Session = Depends(get_db)):
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Paper trade persistence failed: {e.__class__.__name__}")
+    track_paper_trade(paper_trade)
     
     return {
         "success": True,
@@ -774,6 +776,7 @@ def update_paper_trade(
     
     db.commit()
     db.refresh(trade)
+    track_paper_trade(trade)
     
     return {
         "success": True,
@@ -856,6 +859,7 @@ def delete_paper_trade(trade_id: int, db: Session = Depends(get_db)):
     
     db.delete(trade)
     db.commit()
+    forget_paper_trade(trade_id)
     
     return {"success": True, "message": "Paper trade deleted"}
 
@@ -870,6 +874,8 @@ def close_all_open_trades(db: Session = Depends(get_db)):
         trade.exit_time = datetime.utcnow()
     
     db.commit()
+    for trade in open_trades:
+        track_paper_trade(trade)
     
     return {
         "success": True,
@@ -935,6 +941,7 @@ def set_paper_trade_price(trade_id: int, current_price: float, db: Session = Dep
     
     db.commit()
     db.refresh(trade)
+    track_paper_trade(trade)
     
     return {
         "success": True,
@@ -10,6 +10,15 @@ def _to_float(value: Any, default: float = 0.0) -> float:
         return default
 
 
+def _first_present(signal: Dict[str, Any], *keys: str) -> Any:
+    """First non-None value among ``keys`` (a real 0.0 reading is kept)."""
+    for key in keys:
+        value = signal.get(key)
+        if value is not None:
+            return value
+    return None
+
+
 def _clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
 
@@ -51,9 +60,9 @@ def evaluate_advanced_ai_signal(signal: Dict[str, Any]) -> Dict[str, Any]:
 
     # Execution-risk signals from news, liquidity and options premium behaviour.
     news_risk_raw = _to_float(signal.get("news_risk") or signal.get("news_impact_score") or signal.get("event_risk"), -1)
-    spread_pct = _to_float(signal.get("bid_ask_spread_pct") or signal.get("spread_pct"), -1)
+    spread_pct = _to_float(_first_present(signal, "bid_ask_spread_pct", "spread_pct"), -1)
     volume_ratio = _to_float(tech.get("volume_ratio") or signal.get("volume_ratio"), -1)
-    iv_spike = _to_float(signal.get("iv_spike_pct") or signal.get("implied_volatility_change"), -1)
+    iv_spike = _to_float(_first_present(signal, "iv_spike_pct", "implied_volatility_change"), -1)
     premium_distortion_hint = _to_float(signal.get("premium_distortion") or signal.get("premium_distortion_risk"), -1)
 
     # Regime score: stable trend + enough confidence/quality + sensible volatility proxy.
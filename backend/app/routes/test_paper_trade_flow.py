@@ -238,3 +238,63 @@ def test_paper_updater_breakeven_trail_then_sl_hit(monkeypatch):
         assert row_after_second.exit_time is not None
     finally:
         db.close()
+
+
+def test_streamed_prices_skip_the_poll_rate_limit_and_lock_exits_on_first_down_tick(monkeypatch):
+    db = _make_session()
+    try:
+        def add(symbol):
+            trade = PaperTrade(
+                user_id=1, symbol=symbol, side="BUY", quantity=1, entry_price=100.0, current_price=100.0,
+                stop_loss=95.0, target=130.0, status="OPEN", trading_date=date.today(),
+            )
+            db.add(trade)
+            return trade
+
+        streamed, other = add("NFO:NIFTY26MAR22500CE"), add("NFO:NIFTY26MAR22600CE")
+        db.commit()
+        monkeypatch.setattr(updater, "_paper_triggers", updater.TriggerIndex())
+        monkeypatch.setattr(updater, "_price_update_cache", {"last_update": 1e12, "min_interval": 2.0})
+        monkeypatch.setattr(updater, "_get_kite", lambda: (_ for _ in ()).throw(AssertionError("no broker fetch")))
+        updater.track_paper_trade(streamed)
+        updater.track_paper_trade(other)
+
+        assert updater.update_open_paper_trades(db)["rate_limited"] is True
+        updater.update_open_paper_trades(db, prices={"NFO:NIFTY26MAR22500CE": 112.5})
+        assert (streamed.status, streamed.stop_loss) == ("OPEN", 112.0)
+        updater.update_open_paper_trades(db, prices={"NFO:NIFTY26MAR22500CE": 112.4})
+
+        assert (streamed.status, streamed.exit_price) == ("PROFIT_TRAIL", 112.4)
+        assert (other.status, other.current_price) == ("OPEN", 100.0)
+    finally:
+        db.close()
+
+
+def test_quiet_streamed_ticks_touch_no_rows(monkeypatch):
+    db = _make_session()
+    try:
+        trade = PaperTrade(
+            user_id=1, symbol="NFO:NIFTY26MAR22500CE", side="BUY", quantity=1, entry_price=100.0, current_price=100.0,
+            stop_loss=95.0, target=130.0, status="OPEN", trading_date=date.today(),
+        )
+        db.add(trade)
+        db.commit()
+        monkeypatch.setattr(updater, "_paper_triggers", updater.TriggerIndex())
+        updater.track_paper_trade(trade)
+
+        queries, commits = [], []
+        monkeypatch.setattr(db, "query", lambda *a: queries.append(a))
+        monkeypatch.setattr(db, "commit", lambda: commits.append(1))
+        result = updater.update_open_paper_trades(db, prices={"NFO:NIFTY26MAR22500CE": 104.0, "NFO:OTHER": 1.0})
+
+        assert (queries, commits, result["updated_count"]) == ([], [], 0)
+        assert trade.current_price == 100.0
+
+        monkeypatch.undo()
+        monkeypatch.setattr(updater, "_paper_triggers", updater.TriggerIndex())
+        trade.status = "MANUAL_CLOSE"
+        db.commit()
+        updater.track_paper_trade(trade)
+        assert len(updater._paper_triggers) == 0
+    finally:
+        db.close()
@@ -1,6 +1,6 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from app.strategies.base import Strategy, Signal
@@ -22,6 +22,11 @@ class BacktestMetrics:
     profit_factor: float = 0
     trades: List[Dict[str, Any]] = field(default_factory=list)
 
+def _price_level(value: float) -> Optional[float]:
+    """NaN/zero levels in a signal series mean "not set", like ``None`` on a Signal."""
+    return value if value and not np.isnan(value) else None
+
+
 class Backtester:
     """Backtesting engine for strategies"""
     
@@ -48,18 +53,54 @@ class Backtester:
             logger.log_error("Invalid data for backtesting", {"symbol": symbol})
             return BacktestMetrics()
         
-        metrics = BacktestMetrics()
+        series = self._signal_series(data)
+        if series is not None:
+            equity_curve = self._simulate_signal_series(data, series, symbol)
+        else:
+            equity_curve = self._run_bars(data, symbol)
+        
+        # Close any remaining positions at last price
+        last_price = data["close"].iloc[-1]
+        for symbol, position in self.positions.items():
+            pnl = (last_price - position["entry_price"]) * position["quantity"]
+            self.trades.append({
+                "symbol": symbol,
+                "entry_price": position["entry_price"],
+                "exit_price": last_price,
+                "quantity": position["quantity"],
+                "pnl": pnl,
+                "pnl_percent": (pnl / (position["entry_price"] * position["quantity"])) * 100,
+                "entry_time": position["entry_time"],
+                "exit_time": data.index[-1]
+            })
+            self.current_capital += position["quantity"] * last_price
+        
+        # Calculate metrics
+        metrics = self._calculate_metrics(equity_curve)
+        metrics.trades = self.trades
+        
+        logger.log_trade({
+            "strategy": self.strategy.name,
+            "total_return": metrics.total_return,
+            "sharpe_ratio": metrics.sharpe_ratio,
+            "trades": len(self.trades)
+        })
+        
+        return metrics
+    
+    def _run_bars(self, data: pd.DataFrame, symbol: str) -> List[float]:
+        """Per-bar simulation driven by ``on_bar`` or ``generate_signal``."""
         equity_curve = [self.initial_capital]
+        signal_at = self._signal_source(data)
+        closes = data["close"].to_numpy()
         
         for i in range(len(data)):
-            current_data = data.iloc[:i+1].copy()
-            
             # Generate signal
-            signal = self.strategy.generate_signal(current_data)
+            signal = signal_at(i)
             signal.symbol = symbol
             
             # Process signal
-            current_price = data["close"].iloc[i]
+            current_price = closes[i]
             
             if signal.action == "buy" and symbol not in self.positions:
                 # Open long position
@@ -133,35 +174,107 @@ class Backtester:
             
             equity_curve.append(self.current_capital)
         
-        # Close any remaining positions at last price
-        last_price = data["close"].iloc[-1]
-        for symbol, position in self.positions.items():
-            pnl = (last_price - position["entry_price"]) * position["quantity"]
-            self.trades.append({
+        return equity_curve
+
+    def _signal_series(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        series_fn = getattr(self.strategy, "generate_signal_series", None)
+        return series_fn(data) if callable(series_fn) else None
+
+    def _simulate_signal_series(self, data: pd.DataFrame, series: pd.DataFrame, symbol: str) -> List[float]:
+        """Vectorized simulation of a whole-series signal frame.
+
+        Same fill rules as :meth:`_run_bars`: buys open at the bar close with
+        95% of cash, sells close an open position, and stop-loss/take-profit
+        are checked on every bar the position is open (including the entry
+        bar). Entries and exits are located with array searches, so only the
+        trades themselves are touched in Python. The equity curve is the cash
+        balance after each bar, as in the per-bar engine.
+        """
+        closes = data["close"].to_numpy()
+        n = len(closes)
+        action = series["action"].to_numpy()
+        stop_losses = series["stop_loss"].to_numpy(dtype=float)
+        take_profits = series["take_profit"].to_numpy(dtype=float)
+        buys = np.flatnonzero(action == "buy")
+        sells = np.flatnonzero(action == "sell")
+        cash = np.full(n, np.nan)
+
+        i = 0
+        while True:
+            k = int(np.searchsorted(buys, i))
+            if k == len(buys):
+                break
+            entry = int(buys[k])
+            entry_price = closes[entry]
+            quantity = (self.current_capital * 0.95) / entry_price
+            self.current_capital -= quantity * entry_price
+            cash[entry] = self.current_capital
+            stop_loss = _price_level(stop_losses[entry])
+            take_profit = _price_level(take_profits[entry])
+
+            # A sell on a later bar closes before that bar's SL/TP check.
+            j = int(np.searchsorted(sells, entry, side="right"))
+            next_sell = int(sells[j]) if j < len(sells) else n
+            window = closes[entry:next_sell]
+            hits = np.zeros(len(window), dtype=bool)
+            if stop_loss is not None:
+                hits |= window <= stop_loss
+            if take_profit is not None:
+                hits |= window >= take_profit
+
+            reason = None
+            if hits.any():
+                exit_bar = entry + int(np.argmax(hits))
+                reason = "stop_loss" if stop_loss is not None and closes[exit_bar] <= stop_loss else "take_profit"
+            elif next_sell < n:
+                exit_bar = next_sell
+            else:
+                # Still open at the end; closed out with the other leftovers.
+                self.positions[symbol] = {
+                    "type": "long",
+                    "entry_price": entry_price,
+                    "quantity": quantity,
+                    "entry_time": data.index[entry],
+                    "stop_loss": stop_loss,
+                    "take_profit": take_profit,
+                }
+                break
+
+            exit_price = closes[exit_bar]
+            pnl = (exit_price - entry_price) * quantity
+            trade = {
                 "symbol": symbol,
-                "entry_price": position["entry_price"],
-                "exit_price": last_price,
-                "quantity": position["quantity"],
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "quantity": quantity,
                 "pnl": pnl,
-                "pnl_percent": (pnl / (position["entry_price"] * position["quantity"])) * 100,
-                "entry_time": position["entry_time"],
-                "exit_time": data.index[-1]
-            })
-            self.current_capital += position["quantity"] * last_price
-        
-        # Calculate metrics
-        metrics = self._calculate_metrics(equity_curve)
-        metrics.trades = self.trades
-        
-        logger.log_trade({
-            "strategy": self.strategy.name,
-            "total_return": metrics.total_return,
-            "sharpe_ratio": metrics.sharpe_ratio,
-            "trades": len(self.trades)
-        })
-        
-        return metrics
-    
+                "pnl_percent": (pnl / (entry_price * quantity)) * 100,
+                "entry_time": data.index[entry],
+                "exit_time": data.index[exit_bar],
+            }
+            if reason:
+                trade["reason"] = reason
+            self.trades.append(trade)
+            self.current_capital += quantity * exit_price
+            cash[exit_bar] = self.current_capital
+            i = exit_bar + 1
+
+        equity = pd.Series(cash).ffill().fillna(self.initial_capital).tolist()
+        return [self.initial_capital] + equity
+
+    def _signal_source(self, data: pd.DataFrame) -> Callable[[int], Signal]:
+        """Per-bar signal function for this run.
+
+        Strategies that precompute indicators in ``prepare`` are driven bar by
+        bar through ``on_bar``; anything else gets the growing prefix of
+        ``data`` (a slice, not a copy) as before.
+        """
+        prepare = getattr(self.strategy, "prepare", None)
+        indicators = prepare(data) if callable(prepare) else None
+        if indicators is not None:
+            return lambda i: self.strategy.on_bar(i, data, indicators)
+        return lambda i: self.strategy.generate_signal(data.iloc[:i + 1])
+
     def _calculate_metrics(self, equity_curve: List[float]) -> BacktestMetrics:
         """Calculate backtest metrics"""
         metrics = BacktestMetrics()
@@ -5,6 +5,8 @@ from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from datetime import datetime
 
+from app.strategies.indicator_cache import indicator_cache
+
 @dataclass
 class Signal:
     """Trading signal from strategy"""
@@ -34,6 +36,42 @@ class Strategy(ABC):
         """Validate that required data is available"""
         pass
 
+    def prepare(self, data: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """Precompute indicator arrays over the full backtest frame.
+
+        Returning None (the default) makes the backtester fall back to calling
+        ``generate_signal`` with the growing prefix of ``data``.
+        """
+        return None
+
+    def on_bar(self, i: int, data: pd.DataFrame, indicators: Dict[str, Any]) -> Signal:
+        """Signal for bar ``i`` using arrays from :meth:`prepare`."""
+        return self.generate_signal(data.iloc[:i + 1])
+
+    def generate_signal_series(self, data: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Signals for every bar at once, for the vectorized backtest.
+
+        Returns a frame aligned with ``data`` holding ``action``
+        (buy/sell/hold), ``entry_price``, ``stop_loss`` and ``take_profit``
+        (NaN where unset), or None if the strategy only works bar by bar.
+        """
+        return None
+
+
+def signal_series_frame(data: pd.DataFrame, buy: np.ndarray, sell: np.ndarray, stop_loss=None, take_profit=None) -> pd.DataFrame:
+    """Build a ``generate_signal_series`` frame; ``buy`` wins where both are set."""
+    close = data["close"].to_numpy(dtype=float)
+    nan = np.full(len(data), np.nan)
+    return pd.DataFrame(
+        {
+            "action": np.where(buy, "buy", np.where(sell, "sell", "hold")).astype(object),
+            "entry_price": np.where(buy, close, np.nan),
+            "stop_loss": np.where(buy, stop_loss, np.nan) if stop_loss is not None else nan,
+            "take_profit": np.where(buy, take_profit, np.nan) if take_profit is not None else nan,
+        },
+        index=data.index,
+    )
+
 class MovingAverageCrossover(Strategy):
     """Moving Average Crossover Strategy"""
     
@@ -63,14 +101,46 @@ class MovingAverageCrossover(Strategy):
         fast_ma = data["close"].rolling(window=self.fast_period).mean()
         slow_ma = data["close"].rolling(window=self.slow_period).mean()
         
-        # Get latest values
-        current_price = data["close"].iloc[-1]
-        fast_ma_val = fast_ma.iloc[-1]
-        slow_ma_val = slow_ma.iloc[-1]
-        
-        prev_fast_ma = fast_ma.iloc[-2]
-        prev_slow_ma = slow_ma.iloc[-2]
-        
+        return self._crossover_signal(
+            data["close"].iloc[-1],
+            fast_ma.iloc[-1],
+            slow_ma.iloc[-1],
+            fast_ma.iloc[-2],
+            slow_ma.iloc[-2],
+        )
+
+    def prepare(self, data: pd.DataFrame) -> Dict[str, Any]:
+        window = indicator_cache.window(data)
+        return {
+            "close": window.close(),
+            "fast_ma": window.sma(self.fast_period),
+            "slow_ma": window.sma(self.slow_period),
+        }
+
+    def on_bar(self, i: int, data: pd.DataFrame, indicators: Dict[str, Any]) -> Signal:
+        if i + 1 < self.slow_period:
+            return Signal(timestamp=datetime.now(), symbol="", action="hold", strength=0)
+        fast_ma, slow_ma = indicators["fast_ma"], indicators["slow_ma"]
+        return self._crossover_signal(indicators["close"][i], fast_ma[i], slow_ma[i], fast_ma[i - 1], slow_ma[i - 1])
+
+    def generate_signal_series(self, data: pd.DataFrame) -> pd.DataFrame:
+        ind = self.prepare(data)
+        fast_ma, slow_ma = ind["fast_ma"], ind["slow_ma"]
+        prev_fast, prev_slow = np.roll(fast_ma, 1), np.roll(slow_ma, 1)
+        ready = np.arange(len(data)) + 1 >= max(self.slow_period, 2)
+        with np.errstate(invalid="ignore"):
+            buy = ready & (prev_fast <= prev_slow) & (fast_ma > slow_ma)
+            sell = ready & ~buy & (prev_fast >= prev_slow) & (fast_ma < slow_ma)
+        close = ind["close"]
+        return signal_series_frame(
+            data,
+            buy,
+            sell,
+            stop_loss=close * (1 - self.stop_loss_percent / 100),
+            take_profit=close * (1 + self.take_profit_percent / 100),
+        )
+
+    def _crossover_signal(self, current_price, fast_ma_val, slow_ma_val, prev_fast_ma, prev_slow_ma) -> Signal:
         # Determine signal
         if prev_fast_ma <= prev_slow_ma and fast_ma_val > slow_ma_val:
             # Bullish crossover
@@ -137,14 +207,41 @@ class RSIStrategy(Strategy):
         rsi = self.calculate_rsi(data["close"])
         current_rsi = rsi.iloc[-1]
         prev_rsi = rsi.iloc[-2] if len(rsi) > 1 else current_rsi
-        
+        return self._rsi_signal(current_rsi, prev_rsi, data["close"].iloc[-1])
+
+    def prepare(self, data: pd.DataFrame) -> Dict[str, Any]:
+        window = indicator_cache.window(data)
+        return {
+            "close": window.close(),
+            "rsi": window.get("rsi", self.period, lambda: self.calculate_rsi(data["close"]).to_numpy()),
+        }
+
+    def on_bar(self, i: int, data: pd.DataFrame, indicators: Dict[str, Any]) -> Signal:
+        if i + 1 < self.period:
+            return Signal(timestamp=datetime.now(), symbol="", action="hold", strength=0)
+        rsi = indicators["rsi"]
+        prev_rsi = rsi[i - 1] if i > 0 else rsi[i]
+        return self._rsi_signal(rsi[i], prev_rsi, indicators["close"][i])
+
+    def generate_signal_series(self, data: pd.DataFrame) -> pd.DataFrame:
+        rsi = self.prepare(data)["rsi"]
+        prev_rsi = np.roll(rsi, 1)
+        if len(rsi):
+            prev_rsi[0] = rsi[0]
+        ready = np.arange(len(data)) + 1 >= self.period
+        with np.errstate(invalid="ignore"):
+            buy = ready & (prev_rsi > self.oversold) & (rsi <= self.oversold)
+            sell = ready & ~buy & (prev_rsi < self.overbought) & (rsi >= self.overbought)
+        return signal_series_frame(data, buy, sell)
+
+    def _rsi_signal(self, current_rsi, prev_rsi, current_price) -> Signal:
         if prev_rsi > self.oversold and current_rsi <= self.oversold:
             return Signal(
                 timestamp=datetime.now(),
                 symbol="",
                 action="buy",
                 strength=0.7,
-                entry_price=data["close"].iloc[-1]
+                entry_price=current_price
             )
         elif prev_rsi < self.overbought and current_rsi >= self.overbought:
             return Signal(
@@ -185,14 +282,36 @@ class MomentumStrategy(Strategy):
         
         # Calculate momentum
         price_change = (data["close"].iloc[-1] - data["close"].iloc[-self.period-1]) / data["close"].iloc[-self.period-1]
-        
+        return self._momentum_signal(price_change, data["close"].iloc[-1])
+
+    def prepare(self, data: pd.DataFrame) -> Dict[str, Any]:
+        return {"close": data["close"].to_numpy()}
+
+    def on_bar(self, i: int, data: pd.DataFrame, indicators: Dict[str, Any]) -> Signal:
+        if i < self.period:
+            return Signal(timestamp=datetime.now(), symbol="", action="hold", strength=0)
+        close = indicators["close"]
+        base = close[i - self.period]
+        return self._momentum_signal((close[i] - base) / base, close[i])
+
+    def generate_signal_series(self, data: pd.DataFrame) -> pd.DataFrame:
+        close = data["close"].to_numpy(dtype=float)
+        base = np.roll(close, self.period)
+        ready = np.arange(len(data)) >= self.period
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price_change = np.where(ready, (close - base) / base, 0.0)
+        buy = ready & (price_change > self.threshold)
+        sell = ready & (price_change < -self.threshold)
+        return signal_series_frame(data, buy, sell)
+
+    def _momentum_signal(self, price_change, current_price) -> Signal:
         if price_change > self.threshold:
             return Signal(
                 timestamp=datetime.now(),
                 symbol="",
                 action="buy",
                 strength=min(abs(price_change) / 0.1, 1.0),
-                entry_price=data["close"].iloc[-1]
+                entry_price=current_price
             )
         elif price_change < -self.threshold:
             return Signal(
@@ -230,22 +349,79 @@ class IntradayProfessionalStrategy(Strategy):
         
         # Find the last non-empty signal
         signals_df = df[df['Signal'] != '']
-        
+        signal_pos = None
         if not signals_df.empty:
-            last_row = signals_df.iloc[-1]
             signal_idx = signals_df.index[-1]
-
-            # If signal is very recent (within last 5 candles), use it.
             # Works for both numeric and datetime indexes.
             try:
                 signal_pos = int(df.index.get_loc(signal_idx))
-                current_pos = len(df) - 1
-                is_recent = (current_pos - signal_pos) <= 5
             except Exception:
-                is_recent = False
+                signal_pos = None
+            signal_value = signals_df['Signal'].iloc[-1]
+        else:
+            signal_value = ''
+
+        last_row = df.iloc[-1]
+        return self._signal_at(
+            len(df) - 1,
+            signal_value,
+            signal_pos,
+            last_row['close'],
+            last_row['EMA9'],
+            last_row['EMA21'],
+            last_row['RSI'],
+            last_row['MACD_hist'],
+            last_row['VWAP'],
+            last_row['Supertrend'],
+        )
+
+    def prepare(self, data: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        # Indicators and the signal state machine are causal, so one pass over
+        # the full frame gives every prefix's values.
+        if not data.index.is_unique:
+            return None
+        # ``capital`` does not affect the signals, so grid points share the
+        # arrays. Only copies are cached, never the enriched frame itself.
+        return dict(indicator_cache.get(data, 'intraday_professional', (), lambda: self._professional_arrays(data)))
+
+    def _professional_arrays(self, data: pd.DataFrame) -> Dict[str, np.ndarray]:
+        df = professional_generate_signals(data, self.capital)
+        signal = df['Signal'].to_numpy(copy=True)
+        positions = np.where(signal != '', np.arange(len(df)), -1)
+        return {
+            'signal': signal,
+            'last_signal_pos': np.maximum.accumulate(positions) if len(positions) else positions,
+            'close': df['close'].to_numpy(dtype=float, copy=True),
+            'ema9': df['EMA9'].to_numpy(dtype=float, copy=True),
+            'ema21': df['EMA21'].to_numpy(dtype=float, copy=True),
+            'rsi': df['RSI'].to_numpy(dtype=float, copy=True),
+            'macd_hist': df['MACD_hist'].to_numpy(dtype=float, copy=True),
+            'vwap': df['VWAP'].to_numpy(dtype=float, copy=True),
+            'supertrend': df['Supertrend'].to_numpy(dtype=float, copy=True),
+        }
+
+    def on_bar(self, i: int, data: pd.DataFrame, indicators: Dict[str, Any]) -> Signal:
+        pos = int(indicators['last_signal_pos'][i])
+        return self._signal_at(
+            i,
+            indicators['signal'][pos] if pos >= 0 else '',
+            pos if pos >= 0 else None,
+            indicators['close'][i],
+            indicators['ema9'][i],
+            indicators['ema21'][i],
+            indicators['rsi'][i],
+            indicators['macd_hist'][i],
+            indicators['vwap'][i],
+            indicators['supertrend'][i],
+        )
+
+    def _signal_at(self, current_pos, signal_value, signal_pos, price, ema9, ema21, rsi, macd_hist, vwap, supertrend) -> Signal:
+        if signal_value:
+            # If signal is very recent (within last 5 candles), use it.
+            is_recent = signal_pos is not None and (current_pos - signal_pos) <= 5
 
             if is_recent:
-                action = last_row['Signal'].lower()
+                action = signal_value.lower()
                 if 'long' in action:
                     action = 'buy'
                 elif 'short' in action:
@@ -258,20 +434,12 @@ class IntradayProfessionalStrategy(Strategy):
                     symbol=self.parameters.get('symbol', ''),
                     action=action,
                     strength=1.0,
-                    entry_price=df['close'].iloc[-1],
-                    stop_loss=df['Supertrend'].iloc[-1] if 'Supertrend' in df.columns else None,
+                    entry_price=price,
+                    stop_loss=supertrend,
                     take_profit=None
                 )
         
         # No recent signal - determine current market bias
-        last_row = df.iloc[-1]
-        price = last_row['close']
-        ema9 = last_row['EMA9']
-        ema21 = last_row['EMA21']
-        rsi = last_row['RSI']
-        macd_hist = last_row['MACD_hist']
-        vwap = last_row['VWAP']
-        
         # Count bullish/bearish indicators
         bullish_count = 0
         bearish_count = 0
@@ -313,7 +481,7 @@ class IntradayProfessionalStrategy(Strategy):
             action=action,
             strength=strength,
             entry_price=price,
-            stop_loss=last_row['Supertrend'] if 'Supertrend' in df.columns else None,
+            stop_loss=supertrend,
             take_profit=None
         )
 
@@ -0,0 +1,161 @@
+"""
+Indicator cache shared across backtest runs.
+
+A walk-forward grid rebuilds the strategy for every parameter combination
+and backtests it over the same train window, so moving averages, RSI and ATR
+for a given period get recomputed once per grid point. Strategies fetch those
+arrays here instead, keyed by (data fingerprint, indicator name, params), so
+each distinct indicator is computed once per window.
+
+Only whole-frame computations (``prepare``/``generate_signal_series``) go
+through the cache; growing-prefix calls would never hit.
+
+Entries are kept only inside a :meth:`IndicatorCache.scope` (a walk-forward
+run or one grid search) and dropped when the outermost scope exits; outside a
+scope values are computed and returned uncached. Cached values are frozen
+numpy arrays, or dicts of them, bounded by entry count and total bytes.
+"""
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Hashable, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+_FINGERPRINT_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+def fingerprint(data: pd.DataFrame) -> str:
+    """Content hash of a frame's OHLCV values and index."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(len(data)).encode())
+    index = data.index
+    if isinstance(index, pd.DatetimeIndex):
+        digest.update(np.ascontiguousarray(index.asi8).tobytes())
+    else:
+        digest.update(pd.util.hash_pandas_object(index, index=False).to_numpy().tobytes())
+    for column in _FINGERPRINT_COLUMNS:
+        if column in data.columns:
+            digest.update(column.encode())
+            digest.update(np.ascontiguousarray(data[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def _freeze(value: Any) -> int:
+    """Make ``value``'s arrays read-only and return their size in bytes."""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(_freeze(v) for v in value.values())
+    return 0
+
+
+class IndicatorCache:
+    """Scoped LRU of indicator arrays, bounded by entries and bytes; values are read-only."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(1, int(max_bytes))
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._scopes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def open_scope(self) -> None:
+        with self._lock:
+            self._scopes += 1
+
+    def close_scope(self) -> None:
+        with self._lock:
+            self._scopes = max(0, self._scopes - 1)
+            if not self._scopes:
+                self._entries.clear()
+                self._bytes = 0
+
+    @property
+    def active(self) -> bool:
+        return self._scopes > 0
+
+    @contextmanager
+    def scope(self) -> Iterator["IndicatorCache"]:
+        """Keep computed indicators until the outermost scope exits."""
+        self.open_scope()
+        try:
+            yield self
+        finally:
+            self.close_scope()
+
+    def get(self, data: pd.DataFrame, name: str, params: Hashable, compute: Callable[[], Any], key: str = None) -> Any:
+        """Return the cached value, or ``compute()`` it once for this data window.
+
+        ``key`` is the precomputed :func:`fingerprint` of ``data``; pass it when
+        fetching several indicators for the same frame.
+        """
+        if not self.active:
+            value = compute()
+            _freeze(value)
+            return value
+        cache_key = (key or fingerprint(data), name, params)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = compute()
+        size = _freeze(value)
+        with self._lock:
+            if not self._scopes or size > self.max_bytes:
+                return value
+            previous = self._entries.pop(cache_key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            self._entries[cache_key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+        return value
+
+    def window(self, data: pd.DataFrame) -> "WindowIndicators":
+        return WindowIndicators(self, data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+class WindowIndicators:
+    """Common indicators for one data window, fingerprinted once (inside a scope)."""
+
+    def __init__(self, cache: IndicatorCache, data: pd.DataFrame):
+        self.cache = cache
+        self.data = data
+        self.key = fingerprint(data) if cache.active else None
+
+    def get(self, name: str, params: Hashable, compute: Callable[[], Any]) -> Any:
+        return self.cache.get(self.data, name, params, compute, key=self.key)
+
+    def close(self) -> np.ndarray:
+        return self.get("close", (), lambda: self.data["close"].to_numpy(dtype=float).copy())
+
+    def sma(self, period: int) -> np.ndarray:
+        return self.get("sma", int(period), lambda: self.data["close"].rolling(window=period).mean().to_numpy())
+
+
+indicator_cache = IndicatorCache()
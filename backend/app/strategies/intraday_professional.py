@@ -34,83 +34,124 @@ def macd(df, fast=12, slow=26, signal=9, col='close'):
 
 def supertrend(df, period=10, multiplier=3):
     hl2 = (df['high'] + df['low']) / 2
-    atr = df['high'].combine(df['low'], max) - df['low'].combine(df['high'], min)
+    atr = (df['high'] - df['low']).abs()
     atr = atr.rolling(window=period).mean()
-    upperband = hl2 + (multiplier * atr)
-    lowerband = hl2 - (multiplier * atr)
-    supertrend = np.zeros(len(df))
-    in_uptrend = True
-    for i in range(1, len(df)):
-        if df['close'][i] > upperband[i-1]:
-            in_uptrend = True
-        elif df['close'][i] < lowerband[i-1]:
-            in_uptrend = False
-        supertrend[i] = upperband[i] if in_uptrend else lowerband[i]
+    upperband = (hl2 + (multiplier * atr)).to_numpy()
+    lowerband = (hl2 - (multiplier * atr)).to_numpy()
+    close = df['close'].to_numpy()
+    # Trend flips when close breaks the previous bar's band and holds otherwise.
+    flips = np.full(len(df), np.nan)
+    if len(df) > 1:
+        breaks_up = close[1:] > upperband[:-1]
+        breaks_down = close[1:] < lowerband[:-1]
+        flips[1:] = np.where(breaks_up, 1.0, np.where(breaks_down, 0.0, np.nan))
+    flips[0] = 1.0
+    in_uptrend = pd.Series(flips).ffill().to_numpy().astype(bool)
+    supertrend = np.where(in_uptrend, upperband, lowerband)
+    if len(df):
+        supertrend[0] = 0.0
     return pd.Series(supertrend, index=df.index)
 
 # --- Signal Logic ---
-def generate_signals(df, capital=0):
-    df = df.copy()
-    df['VWAP'] = vwap(df)
-    df['EMA9'] = ema(df, 9)
-    df['EMA21'] = ema(df, 21)
-    df['RSI'] = rsi(df, 14)
-    df['MACD'], df['MACD_signal'], df['MACD_hist'] = macd(df)
-    df['Supertrend'] = supertrend(df, 10, 3)
-    df['Signal'] = ''
-    df['Debug'] = ''
-    last_signal = None
-    for i in range(21, len(df)):
-        price = df['close'][i]
-        above_vwap = price > df['VWAP'][i]
-        ema9 = df['EMA9'][i]
-        ema21 = df['EMA21'][i]
-        ema9_prev = df['EMA9'][i-1]
-        ema21_prev = df['EMA21'][i-1]
-        
+_FIRST_SIGNAL_BAR = 21
+
+
+def _signal_conditions(df):
+    """Entry/exit conditions for every bar as boolean arrays."""
+    price = df['close'].to_numpy()
+    ema9 = df['EMA9'].to_numpy()
+    ema21 = df['EMA21'].to_numpy()
+    ema9_prev = np.roll(ema9, 1)
+    ema21_prev = np.roll(ema21, 1)
+    rsi_val = df['RSI'].to_numpy()
+    macd_hist = df['MACD_hist'].to_numpy()
+    macd_hist_prev = np.roll(macd_hist, 1)
+    supertrend_val = df['Supertrend'].to_numpy()
+
+    with np.errstate(invalid='ignore'):
+        above_vwap = price > df['VWAP'].to_numpy()
         # More sensitive trend detection
-        ema_bullish = ema9 > ema21 and (ema9 - ema9_prev) > 0
-        ema_bearish = ema9 < ema21 and (ema9 - ema9_prev) < 0
-        ema_cross_up = ema9_prev <= ema21_prev and ema9 > ema21
-        ema_cross_down = ema9_prev >= ema21_prev and ema9 < ema21
-        
-        rsi_val = df['RSI'][i]
-        macd_hist = df['MACD_hist'][i]
-        macd_hist_prev = df['MACD_hist'][i-1]
+        ema_bullish = (ema9 > ema21) & ((ema9 - ema9_prev) > 0)
+        ema_bearish = (ema9 < ema21) & ((ema9 - ema9_prev) < 0)
+        ema_cross_up = (ema9_prev <= ema21_prev) & (ema9 > ema21)
+        ema_cross_down = (ema9_prev >= ema21_prev) & (ema9 < ema21)
         macd_rising = macd_hist > macd_hist_prev
         macd_falling = macd_hist < macd_hist_prev
-        supertrend_val = df['Supertrend'][i]
-        
-        # IMPROVED Entry Logic - Stricter conditions for better win rate
+        rsi_ok = (35 < rsi_val) & (rsi_val < 65)  # Tighter RSI range to avoid extremes
+
         # Long Entry - ALL conditions must align for high-probability setup
-        if (above_vwap and 
-            (ema_cross_up or (ema_bullish and ema9 > ema21 * 1.002)) and  # Stronger EMA separation
-            35 < rsi_val < 65 and  # Tighter RSI range to avoid extremes
-            macd_hist > 0 and macd_rising and  # Both MACD conditions required
-            price > supertrend_val):  # Price must be above Supertrend for confirmation
-            df.at[df.index[i], 'Signal'] = 'LONG'
-            last_signal = 'LONG'
+        long_entry = (
+            above_vwap
+            & (ema_cross_up | (ema_bullish & (ema9 > ema21 * 1.002)))  # Stronger EMA separation
+            & rsi_ok
+            & (macd_hist > 0) & macd_rising  # Both MACD conditions required
+            & (price > supertrend_val)  # Price must be above Supertrend for confirmation
+        )
         # Short Entry - ALL conditions must align
-        elif (not above_vwap and 
-              (ema_cross_down or (ema_bearish and ema9 < ema21 * 0.998)) and  # Stronger EMA separation
-              35 < rsi_val < 65 and  # Tighter RSI range  
-              macd_hist < 0 and macd_falling and  # Both MACD conditions required
-              price < supertrend_val):  # Price must be below Supertrend for confirmation
-            df.at[df.index[i], 'Signal'] = 'SHORT'
-            last_signal = 'SHORT'
+        short_entry = (
+            ~above_vwap
+            & (ema_cross_down | (ema_bearish & (ema9 < ema21 * 0.998)))
+            & rsi_ok
+            & (macd_hist < 0) & macd_falling
+            & (price < supertrend_val)
+        )
         # Exit with tighter conditions to lock profits
-        elif last_signal == 'LONG' and (price < supertrend_val or rsi_val > 70 or macd_hist < 0):
-            df.at[df.index[i], 'Signal'] = 'EXIT LONG'
+        exit_long = (price < supertrend_val) | (rsi_val > 70) | (macd_hist < 0)
+        exit_short = (price > supertrend_val) | (rsi_val < 30) | (macd_hist > 0)
+
+    return {
+        'price': price, 'ema9': ema9, 'ema21': ema21, 'rsi': rsi_val,
+        'macd_hist': macd_hist, 'supertrend': supertrend_val,
+        'above_vwap': above_vwap, 'ema_bullish': ema_bullish, 'ema_bearish': ema_bearish,
+        'macd_rising': macd_rising,
+        'long_entry': long_entry, 'short_entry': short_entry,
+        'exit_long': exit_long, 'exit_short': exit_short,
+    }
+
+
+def _signal_states(long_entry, short_entry, exit_long, exit_short, start=_FIRST_SIGNAL_BAR):
+    """LONG/SHORT/EXIT state machine; the only per-bar pass left."""
+    signals = [''] * len(long_entry)
+    last_signal = None
+    long_entry, short_entry = long_entry.tolist(), short_entry.tolist()
+    exit_long, exit_short = exit_long.tolist(), exit_short.tolist()
+    for i in range(start, len(signals)):
+        if long_entry[i]:
+            signals[i] = last_signal = 'LONG'
+        elif short_entry[i]:
+            signals[i] = last_signal = 'SHORT'
+        elif last_signal == 'LONG' and exit_long[i]:
+            signals[i] = 'EXIT LONG'
             last_signal = None
-        elif last_signal == 'SHORT' and (price > supertrend_val or rsi_val < 30 or macd_hist > 0):
-            df.at[df.index[i], 'Signal'] = 'EXIT SHORT'
+        elif last_signal == 'SHORT' and exit_short[i]:
+            signals[i] = 'EXIT SHORT'
             last_signal = None
-        # Debug info with more details
-        debug_msg = f"Price={price:.2f}, VWAP={df['VWAP'][i]:.2f}, above_vwap={above_vwap}, "
-        debug_msg += f"EMA9={ema9:.2f}, EMA21={ema21:.2f}, ema_bullish={ema_bullish}, ema_bearish={ema_bearish}, "
-        debug_msg += f"RSI={rsi_val:.2f}, MACD_hist={macd_hist:.4f}, macd_rising={macd_rising}, "
-        debug_msg += f"Supertrend={supertrend_val:.2f}, Signal={df.at[df.index[i], 'Signal']}"
-        df.at[df.index[i], 'Debug'] = debug_msg
+    return signals
+
+
+def generate_signals(df, capital=0, debug=False):
+    """Add indicator columns plus ``Signal``; ``debug=True`` also fills ``Debug``."""
+    df = df.copy()
+    df['VWAP'] = vwap(df)
+    df['EMA9'] = ema(df, 9)
+    df['EMA21'] = ema(df, 21)
+    df['RSI'] = rsi(df, 14)
+    df['MACD'], df['MACD_signal'], df['MACD_hist'] = macd(df)
+    df['Supertrend'] = supertrend(df, 10, 3)
+
+    c = _signal_conditions(df)
+    signals = _signal_states(c['long_entry'], c['short_entry'], c['exit_long'], c['exit_short'])
+    df['Signal'] = np.array(signals, dtype=object)
+    debug_col = [''] * len(df)
+    if debug:
+        vwap_vals = df['VWAP'].to_numpy()
+        for i in range(_FIRST_SIGNAL_BAR, len(df)):
+            debug_msg = f"Price={c['price'][i]:.2f}, VWAP={vwap_vals[i]:.2f}, above_vwap={c['above_vwap'][i]}, "
+            debug_msg += f"EMA9={c['ema9'][i]:.2f}, EMA21={c['ema21'][i]:.2f}, ema_bullish={c['ema_bullish'][i]}, ema_bearish={c['ema_bearish'][i]}, "
+            debug_msg += f"RSI={c['rsi'][i]:.2f}, MACD_hist={c['macd_hist'][i]:.4f}, macd_rising={c['macd_rising'][i]}, "
+            debug_msg += f"Supertrend={c['supertrend'][i]:.2f}, Signal={signals[i]}"
+            debug_col[i] = debug_msg
+    df['Debug'] = np.array(debug_col, dtype=object)
     return df
 
 # --- Backtesting Module ---
@@ -215,7 +256,7 @@ def backtest(df, capital=100000):
 if __name__ == "__main__":
     # Load your 5-min OHLCV data as a DataFrame with columns: ['open','high','low','close','volume']
     df = pd.read_csv('nifty_5min.csv')
-    df = generate_signals(df)
+    df = generate_signals(df, debug=True)
     print(df[['close','Signal','Debug']].tail(20))
     results = backtest(df)
     print('Backtest Results:', results)
@@ -11,10 +11,13 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from itertools import chain
 from kiteconnect import KiteConnect
+from app.engine.broker_executor import bind_kite
+from app.engine.rate_limiter import rate_limited
 from app.core.database import SessionLocal
 from app.models.auth import BrokerCredential
 from app.core.security import encryption_manager
 from app.core.config import get_settings
+from app.engine.price_bus import price_bus
 
 class NewsAnalyzer:
     """Fetch and analyze market news with sentiment analysis"""
@@ -198,6 +201,8 @@ class MarketTrendAnalyzer:
         # Zerodha credentials can be provided via environment or .env to source quotes directly from Kite.
         self.kite_api_key = os.getenv('ZERODHA_API_KEY') or settings.ZERODHA_API_KEY or None
         self.kite_access_token = os.getenv('ZERODHA_ACCESS_TOKEN') or None
+        self._kite = None
+        self._kite_credentials = None
     
     async def get_market_trends(self) -> Dict[str, Any]:
         """Get current market trends for major indices"""
@@ -274,10 +279,9 @@ class MarketTrendAnalyzer:
         }
 
         try:
-            kite = KiteConnect(api_key=self.kite_api_key)
-            kite.set_access_token(self.kite_access_token)
             instruments = [sym for sym in mapping.values() if sym]
-            quotes = kite.ltp(instruments)
+            # ltp carries no previous close; the bus's ohlc poll does.
+            quotes = price_bus.ohlc(self._kite_client(), instruments)
         except Exception as exc:
             # Silently fail and fallback to NSE if Zerodha credentials invalid
             return {}
@@ -309,6 +313,15 @@ class MarketTrendAnalyzer:
 
         return rows
 
+    def _kite_client(self) -> KiteConnect:
+        """Reuse one client per credential pair so the price bus can share its snapshot."""
+        credentials = (self.kite_api_key, self.kite_access_token)
+        if self._kite is None or self._kite_credentials != credentials:
+            kite = bind_kite(KiteConnect(api_key=self.kite_api_key))
+            kite.set_access_token(self.kite_access_token)
+            self._kite, self._kite_credentials = rate_limited(kite), credentials
+        return self._kite
+
     def _hydrate_tokens_from_db(self) -> None:
         """Load Zerodha api_key/access_token from broker_credentials when env vars are absent."""
         try:
@@ -0,0 +1,299 @@
+"""
+Multi-symbol portfolio backtester.
+
+``Backtester`` follows one symbol and commits 95% of capital to each entry.
+Production instead runs several index/stock trades at once under
+``MAX_TRADES`` and the ``max_position_pct`` / ``max_portfolio_pct`` caps, with a
+cooldown after a stop-loss on the same symbol. This engine simulates that
+setup over time-aligned (symbols x bars) arrays with one shared cash balance.
+
+Per bar, the same rules as ``Backtester`` apply to every symbol: buys open
+at the bar close, sells close an open position, and stop-loss/take-profit
+are checked on every bar a position is open. Signal/price handling is
+vectorized across symbols; the bar loop skips straight past bars with no open
+positions and no entries.
+"""
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.strategies.backtester import BacktestMetrics
+from app.strategies.base import Strategy
+
+_ACTION_CODES = {"buy": 1, "sell": -1}
+
+
+@dataclass
+class PortfolioConfig:
+    """Capital and risk caps for a portfolio run."""
+    initial_capital: float = 100000
+    max_trades: int = 3
+    max_position_pct: float = 0.10
+    max_portfolio_pct: float = 0.10
+    symbol_cooldown_bars: int = 0
+    periods_per_year: int = 252
+
+    @classmethod
+    def from_risk_config(
+        cls,
+        risk_config: Dict[str, Any],
+        max_trades: int,
+        initial_capital: float = 100000,
+        bar_minutes: int = 5,
+    ) -> "PortfolioConfig":
+        """Build from the auto-trading ``risk_config`` dict and ``MAX_TRADES``."""
+        cooldown_minutes = float(risk_config.get("symbol_cooldown_minutes", 0) or 0)
+        return cls(
+            initial_capital=initial_capital,
+            max_trades=int(max_trades),
+            max_position_pct=float(risk_config.get("max_position_pct", 1.0)),
+            max_portfolio_pct=float(risk_config.get("max_portfolio_pct", 1.0)),
+            symbol_cooldown_bars=int(math.ceil(cooldown_minutes / max(bar_minutes, 1))),
+        )
+
+
+@dataclass
+class PortfolioMetrics(BacktestMetrics):
+    """Portfolio-level metrics; the equity curve is marked to market."""
+    final_equity: float = 0
+    max_concurrent_positions: int = 0
+    avg_exposure_pct: float = 0
+    skipped_entries: Dict[str, int] = field(default_factory=dict)
+    per_symbol: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    equity_curve: List[float] = field(default_factory=list)
+
+
+def signal_series_for(strategy: Strategy, data: pd.DataFrame) -> pd.DataFrame:
+    """Whole-series signals for ``strategy``, falling back to a per-bar pass."""
+    series_fn = getattr(strategy, "generate_signal_series", None)
+    series = series_fn(data) if callable(series_fn) else None
+    if series is not None:
+        return series
+
+    prepare = getattr(strategy, "prepare", None)
+    indicators = prepare(data) if callable(prepare) else None
+    rows = []
+    for i in range(len(data)):
+        if indicators is not None:
+            signal = strategy.on_bar(i, data, indicators)
+        else:
+            signal = strategy.generate_signal(data.iloc[:i + 1])
+        rows.append((
+            signal.action,
+            signal.entry_price if signal.entry_price is not None else np.nan,
+            signal.stop_loss if signal.stop_loss else np.nan,
+            signal.take_profit if signal.take_profit else np.nan,
+        ))
+    return pd.DataFrame(rows, columns=["action", "entry_price", "stop_loss", "take_profit"], index=data.index)
+
+
+class PortfolioBacktester:
+    """Shared-capital backtest over many symbols."""
+
+    def __init__(self, config: Optional[PortfolioConfig] = None):
+        self.config = config or PortfolioConfig()
+
+    def run_strategies(
+        self,
+        data: Dict[str, pd.DataFrame],
+        strategy_factory: Callable[[str], Strategy],
+    ) -> PortfolioMetrics:
+        """Build one strategy per symbol, collect its signal series and run.
+
+        Dict order is entry priority when several symbols signal on one bar.
+        """
+        symbols = list(data)
+        series = {sym: signal_series_for(strategy_factory(sym), frame) for sym, frame in data.items()}
+        closes = pd.DataFrame({sym: frame["close"] for sym, frame in data.items()})[symbols]
+        return self.run(
+            closes,
+            pd.DataFrame({sym: s["action"] for sym, s in series.items()}).reindex(closes.index)[symbols],
+            pd.DataFrame({sym: s["stop_loss"] for sym, s in series.items()}).reindex(closes.index)[symbols],
+            pd.DataFrame({sym: s["take_profit"] for sym, s in series.items()}).reindex(closes.index)[symbols],
+        )
+
+    def run(
+        self,
+        closes: pd.DataFrame,
+        actions: pd.DataFrame,
+        stop_loss: Optional[pd.DataFrame] = None,
+        take_profit: Optional[pd.DataFrame] = None,
+    ) -> PortfolioMetrics:
+        """Simulate aligned frames (index = bars, columns = symbols).
+
+        ``actions`` holds buy/sell/hold; ``stop_loss``/``take_profit`` hold the
+        levels set on buy bars (NaN = none). Missing closes mean the symbol
+        does not trade on that bar.
+        """
+        cfg = self.config
+        symbols = [str(c) for c in closes.columns]
+        index = closes.index
+        n_symbols, n_bars = len(symbols), len(index)
+
+        price = closes.to_numpy(dtype=float).T
+        tradable = ~np.isnan(price)
+        mark = np.nan_to_num(closes.ffill().to_numpy(dtype=float).T)
+        raw_actions = actions.reindex_like(closes).to_numpy(dtype=object).T
+        code = np.zeros(raw_actions.shape, dtype=np.int8)
+        for action, value in _ACTION_CODES.items():
+            code[raw_actions == action] = value
+        code[~tradable] = 0
+        sl_levels = self._levels(stop_loss, closes)
+        tp_levels = self._levels(take_profit, closes)
+
+        is_open = np.zeros(n_symbols, dtype=bool)
+        qty = np.zeros(n_symbols)
+        cost = np.zeros(n_symbols)
+        entry_price = np.zeros(n_symbols)
+        entry_bar = np.zeros(n_symbols, dtype=np.int64)
+        pos_sl = np.full(n_symbols, np.nan)
+        pos_tp = np.full(n_symbols, np.nan)
+        cooldown_until = np.full(n_symbols, -1, dtype=np.int64)
+
+        cash = float(cfg.initial_capital)
+        equity = np.empty(n_bars)
+        exposure = np.zeros(n_bars)
+        trades: List[Dict[str, Any]] = []
+        skipped = {"max_trades": 0, "capital": 0, "cooldown": 0}
+        max_concurrent = 0
+        wants_entry = (code == 1).any(axis=0)
+
+        def close_position(s: int, t: int, exit_price: float, reason: str) -> None:
+            nonlocal cash
+            pnl = (exit_price - entry_price[s]) * qty[s]
+            trades.append({
+                "symbol": symbols[s],
+                "entry_price": float(entry_price[s]),
+                "exit_price": float(exit_price),
+                "quantity": float(qty[s]),
+                "pnl": float(pnl),
+                "pnl_percent": float(pnl / cost[s] * 100) if cost[s] else 0.0,
+                "entry_time": index[entry_bar[s]],
+                "exit_time": index[t],
+                "reason": reason,
+            })
+            cash += qty[s] * exit_price
+            is_open[s] = False
+            qty[s] = cost[s] = 0.0
+
+        for t in range(n_bars):
+            if not wants_entry[t] and not is_open.any():
+                equity[t] = cash
+                continue
+            px = price[:, t]
+
+            # Entries, in symbol (priority) order, under the shared caps.
+            candidates = np.flatnonzero((code[:, t] == 1) & ~is_open)
+            if candidates.size:
+                cooling = cooldown_until[candidates] >= t
+                skipped["cooldown"] += int(cooling.sum())
+                candidates = candidates[~cooling]
+            if candidates.size:
+                equity_now = cash + float(np.dot(qty, mark[:, t]))
+                in_use = float(cost.sum())
+                for s in candidates:
+                    if int(is_open.sum()) >= cfg.max_trades:
+                        skipped["max_trades"] += 1
+                        continue
+                    budget = min(
+                        cash,
+                        equity_now * cfg.max_position_pct,
+                        equity_now * cfg.max_portfolio_pct - in_use,
+                    )
+                    if budget <= 0:
+                        skipped["capital"] += 1
+                        continue
+                    qty[s] = budget / px[s]
+                    cost[s] = qty[s] * px[s]
+                    cash -= cost[s]
+                    in_use += cost[s]
+                    entry_price[s] = px[s]
+                    entry_bar[s] = t
+                    pos_sl[s] = sl_levels[s, t]
+                    pos_tp[s] = tp_levels[s, t]
+                    is_open[s] = True
+                max_concurrent = max(max_concurrent, int(is_open.sum()))
+
+            # Exits: sell signal first, then stop-loss, then take-profit.
+            live = is_open & tradable[:, t]
+            if live.any():
+                with np.errstate(invalid="ignore"):
+                    sell = live & (code[:, t] == -1)
+                    sl_hit = live & ~sell & (px <= pos_sl)
+                    tp_hit = live & ~sell & ~sl_hit & (px >= pos_tp)
+                for reason, mask in (("signal", sell), ("stop_loss", sl_hit), ("take_profit", tp_hit)):
+                    for s in np.flatnonzero(mask):
+                        close_position(int(s), t, px[s], reason)
+                cooldown_until[sl_hit] = t + cfg.symbol_cooldown_bars
+
+            held = float(np.dot(qty, mark[:, t]))
+            equity[t] = cash + held
+            exposure[t] = held / equity[t] if equity[t] else 0.0
+
+        if n_bars:
+            for s in np.flatnonzero(is_open):
+                close_position(int(s), n_bars - 1, mark[s, n_bars - 1], "end_of_data")
+            equity[-1] = cash
+
+        return self._metrics(trades, equity, exposure, skipped, max_concurrent, symbols)
+
+    @staticmethod
+    def _levels(levels: Optional[pd.DataFrame], closes: pd.DataFrame) -> np.ndarray:
+        if levels is None:
+            return np.full((closes.shape[1], closes.shape[0]), np.nan)
+        values = levels.reindex_like(closes).to_numpy(dtype=float).T
+        # A zero level means "not set", as on a Signal.
+        return np.where(values == 0, np.nan, values)
+
+    def _metrics(
+        self,
+        trades: List[Dict[str, Any]],
+        equity: np.ndarray,
+        exposure: np.ndarray,
+        skipped: Dict[str, int],
+        max_concurrent: int,
+        symbols: List[str],
+    ) -> PortfolioMetrics:
+        cfg = self.config
+        curve = np.concatenate([[float(cfg.initial_capital)], equity])
+        returns = np.diff(curve) / curve[:-1]
+        metrics = PortfolioMetrics(trades=trades, skipped_entries=skipped, max_concurrent_positions=max_concurrent)
+        metrics.equity_curve = curve.tolist()
+        metrics.final_equity = float(curve[-1])
+        metrics.total_return = float((curve[-1] - cfg.initial_capital) / cfg.initial_capital)
+        metrics.annual_return = float((1 + metrics.total_return) ** (cfg.periods_per_year / max(len(curve), 1)) - 1)
+        if len(returns):
+            metrics.sharpe_ratio = float(np.sqrt(cfg.periods_per_year) * returns.mean() / (returns.std() + 1e-8))
+            running_max = np.maximum.accumulate(curve)
+            metrics.max_drawdown = float(np.min((curve - running_max) / running_max))
+            metrics.avg_exposure_pct = float(exposure.mean() * 100)
+
+        pnl = np.array([t["pnl"] for t in trades], dtype=float)
+        metrics.total_trades = len(trades)
+        metrics.winning_trades = int((pnl > 0).sum())
+        metrics.losing_trades = int((pnl <= 0).sum())
+        if metrics.total_trades:
+            metrics.win_rate = metrics.winning_trades / metrics.total_trades
+        winning_pnl = float(pnl[pnl > 0].sum())
+        losing_pnl = float(-pnl[pnl <= 0].sum())
+        if metrics.winning_trades:
+            metrics.avg_win = winning_pnl / metrics.winning_trades
+        if metrics.losing_trades:
+            metrics.avg_loss = losing_pnl / metrics.losing_trades
+        if losing_pnl > 0:
+            metrics.profit_factor = winning_pnl / losing_pnl
+
+        trade_symbols = np.array([t["symbol"] for t in trades])
+        for sym in symbols:
+            sym_pnl = pnl[trade_symbols == sym] if len(trades) else pnl
+            metrics.per_symbol[sym] = {
+                "trades": int(len(sym_pnl)),
+                "pnl": float(sym_pnl.sum()),
+                "win_rate": float((sym_pnl > 0).mean()) if len(sym_pnl) else 0.0,
+            }
+        return metrics
@@ -0,0 +1,86 @@
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.strategies.backtester import Backtester
+from app.strategies.base import StrategyFactory
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from walkforward_backtest import EntryGuardAtrWrapper  # noqa: E402
+
+
+def _ohlcv(n=600, seed=5):
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.cumprod(1 + rng.normal(0, 0.004, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.004, n)),
+            "low": close * (1 - rng.uniform(0, 0.004, n)),
+            "close": close,
+            "volume": rng.integers(100, 1000, n).astype(float),
+        },
+        index=pd.date_range("2023-01-02 09:15", periods=n, freq="5min"),
+    )
+
+
+def _run(strategy, data, mode="auto"):
+    """``mode``: "auto" (signal series when available), "bars" (on_bar) or "prefix"."""
+    if mode in ("bars", "prefix"):
+        strategy.generate_signal_series = lambda _data: None
+    if mode == "prefix":
+        strategy.prepare = lambda _data: None
+    return asdict(Backtester(strategy).backtest(data, symbol="NIFTY"))
+
+
+STRATEGIES = [
+    ("ma_crossover", {"fast_period": 5, "slow_period": 20}),
+    ("ma_crossover", {"fast_period": 5, "slow_period": 20, "stop_loss_percent": 0.3, "take_profit_percent": 0.4}),
+    ("rsi", {"period": 14, "overbought": 60, "oversold": 40}),
+    ("momentum", {"period": 10, "threshold": 0.01}),
+    ("intraday_professional", {}),
+]
+
+
+@pytest.mark.parametrize("strategy_type,params", STRATEGIES)
+def test_vectorized_and_incremental_engines_match_prefix_engine(strategy_type, params):
+    data = _ohlcv()
+    vectorized = _run(StrategyFactory.create_strategy(strategy_type, params), data)
+    bars = _run(StrategyFactory.create_strategy(strategy_type, params), data, mode="bars")
+    prefix = _run(StrategyFactory.create_strategy(strategy_type, params), data, mode="prefix")
+
+    assert vectorized["total_trades"] > 0
+    assert vectorized == bars == prefix
+
+
+def test_entry_guard_wrapper_matches_across_engines():
+    data = _ohlcv(seed=9)
+    # Blacks out entries over the last half day of bars.
+    events = pd.DataFrame({"timestamp": [data.index[-1] + pd.Timedelta(hours=12)], "event": ["policy"]})
+
+    def wrapped():
+        base = StrategyFactory.create_strategy("ma_crossover", {"fast_period": 5, "slow_period": 20})
+        return EntryGuardAtrWrapper(base, events, event_blackout_days=1, use_atr_wrapper=True)
+
+    vectorized = _run(wrapped(), data)
+    bars = _run(wrapped(), data, mode="bars")
+    prefix = _run(wrapped(), data, mode="prefix")
+
+    assert vectorized["total_trades"] > 0
+    assert vectorized == bars == prefix
+
+
+def test_signal_series_records_stop_loss_and_take_profit_exits():
+    strategy = StrategyFactory.create_strategy(
+        "ma_crossover",
+        {"fast_period": 5, "slow_period": 20, "stop_loss_percent": 0.3, "take_profit_percent": 0.4},
+    )
+    metrics = Backtester(strategy).backtest(_ohlcv(), symbol="NIFTY")
+
+    reasons = {t.get("reason") for t in metrics.trades}
+    assert {"stop_loss", "take_profit"} <= reasons
+
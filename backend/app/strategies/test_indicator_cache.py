@@ -0,0 +1,121 @@
+import sys
+from dataclasses import asdict
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.strategies.indicator_cache import IndicatorCache, fingerprint, indicator_cache
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "tools"))
+from walkforward_backtest import choose_best_params, default_param_grid, run_backtest_once  # noqa: E402
+
+
+def _frame(n=400, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 18000 * np.cumprod(1 + rng.normal(0, 0.01, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * 1.004,
+            "low": close * 0.996,
+            "close": close,
+            "volume": np.full(n, 1000.0),
+        },
+        index=pd.date_range("2022-01-03", periods=n, freq="B"),
+    )
+
+
+def test_fingerprint_tracks_content_not_identity():
+    data = _frame()
+    assert fingerprint(data) == fingerprint(data.copy())
+    assert fingerprint(data.iloc[:200]) != fingerprint(data.iloc[1:201])
+    changed = data.copy()
+    changed.iloc[10, changed.columns.get_loc("close")] += 1
+    assert fingerprint(changed) != fingerprint(data)
+
+
+def test_cache_computes_once_evicts_lru_and_freezes_arrays():
+    cache = IndicatorCache(max_entries=2)
+    data = _frame(50)
+    calls = []
+
+    def compute(tag):
+        calls.append(tag)
+        return np.arange(3, dtype=float)
+
+    with cache.scope():
+        first = cache.get(data, "sma", 5, lambda: compute("a"))
+        assert cache.get(data.copy(), "sma", 5, lambda: compute("b")) is first
+        with pytest.raises(ValueError):
+            first[0] = 1.0
+
+        cache.get(data, "sma", 10, lambda: compute("c"))
+        cache.get(data, "rsi", 14, lambda: compute("d"))  # evicts ("sma", 5)
+        cache.get(data, "sma", 5, lambda: compute("e"))
+    assert calls == ["a", "c", "d", "e"]
+
+
+def test_cache_keeps_entries_only_inside_a_scope_and_within_its_byte_bound():
+    cache = IndicatorCache(max_bytes=3 * 8 * 100)
+    data = _frame(50)
+
+    cache.get(data, "sma", 5, lambda: np.zeros(100))
+    assert cache.stats()["entries"] == 0
+
+    with cache.scope():
+        with cache.scope():
+            for period in range(4):
+                cache.get(data, "sma", period, lambda: np.zeros(100))
+        # Four 800-byte arrays do not fit in 2400 bytes; the oldest went first.
+        assert cache.stats()["entries"] == 3
+        assert cache.stats()["bytes"] == 2400
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["bytes"] == 0
+
+
+def test_intraday_professional_caches_read_only_arrays_not_the_frame():
+    from app.strategies.base import IntradayProfessionalStrategy
+
+    data = _frame(120)
+    data.index = pd.date_range("2024-01-02 09:15", periods=len(data), freq="5min")
+    cache = IndicatorCache()
+    with mock.patch("app.strategies.base.indicator_cache", cache), cache.scope():
+        first = IntradayProfessionalStrategy({}).prepare(data)
+        second = IntradayProfessionalStrategy({"capital": 5}).prepare(data)
+
+    assert first is not second
+    assert first["close"] is second["close"]
+    assert all(isinstance(v, np.ndarray) and not v.flags.writeable for v in first.values())
+
+
+@pytest.mark.parametrize("strategy_type", ["ma_crossover", "rsi"])
+def test_grid_search_computes_each_indicator_once_per_window(strategy_type):
+    data = _frame()
+    grid = default_param_grid(strategy_type)
+    events = pd.DataFrame(columns=["timestamp", "event"])
+
+    indicator_cache.clear()
+    choose_best_params(strategy_type, grid, data, "NIFTY", events, use_atr_wrapper=True)
+    stats = indicator_cache.stats()
+
+    if strategy_type == "ma_crossover":
+        periods = {g["fast_period"] for g in grid} | {g["slow_period"] for g in grid}
+        expected = len(periods) + 2  # + close + ATR
+    else:
+        expected = len({g["period"] for g in grid}) + 2
+    assert stats["misses"] == expected
+    assert stats["hits"] > 0
+
+    indicator_cache.clear()
+    uncached = IndicatorCache(max_entries=1)
+    fresh = [asdict(m) for m in _with_cache(uncached, strategy_type, grid, data, events)]
+    cached = [asdict(m) for m in _with_cache(indicator_cache, strategy_type, grid, data, events)]
+    assert fresh == cached
+
+
+def _with_cache(cache, strategy_type, grid, data, events):
+    with mock.patch("app.strategies.base.indicator_cache", cache), mock.patch("walkforward_backtest.indicator_cache", cache):
+        return [run_backtest_once(strategy_type, p, data, "NIFTY", events, use_atr_wrapper=True) for p in grid]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from app.strategies import intraday_professional as ip
+
+
+def _frame(n=1500, seed=11, datetime_index=False):
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.cumprod(1 + rng.normal(0, 0.002, n))
+    index = pd.date_range("2024-01-01 09:15", periods=n, freq="5min") if datetime_index else None
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.002, n)),
+            "low": close * (1 - rng.uniform(0, 0.002, n)),
+            "close": close,
+            "volume": rng.integers(1, 1000, n).astype(float),
+        },
+        index=index,
+    )
+
+
+def _reference_signals(df):
+    """Bar-by-bar state machine as originally written, on the indicator columns."""
+    close, vwap = df["close"].to_numpy(), df["VWAP"].to_numpy()
+    e9, e21 = df["EMA9"].to_numpy(), df["EMA21"].to_numpy()
+    rsi, hist, st = df["RSI"].to_numpy(), df["MACD_hist"].to_numpy(), df["Supertrend"].to_numpy()
+    out, last = [""] * len(df), None
+    for i in range(21, len(df)):
+        price = close[i]
+        bull = e9[i] > e21[i] and (e9[i] - e9[i - 1]) > 0
+        bear = e9[i] < e21[i] and (e9[i] - e9[i - 1]) < 0
+        up = e9[i - 1] <= e21[i - 1] and e9[i] > e21[i]
+        down = e9[i - 1] >= e21[i - 1] and e9[i] < e21[i]
+        if (price > vwap[i] and (up or (bull and e9[i] > e21[i] * 1.002)) and 35 < rsi[i] < 65
+                and hist[i] > 0 and hist[i] > hist[i - 1] and price > st[i]):
+            out[i] = last = "LONG"
+        elif (not price > vwap[i] and (down or (bear and e9[i] < e21[i] * 0.998)) and 35 < rsi[i] < 65
+                and hist[i] < 0 and hist[i] < hist[i - 1] and price < st[i]):
+            out[i] = last = "SHORT"
+        elif last == "LONG" and (price < st[i] or rsi[i] > 70 or hist[i] < 0):
+            out[i], last = "EXIT LONG", None
+        elif last == "SHORT" and (price > st[i] or rsi[i] < 30 or hist[i] > 0):
+            out[i], last = "EXIT SHORT", None
+    return out
+
+
+def _reference_supertrend(df, period=10, multiplier=3):
+    hl2 = ((df["high"] + df["low"]) / 2).to_numpy()
+    atr = (df["high"] - df["low"]).rolling(window=period).mean().to_numpy()
+    upper, lower = hl2 + multiplier * atr, hl2 - multiplier * atr
+    close, out, up = df["close"].to_numpy(), np.zeros(len(df)), True
+    for i in range(1, len(df)):
+        if close[i] > upper[i - 1]:
+            up = True
+        elif close[i] < lower[i - 1]:
+            up = False
+        out[i] = upper[i] if up else lower[i]
+    return out
+
+
+def test_vectorized_signals_match_bar_by_bar_reference():
+    for seed, datetime_index in ((1, False), (2, True), (3, False)):
+        df = _frame(seed=seed, datetime_index=datetime_index)
+        result = ip.generate_signals(df)
+
+        np.testing.assert_allclose(result["Supertrend"], _reference_supertrend(df))
+        assert result["Signal"].tolist() == _reference_signals(result)
+        assert (result["Signal"] != "").sum() > 0
+        assert list(result.index) == list(df.index)
+        assert "Signal" not in df.columns
+
+
+def test_debug_strings_are_opt_in():
+    df = _frame(n=60)
+    assert set(ip.generate_signals(df)["Debug"]) == {""}
+
+    debug = ip.generate_signals(df, debug=True)["Debug"]
+    assert debug.iloc[:21].tolist() == [""] * 21
+    assert debug.iloc[-1].startswith("Price=") and "Signal=" in debug.iloc[-1]
+
+
+def test_short_frames_produce_no_signals():
+    result = ip.generate_signals(_frame(n=15))
+    assert result["Signal"].tolist() == [""] * 15
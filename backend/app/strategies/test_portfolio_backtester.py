@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.strategies.backtester import Backtester
+from app.strategies.base import StrategyFactory
+from app.strategies.portfolio_backtester import PortfolioBacktester, PortfolioConfig
+
+
+def _frames(symbols, n=500, seed=13):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01 09:15", periods=n, freq="5min")
+    frames = {}
+    for k, sym in enumerate(symbols):
+        close = (1000 + 100 * k) * np.cumprod(1 + rng.normal(0, 0.004, n))
+        frames[sym] = pd.DataFrame(
+            {"open": close, "high": close * 1.002, "low": close * 0.998, "close": close, "volume": 1000.0},
+            index=index,
+        )
+    return frames
+
+
+def _manual(closes, actions, stop_loss=None):
+    index = pd.RangeIndex(len(next(iter(closes.values()))))
+    return (
+        pd.DataFrame(closes, index=index),
+        pd.DataFrame(actions, index=index),
+        pd.DataFrame(stop_loss, index=index) if stop_loss else None,
+    )
+
+
+def test_single_symbol_matches_backtester_trades():
+    frames = _frames(["NIFTY"])
+    params = {"fast_period": 5, "slow_period": 20, "stop_loss_percent": 0.3, "take_profit_percent": 0.4}
+    single = Backtester(StrategyFactory.create_strategy("ma_crossover", params)).backtest(frames["NIFTY"], symbol="NIFTY")
+
+    config = PortfolioConfig(max_trades=1, max_position_pct=0.95, max_portfolio_pct=0.95)
+    portfolio = PortfolioBacktester(config).run_strategies(
+        frames, lambda sym: StrategyFactory.create_strategy("ma_crossover", params)
+    )
+
+    keys = ("entry_price", "exit_price", "quantity", "pnl", "entry_time", "exit_time")
+    assert [tuple(t[k] for k in keys) for t in portfolio.trades] == pytest.approx(
+        [tuple(t[k] for k in keys) for t in single.trades]
+    )
+    assert portfolio.final_equity == pytest.approx(single.trades and 100000 + sum(t["pnl"] for t in single.trades))
+
+
+def test_position_and_portfolio_caps_share_capital():
+    closes, actions, _ = _manual(
+        {"A": [100.0] * 4, "B": [50.0] * 4, "C": [20.0] * 4},
+        {"A": ["buy", "hold", "hold", "hold"], "B": ["buy", "hold", "hold", "hold"], "C": ["buy", "hold", "sell", "hold"]},
+    )
+    config = PortfolioConfig(initial_capital=1000, max_trades=3, max_position_pct=0.2, max_portfolio_pct=0.5)
+    metrics = PortfolioBacktester(config).run(closes, actions)
+
+    sizes = {t["symbol"]: t["quantity"] * t["entry_price"] for t in metrics.trades}
+    # A and B get 20% each; C only gets what is left under the 50% portfolio cap.
+    assert sizes == pytest.approx({"A": 200.0, "B": 200.0, "C": 100.0})
+    assert metrics.max_concurrent_positions == 3
+    assert [t["reason"] for t in metrics.trades] == ["signal", "end_of_data", "end_of_data"]
+
+
+def test_max_trades_and_stop_loss_cooldown():
+    closes, actions, stops = _manual(
+        {"A": [100, 90, 100, 100, 100], "B": [10, 10, 10, 10, 10]},
+        {"A": ["buy", "hold", "buy", "buy", "hold"], "B": ["buy", "hold", "hold", "hold", "hold"]},
+        {"A": [95, np.nan, 95, 95, np.nan], "B": [np.nan] * 5},
+    )
+    config = PortfolioConfig(initial_capital=1000, max_trades=1, max_position_pct=0.5, max_portfolio_pct=1.0, symbol_cooldown_bars=1)
+    metrics = PortfolioBacktester(config).run(closes, actions, stops)
+
+    # A is first in priority, so B is blocked by max_trades; A stops out at bar 1,
+    # is cooling down on bar 2 and re-enters on bar 3.
+    assert metrics.skipped_entries == {"max_trades": 1, "capital": 0, "cooldown": 1}
+    assert [(t["symbol"], t["entry_time"], t["exit_time"], t["reason"]) for t in metrics.trades] == [
+        ("A", 0, 1, "stop_loss"),
+        ("A", 3, 4, "end_of_data"),
+    ]
+    assert metrics.per_symbol["B"]["trades"] == 0
+    assert metrics.equity_curve[-1] == pytest.approx(metrics.final_equity)
+
+
+def test_config_from_risk_config():
+    config = PortfolioConfig.from_risk_config(
+        {"max_position_pct": 0.1, "max_portfolio_pct": 0.3, "symbol_cooldown_minutes": 4}, max_trades=3, bar_minutes=5
+    )
+    assert (config.max_trades, config.max_position_pct, config.max_portfolio_pct, config.symbol_cooldown_bars) == (3, 0.1, 0.3, 1)
+
+
+def test_fifty_symbol_universe_runs():
+    frames = _frames([f"S{i}" for i in range(50)], n=400)
+    metrics = PortfolioBacktester(PortfolioConfig(max_trades=5)).run_strategies(
+        frames, lambda sym: StrategyFactory.create_strategy("momentum", {"period": 10, "threshold": 0.01})
+    )
+    assert metrics.total_trades > 0
+    assert metrics.max_concurrent_positions <= 5
+    assert len(metrics.equity_curve) == 401
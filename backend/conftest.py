@@ -0,0 +1,19 @@
+"""Fixtures shared by the co-located ``app`` tests and the ``tests`` suite."""
+import pytest
+
+from app.engine.instrument_store import instrument_store
+from app.engine.candle_store import candle_store
+from app.engine.fno_universe import fno_universe
+
+
+@pytest.fixture(autouse=True)
+def isolated_instrument_store(tmp_path, monkeypatch):
+    """Keep each test's mocked instrument dumps and candles out of the shared stores."""
+    monkeypatch.setenv("INSTRUMENT_STORE_DIR", str(tmp_path / "instruments"))
+    instrument_store.clear_memory()
+    candle_store.clear()
+    fno_universe.clear()
+    yield instrument_store
+    instrument_store.clear_memory()
+    candle_store.clear()
+    fno_universe.clear()
@@ -0,0 +1,116 @@
+"""Shared fixtures for the pytest-benchmark suite.
+
+Benchmarks are skipped in the regular test run; select them with
+``--benchmark-only`` (see tests/README.md for baselines and the CI gate).
+"""
+from datetime import date, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.engine import rate_limiter
+
+_HERE = Path(__file__).parent
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("benchmark_only", default=False):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with --benchmark-only")
+    for item in items:
+        if _HERE in Path(str(item.fspath)).parents:
+            item.add_marker(skip)
+
+
+def make_ohlcv(bars: int, seed: int = 7, start: str = "2024-01-01 09:15") -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 20000 * np.cumprod(1 + rng.normal(0, 0.002, bars))
+    spread = np.abs(rng.normal(0, 0.001, bars)) * close
+    return pd.DataFrame(
+        {
+            "open": np.r_[close[0], close[:-1]],
+            "high": close + spread,
+            "low": close - spread,
+            "close": close,
+            "volume": rng.integers(1_000, 50_000, bars).astype(float),
+        },
+        index=pd.date_range(start, periods=bars, freq="5min"),
+    )
+
+
+@pytest.fixture(scope="session")
+def ohlcv():
+    return make_ohlcv
+
+
+@pytest.fixture
+def throughput(benchmark):
+    """Record ``items / mean seconds`` in the benchmark's extra_info."""
+    def record(items: int, unit: str) -> None:
+        stats = getattr(benchmark, "stats", None)
+        if stats is not None and stats.stats.mean:
+            benchmark.extra_info[f"{unit}_per_second"] = round(items / stats.stats.mean, 1)
+    return record
+
+
+class FakeBroker:
+    """Deterministic in-memory Kite stand-in: option instruments, flat quotes, no candles."""
+
+    SPOTS = {"NIFTY": 25000, "BANKNIFTY": 55000, "TCS": 4100, "INFY": 800, "RELIANCE": 3000}
+
+    def __init__(self):
+        expiry = date.today() + timedelta(days=10)
+        self._instruments = []
+        for name, spot in self.SPOTS.items():
+            step = 50 if spot > 10000 else 10
+            atm = round(spot / step) * step
+            for offset in range(-10, 11):
+                for kind in ("CE", "PE"):
+                    strike = atm + offset * step
+                    self._instruments.append({
+                        "tradingsymbol": f"{name}X{strike}{kind}",
+                        "segment": "NFO-OPT",
+                        "exchange": "NFO",
+                        "name": name,
+                        "expiry": expiry,
+                        "strike": strike,
+                        "instrument_type": kind,
+                        "lot_size": 50,
+                        "instrument_token": len(self._instruments) + 1,
+                    })
+        self.prices = {}
+
+    def instruments(self, exchange=None):
+        return self._instruments
+
+    def quote(self, symbols):
+        symbols = [symbols] if isinstance(symbols, str) else symbols
+        quotes = {}
+        for symbol in symbols:
+            price = self.prices.get(symbol, 100.0)
+            quotes[symbol] = {
+                "last_price": price,
+                "ohlc": {"open": price * 0.99, "high": price * 1.02, "low": price * 0.97, "close": price * 0.995},
+                "volume": 100000,
+                "oi": 5000,
+                "depth": {"buy": [{"price": price - 0.05, "quantity": 100}], "sell": [{"price": price + 0.05, "quantity": 100}]},
+            }
+        return quotes
+
+    def ltp(self, symbols):
+        symbols = [symbols] if isinstance(symbols, str) else symbols
+        return {s: {"last_price": self.prices.get(s, 100.0), "instrument_token": 1} for s in symbols}
+
+    def historical_data(self, **kwargs):
+        return []
+
+
+@pytest.fixture
+def fake_broker():
+    # The process-wide Kite token buckets (1 quote req/s) would make every
+    # round mostly sleep; benchmarks measure our code, not the broker limit.
+    with patch.dict(rate_limiter.KITE_RATE_LIMITS, clear=True):
+        yield FakeBroker()
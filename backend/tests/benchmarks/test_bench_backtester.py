@@ -0,0 +1,51 @@
+"""Backtester throughput (bars/s) for the series, per-bar and portfolio engines.
+
+Backtests run outside an indicator-cache scope, so every round measures a
+cold backtest.
+"""
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.strategies.backtester import Backtester
+from app.strategies.base import StrategyFactory
+from app.strategies.portfolio_backtester import PortfolioBacktester, PortfolioConfig
+
+BARS = 20_000
+PORTFOLIO_SYMBOLS = 50
+PORTFOLIO_BARS = 2_000
+PARAMS = {"fast_period": 10, "slow_period": 30, "stop_loss_percent": 0.5, "take_profit_percent": 1.0}
+
+
+@pytest.fixture(scope="module")
+def frame(ohlcv):
+    return ohlcv(BARS)
+
+
+def _ma_crossover(_symbol=None):
+    return StrategyFactory.create_strategy("ma_crossover", PARAMS)
+
+
+def _cold(benchmark, fn, rounds=10):
+    return benchmark.pedantic(fn, rounds=rounds, iterations=1, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group="backtester")
+def test_signal_series_backtest(benchmark, throughput, frame):
+    _cold(benchmark, lambda: Backtester(_ma_crossover()).backtest(frame, symbol="NIFTY"))
+    throughput(BARS, "bars")
+
+
+@pytest.mark.benchmark(group="backtester")
+def test_bar_hook_backtest(benchmark, throughput, frame):
+    strategy = StrategyFactory.create_strategy("intraday_professional", {})
+    _cold(benchmark, lambda: Backtester(strategy).backtest(frame, symbol="NIFTY"))
+    throughput(BARS, "bars")
+
+
+@pytest.mark.benchmark(group="backtester")
+def test_portfolio_backtest(benchmark, throughput, ohlcv):
+    data = {f"S{i}": ohlcv(PORTFOLIO_BARS, seed=i) for i in range(PORTFOLIO_SYMBOLS)}
+    runner = PortfolioBacktester(PortfolioConfig(max_trades=5))
+    _cold(benchmark, lambda: runner.run_strategies(data, _ma_crossover), rounds=5)
+    throughput(PORTFOLIO_SYMBOLS * PORTFOLIO_BARS, "bars")
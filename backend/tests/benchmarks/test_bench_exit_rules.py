@@ -0,0 +1,53 @@
+"""Vectorized exit-rule batches over 1k-100k open trades."""
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.engine import exit_rules
+
+SIZES = [1_000, 10_000, 100_000]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n // 1000}k")
+def batch(request):
+    rows = request.param
+    rng = np.random.default_rng(0)
+    sign = np.where(rng.random(rows) < 0.5, 1.0, -1.0)
+    entry = rng.uniform(50, 500, rows)
+    price = entry * (1 + rng.normal(0, 0.01, rows))
+    start, trail_stop, step = exit_rules.initial_trail(sign, entry, exit_rules.LiveRules())
+    return {
+        "kind": rng.integers(0, 3, rows),
+        "sign": sign,
+        "entry": entry,
+        "qty": np.full(rows, 50.0),
+        "price": price,
+        "prev_price": price * (1 + rng.normal(0, 0.001, rows)),
+        "stop": entry * (1 - sign * 0.01),
+        "target": entry * (1 + sign * 0.02),
+        "peak_pnl": np.full(rows, np.nan),
+        "breakeven_applied": np.zeros(rows, dtype=bool),
+        "trail_active": rng.random(rows) < 0.3,
+        "trail_start": start,
+        "trail_stop": trail_stop,
+        "trail_step": step,
+        "support": np.full(rows, np.nan),
+        "resistance": np.full(rows, np.nan),
+    }
+
+
+@pytest.mark.benchmark(group="exit-rules")
+def test_paper_exits(benchmark, throughput, batch):
+    columns = {k: batch[k] for k in ("entry", "stop", "target", "sign", "price", "prev_price", "qty")}
+    result = benchmark(exit_rules.paper_exits, **columns)
+    assert len(result.status) == len(batch["price"])
+    throughput(len(batch["price"]), "trades")
+
+
+@pytest.mark.benchmark(group="exit-rules")
+def test_live_exits(benchmark, throughput, batch):
+    columns = {k: v for k, v in batch.items() if k != "prev_price"}
+    result = benchmark(exit_rules.live_exits, **columns, rules=exit_rules.LiveRules())
+    assert len(result.status) == len(batch["price"])
+    throughput(len(batch["price"]), "trades")
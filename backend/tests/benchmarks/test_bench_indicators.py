@@ -0,0 +1,40 @@
+"""Indicator throughput (bars/s)."""
+import numpy as np
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.engine.streaming_indicators import IndicatorSet
+from app.engine.technical_indicators import calculate_indicators_batch
+from app.strategies import intraday_professional
+
+BARS = 20_000
+SYMBOLS = 200
+SYMBOL_BARS = 300
+
+
+@pytest.fixture(scope="module")
+def frame(ohlcv):
+    return ohlcv(BARS)
+
+
+@pytest.mark.benchmark(group="indicators")
+def test_intraday_professional_signals(benchmark, throughput, frame):
+    benchmark(intraday_professional.generate_signals, frame)
+    throughput(BARS, "bars")
+
+
+@pytest.mark.benchmark(group="indicators")
+def test_streaming_indicator_set(benchmark, throughput, frame):
+    highs, lows, closes, volumes = (frame[c].to_numpy() for c in ("high", "low", "close", "volume"))
+    benchmark(lambda: IndicatorSet().update_many(highs, lows, closes, volumes))
+    throughput(BARS, "bars")
+
+
+@pytest.mark.benchmark(group="indicators")
+def test_batch_indicators_across_symbols(benchmark, throughput, ohlcv):
+    frames = [ohlcv(SYMBOL_BARS, seed=i) for i in range(SYMBOLS)]
+    closes, highs, lows, volumes = (np.vstack([f[c].to_numpy() for f in frames]) for c in ("close", "high", "low", "volume"))
+    symbols = [f"S{i}" for i in range(SYMBOLS)]
+    benchmark(calculate_indicators_batch, closes, highs, lows, volumes, symbols=symbols)
+    throughput(SYMBOLS * SYMBOL_BARS, "bars")
@@ -0,0 +1,55 @@
+"""Paper-trade price update throughput (trades/s)."""
+import pytest
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core.database import Base
+from app.engine.paper_trade_updater import update_open_paper_trades
+from app.models.trading import PaperTrade
+
+OPEN_TRADES = 1_000
+
+
+@pytest.fixture(scope="module")
+def paper_db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[PaperTrade.__table__])
+    with engine.begin() as conn:
+        conn.execute(insert(PaperTrade), [
+            {
+                "symbol": f"NIFTY26MAR{22000 + 50 * (i % 100)}CE",
+                "side": "BUY",
+                "quantity": 50,
+                "entry_price": 100.0,
+                "current_price": 100.0,
+                "stop_loss": 90.0,
+                "target": 130.0,
+                "status": "OPEN",
+            }
+            for i in range(OPEN_TRADES)
+        ])
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+@pytest.mark.benchmark(group="paper-updates")
+def test_update_open_paper_trades(benchmark, throughput, paper_db, fake_broker):
+    # Price stays between SL and the breakeven trigger, so every round updates all trades.
+    fake_broker.prices = {f"NFO:NIFTY26MAR{22000 + 50 * k}CE": 105.0 for k in range(100)}
+
+    def reset():
+        paper_db.execute(update(PaperTrade).values(current_price=100.0, stop_loss=90.0, status="OPEN"))
+        paper_db.commit()
+
+    result = benchmark.pedantic(
+        lambda: update_open_paper_trades(paper_db, force=True, kite=fake_broker, ltp_timeout_s=None),
+        setup=reset,
+        rounds=10,
+        iterations=1,
+    )
+    assert result["updated_count"] == OPEN_TRADES
+    throughput(OPEN_TRADES, "trades")
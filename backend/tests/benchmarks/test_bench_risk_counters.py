@@ -0,0 +1,55 @@
+"""Daily risk counters over 10k-100k persisted trades."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+pytest.importorskip("pytest_benchmark")
+
+from app.core.database import Base
+from app.core.market_hours import ist_now
+from app.models.trading import PaperTrade
+from app.routes.auto_trading_simple import _count_daily_trades, _get_daily_pnl
+
+SIZES = [10_000, 100_000]
+
+
+@pytest.fixture(scope="module", params=SIZES, ids=lambda n: f"{n // 1000}k")
+def trade_db(request):
+    rows = request.param
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine, tables=[PaperTrade.__table__])
+    day_start = datetime.combine(ist_now().date(), datetime.min.time())
+    with engine.begin() as conn:
+        conn.execute(insert(PaperTrade), [
+            {
+                "symbol": f"NIFTY{i % 100}",
+                "side": "BUY" if i % 2 else "SELL",
+                "quantity": 50,
+                "entry_price": 100.0,
+                "exit_price": 110.0 if i % 3 else 95.0,
+                "status": "TARGET_HIT" if i % 3 else "SL_HIT",
+                "entry_time": day_start + timedelta(milliseconds=i),
+                "exit_time": day_start + timedelta(milliseconds=i + 500),
+            }
+            for i in range(rows)
+        ])
+    session = sessionmaker(bind=engine)()
+    yield session, rows
+    session.close()
+    engine.dispose()
+
+
+@pytest.mark.benchmark(group="risk-counters")
+def test_count_daily_trades(benchmark, throughput, trade_db):
+    session, rows = trade_db
+    assert benchmark(_count_daily_trades, session) == rows
+    throughput(rows, "trades")
+
+
+@pytest.mark.benchmark(group="risk-counters")
+def test_get_daily_pnl(benchmark, throughput, trade_db):
+    session, rows = trade_db
+    benchmark(_get_daily_pnl, session)
+    throughput(rows, "trades")
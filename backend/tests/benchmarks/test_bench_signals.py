@@ -0,0 +1,23 @@
+"""Full option-signal scan against an in-memory broker."""
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+from app.engine import option_signal_generator as osg
+
+
+@pytest.mark.benchmark(group="signals")
+def test_generate_signals_scan(benchmark, fake_broker):
+    def scan():
+        # Clear the response cache on every call so each one is a full scan.
+        osg._signals_cache.clear()
+        return osg.generate_signals(include_nifty50=True, max_symbols=120)
+
+    with patch.object(osg, "_get_kite", return_value=fake_broker):
+        # A scan is a few ms of thread-pool fan-out; batching calls per round
+        # keeps scheduling jitter out of the regression gate.
+        signals = benchmark.pedantic(scan, rounds=20, iterations=10, warmup_rounds=1)
+    osg._signals_cache.clear()
+    assert any(not s.get("error") for s in signals)
@@ -0,0 +1,66 @@
+"""Walk-forward grid runner: parallel runs must match the serial report."""
+import sys
+from dataclasses import asdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tools"))
+from walkforward_backtest import (  # noqa: E402
+    GridRunner,
+    SharedOHLCV,
+    choose_best_params,
+    default_param_grid,
+    walk_forward,
+)
+
+
+def _daily(n=700, seed=21, tz=None):
+    rng = np.random.default_rng(seed)
+    close = 18000 * np.cumprod(1 + rng.normal(0.0003, 0.01, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close * (1 + rng.uniform(0, 0.01, n)),
+            "low": close * (1 - rng.uniform(0, 0.01, n)),
+            "close": close,
+            "volume": rng.integers(1_000, 10_000, n).astype(float),
+        },
+        index=pd.date_range("2021-01-01", periods=n, freq="B", tz=tz),
+    )
+
+
+def _summary(results):
+    return [(i, params, asdict(train), asdict(test)) for i, params, train, test in results]
+
+
+def test_parallel_walk_forward_matches_serial():
+    data = _daily()
+    events = pd.DataFrame(columns=["timestamp", "event"])
+    grid = default_param_grid("ma_crossover")
+
+    with GridRunner(data, "ma_crossover", "NIFTY", events, workers=1) as runner:
+        serial = walk_forward(runner, grid, 250, 100, 100)
+    with GridRunner(data, "ma_crossover", "NIFTY", events, workers=3) as runner:
+        parallel = walk_forward(runner, grid, 250, 100, 100)
+
+    assert len(serial) == 4
+    assert _summary(parallel) == _summary(serial)
+
+    first_start, first_params, first_train, _ = serial[0]
+    best_params, best_train = choose_best_params("ma_crossover", grid, data.iloc[first_start:250], "NIFTY", events)
+    assert first_params == best_params
+    assert asdict(first_train) == asdict(best_train)
+
+
+def test_shared_ohlcv_round_trips_frame_and_index():
+    for data in (_daily(50, tz="Asia/Kolkata"), _daily(50).reset_index(drop=True)):
+        shared = SharedOHLCV(data)
+        try:
+            shm, frame = SharedOHLCV.attach(shared.spec())
+            pd.testing.assert_frame_equal(frame, data, check_freq=False)
+            del frame
+            shm.close()
+        finally:
+            shared.close()
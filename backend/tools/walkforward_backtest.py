@@ -3,11 +3,17 @@ Walk-forward backtest runner using existing strategy + backtester.
 
 Usage examples:
   PYTHONPATH=backend python backend/tools/walkforward_backtest.py --ticker ^NSEI --strategy ma_crossover
+  PYTHONPATH=backend python backend/tools/walkforward_backtest.py --ticker ^NSEI --strategy rsi --workers 0
   PYTHONPATH=backend python backend/tools/walkforward_backtest.py --ticker ^NSEBANK --strategy momentum --period 5y
   PYTHONPATH=backend python backend/tools/walkforward_backtest.py --csv data/nifty_ohlcv.csv --strategy intraday_professional
 
 CSV must contain OHLCV columns: open, high, low, close, volume (any case).
 Optional events CSV format: timestamp,event (ISO-8601 timestamp).
+
+--workers N runs the parameter grid on N processes (0 = all cores). The OHLCV
+arrays are placed in shared memory once; workers attach to them instead of
+receiving pickled frames, and results are collected in grid order so the
+report is identical to a serial run.
 """
 
 from __future__ import annotations
@@ -15,14 +21,19 @@ from __future__ import annotations
 import argparse
 import itertools
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from app.strategies.base import StrategyFactory
 from app.strategies.backtester import Backtester, BacktestMetrics
+from app.strategies.indicator_cache import indicator_cache
 
 
 class EntryGuardAtrWrapper:
@@ -67,6 +78,10 @@ class EntryGuardAtrWrapper:
     def _atr(self, data: pd.DataFrame) -> float:
         if len(data) < (self.atr_period + 2):
             return 0.0
+        atr = self._atr_series(data).iloc[-1]
+        return float(atr) if pd.notna(atr) else 0.0
+
+    def _atr_series(self, data: pd.DataFrame) -> pd.Series:
         high = data["high"].astype(float)
         low = data["low"].astype(float)
         close = data["close"].astype(float)
@@ -79,13 +94,69 @@ class EntryGuardAtrWrapper:
             ],
             axis=1,
         ).max(axis=1)
-        atr = tr.rolling(self.atr_period).mean().iloc[-1]
-        return float(atr) if pd.notna(atr) else 0.0
+        return tr.rolling(self.atr_period).mean()
+
+    def _cached_atr(self, data: pd.DataFrame) -> np.ndarray:
+        """Whole-window ATR, shared across grid points through the indicator cache."""
+        return indicator_cache.get(data, "atr", self.atr_period, lambda: self._atr_series(data).to_numpy())
 
     def generate_signal(self, data: pd.DataFrame):
         signal = self.base.generate_signal(data)
-
         current_ts = data.index[-1] if len(data) > 0 else None
+        return self._guard(signal, current_ts, lambda: data["close"].iloc[-1], lambda: self._atr(data))
+
+    def prepare(self, data: pd.DataFrame) -> Dict[str, Any] | None:
+        base_prepare = getattr(self.base, "prepare", None)
+        base_indicators = base_prepare(data) if callable(base_prepare) else None
+        if base_indicators is None:
+            return None
+        atr = self._cached_atr(data) if self.use_atr_wrapper else None
+        return {"base": base_indicators, "atr": atr}
+
+    def on_bar(self, i: int, data: pd.DataFrame, indicators: Dict[str, Any]):
+        signal = self.base.on_bar(i, data, indicators["base"])
+
+        def atr_at() -> float:
+            if i + 1 < (self.atr_period + 2):
+                return 0.0
+            value = indicators["atr"][i]
+            return float(value) if pd.notna(value) else 0.0
+
+        return self._guard(signal, data.index[i], lambda: data["close"].iloc[i], atr_at)
+
+    def generate_signal_series(self, data: pd.DataFrame) -> pd.DataFrame | None:
+        series_fn = getattr(self.base, "generate_signal_series", None)
+        series = series_fn(data) if callable(series_fn) else None
+        if series is None:
+            return None
+        action = series["action"].to_numpy().copy()
+        entry_price = series["entry_price"].to_numpy(dtype=float).copy()
+        stop_loss = series["stop_loss"].to_numpy(dtype=float).copy()
+        take_profit = series["take_profit"].to_numpy(dtype=float).copy()
+        closes = data["close"].to_numpy(dtype=float)
+        atr = self._cached_atr(data) if self.use_atr_wrapper else None
+
+        # Guards only touch buy bars, so this loop is over entries, not bars.
+        for i in np.flatnonzero(action == "buy"):
+            if self._is_event_blackout(data.index[i]):
+                action[i] = "hold"
+                stop_loss[i] = take_profit[i] = np.nan
+                continue
+            if atr is None:
+                continue
+            atr_val = float(atr[i]) if i + 1 >= (self.atr_period + 2) and pd.notna(atr[i]) else 0.0
+            entry = entry_price[i] if entry_price[i] and not np.isnan(entry_price[i]) else closes[i]
+            if atr_val > 0 and entry > 0:
+                entry_price[i] = entry
+                stop_loss[i] = entry - (atr_val * self.atr_mult)
+                take_profit[i] = entry + (atr_val * self.atr_mult * self.tp_mult)
+
+        return pd.DataFrame(
+            {"action": action, "entry_price": entry_price, "stop_loss": stop_loss, "take_profit": take_profit},
+            index=series.index,
+        )
+
+    def _guard(self, signal, current_ts: Any, last_close, atr_value):
         if signal.action == "buy" and self._is_event_blackout(current_ts):
             signal.action = "hold"
             signal.strength = 0.0
@@ -94,8 +165,8 @@ class EntryGuardAtrWrapper:
             return signal
 
         if self.use_atr_wrapper and signal.action == "buy":
-            atr_val = self._atr(data)
-            entry = float(signal.entry_price or data["close"].iloc[-1])
+            atr_val = atr_value()
+            entry = float(signal.entry_price or last_close())
             if atr_val > 0 and entry > 0:
                 signal.entry_price = entry
                 signal.stop_loss = entry - (atr_val * self.atr_mult)
@@ -247,6 +318,20 @@ def run_backtest_once(
     return engine.backtest(df, symbol=symbol)
 
 
+def select_best_params(
+    param_grid: List[Dict[str, Any]],
+    results: List[BacktestMetrics],
+) -> Tuple[Dict[str, Any], BacktestMetrics]:
+    """First grid entry with the highest (sharpe, return, win rate) score."""
+    best_params, best_metrics = param_grid[0], results[0]
+    best_score = (best_metrics.sharpe_ratio, best_metrics.total_return, best_metrics.win_rate)
+    for params, m in zip(param_grid[1:], results[1:]):
+        score = (m.sharpe_ratio, m.total_return, m.win_rate)
+        if score > best_score:
+            best_params, best_metrics, best_score = params, m, score
+    return best_params, best_metrics
+
+
 def choose_best_params(
     strategy_type: str,
     param_grid: List[Dict[str, Any]],
@@ -257,35 +342,217 @@ def choose_best_params(
     use_atr_wrapper: bool = False,
     atr_period: int = 14,
 ) -> Tuple[Dict[str, Any], BacktestMetrics]:
-    best_params = param_grid[0]
-    best_metrics = run_backtest_once(
-        strategy_type,
-        best_params,
-        train_df,
-        symbol,
-        events,
-        event_blackout_days,
-        use_atr_wrapper,
-        atr_period,
+    with indicator_cache.scope():
+        results = [
+            run_backtest_once(
+                strategy_type,
+                params,
+                train_df,
+                symbol,
+                events,
+                event_blackout_days,
+                use_atr_wrapper,
+                atr_period,
+            )
+            for params in param_grid
+        ]
+    return select_best_params(param_grid, results)
+
+
+# --- Parallel grid evaluation ---
+
+_OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+# Per-worker state set by _init_worker: the shared-memory handle, the OHLCV
+# frame viewing it, and the run settings shared by every task.
+_worker: Dict[str, Any] = {}
+
+
+def _index_layout(index: pd.Index) -> Optional[Dict[str, Any]]:
+    """How to rebuild ``index`` from int64s, or None if it cannot be."""
+    if isinstance(index, pd.DatetimeIndex):
+        return {"kind": "datetime", "unit": index.unit, "tz": str(index.tz) if index.tz else None, "name": index.name}
+    if pd.api.types.is_integer_dtype(index.dtype):
+        return {"kind": "integer", "name": index.name}
+    return None
+
+
+def _rebuild_index(values: np.ndarray, layout: Dict[str, Any]) -> pd.Index:
+    if layout["kind"] == "integer":
+        return pd.Index(values, name=layout["name"])
+    index = pd.DatetimeIndex(values.view(f"M8[{layout['unit']}]"), name=layout["name"])
+    if layout["tz"]:
+        index = index.tz_localize("UTC").tz_convert(layout["tz"])
+    return index
+
+
+class SharedOHLCV:
+    """OHLCV frame copied once into a shared-memory block.
+
+    The block holds a (5, bars) float64 matrix followed by the index as int64
+    (epoch units for a DatetimeIndex). Other index types are small enough to
+    ship to each worker once at start-up.
+    """
+
+    def __init__(self, data: pd.DataFrame):
+        self.bars = len(data)
+        self.layout = _index_layout(data.index)
+        self.index = None if self.layout else data.index
+        size = max(1, (len(_OHLCV_COLUMNS) + 1) * self.bars * 8)
+        self.shm = shared_memory.SharedMemory(create=True, size=size)
+        prices, index_values = self.views(self.shm.buf, self.bars)
+        prices[:] = data[_OHLCV_COLUMNS].to_numpy(dtype=np.float64).T
+        if self.layout:
+            index_values[:] = data.index.asi8 if self.layout["kind"] == "datetime" else data.index.to_numpy(dtype=np.int64)
+
+    @staticmethod
+    def views(buf, bars: int) -> Tuple[np.ndarray, np.ndarray]:
+        prices = np.ndarray((len(_OHLCV_COLUMNS), bars), dtype=np.float64, buffer=buf)
+        index_values = np.ndarray((bars,), dtype=np.int64, buffer=buf, offset=prices.nbytes)
+        return prices, index_values
+
+    def spec(self) -> Dict[str, Any]:
+        return {"name": self.shm.name, "bars": self.bars, "layout": self.layout, "index": self.index, "owner": os.getpid()}
+
+    @classmethod
+    def attach(cls, spec: Dict[str, Any]) -> Tuple[shared_memory.SharedMemory, pd.DataFrame]:
+        shm = shared_memory.SharedMemory(name=spec["name"])
+        if spec.get("owner") != os.getpid():
+            # The parent owns (and unlinks) the block; keep the resource
+            # tracker from unlinking it when a worker exits.
+            try:
+                resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+            except Exception:
+                pass
+        prices, index_values = cls.views(shm.buf, spec["bars"])
+        index = spec["index"] if spec["layout"] is None else _rebuild_index(index_values, spec["layout"])
+        frame = pd.DataFrame(dict(zip(_OHLCV_COLUMNS, prices)), index=index, copy=False)
+        return shm, frame
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+def _init_worker(spec: Dict[str, Any], settings: Dict[str, Any]) -> None:
+    shm, frame = SharedOHLCV.attach(spec)
+    _worker.update(shm=shm, data=frame, settings=settings)
+    # A pool worker lives for one walk-forward run, so its cache scope does too.
+    indicator_cache.open_scope()
+
+
+def _run_task(task: Tuple[Dict[str, Any], int, int]) -> BacktestMetrics:
+    params, start, stop = task
+    settings = _worker["settings"]
+    return run_backtest_once(
+        settings["strategy_type"],
+        params,
+        _worker["data"].iloc[start:stop],
+        settings["symbol"],
+        settings["events"],
+        settings["event_blackout_days"],
+        settings["use_atr_wrapper"],
+        settings["atr_period"],
     )
-    best_score = (best_metrics.sharpe_ratio, best_metrics.total_return, best_metrics.win_rate)
 
-    for params in param_grid[1:]:
-        m = run_backtest_once(
-            strategy_type,
-            params,
-            train_df,
-            symbol,
-            events,
-            event_blackout_days,
-            use_atr_wrapper,
-            atr_period,
-        )
-        score = (m.sharpe_ratio, m.total_return, m.win_rate)
-        if score > best_score:
-            best_params, best_metrics, best_score = params, m, score
 
-    return best_params, best_metrics
+class GridRunner:
+    """Runs ``(params, start, stop)`` backtests serially or on a process pool.
+
+    Results always come back in task order, so parameter selection is the
+    same whatever the worker count.
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame,
+        strategy_type: str,
+        symbol: str,
+        events: pd.DataFrame,
+        event_blackout_days: int = 0,
+        use_atr_wrapper: bool = False,
+        atr_period: int = 14,
+        workers: int = 1,
+    ) -> None:
+        self.data = data
+        self.settings = {
+            "strategy_type": strategy_type,
+            "symbol": symbol,
+            "events": events,
+            "event_blackout_days": event_blackout_days,
+            "use_atr_wrapper": use_atr_wrapper,
+            "atr_period": atr_period,
+        }
+        self.workers = (os.cpu_count() or 1) if workers <= 0 else int(workers)
+        self._shared: Optional[SharedOHLCV] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            self._shared = SharedOHLCV(data)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self._shared.spec(), self.settings),
+            )
+
+    def run(self, tasks: List[Tuple[Dict[str, Any], int, int]]) -> List[BacktestMetrics]:
+        if self._pool is None:
+            s = self.settings
+            return [
+                run_backtest_once(
+                    s["strategy_type"],
+                    params,
+                    self.data.iloc[start:stop],
+                    s["symbol"],
+                    s["events"],
+                    s["event_blackout_days"],
+                    s["use_atr_wrapper"],
+                    s["atr_period"],
+                )
+                for params, start, stop in tasks
+            ]
+        chunksize = max(1, len(tasks) // (self.workers * 4))
+        return list(self._pool.map(_run_task, tasks, chunksize=chunksize))
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def __enter__(self) -> "GridRunner":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def walk_forward(
+    runner: GridRunner,
+    param_grid: List[Dict[str, Any]],
+    train_bars: int,
+    test_bars: int,
+    step_bars: int,
+) -> List[Tuple[int, Dict[str, Any], BacktestMetrics, BacktestMetrics]]:
+    """Best train-window params and their test metrics for every window.
+
+    The whole train grid (windows x params) is submitted as one batch, then
+    the test runs as a second batch. Returns ``(start, best_params,
+    train_metrics, test_metrics)`` per window, in window order.
+    """
+    starts = list(range(0, len(runner.data) - train_bars - test_bars + 1, step_bars))
+    train_tasks = [(params, i, i + train_bars) for i in starts for params in param_grid]
+    with indicator_cache.scope():
+        train_results = runner.run(train_tasks)
+
+    chosen = []
+    for w, i in enumerate(starts):
+        window_results = train_results[w * len(param_grid):(w + 1) * len(param_grid)]
+        chosen.append(select_best_params(param_grid, window_results))
+
+    test_tasks = [(best, i + train_bars, i + train_bars + test_bars) for i, (best, _) in zip(starts, chosen)]
+    test_results = runner.run(test_tasks)
+    return [(i, best, train, test) for i, (best, train), test in zip(starts, chosen, test_results)]
 
 
 def summarize_windows(windows: List[Dict[str, Any]]) -> Dict[str, Any]:
@@ -362,6 +629,7 @@ def main() -> None:
     parser.add_argument("--train-bars", type=int, default=504, help="Bars in each training window")
     parser.add_argument("--test-bars", type=int, default=126, help="Bars in each testing window")
     parser.add_argument("--step-bars", type=int, default=126, help="Window step size")
+    parser.add_argument("--workers", type=int, default=1, help="Processes for the parameter grid (0 = all cores)")
     parser.add_argument("--out", default="backend/tools/walkforward_result.json", help="Output JSON file")
     args = parser.parse_args()
 
@@ -379,33 +647,23 @@ def main() -> None:
     tp_mults = parse_float_list(args.tp_mults, [2.0, 2.5, 3.0])
     param_grid = build_param_grid(args.strategy, args.use_atr_wrapper, atr_mults, tp_mults)
 
+    with GridRunner(
+        data,
+        args.strategy,
+        symbol,
+        events,
+        args.event_blackout_days,
+        args.use_atr_wrapper,
+        args.atr_period,
+        workers=args.workers,
+    ) as runner:
+        results = walk_forward(runner, param_grid, args.train_bars, args.test_bars, args.step_bars)
+
     windows: List[Dict[str, Any]] = []
-    i = 0
-    while i + args.train_bars + args.test_bars <= len(data):
+    for i, best_params, train_metrics, test_metrics in results:
         train_df = data.iloc[i : i + args.train_bars]
         test_df = data.iloc[i + args.train_bars : i + args.train_bars + args.test_bars]
 
-        best_params, train_metrics = choose_best_params(
-            args.strategy,
-            param_grid,
-            train_df,
-            symbol,
-            events,
-            args.event_blackout_days,
-            args.use_atr_wrapper,
-            args.atr_period,
-        )
-        test_metrics = run_backtest_once(
-            args.strategy,
-            best_params,
-            test_df,
-            symbol,
-            events,
-            args.event_blackout_days,
-            args.use_atr_wrapper,
-            args.atr_period,
-        )
-
         trades_near_events = count_trades_near_events(test_metrics.trades, events)
 
         windows.append(
@@ -437,8 +695,6 @@ def main() -> None:
             }
         )
 
-        i += args.step_bars
-
     summary = summarize_windows(windows)
 
     payload = {
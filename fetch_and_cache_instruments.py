@@ -1,7 +1,10 @@
 import os
-import json
+import sys
 from kiteconnect import KiteConnect
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "backend"))
+from app.engine.instrument_store import instrument_store
+
 API_KEY = os.getenv("ZERODHA_API_KEY", "30i4qnng2thn7mfd")
 ACCESS_TOKEN = os.getenv("ZERODHA_ACCESS_TOKEN", "c2LLp1Wp179507J20r7o8Xkv60N4UKGb")
 
@@ -9,12 +12,8 @@ kite = KiteConnect(api_key=API_KEY)
 kite.set_access_token(ACCESS_TOKEN)
 
 print("Fetching instruments from Zerodha...")
-instruments = kite.instruments()
-# Convert any date fields to string for JSON serialization
-for inst in instruments:
-    for k, v in inst.items():
-        if hasattr(v, 'isoformat'):
-            inst[k] = v.isoformat()
-with open("instruments_cache.json", "w", encoding="utf-8") as f:
-    json.dump(instruments, f)
-print(f"Saved {len(instruments)} instruments to instruments_cache.json")
+# Refresh the full dump plus the per-exchange dumps used by the signal scanner.
+for exchange in (None, "NSE", "NFO", "BFO"):
+    table = instrument_store.refresh(kite, exchange)
+    label = exchange or "ALL"
+    print(f"Saved {len(table)} {label} instruments to {instrument_store.root / table.trading_day.isoformat() / table.exchange}")